@@ -0,0 +1,198 @@
+"""벡터화 백테스트 벤치마크 + 기준 구현 대조
+
+가상 일봉(종목마다 상장 시점이 다름)을 바 저장소(필요하면 market_data 테이블)에 넣고 행렬로
+읽는 시간, 지표 계산, 다섯 전략의 백테스트 시간을 출력합니다. 일부 종목으로 같은 신호 행렬에
+대해 거래일을 하루씩 진행하는 순수 파이썬 기준 구현과 거래/평가액을 대조하고, 한 전략의
+결과를 trades/robots에 기록하는 시간도 잽니다.
+실행: cd backend && python -m benchmarks.bench_backtest [--symbols 500] [--days 2520] [--database]
+"""
+import argparse
+import math
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services import backtest
+
+
+def make_bars(symbols, days, seed=3):
+    """상장일이 다른 가상 OHLCV (종가는 기하 랜덤워크, 고가/저가는 시가/종가 바깥)"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, (symbols, days)), axis=1))
+    open_ = close * np.exp(rng.normal(0, 0.004, (symbols, days)))
+    high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, 0.008, (symbols, days))))
+    low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, 0.008, (symbols, days))))
+    volume = rng.integers(100_000, 5_000_000, (symbols, days)).astype(np.float64)
+    listed = days - rng.integers(days // 5, days + 1, symbols)
+    for row, first in enumerate(listed):
+        for values in (open_, high, low, close, volume):
+            values[row, :first] = np.nan
+    dates = np.busday_offset("2015-01-02", np.arange(days), roll="forward")
+    return backtest.BarMatrix([f"S{i:04d}" for i in range(symbols)], dates, open_, high, low, close, volume)
+
+
+def reference_trades(bars, entry, exit_signal, params, initial_capital, max_positions):
+    """거래일을 하루씩 진행하는 기준 구현 → [(종목 행, 진입일, 청산일, 수량, 청산가, 사유)], 일별 평가액"""
+    count, days = bars.shape
+    close = backtest._ffill(bars.close)
+    valid = ~np.isnan(bars.close)
+    last_valid = [days - 1 - int(np.argmax(valid[row, ::-1])) if valid[row].any() else -1 for row in range(count)]
+    realized = initial_capital  # 보유 수 제한이 있으면 실현 자본 기준, 없으면 초기 자본 고정
+    holding = params["max_holding_days"]
+    rate = backtest.DEFAULT_COMMISSION_RATE
+    positions, trades, equity, cash = {}, [], [], initial_capital
+    for day in range(days):
+        # 시가 진입 (전 봉 신호), 같은 날 후보는 종목 순서대로
+        for row in range(count):
+            if day == 0 or not entry[row, day - 1] or row in positions:
+                continue
+            price = bars.open[row, day]
+            if not price > 0 or day > last_valid[row] or (max_positions and len(positions) >= max_positions):
+                continue
+            capital = max(realized, 0.0) if max_positions else initial_capital
+            quantity = math.floor(capital * params["position_size_pct"] / 100 / price)
+            if quantity <= 0:
+                continue
+            positions[row] = (day, price, quantity)
+            cash -= quantity * price * (1 + rate)
+        # 장중 손절/익절, 종가 청산 신호/기간 만료
+        for row, (start, price, quantity) in list(positions.items()):
+            stop = price * (1 - params["stop_loss_pct"] / 100)
+            target = price * (1 + params["take_profit_pct"] / 100)
+            horizon = min(holding, last_valid[row] - start + 1)
+            opening = bars.open[row, day]
+            if bars.low[row, day] <= stop:
+                exit_price, reason = (opening if opening <= stop else stop), backtest.EXIT_STOP
+            elif bars.high[row, day] >= target:
+                exit_price, reason = (opening if opening >= target else target), backtest.EXIT_TARGET
+            elif exit_signal[row, day]:
+                exit_price, reason = close[row, day], backtest.EXIT_SIGNAL
+            elif day - start == horizon - 1:
+                exit_price = close[row, day]
+                reason = backtest.EXIT_EXPIRY if horizon == holding else backtest.EXIT_END
+            else:
+                continue
+            del positions[row]
+            cash += quantity * exit_price * (1 - rate)
+            realized += quantity * (exit_price * (1 - rate) - price * (1 + rate))
+            trades.append((row, start, day, quantity, exit_price, reason))
+        value = sum(quantity * close[row, day] for row, (_, _, quantity) in positions.items())
+        equity.append(cash + value)
+    return sorted(trades), np.array(equity)
+
+
+def check_reference(bars, strategy_type, max_positions):
+    features = backtest.Features(bars)
+    params = backtest.strategy_params(strategy_type)
+    entry, exit_signal = backtest.STRATEGIES[strategy_type]["signals"](features, params)
+    result = backtest.run_backtest(bars, strategy_type, max_positions=max_positions, features=features)
+    limit = max(int(100 // params["position_size_pct"]), 1) if max_positions is None else max_positions
+    expected, equity = reference_trades(bars, entry, exit_signal, params, result.initial_capital, limit)
+    t = result.trades
+    actual = sorted(zip(t["row"].tolist(), t["entry_day"].tolist(), t["exit_day"].tolist(),
+                        t["quantity"].tolist(), t["exit_price"].tolist(), t["reason"].tolist()))
+    if [a[:4] + a[5:] for a in actual] != [e[:4] + e[5:] for e in expected]:
+        raise AssertionError(f"{strategy_type} (max_positions={max_positions}): trades differ "
+                             f"({len(actual)} vs {len(expected)})")
+    assert np.allclose([a[4] for a in actual], [e[4] for e in expected], rtol=1e-12)
+    assert np.allclose(result.equity, equity, rtol=1e-9)
+    return len(actual)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--days", type=int, default=2520)
+    parser.add_argument("--check", type=int, default=40, help="기준 구현과 대조할 종목 수")
+    parser.add_argument("--database", action="store_true", help="market_data 테이블에서 읽는 시간도 측정")
+    args = parser.parse_args()
+
+    from sqlalchemy import create_engine, func, select
+    from src.models.trading import MarketData, Robot, Trade, db
+    from src.services.bar_store import BarStore
+
+    generated = make_bars(args.symbols, args.days)
+    bar_count = int((~np.isnan(generated.close)).sum())
+    print(f"{args.symbols} symbols x {args.days} days ({bar_count:,} bars)")
+
+    tmp = tempfile.mkdtemp()
+    store = BarStore(os.path.join(tmp, "bars"))
+    for row, symbol in enumerate(generated.symbols):
+        listed = ~np.isnan(generated.close[row])
+        store.write(symbol, generated.dates[listed], generated.open[row, listed], generated.high[row, listed],
+                    generated.low[row, listed], generated.close[row, listed], generated.volume[row, listed])
+    start = time.perf_counter()
+    bars = backtest.bars_from_store(store, generated.symbols)
+    print(f"  load matrix from bar store            {time.perf_counter() - start:7.3f} s")
+    # 행렬 날짜는 상장된 날짜의 합집합이므로 (첫날 상장한 종목이 없으면 앞쪽이 빠짐) 그 날짜로 맞춰 비교
+    columns = np.searchsorted(generated.dates, bars.dates)
+    assert np.array_equal(generated.dates[columns], bars.dates)
+    assert np.isnan(np.delete(generated.close, columns, axis=1)).all()
+    assert np.array_equal(bars.close, generated.close[:, columns], equal_nan=True)
+
+    engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+    db.metadata.create_all(engine)
+    if args.database:
+        with engine.begin() as conn:
+            for row, symbol in enumerate(bars.symbols):
+                listed = np.flatnonzero(~np.isnan(bars.close[row]))
+                conn.execute(MarketData.__table__.insert(), [
+                    {"symbol": symbol, "date": day, "open_price": o, "high_price": h, "low_price": l,
+                     "close_price": c, "volume": int(v), "data_source": "bench"}
+                    for day, o, h, l, c, v in zip(bars.dates[listed].tolist(), bars.open[row, listed].tolist(),
+                                                  bars.high[row, listed].tolist(), bars.low[row, listed].tolist(),
+                                                  bars.close[row, listed].tolist(),
+                                                  bars.volume[row, listed].tolist())
+                ])
+        start = time.perf_counter()
+        with engine.connect() as conn:
+            from_db = backtest.bars_from_database(conn, bars.symbols)
+        print(f"  load matrix from market_data          {time.perf_counter() - start:7.3f} s")
+        assert np.array_equal(from_db.close, bars.close, equal_nan=True)
+
+    features = backtest.Features(bars)
+    start = time.perf_counter()
+    features.base
+    print(f"  indicators (compute_batch)            {time.perf_counter() - start:7.3f} s")
+
+    total = time.perf_counter()
+    results = {}
+    for strategy_type in backtest.STRATEGIES:
+        start = time.perf_counter()
+        results[strategy_type] = result = backtest.run_backtest(bars, strategy_type, features=features)
+        unlimited = time.perf_counter()
+        backtest.run_backtest(bars, strategy_type, max_positions=0, features=features)
+        m = result.metrics
+        print(f"  {strategy_type:<8} {unlimited - start:6.3f} s (unlimited positions "
+              f"{time.perf_counter() - unlimited:6.3f} s)  {m['trades']:>6,} trades  return {m['total_return']:7.2f}%  "
+              f"win {m['win_rate']:5.1f}%  mdd {m['max_drawdown']:5.1f}%  sharpe {m['sharpe_ratio']:5.2f}")
+    print(f"  all five strategies (both modes)      {time.perf_counter() - total:7.3f} s")
+
+    subset = backtest.BarMatrix(bars.symbols[:args.check], bars.dates,
+                                *(getattr(bars, name)[:args.check] for name in backtest.OHLCV))
+    start = time.perf_counter()
+    checked = sum(check_reference(subset, strategy_type, max_positions)
+                  for strategy_type in backtest.STRATEGIES for max_positions in (None, 0))
+    print(f"  reference check: {checked:,} trades on {args.check} symbols match the day-by-day loop "
+          f"({time.perf_counter() - start:.1f} s)")
+
+    strategy_type = next(iter(backtest.STRATEGIES))
+    with engine.begin() as conn:
+        robot_id = conn.execute(Robot.__table__.insert().values(
+            name="Bench", strategy_type=strategy_type, initial_capital=100000
+        )).inserted_primary_key[0]
+    start = time.perf_counter()
+    saved = backtest.save_backtest(engine, robot_id, bars, features, results[strategy_type])
+    with engine.connect() as conn:
+        rows = conn.execute(select(func.count()).select_from(Trade.__table__)).scalar()
+    print(f"  save {strategy_type} trades + metrics          {time.perf_counter() - start:7.3f} s  "
+          f"({saved['inserted']:,} trade rows, table has {rows:,})")
+
+
+if __name__ == "__main__":
+    main()
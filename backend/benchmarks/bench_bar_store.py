@@ -0,0 +1,93 @@
+"""일봉 조회 벤치마크: market_data 테이블(행 단위) vs 컬럼형 바 저장소(메모리 맵)
+
+가상 일봉을 market_data에 채우고 바 저장소로 동기화한 뒤, 전체 종목의 종가 평균을 구하는
+시간을 비교합니다 (ORM 객체, Core SELECT, 바 저장소 뷰).
+실행: cd backend && python -m benchmarks.bench_bar_store [--symbols 500] [--days 2520]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def build_database(engine, symbols, days, seed=1):
+    """종목 symbols개 x 일봉 days개 가상 데이터"""
+    from src.models.trading import MarketData, db
+
+    db.metadata.create_all(engine)
+    rng = np.random.default_rng(seed)
+    start = date(2015, 1, 1)
+    dates = [start + timedelta(days=i) for i in range(days)]
+    with engine.begin() as conn:
+        for index in range(symbols):
+            close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, days)))
+            volume = rng.integers(100_000, 5_000_000, days)
+            conn.execute(MarketData.__table__.insert(), [
+                {"symbol": f"S{index:04d}", "date": day, "open_price": c, "high_price": c * 1.01,
+                 "low_price": c * 0.99, "close_price": c, "volume": int(v), "data_source": "bench"}
+                for day, c, v in zip(dates, close.tolist(), volume.tolist())
+            ])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--days", type=int, default=2520)
+    args = parser.parse_args()
+
+    from sqlalchemy import create_engine, select
+    from sqlalchemy.orm import Session
+    from src.models.trading import MarketData
+    from src.services.bar_store import BarStore, load_from_database
+
+    tmp = tempfile.mkdtemp()
+    engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+    build_database(engine, args.symbols, args.days)
+    store = BarStore(os.path.join(tmp, "bars"))
+    print(f"{args.symbols} symbols x {args.days} bars = {args.symbols * args.days:,} rows")
+
+    start = time.perf_counter()
+    with engine.connect() as conn:
+        load_from_database(conn, store)
+    print(f"  sync market_data -> bar store      {time.perf_counter() - start:7.2f} s")
+
+    symbols = store.symbols()
+
+    def orm():
+        with Session(engine) as session:
+            return [np.mean([bar.close_price for bar in session.scalars(
+                select(MarketData).where(MarketData.symbol == symbol).order_by(MarketData.date)
+            )]) for symbol in symbols]
+
+    def core():
+        table = MarketData.__table__
+        with engine.connect() as conn:
+            return [np.mean(conn.execute(
+                select(table.c.close_price).where(table.c.symbol == symbol).order_by(table.c.date)
+            ).scalars().all()) for symbol in symbols]
+
+    def bar_store():
+        return [store.read(symbol).close.mean() for symbol in symbols]
+
+    results = {}
+    for name, fn in [("ORM rows", orm), ("Core SELECT", core), ("bar store (mmap views)", bar_store)]:
+        start = time.perf_counter()
+        results[name] = fn()
+        print(f"  mean close, all symbols: {name:<24} {time.perf_counter() - start:7.3f} s")
+    assert np.allclose(results["ORM rows"], results["bar store (mmap views)"])
+
+    # 구간 조회 (1년): 이진 탐색 + 슬라이스
+    start = time.perf_counter()
+    for symbol in symbols:
+        store.read(symbol, date(2019, 1, 1), date(2019, 12, 31)).close.mean()
+    print(f"  1-year range, all symbols: bar store             {time.perf_counter() - start:7.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""손절/익절 트리거 인덱스 벤치마크
+
+종목 수만큼의 랜덤워크 가격으로 매 틱 전 종목 가격을 바꾸며, 열린 포지션 n개의 손절/익절 검사를
+세 가지로 비교합니다. 틱마다 발동한 수만큼 새 포지션을 넣어 n을 유지합니다.
+- TriggerIndex: 종목별 정렬 목록 이분 탐색 (O(log n + k))
+- naive scan: 틱마다 열린 포지션 전체를 파이썬 루프로 검사
+- numpy scan: 틱마다 전체 포지션 배열을 벡터 비교
+틱마다 세 방식이 발동시킨 포지션 집합이 같은지 확인합니다.
+실행: cd backend && python -m benchmarks.bench_exit_triggers [--positions 300000] [--symbols 500] [--ticks 200]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.exit_triggers import OpenPosition, TriggerIndex
+
+
+def new_positions(rng, start_id, count, symbols, prices):
+    """현재 가격 근처에서 진입한 포지션 (손절 -2~-8%, 익절 +3~+15%)"""
+    rows = rng.integers(0, len(symbols), count)
+    entry = prices[rows] * np.exp(rng.normal(0, 0.002, count))
+    stop = np.round(entry * (1 - rng.uniform(0.02, 0.08, count)), 2)
+    target = np.round(entry * (1 + rng.uniform(0.03, 0.15, count)), 2)
+    return [OpenPosition(start_id + i, 1, symbols[row], 10, price, stop_loss, take_profit)
+            for i, (row, price, stop_loss, take_profit)
+            in enumerate(zip(rows.tolist(), entry.tolist(), stop.tolist(), target.tolist()))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--positions", type=int, default=300000)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--volatility", type=float, default=0.002, help="틱당 가격 변동 (표준편차)")
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    symbols = [f"S{i:04d}" for i in range(args.symbols)]
+    prices = rng.uniform(20, 500, args.symbols)
+    initial = new_positions(rng, 1, args.positions, symbols, prices)
+    next_id = args.positions + 1
+
+    index = TriggerIndex()
+    start = time.perf_counter()
+    for position in initial:
+        index.add(position)
+    build = time.perf_counter() - start
+    # 비교 구현은 같은 포지션의 복사본 (open 표시를 따로 유지)
+    naive = {p.trade_id: (p.symbol, p.stop_loss, p.take_profit) for p in initial}
+    array_ids = np.array([p.trade_id for p in initial])
+    array_rows = np.array([int(p.symbol[1:]) for p in initial])
+    array_stop = np.array([p.stop_loss for p in initial])
+    array_target = np.array([p.take_profit for p in initial])
+    print(f"{args.positions:,} positions on {args.symbols} symbols, {args.ticks} ticks "
+          f"(index built in {build:.2f}s = {args.positions / build:,.0f} inserts/s)")
+
+    timings = {"index": 0.0, "naive": 0.0, "numpy": 0.0}
+    fired_total, mismatches, insert_time = 0, 0, 0.0
+    for _ in range(args.ticks):
+        prices = prices * np.exp(rng.normal(0, args.volatility, args.symbols))
+        price_list = prices.tolist()
+        by_symbol = dict(zip(symbols, price_list))
+
+        start = time.perf_counter()
+        hits = []
+        for symbol, price in by_symbol.items():
+            hits.extend(index.check(symbol, price))
+        timings["index"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        naive_hits = []
+        for trade_id, (symbol, stop_loss, take_profit) in naive.items():
+            price = by_symbol[symbol]
+            if price <= stop_loss or price >= take_profit:
+                naive_hits.append(trade_id)
+        for trade_id in naive_hits:
+            del naive[trade_id]
+        timings["naive"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        current = prices[array_rows]
+        mask = (current <= array_stop) | (current >= array_target)
+        numpy_hits = array_ids[mask]
+        keep = ~mask
+        array_ids, array_rows = array_ids[keep], array_rows[keep]
+        array_stop, array_target = array_stop[keep], array_target[keep]
+        timings["numpy"] += time.perf_counter() - start
+
+        fired = {position.trade_id for position, _ in hits}
+        if fired != set(naive_hits) or fired != set(numpy_hits.tolist()):
+            mismatches += 1
+        fired_total += len(fired)
+
+        # 발동한 만큼 새 포지션을 넣어 열린 포지션 수 유지
+        added = new_positions(rng, next_id, len(fired), symbols, prices)
+        next_id += len(added)
+        start = time.perf_counter()
+        for position in added:
+            index.add(position)
+        insert_time += time.perf_counter() - start
+        for position in added:
+            naive[position.trade_id] = (position.symbol, position.stop_loss, position.take_profit)
+        array_ids = np.concatenate([array_ids, [p.trade_id for p in added]]).astype(np.int64)
+        array_rows = np.concatenate([array_rows, [int(p.symbol[1:]) for p in added]]).astype(np.int64)
+        array_stop = np.concatenate([array_stop, [p.stop_loss for p in added]])
+        array_target = np.concatenate([array_target, [p.take_profit for p in added]])
+
+    stats = index.stats()
+    print(f"  fired {fired_total:,} triggers ({fired_total / args.ticks:,.0f} per tick), "
+          f"{stats['open_positions']:,} open, {stats['stale']:,} stale entries; "
+          f"fired sets {'identical' if not mismatches else f'DIFFERENT on {mismatches} ticks'} across all three")
+    for name, label in (("index", "TriggerIndex"), ("naive", "naive scan"), ("numpy", "numpy scan")):
+        per_tick = timings[name] / args.ticks * 1000
+        print(f"  {label:<13} {per_tick:8.3f} ms/tick ({args.ticks / timings[name]:,.0f} ticks/s)"
+              + (f"  {timings['naive'] / timings[name]:.0f}x faster than naive" if name != "naive" else ""))
+    if fired_total:
+        print(f"  re-inserting {fired_total:,} positions: {fired_total / insert_time:,.0f} inserts/s")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
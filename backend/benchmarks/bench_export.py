@@ -0,0 +1,86 @@
+"""거래 내역 내보내기 벤치마크: /trades/export 스트리밍 vs 커서 페이지 반복 조회
+
+행 수를 늘려도 내보내기 중 파이썬 메모리 최대치(tracemalloc)가 일정한지와, 한 로봇의 거래
+전체를 20건씩 페이지로 받는 기존 방식 대비 시간을 비교합니다.
+실행: cd backend && python -m benchmarks.bench_export [--sizes 100000 1000000] [--per-page 20]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_trade_listing import build_database
+
+
+def stream(client, url):
+    """응답을 청크 단위로 소비 → (바이트 수, 행 수)"""
+    response = client.get(url, buffered=False)
+    size = lines = 0
+    for chunk in response.response:
+        size += len(chunk)
+        lines += chunk.count(b'\n') if isinstance(chunk, bytes) else chunk.count('\n')
+    response.close()
+    return size, lines
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--robots", type=int, default=5)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    from src.main import app
+    from src.models.trading import db
+
+    for size in args.sizes:
+        if os.path.exists(path):
+            os.remove(path)
+        build_database(path, size, args.robots)
+        client = app.test_client()
+        client.get("/api/health")  # 지연 초기화 완료
+        print(f"{size:,} trades, {args.robots} robots")
+
+        for export_format in ("csv", "ndjson"):
+            url = f"/api/trades/export?format={export_format}"
+            start = time.perf_counter()
+            size_bytes, lines = stream(client, url)
+            elapsed = time.perf_counter() - start
+
+            tracemalloc.start()
+            stream(client, url)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"  export {export_format:<6} {lines:>10,} lines {size_bytes / 1e6:8.1f} MB "
+                  f"{elapsed:7.2f} s ({lines / elapsed:>9,.0f} rows/s)  peak python memory {peak / 1e6:6.1f} MB")
+
+        # 기존 방식: 로봇 1의 거래를 커서 페이지(per_page건)로 끝까지 조회
+        start = time.perf_counter()
+        pages = rows = 0
+        cursor = ""
+        while cursor is not None:
+            data = client.get(f"/api/robots/1/trades?per_page={args.per_page}&cursor={cursor}").get_json()["data"]
+            pages += 1
+            rows += len(data["trades"])
+            cursor = data["pagination"]["next_cursor"]
+        paged = time.perf_counter() - start
+
+        start = time.perf_counter()
+        _, lines = stream(client, "/api/trades/export?format=ndjson&robot_id=1")
+        exported = time.perf_counter() - start
+        print(f"  robot 1: {pages:,} pages of {args.per_page} ({rows:,} rows) {paged:7.2f} s  "
+              f"vs export {lines:,} rows {exported:6.2f} s")
+
+        with app.app_context():
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
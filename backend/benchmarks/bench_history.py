@@ -0,0 +1,75 @@
+"""과거 일봉 수집 벤치마크 (로컬 가짜 Polygon 서버)
+
+1) 처음 적재: 종목마다 구간 전체를 한 번에 요청
+2) 같은 조건으로 다시 실행: 구간 캐시로 요청 0건
+3) 종료일을 늘려 다시 실행: 새 날짜 구간만 요청
+4) 요청 속도 제한 확인
+실행: cd backend && python -m benchmarks.bench_history [--symbols 200] [--days 730] [--latency 0.02]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_polygon import FakePolygonServer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=50.0, help="속도 제한 확인 단계의 초당 요청 수")
+    args = parser.parse_args()
+
+    from sqlalchemy import create_engine, func, select
+    from src.models.trading import MarketData, db
+    from src.services.history_fetcher import CoverageCache, HistoryFetcher
+    from src.services.stock_data_service import StockDataService
+
+    tmp = tempfile.mkdtemp()
+    engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+    db.metadata.create_all(engine)
+    coverage = CoverageCache(os.path.join(tmp, "coverage.db"))
+    symbols = [f"T{i:05d}" for i in range(args.symbols)]
+    today = date.today()
+    start = today - timedelta(days=args.days)
+
+    with FakePolygonServer(latency=args.latency) as server:
+        service = StockDataService(base_url=server.base_url, max_workers=args.workers)
+        fetcher = HistoryFetcher(service, coverage, rate_limit=None, max_workers=args.workers)
+
+        def run(label, end, **kwargs):
+            before = server.request_count
+            started = time.perf_counter()
+            stats = fetcher.load(engine, symbols, start, end, **kwargs)
+            elapsed = time.perf_counter() - started
+            with engine.connect() as conn:
+                rows = conn.execute(select(func.count()).select_from(MarketData.__table__)).scalar()
+            print(f"  {label:<28} {elapsed:7.2f} s  {server.request_count - before:5d} requests  "
+                  f"{stats['bars']:>8,} bars written  {stats['up_to_date']:4d} up to date  "
+                  f"market_data rows {rows:,}")
+            return stats
+
+        print(f"{args.symbols} symbols, {start} ~ {today}, latency {args.latency * 1000:.0f} ms, "
+              f"{args.workers} workers")
+        run("initial load (to -10 days)", today - timedelta(days=10))
+        run("re-run, same range", today - timedelta(days=10))
+        run("extend to today", today)
+        run("re-run to today", today)
+
+        limited = HistoryFetcher(service, coverage, rate_limit=args.rate, max_workers=args.workers)
+        started = time.perf_counter()
+        stats = limited.load(engine, symbols, start, today, refresh=True)
+        elapsed = time.perf_counter() - started
+        print(f"  refresh at {args.rate:.0f} req/s limit: {stats['requests']} requests in {elapsed:.2f} s "
+              f"({stats['requests'] / elapsed:.1f} req/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""기술적 지표 엔진 벤치마크 + 기준 구현 대조
+
+가상 일봉(종목마다 길이가 다름)으로 배치(NumPy)/스트리밍(O(1) 갱신) 결과를 정의대로 짠 순수
+파이썬 기준 구현과 비교하고, 처리량을 종목 x 봉 / 초로 출력합니다.
+실행: cd backend && python -m benchmarks.bench_indicators [--symbols 2000] [--bars 2520]
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services import indicators
+
+NAN = float("nan")
+
+
+# ---- 기준 구현 (정의를 그대로 옮긴 순수 파이썬) ----
+
+def ref_sma(values, period):
+    return [sum(values[i - period + 1:i + 1]) / period if i >= period - 1 else NAN for i in range(len(values))]
+
+
+def ref_smooth(values, period, alpha):
+    """NaN이 아닌 값만 세어 처음 period개 평균으로 시작"""
+    out, seen, seed, current = [], 0, 0.0, NAN
+    for x in values:
+        if not math.isnan(x):
+            seen += 1
+            if seen <= period:
+                seed += x
+            if seen == period:
+                current = seed / period
+            elif seen > period:
+                current = current + alpha * (x - current)
+        out.append(current if seen >= period else NAN)
+    return out
+
+
+def ref_ema(values, period):
+    return ref_smooth(values, period, 2.0 / (period + 1))
+
+
+def ref_rsi(close, period=14):
+    changes = [NAN] + [close[i] - close[i - 1] for i in range(1, len(close))]
+    gains = ref_smooth([NAN if math.isnan(c) else max(c, 0.0) for c in changes], period, 1.0 / period)
+    losses = ref_smooth([NAN if math.isnan(c) else max(-c, 0.0) for c in changes], period, 1.0 / period)
+    out = []
+    for gain, loss in zip(gains, losses):
+        if math.isnan(gain):
+            out.append(NAN)
+        elif loss == 0:
+            out.append(50.0 if gain == 0 else 100.0)
+        else:
+            out.append(100.0 - 100.0 / (1.0 + gain / loss))
+    return out
+
+
+def ref_indicators(close, volume):
+    fast, slow = ref_ema(close, 12), ref_ema(close, 26)
+    line = [f - s for f, s in zip(fast, slow)]
+    signal = ref_ema(line, 9)
+    avg_volume = ref_sma(volume, 20)
+    return {
+        "rsi": ref_rsi(close),
+        "macd": line,
+        "macd_signal": signal,
+        "macd_hist": [m - s for m, s in zip(line, signal)],
+        "ema_12": fast,
+        "ema_26": slow,
+        "moving_avg_20": ref_sma(close, 20),
+        "moving_avg_50": ref_sma(close, 50),
+        "volume_ratio": [NAN] + [v / a if a > 0 else NAN for v, a in zip(volume[1:], avg_volume[:-1])]
+    }
+
+
+def assert_close(name, actual, expected):
+    actual, expected = np.asarray(actual, dtype=np.float64), np.asarray(expected, dtype=np.float64)
+    if not np.array_equal(np.isnan(actual), np.isnan(expected)):
+        raise AssertionError(f"{name}: NaN positions differ")
+    mask = ~np.isnan(expected)
+    if not np.allclose(actual[mask], expected[mask], rtol=1e-9, atol=1e-9):
+        raise AssertionError(f"{name}: max diff {np.max(np.abs(actual[mask] - expected[mask]))}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=2000)
+    parser.add_argument("--bars", type=int, default=2520)
+    parser.add_argument("--check", type=int, default=25, help="기준 구현과 대조할 종목 수")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, (args.symbols, args.bars)), axis=1))
+    volume = rng.integers(100_000, 5_000_000, (args.symbols, args.bars)).astype(np.float64)
+    # 상장일이 다른 종목: 앞쪽 일부를 NaN으로 비움
+    lengths = rng.integers(args.bars // 10, args.bars + 1, args.symbols)
+    for row, length in enumerate(lengths):
+        close[row, :args.bars - length] = np.nan
+        volume[row, :args.bars - length] = np.nan
+    total_bars = int(lengths.sum())
+    print(f"{args.symbols} symbols, up to {args.bars} bars ({total_bars:,} symbol-bars)")
+
+    start = time.perf_counter()
+    batch = indicators.compute_batch(close, volume)
+    elapsed = time.perf_counter() - start
+    print(f"  batch (NumPy, all symbols)   {elapsed:7.2f} s  {total_bars / elapsed:>12,.0f} symbol-bars/s")
+
+    stream_rows = min(args.symbols, 200)
+    start = time.perf_counter()
+    streamed = []
+    for row in range(stream_rows):
+        state = indicators.IndicatorState()
+        valid = ~np.isnan(close[row])
+        values = [state.update(c, v) for c, v in zip(close[row][valid].tolist(), volume[row][valid].tolist())]
+        streamed.append(values)
+    elapsed = time.perf_counter() - start
+    streamed_bars = int(lengths[:stream_rows].sum())
+    print(f"  streaming ({stream_rows} symbols)      {elapsed:7.2f} s  {streamed_bars / elapsed:>12,.0f} updates/s "
+          f"({elapsed / streamed_bars * 1e6:.1f} us per bar, all indicators)")
+
+    start = time.perf_counter()
+    for row in range(args.check):
+        valid = ~np.isnan(close[row])
+        offset = args.bars - int(valid.sum())
+        reference = ref_indicators(close[row][valid].tolist(), volume[row][valid].tolist())
+        for name, expected in reference.items():
+            assert_close(f"batch {name} row {row}", batch[name][row, offset:], expected)
+            assert np.all(np.isnan(batch[name][row, :offset]))
+            if row < stream_rows:
+                assert_close(f"stream {name} row {row}",
+                             [NAN if v[name] is None else v[name] for v in streamed[row]], expected)
+    elapsed = time.perf_counter() - start
+    print(f"  reference check: {args.check} symbols match batch and streaming (rtol 1e-9), "
+          f"pure-Python reference {int(lengths[:args.check].sum()) / elapsed:,.0f} symbol-bars/s")
+
+
+if __name__ == "__main__":
+    main()
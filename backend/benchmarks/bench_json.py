@@ -0,0 +1,92 @@
+"""JSON 직렬화/압축 벤치마크: /api/trades/recent?limit=1000 응답
+
+1) 직렬화: Flask 기본 제공자(키 정렬, isoformat 문자열) vs 표준 json 경로 vs orjson
+2) 전송 바이트: 압축 없음 / gzip / br, 엔드포인트 전체 응답 시간
+실행: cd backend && python -m benchmarks.bench_json [--size 20000] [--limit 1000]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_trade_listing import build_database
+
+
+def median_ms(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=20000)
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    build_database(path, args.size)
+
+    from flask.json.provider import DefaultJSONProvider
+    from src.main import app
+    from src.models.projections import serialize_trade_row, trade_detail_select
+    from src.models.trading import db, Trade
+    from src.services import json_provider
+    from src.services.compression import brotli, compress
+
+    client = app.test_client()
+    client.get("/api/health")  # 지연 초기화 완료
+    with app.app_context():
+        query = trade_detail_select().order_by(Trade.trade_date.desc()).limit(args.limit)
+        trades = [serialize_trade_row(row) for row in db.session.execute(query)]
+
+    # 기존 방식: 필드마다 isoformat() 후 Flask 기본 제공자 (키 정렬)
+    legacy = DefaultJSONProvider(app)
+
+    def legacy_dumps():
+        legacy.dumps({"success": True, "data": [
+            {**trade, "trade_date": trade["trade_date"].isoformat()} for trade in trades
+        ]}).encode()
+
+    def stdlib_dumps():
+        json_provider.json.dumps({"success": True, "data": trades}, default=json_provider._default,
+                                 ensure_ascii=False, separators=(",", ":")).encode()
+
+    payload = {"success": True, "data": trades}
+    print(f"{args.limit} trades, JSON backend: {json_provider.BACKEND} (median ms)")
+    print(f"  {'Flask default (isoformat + sort_keys)':<40} {median_ms(legacy_dumps, args.repeat):7.2f} ms")
+    print(f"  {'stdlib json (native datetime)':<40} {median_ms(stdlib_dumps, args.repeat):7.2f} ms")
+    if json_provider.orjson is not None:
+        print(f"  {'orjson (native datetime)':<40} "
+              f"{median_ms(lambda: json_provider.dumps_bytes(payload), args.repeat):7.2f} ms")
+
+    body = json_provider.dumps_bytes(payload)
+    encodings = ["gzip"] + (["br"] if brotli is not None else [])
+    print(f"\nbody size: {len(body):,} bytes")
+    for encoding in encodings:
+        compressed = compress(body, encoding)
+        ms = median_ms(lambda: compress(body, encoding), args.repeat)
+        print(f"  {encoding:<5} {len(compressed):>9,} bytes ({len(compressed) / len(body):6.1%})  {ms:6.2f} ms")
+
+    url = f"/api/trades/recent?limit={args.limit}"
+    print(f"\nGET {url} (median ms / bytes sent)")
+    for accept in ["identity"] + encodings:
+        response = client.get(url, headers={"Accept-Encoding": accept})
+        sent = len(response.get_data())
+        ms = median_ms(lambda: client.get(url, headers={"Accept-Encoding": accept}), args.repeat)
+        print(f"  Accept-Encoding: {accept:<9} {ms:7.2f} ms  {sent:>9,} bytes  "
+              f"({response.headers.get('Content-Encoding', 'identity')})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""주문장 체결 엔진 벤치마크
+
+지정가(중간가 주변), 취소, 시장가, 스톱/스톱 지정가 주문을 무작위로 섞어 MatchingEngine에 넣고
+초당 처리 연산 수를 출력합니다. 작은 표본은 리스트를 매번 훑는 단순 가격-시간 우선 구현과
+같은 연산을 돌려 체결 (가격, 수량, 매수 주문, 매도 주문) 순서가 같은지 확인합니다.
+실행: cd backend && python -m benchmarks.bench_order_book [--ops 300000] [--symbols 20] [--check 20000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.order_book import BUY, LIMIT, MARKET, SELL, STOP, STOP_LIMIT, MatchingEngine
+from src.services.simulated_exchange import SimulatedExchange
+
+
+def make_ops(count, symbols, seed):
+    """(연산, 종목, 방향, 수량, 유형, 지정가, 스톱 가격) 목록 (취소는 그때까지 접수된 주문 ID 중 최근 것)"""
+    rng = random.Random(seed)
+    mids = {symbol: 100.0 for symbol in symbols}
+    ops, submitted = [], 0
+    for _ in range(count):
+        symbol = rng.choice(symbols)
+        mid = mids[symbol] = max(mids[symbol] + rng.gauss(0, 0.02), 1.0)
+        side = BUY if rng.random() < 0.5 else SELL
+        quantity = rng.randint(1, 200)
+        roll = rng.random()
+        if roll < 0.2 and submitted:
+            ops.append(("cancel", max(submitted - rng.randint(0, 200), 1)))
+            continue
+        sign = 1 if side == BUY else -1
+        if roll < 0.75:
+            # 절반 이상은 상대 호가에 닿지 않고 대기하도록 중간가 뒤쪽에 걸림
+            price = round(mid + sign * rng.gauss(-0.05, 0.1), 2)
+            ops.append(("submit", symbol, side, quantity, LIMIT, max(price, 0.01), None))
+        elif roll < 0.9:
+            ops.append(("submit", symbol, side, quantity, MARKET, None, None))
+        else:
+            stop = round(mid + sign * abs(rng.gauss(0.1, 0.1)), 2)
+            if rng.random() < 0.5:
+                ops.append(("submit", symbol, side, quantity, STOP, None, stop))
+            else:
+                ops.append(("submit", symbol, side, quantity, STOP_LIMIT, round(stop + sign * 0.05, 2), stop))
+        submitted += 1
+    return ops
+
+
+def run_engine(ops):
+    engine = MatchingEngine()
+    fills = []
+    start = time.perf_counter()
+    for op in ops:
+        if op[0] == "cancel":
+            engine.cancel(op[1])
+        else:
+            fills.extend(engine.submit(*op[1:])[1])
+    return engine, fills, time.perf_counter() - start
+
+
+class NaiveBook:
+    """리스트를 매번 훑어 최우선 주문을 찾는 참조 구현 (한 종목)"""
+
+    def __init__(self):
+        self.bids, self.asks, self.stops, self.orders = [], [], [], {}
+        self.last = None
+        self.fills = []
+        self.next_id = 1
+
+    def reached(self, order):
+        if self.last is None:
+            return False
+        return self.last >= order["stop"] if order["side"] == BUY else self.last <= order["stop"]
+
+    def submit(self, side, quantity, order_type, price, stop):
+        order = {"id": self.next_id, "seq": self.next_id, "side": side, "remaining": quantity, "price": price,
+                 "stop": stop}
+        self.next_id += 1
+        self.orders[order["id"]] = order
+        if stop is not None and not self.reached(order):
+            self.stops.append(order)
+            return
+        self.execute(order)
+        self.run_stops()
+
+    def execute(self, order):
+        buy = order["side"] == BUY
+        book = self.asks if buy else self.bids
+        while order["remaining"] and book:
+            best = min(book, key=lambda m: (m["price"] if buy else -m["price"], m["seq"]))
+            if order["price"] is not None and (best["price"] > order["price"] if buy else best["price"] < order["price"]):
+                break
+            quantity = min(order["remaining"], best["remaining"])
+            order["remaining"] -= quantity
+            best["remaining"] -= quantity
+            self.fills.append((best["price"], quantity, order["id"] if buy else best["id"],
+                               best["id"] if buy else order["id"]))
+            self.last = best["price"]
+            if not best["remaining"]:
+                book.remove(best)
+        if order["remaining"] and order["price"] is not None:
+            (self.bids if buy else self.asks).append(order)
+        else:
+            order["remaining"] = 0
+
+    def run_stops(self):
+        while True:
+            triggered = sorted((order for order in self.stops if self.reached(order)), key=lambda o: o["id"])
+            if not triggered:
+                return
+            for order in triggered:
+                self.stops.remove(order)
+            for order in triggered:
+                order["seq"] = self.next_id  # 발동 시점의 순번으로 대기
+                self.next_id += 1
+                self.execute(order)
+
+    def cancel(self, order_id):
+        order = self.orders.get(order_id)
+        if order is None or not order["remaining"]:
+            return
+        order["remaining"] = 0
+        for pending in (self.bids, self.asks, self.stops):
+            if order in pending:
+                pending.remove(order)
+
+
+def cross_check(count, seed):
+    ops = make_ops(count, ["X"], seed)
+    _, fills, _ = run_engine(ops)
+    naive = NaiveBook()
+    start = time.perf_counter()
+    for op in ops:
+        if op[0] == "cancel":
+            naive.cancel(op[1])
+        else:
+            naive.submit(*op[2:])
+    elapsed = time.perf_counter() - start
+    got = [(fill.price, fill.quantity, fill.buy.id, fill.sell.id) for fill in fills]
+    return got == naive.fills, len(got), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ops", type=int, default=300000)
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--check", type=int, default=20000, help="단순 구현과 비교할 연산 수 (한 종목)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    ops = make_ops(args.ops, [f"S{i:03d}" for i in range(args.symbols)], args.seed)
+    kinds = {}
+    for op in ops:
+        kind = "CANCEL" if op[0] == "cancel" else op[4]
+        kinds[kind] = kinds.get(kind, 0) + 1
+    print(f"{len(ops):,} ops on {args.symbols} symbols: "
+          + ", ".join(f"{kind} {count:,}" for kind, count in sorted(kinds.items())))
+
+    engine, fills, elapsed = run_engine(ops)
+    stats = engine.stats()
+    print(f"  MatchingEngine: {elapsed:.2f}s = {len(ops) / elapsed:,.0f} ops/s "
+          f"({elapsed / len(ops) * 1e6:.2f} us/op), {len(fills):,} fills, {stats['open_orders']:,} orders left open")
+
+    ok, count, naive_elapsed = cross_check(args.check, args.seed + 1)
+    _, _, heap_elapsed = run_engine(make_ops(args.check, ["X"], args.seed + 1))
+    print(f"  cross-check {args.check:,} ops on one symbol: {count:,} fills "
+          f"{'identical to' if ok else 'DIFFERENT FROM'} naive list scan "
+          f"(heap {heap_elapsed * 1000:.0f} ms vs naive {naive_elapsed * 1000:.0f} ms)")
+
+    # 모의 거래소 경로 (시세 고정: 호가 사다리는 첫 주문에서 한 번만 걸림)
+    exchange = SimulatedExchange(MatchingEngine(), quote_source=lambda symbol: {"close": 100.0})
+    robot_ops = [op for op in ops if op[0] == "submit"][:50000]
+    start = time.perf_counter()
+    for op in robot_ops:
+        exchange.submit(*op[1:], robot_id=1)
+    elapsed = time.perf_counter() - start
+    print(f"  SimulatedExchange.submit (fixed quote): {len(robot_ops) / elapsed:,.0f} orders/s")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
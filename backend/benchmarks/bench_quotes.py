@@ -0,0 +1,70 @@
+"""다종목 시세 조회 벤치마크: 순차 조회 vs 일괄 병렬 조회
+
+실행: cd backend && python -m benchmarks.bench_quotes [--symbols 15] [--latency 0.05]
+"""
+import argparse
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_polygon import FakePolygonServer
+from src.services.quote_cache import QuoteCache
+from src.services.stock_data_service import StockDataService
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=15)
+    parser.add_argument("--latency", type=float, default=0.05, help="가짜 서버 응답 지연 (초)")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    symbols = [f"SYM{i}" for i in range(args.symbols)]
+
+    with FakePolygonServer(latency=args.latency) as server:
+        def fresh_service():
+            return StockDataService(base_url=server.base_url, max_workers=args.workers,
+                                    quote_cache=QuoteCache())
+
+        # 기존 방식: 연결 재사용 없는 requests.get 순차 호출
+        def legacy():
+            for symbol in symbols:
+                requests.get(f"{server.base_url}/v2/aggs/ticker/{symbol}/prev",
+                             params={"apikey": "demo"}).json()
+
+        service = fresh_service()
+
+        def sequential():
+            for symbol in symbols:
+                service.get_stock_quote(symbol)
+
+        batch_service = fresh_service()
+
+        def batched():
+            batch_service.get_stock_quotes(symbols)
+
+        results = [
+            ("legacy requests.get (sequential)", _timed(legacy)),
+            ("pooled session (sequential)", _timed(sequential)),
+            ("get_stock_quotes (concurrent)", _timed(batched)),
+            ("get_stock_quotes (cached)", _timed(batched)),
+        ]
+
+    print(f"{args.symbols} symbols, {args.latency * 1000:.0f} ms simulated RTT, {args.workers} workers")
+    baseline = results[0][1]
+    for name, elapsed in results:
+        print(f"  {name:<36} {elapsed * 1000:8.1f} ms  ({baseline / elapsed:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""로봇 런타임 벤치마크
+
+임시 DB에 전략별 로봇을 만들고 로컬 랜덤워크 피드로 런타임을 일정 시간 돌립니다. 실행마다
+time.sleep하는 느린 로봇을 하나 섞어, 다른 로봇들이 주기대로 실행되는지 (예정 대비 실행 횟수)
+와 로봇별 실행 시간, 거래 기록 배치를 출력합니다. 새 봉 하나에서 첫 로봇(지표/신호 계산)과
+같은 전략의 나머지 로봇(공유 결과 사용)의 평가 시간도 따로 잽니다.
+실행: cd backend && python -m benchmarks.bench_robot_runtime [--robots 50] [--symbols 500] [--seconds 20]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services import backtest
+from src.services.robot_runtime import RandomWalkQuoteFeed, RobotRuntime
+
+SLOW_STRATEGY = "느린 전략"
+
+
+def slow_signals(features, params):
+    time.sleep(params["sleep"])
+    return backtest.momentum_signals(features, params)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--robots", type=int, default=50, help="전략별로 고르게 나눈 로봇 수")
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--interval", type=float, default=1.0, help="로봇 실행 주기 (초)")
+    parser.add_argument("--tick", type=float, default=0.5, help="피드 봉 간격 (초)")
+    parser.add_argument("--slow", type=float, default=3.0, help="느린 로봇의 실행당 지연 (초, 0이면 없음)")
+    args = parser.parse_args()
+
+    from sqlalchemy import create_engine
+    from src.models.trading import Robot, Trade, db
+
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'runtime.db')}")
+    db.metadata.create_all(engine)
+    strategies = list(backtest.STRATEGIES)
+    robots = [{"name": f"Bench {i}", "strategy_type": strategies[i % len(strategies)], "initial_capital": 100000,
+               "is_active": True} for i in range(args.robots)]
+    if args.slow:
+        # 전략 신호 자체가 느린 로봇 (다른 로봇과 신호를 공유하지 않는 별도 전략)
+        backtest.STRATEGIES[SLOW_STRATEGY] = {
+            "signals": slow_signals, "reason": "느린 로봇",
+            "params": {**backtest.STRATEGIES["모멘텀 투자"]["params"], "sleep": args.slow}
+        }
+        robots.append({"name": "Slow", "strategy_type": SLOW_STRATEGY, "initial_capital": 100000, "is_active": True})
+    with engine.begin() as conn:
+        conn.execute(Robot.__table__.insert(), robots)
+
+    feed = RandomWalkQuoteFeed([f"S{i:04d}" for i in range(args.symbols)], seed=5)
+    print(f"{len(robots)} robots every {args.interval}s on {args.symbols} symbols, "
+          f"new bar every {args.tick}s, {args.workers} workers")
+
+    # 새 봉 하나에서 로봇별 평가 시간 (전략마다 첫 로봇이 신호 계산, 나머지는 공유)
+    runtime = RobotRuntime(workers=args.workers, interval=args.interval)
+    runtime.engine, runtime.feed = engine, feed
+    runtime.load_robots()
+    feed.tick()
+    snapshot = feed.snapshot()
+    first, shared = {}, {}
+    for state in sorted(runtime._robots.values(), key=lambda state: state.robot_id):
+        if state.strategy_type == SLOW_STRATEGY:
+            continue
+        start = time.perf_counter()
+        runtime.evaluate(state, snapshot)
+        elapsed = (time.perf_counter() - start) * 1000
+        (shared if state.strategy_type in first else first).setdefault(state.strategy_type, []).append(elapsed)
+    for strategy_type in strategies:
+        print(f"  one bar {strategy_type:<8} first robot {first[strategy_type][0]:7.2f} ms, "
+              f"others {statistics.mean(shared.get(strategy_type, [0.0])):6.3f} ms")
+
+    runtime = RobotRuntime(workers=args.workers, interval=args.interval, reload_interval=3600)
+    feed.start(args.tick)
+    runtime.start(engine, feed)
+    time.sleep(args.seconds)
+    feed.stop()
+    runtime.stop()
+
+    stats = runtime.stats()
+    normal = [robot for robot in stats["robots"] if robot["strategy_type"] != SLOW_STRATEGY]
+    # 시작 시점을 주기 안에서 흩으므로 예정 횟수는 대략 seconds / interval
+    expected = args.seconds / args.interval
+    ratios = [robot["runs"] / expected for robot in normal]
+    print(f"  ran {args.seconds:.0f}s: normal robots {min(ratios):.0%} ~ {max(ratios):.0%} of scheduled runs "
+          f"(mean {statistics.mean(ratios):.0%}), {sum(r['overruns'] for r in normal)} overruns, "
+          f"{sum(r['errors'] for r in normal)} errors")
+    for strategy_type in strategies:
+        rows = [robot for robot in normal if robot["strategy_type"] == strategy_type]
+        print(f"    {strategy_type:<8} avg {statistics.mean(r['avg_ms'] for r in rows):7.2f} ms  "
+              f"p95 {max(r['p95_ms'] for r in rows):7.2f} ms  max {max(r['max_ms'] for r in rows):7.2f} ms  "
+              f"{sum(r['trades'] for r in rows):,} trades")
+    for robot in stats["robots"]:
+        if robot["strategy_type"] == SLOW_STRATEGY:
+            print(f"    slow robot: {robot['runs']} runs, {robot['overruns']} skipped while still running, "
+                  f"avg {robot['avg_ms']:,.0f} ms")
+    writer = stats["writer"]
+    with engine.connect() as conn:
+        stored = conn.execute(db.select(db.func.count()).select_from(Trade.__table__)).scalar()
+    print(f"  writer: {writer['written']:,} trades in {writer['batches']:,} batches (avg {writer['avg_batch']}), "
+          f"flush max {writer['max_flush_ms']} ms, table has {stored:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""콜드 스타트 벤치마크: 새 프로세스에서 src.main import → 첫 /api/health 응답까지
+
+app.db를 임시 파일로 복사하여 사용하므로 원본 DB는 변경되지 않습니다 (--fresh: 빈 DB).
+실행: cd backend && python -m benchmarks.bench_startup [--runs 5] [--fresh]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import json, time
+start = time.perf_counter()
+from src.main import app
+imported = time.perf_counter()
+response = app.test_client().get('/api/health')
+served = time.perf_counter()
+assert response.status_code == 200, response.status_code
+print(json.dumps({"import": imported - start, "first_request": served - imported, "total": served - start}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--fresh", action="store_true", help="복사본 대신 빈 DB로 시작")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "app.db")
+        if not args.fresh:
+            shutil.copy(os.path.join(BACKEND_DIR, "src", "database", "app.db"), db_path)
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}")
+
+        samples = []
+        for _ in range(args.runs):
+            output = subprocess.run(
+                [sys.executable, "-c", CHILD], cwd=BACKEND_DIR, env=env,
+                capture_output=True, text=True, check=True
+            ).stdout
+            samples.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"cold start over {args.runs} runs, {'empty' if args.fresh else 'copied'} DB (median, ms)")
+    for key in ("import", "first_request", "total"):
+        print(f"  {key:<14} {statistics.median(s[key] for s in samples) * 1000:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
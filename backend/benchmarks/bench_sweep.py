@@ -0,0 +1,75 @@
+"""파라미터 탐색 벤치마크 (프로세스 풀 + 공유 메모리)
+
+가상 일봉 행렬로 같은 설정 목록을 한 프로세스에서 차례로 평가한 시간과, 작업 프로세스 수를
+바꿔 가며 run_sweep으로 평가한 시간을 비교합니다 (설정/초, 배속, 효율 = 배속 / 프로세스 수).
+마지막으로 워크포워드 탐색을 한 번 실행해 구간별 최적 설정과 검증 성과를 출력합니다.
+실행: cd backend && python -m benchmarks.bench_sweep [--symbols 500] [--days 2520] [--configs 240] [--workers 1,2,4]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_backtest import make_bars
+from src.services import backtest, param_sweep
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--days", type=int, default=2520)
+    parser.add_argument("--configs", type=int, default=240)
+    parser.add_argument("--workers", default=None, help="쉼표로 구분한 프로세스 수 (기본: 1, 2, 4 ... CPU 수)")
+    parser.add_argument("--strategy", default="모멘텀 투자")
+    args = parser.parse_args()
+
+    from sqlalchemy import create_engine, func, select
+    from src.models.trading import SweepResult, db
+
+    cpus = os.cpu_count() or 1
+    counts = ([int(n) for n in args.workers.split(",")] if args.workers
+              else sorted({1, cpus, *(2 ** i for i in range(1, 8) if 2 ** i < cpus)}))
+    bars = make_bars(args.symbols, args.days)
+    configs = param_sweep.random_search(args.strategy, {
+        "rsi_entry": (40, 60), "rsi_exit": (65, 85), "stop_loss_pct": (2, 10), "take_profit_pct": (5, 30),
+        "max_holding_days": (10, 60)
+    }, args.configs, seed=1)
+    tmp = tempfile.mkdtemp()
+    engine = create_engine(f"sqlite:///{os.path.join(tmp, 'sweep.db')}")
+    db.metadata.create_all(engine)
+    print(f"{args.symbols} symbols x {args.days} days, {len(configs)} configs of {args.strategy}, {cpus} CPUs")
+
+    # 기준: 한 프로세스에서 지표 한 번 계산 후 설정을 차례로 평가 (풀/공유 메모리/기록 없음)
+    start = time.perf_counter()
+    features = backtest.Features(bars)
+    serial = [backtest.run_backtest(bars, args.strategy, params, features=features, start=60).metrics
+              for params in configs]
+    baseline = time.perf_counter() - start
+    print(f"  in-process loop            {baseline:7.2f} s  {len(configs) / baseline:7.1f} configs/s")
+
+    for workers in counts:
+        summary = param_sweep.run_sweep(engine, bars, args.strategy, configs, workers=workers, warmup=60)
+        speedup = baseline / summary["seconds"]
+        print(f"  run_sweep, {workers:3d} workers    {summary['seconds']:7.2f} s  "
+              f"{summary['evaluations_per_second']:7.1f} configs/s  speedup {speedup:5.2f}x  "
+              f"efficiency {speedup / workers:5.0%}  ({summary['rows_written']} rows written)")
+        assert summary["best"][0]["metrics"] == max(
+            serial, key=lambda m: (m["sharpe_ratio"], -serial.index(m)))
+
+    folds = param_sweep.run_sweep(engine, bars, args.strategy, configs, workers=counts[-1],
+                                  walk_forward=(504, 126), warmup=60)
+    print(f"  walk-forward 504/126 days: {len(folds['best'])} folds, {folds['evaluations']} evaluations in "
+          f"{folds['seconds']:.2f} s, out-of-sample return {folds['out_of_sample_return']}%")
+    for fold in folds["best"]:
+        print(f"    fold {fold['fold']}: config {fold['config_id']:3d} train sharpe {fold['train']['sharpe_ratio']:5.2f}"
+              f" -> test {fold['test_window'][0]}~{fold['test_window'][1]} return {fold['test']['total_return']:6.2f}%")
+    with engine.connect() as conn:
+        rows = conn.execute(select(func.count()).select_from(SweepResult.__table__)).scalar()
+    print(f"  sweep_results rows: {rows:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""종목 섹터 조회 / 랜덤 종목 선택 / 거래 데이터 생성 비용: 선형 탐색 vs 인덱스
+
+실행: cd backend && python -m benchmarks.bench_symbol_index [--universe 10000] [--trades 20000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.stock_data_service import StockDataService
+from src.services.symbol_index import SymbolIndex
+
+
+def legacy_sector(sector_stocks, symbol):
+    """기존 방식: 섹터 목록 전체를 돌며 in 검사"""
+    sector = "Technology"
+    for sec, stocks in sector_stocks.items():
+        if symbol in stocks:
+            sector = sec
+            break
+    return sector
+
+
+def legacy_random_stock(sector_stocks, additional_stocks):
+    """기존 방식: 호출마다 후보 목록을 다시 만든 뒤 선택"""
+    all_stocks = []
+    for stocks in sector_stocks.values():
+        all_stocks.extend(stocks)
+    all_stocks.extend(additional_stocks)
+    return random.choice(all_stocks)
+
+
+def build_universe(size):
+    sectors = list(StockDataService().sector_stocks)
+    sector_stocks = {sector: [] for sector in sectors}
+    rows = []
+    for i in range(size):
+        symbol = f"S{i:05d}"
+        sector = sectors[i % len(sectors)]
+        sector_stocks[sector].append(symbol)
+        rows.append((symbol, sector, random.choice(["large", "mid", "small", "micro"]), "NYSE", f"{symbol} Inc."))
+    return sector_stocks, rows
+
+
+def per_op(fn, n):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--universe", type=int, default=10000)
+    parser.add_argument("--trades", type=int, default=20000)
+    args = parser.parse_args()
+
+    random.seed(7)
+    sector_stocks, rows = build_universe(args.universe)
+    index = SymbolIndex.from_rows(rows)
+    lookups = [random.choice(rows)[0] for _ in range(args.trades)]
+    additional = StockDataService().additional_stocks
+
+    print(f"universe={args.universe} symbols, {args.trades} operations (us/op)")
+    legacy = per_op(lambda: [legacy_sector(sector_stocks, s) for s in lookups], args.trades)
+    fast = per_op(lambda: [index.sector_for(s) for s in lookups], args.trades)
+    print(f"  sector lookup      linear scan {legacy:9.2f}   index {fast:7.3f}")
+
+    n_random = min(args.trades, 2000)
+    legacy = per_op(lambda: [legacy_random_stock(sector_stocks, additional) for _ in range(n_random)], n_random)
+    fast = per_op(lambda: [index.random_symbol() for _ in range(n_random)], n_random)
+    print(f"  random symbol      rebuild     {legacy:9.2f}   index {fast:7.3f}")
+
+    # 거래 데이터 생성 전체 비용 (시세는 미리 캐시하여 네트워크 제외)
+    service = StockDataService()
+    quote = service._generate_mock_quote("AAPL")
+
+    def generate_legacy():
+        for symbol in lookups:
+            legacy_sector(sector_stocks, symbol)
+            service.generate_detailed_trade_data(symbol, "BUY", "bench", quote=quote)
+
+    before = per_op(generate_legacy, args.trades)
+    service.load_symbol_index(rows)
+    after = per_op(lambda: [service.generate_detailed_trade_data(s, "BUY", "bench", quote=quote)
+                            for s in lookups], args.trades)
+    print(f"  trade generation   before      {before:9.2f}   after {after:7.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""거래 목록 조회 벤치마크: ORM 객체 + to_dict() (기존) vs 컬럼 프로젝션
+
+임시 SQLite DB에 가상 거래를 채운 뒤 쿼리 수와 응답 시간을 비교합니다.
+실행: cd backend && python -m benchmarks.bench_trade_listing [--sizes 1000 100000] [--limit 1000]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def build_database(path, size, robots=5):
+    """로봇 robots개와 가상 거래 size건을 가진 DB 생성"""
+    from sqlalchemy import create_engine, text
+    from src.models.trading import db
+    from src.services.stock_data_service import StockDataService
+    from src.services.synthetic_trades import SyntheticTradeGenerator, bulk_insert_trades
+
+    engine = create_engine(f"sqlite:///{path}")
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for i in range(1, robots + 1):
+            conn.execute(text("INSERT INTO robots (id, name, strategy_type, is_active) "
+                              "VALUES (:id, :name, 'bench', 1)"), {"id": i, "name": f"Robot {i}"})
+    end = datetime.now()
+    generator = SyntheticTradeGenerator(list(range(1, robots + 1)), StockDataService().symbol_index,
+                                        end - timedelta(days=30), end, seed=1)
+    bulk_insert_trades(engine, generator, size)
+    engine.dispose()
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def measure(fn, counter, repeat):
+    timings, queries = [], []
+    for _ in range(repeat):
+        counter.count = 0
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+        queries.append(counter.count)
+    return statistics.median(timings) * 1000, max(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--robots", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    from sqlalchemy import func, select
+    from src.main import app
+    from src.models.projections import serialize_trade_row, trade_detail_select
+    from src.models.trading import db, Trade
+
+    for size in args.sizes:
+        path = os.path.join(tmp, "bench.db")
+        if os.path.exists(path):
+            os.remove(path)
+        build_database(path, size, args.robots)
+
+        client = app.test_client()
+        client.get("/api/health")  # 지연 초기화 완료
+        with app.app_context():
+            db.engine.dispose()
+            counter = QueryCounter(db.engine)
+
+        def legacy():
+            with app.app_context():
+                trades = Trade.query.order_by(Trade.trade_date.desc()).limit(args.limit).all()
+                [trade.to_dict() for trade in trades]
+
+        def projection():
+            with app.app_context():
+                query = trade_detail_select().order_by(Trade.trade_date.desc()).limit(args.limit)
+                [serialize_trade_row(row) for row in db.session.execute(query)]
+
+        def legacy_robot_page():
+            with app.app_context():
+                page = Trade.query.filter_by(robot_id=1).order_by(Trade.trade_date.desc()) \
+                    .paginate(page=1, per_page=args.limit, error_out=False)
+                [trade.to_dict() for trade in page.items]
+
+        def projection_robot_page():
+            with app.app_context():
+                db.session.execute(select(func.count(Trade.id)).where(Trade.robot_id == 1)).scalar()
+                query = trade_detail_select().where(Trade.robot_id == 1) \
+                    .order_by(Trade.trade_date.desc()).limit(args.limit)
+                [serialize_trade_row(row) for row in db.session.execute(query)]
+
+        print(f"{size:,} trades, {args.robots} robots, limit={args.limit} (median ms / queries)")
+        for name, fn in [("recent: ORM + to_dict", legacy), ("recent: projection", projection),
+                         ("robot page: ORM + to_dict", legacy_robot_page),
+                         ("robot page: projection", projection_robot_page)]:
+            ms, queries = measure(fn, counter, args.repeat)
+            print(f"  {name:<32} {ms:8.1f} ms  {queries:4d} queries")
+
+        with app.app_context():
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
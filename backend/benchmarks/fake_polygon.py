@@ -0,0 +1,142 @@
+"""로컬 Polygon API 대역 서버 (벤치마크용)
+
+실제 Polygon 응답 형식을 흉내 내며, 요청마다 latency 초만큼 지연시켜
+네트워크 왕복 시간을 재현합니다.
+"""
+import json
+import math
+import random
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class FakePolygonServer:
+    """백그라운드 스레드에서 동작하는 가짜 Polygon 서버"""
+
+    def __init__(self, latency: float = 0.05, host: str = "127.0.0.1", port: int = 0,
+                 ticker_count: int = 10000):
+        self.latency = latency
+        self.ticker_count = ticker_count
+        self.request_count = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                with server._lock:
+                    server.request_count += 1
+                time.sleep(server.latency)
+                status, payload = server.route(urlparse(self.path))
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def route(self, url):
+        """경로별 응답 생성"""
+        parts = url.path.strip("/").split("/")
+        # /v2/aggs/ticker/{symbol}/prev
+        if len(parts) == 5 and parts[:3] == ["v2", "aggs", "ticker"] and parts[4] == "prev":
+            return 200, self._prev_aggs(parts[3])
+        # /v2/aggs/ticker/{symbol}/range/{multiplier}/day/{from}/{to}?limit=...&cursor=...
+        if len(parts) == 9 and parts[:3] == ["v2", "aggs", "ticker"] and parts[4] == "range":
+            return 200, self._range_aggs(url.path, parts[3], parts[7], parts[8], parse_qs(url.query))
+        # /v3/reference/tickers?cursor=...&limit=...
+        if parts == ["v3", "reference", "tickers"]:
+            return 200, self._tickers(parse_qs(url.query))
+        return 404, {"status": "NOT_FOUND"}
+
+    def _tickers(self, query):
+        start = int(query.get("cursor", ["0"])[0])
+        limit = min(int(query.get("limit", ["100"])[0]), 1000)
+        end = min(start + limit, self.ticker_count)
+        results = [{
+            "ticker": f"T{i:05d}",
+            "name": f"T{i:05d} Holdings",
+            "market": "stocks",
+            "primary_exchange": "XNYS" if i % 2 else "XNAS",
+            "type": "CS",
+            "active": True,
+            "currency_name": "usd",
+            "last_updated_utc": "2026-01-02T00:00:00Z"
+        } for i in range(start, end)]
+        payload = {"status": "OK", "count": len(results), "results": results}
+        if end < self.ticker_count:
+            payload["next_url"] = f"{self.base_url}/v3/reference/tickers?cursor={end}&limit={limit}"
+        return payload
+
+    def _prev_aggs(self, symbol: str):
+        rng = random.Random(symbol)
+        close = round(rng.uniform(20, 500), 2)
+        return {
+            "ticker": symbol,
+            "status": "OK",
+            "resultsCount": 1,
+            "results": [{
+                "T": symbol,
+                "o": round(close * rng.uniform(0.98, 1.02), 2),
+                "h": round(close * 1.02, 2),
+                "l": round(close * 0.98, 2),
+                "c": close,
+                "v": rng.randint(1000000, 50000000),
+                "t": int(time.time() * 1000)
+            }]
+        }
+
+    @staticmethod
+    def daily_bar(symbol: str, day: date):
+        """종목/날짜별로 항상 같은 일봉 (요청 구간이 겹쳐도 값이 같도록 날짜마다 seed)"""
+        base = random.Random(symbol).uniform(20, 500)
+        rng = random.Random(f"{symbol}:{day.isoformat()}")
+        close = round(base * (1 + 0.2 * math.sin(day.toordinal() / 30)) * rng.uniform(0.98, 1.02), 2)
+        opened = datetime(day.year, day.month, day.day, 4, tzinfo=timezone.utc)  # 미국 동부 자정
+        return {
+            "o": round(close * rng.uniform(0.98, 1.02), 2),
+            "h": round(close * 1.02, 2),
+            "l": round(close * 0.98, 2),
+            "c": close,
+            "v": rng.randint(1000000, 50000000),
+            "t": int(opened.timestamp() * 1000)
+        }
+
+    def _range_aggs(self, path: str, symbol: str, start: str, end: str, query):
+        """평일 일봉 (오늘 이후 날짜 제외), limit개씩 next_url 페이지"""
+        first, last = date.fromisoformat(start), min(date.fromisoformat(end), date.today())
+        days = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+        days = [day for day in days if day.weekday() < 5]
+        offset = int(query.get("cursor", ["0"])[0])
+        limit = min(int(query.get("limit", ["5000"])[0]), 50000)
+        results = [self.daily_bar(symbol, day) for day in days[offset:offset + limit]]
+        payload = {"ticker": symbol, "status": "OK", "adjusted": True,
+                   "resultsCount": len(results), "results": results}
+        if offset + limit < len(days):
+            payload["next_url"] = f"{self.base_url}{path}?cursor={offset + limit}&limit={limit}"
+        return payload
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -3,20 +3,48 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+from flask import Flask, send_from_directory, request
+from sqlalchemy import create_engine, func, select
 from flask_cors import CORS
-from src.models.trading import db, Robot, Trade, Portfolio, StockUniverse, MarketCondition
-from src.services.stock_data_service import StockDataService
+from src.models.trading import db, configure_sqlite, Robot, Trade, Portfolio, StockUniverse, MarketCondition
+from src.models.migrations import check_query_plans, run_migrations
+from src.services.stock_data_service import stock_service
+from src.services.pagination import InvalidCursor, approximate_counts, cursor_pagination, keyset_page
+from src.services.synthetic_trades import SyntheticTradeGenerator, bulk_insert_trades
+from src.services.trade_rollups import rebuild_rollups
+from src.services.data_versions import conditional_get, today_key
+from src.services.response_cache import cached_response, make_backend, response_cache
+from src.services.json_provider import FastJSONProvider
+from src.services.compression import init_compression
+from src.services.universe_ingestion import ingest_stock_universe
+from src.services.bar_store import bar_store, load_from_database, save_to_database
+from src.services.history_fetcher import CoverageCache, HistoryFetcher, default_coverage_path
+from src.services.indicators import indicator_engine
+from src.services.backtest import (DEFAULT_COMMISSION_RATE, STRATEGIES, Features, bars_from_database,
+                                   bars_from_store, run_backtest, save_backtest)
+from src.services.param_sweep import OBJECTIVES as PARAM_SWEEP_OBJECTIVES, grid, parse_space, random_search, run_sweep
+from src.services.robot_runtime import RandomWalkQuoteFeed, RobotRuntime, last_trade_prices, robot_runtime
+from src.services.exit_triggers import ExitMonitor
 from src.routes.robots import robots_bp
-from src.routes.trades import trades_bp
+from src.routes.trades import trades_bp, build_market_condition
 from src.routes.predictions import predictions_bp
-from datetime import datetime, date
+from src.routes.stream import stream_bp
+from src.routes.dashboard import dashboard_bp
+from src.routes.orders import orders_bp
+from datetime import datetime, date, timedelta
 import random
 import json
+import threading
+import time
+import click
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
 
+# JSON 직렬화 (orjson 사용 가능 시) 및 1KB 이상 응답 압축 (RESPONSE_COMPRESSION_MIN_SIZE로 조정)
+app.json = FastJSONProvider(app)
+init_compression(app, min_size=int(os.environ.get('RESPONSE_COMPRESSION_MIN_SIZE', 1024)))
+
 # CORS 설정 - 모든 도메인에서 접근 허용
 CORS(app)
 
@@ -24,67 +52,76 @@ CORS(app)
 app.register_blueprint(robots_bp, url_prefix='/api')
 app.register_blueprint(trades_bp, url_prefix='/api')
 app.register_blueprint(predictions_bp, url_prefix='/api')
+app.register_blueprint(stream_bp, url_prefix='/api')
+app.register_blueprint(dashboard_bp, url_prefix='/api')
+app.register_blueprint(orders_bp, url_prefix='/api')
 
-# 데이터베이스 설정
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+# 데이터베이스 설정 (DATABASE_URL 환경변수로 다른 DB 지정 가능)
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
+    'DATABASE_URL',
+    f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+)
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db.init_app(app)
+with app.app_context():
+    configure_sqlite(db.engine)
+
+# 거래 데이터의 기술적 지표는 바 저장소의 일봉으로 계산 (sync-bars / load-history --bar-store로 적재)
+stock_service.indicator_source = indicator_engine.latest
 
-# 주식 데이터 서비스 초기화
-stock_service = StockDataService()
+# 집계 응답 캐시 저장소 (RESPONSE_CACHE_BACKEND=disk면 같은 서버의 워커들이 공유하는 SQLite 파일)
+response_cache.backend = make_backend(
+    os.environ.get('RESPONSE_CACHE_BACKEND'), os.environ.get('RESPONSE_CACHE_PATH')
+)
 
 def init_stock_universe():
     """미국 상장기업 전체 목록 초기화"""
-    if StockUniverse.query.count() > 0:
+    if StockUniverse.query.first() is not None:
         return
     
     print("Initializing stock universe...")
-    tickers = stock_service.get_all_tickers(limit=500)  # 500개 종목으로 제한
-    
-    for ticker_data in tickers:
-        try:
-            # 섹터 결정
-            symbol = ticker_data.get("ticker", "")
-            sector = "Technology"  # 기본값
-            for sec, stocks in stock_service.sector_stocks.items():
-                if symbol in stocks:
-                    sector = sec
-                    break
-            
-            # 시가총액 결정 (랜덤)
-            market_cap = random.choice(["large", "mid", "small", "micro"])
-            
-            stock = StockUniverse(
-                symbol=symbol,
-                name=ticker_data.get("name", f"{symbol} Inc."),
-                exchange=ticker_data.get("primary_exchange", "NASDAQ"),
-                sector=sector,
-                industry=f"{sector} Industry",
-                market_cap=market_cap,
-                is_active=ticker_data.get("active", True)
-            )
-            db.session.add(stock)
-        except Exception as e:
-            print(f"Error adding stock {ticker_data.get('ticker', 'Unknown')}: {e}")
-            continue
-    
+    sync_stock_universe(incremental=False)
+
+def sync_stock_universe(incremental=True):
+    """Polygon 전체 티커 목록을 페이지 단위로 받아 stock_universe에 일괄 upsert"""
     try:
-        db.session.commit()
-        print(f"Added {StockUniverse.query.count()} stocks to universe")
+        stats = ingest_stock_universe(
+            db.engine,
+            stock_service.iter_tickers(),
+            stock_service.symbol_index,
+            incremental=incremental
+        )
+        print(f"Stock universe synced: {stats['received']} tickers in {stats['chunks']} chunks, "
+              f"{StockUniverse.query.count()} stocks in universe")
     except Exception as e:
-        print(f"Error committing stock universe: {e}")
-        db.session.rollback()
+        print(f"Error syncing stock universe: {e}")
+
+def load_symbol_index():
+    """StockUniverse 테이블로 종목 인덱스 구성 (비어 있으면 기본 섹터 목록 유지)"""
+    rows = db.session.query(
+        StockUniverse.symbol,
+        StockUniverse.sector,
+        StockUniverse.market_cap,
+        StockUniverse.exchange,
+        StockUniverse.name
+    ).filter(StockUniverse.is_active.is_(True)).all()
+    index = stock_service.load_symbol_index(rows)
+    print(f"Symbol index loaded: {len(index)} symbols")
 
 def init_market_conditions():
-    """시장 상황 데이터 초기화"""
+    """시장 상황 데이터 초기화 (DB에 저장된 당일 값이 있으면 그 값으로 스냅샷을 맞춤)"""
     today = date.today()
-    if MarketCondition.query.filter_by(date=today).first():
+    condition = MarketCondition.query.filter_by(date=today).first()
+    if condition:
+        stock_service.market_conditions.prime(today, condition.to_dict())
         return
     
-    market_data = stock_service.get_market_condition()
-    
+    save_market_condition(today, stock_service.market_conditions.get(today))
+
+def save_market_condition(day, market_data):
+    """시장 상황 스냅샷을 DB에 저장"""
     market_condition = MarketCondition(
-        date=today,
+        date=day,
         overall_sentiment=market_data["overall_sentiment"],
         vix_level=market_data["vix_level"],
         sp500_change=market_data["market_changes"]["sp500"],
@@ -98,6 +135,20 @@ def init_market_conditions():
     db.session.add(market_condition)
     db.session.commit()
 
+def sync_market_condition(day, snapshot):
+    """스케줄러 주기마다 당일 스냅샷을 DB와 맞춤 (다른 워커가 먼저 저장했으면 그 값을 사용)"""
+    with app.app_context():
+        condition = MarketCondition.query.filter_by(date=day).first()
+        if condition:
+            return condition.to_dict() if snapshot.get('id') != condition.id else None
+        try:
+            save_market_condition(day, snapshot)
+        except Exception:
+            db.session.rollback()
+            condition = MarketCondition.query.filter_by(date=day).first()
+            return condition.to_dict() if condition else None
+        return None
+
 def init_enhanced_sample_data():
     """향상된 샘플 데이터 초기화"""
     # 기존 데이터 확인
@@ -178,13 +229,18 @@ def init_enhanced_sample_data():
     # 향상된 거래 데이터 생성
     robots = Robot.query.all()
     
-    for _ in range(100):  # 100개의 상세한 거래 데이터
+    # 100개의 상세한 거래 데이터 (시세는 한 번에 조회)
+    symbols = [stock_service.get_random_stock_for_trading() for _ in range(100)]
+    quotes = stock_service.get_stock_quotes(symbols)
+    
+    for symbol in symbols:
         robot = random.choice(robots)
-        symbol = stock_service.get_random_stock_for_trading()
         trade_type = random.choice(['BUY', 'SELL'])
         
         # 상세한 거래 데이터 생성
-        trade_data = stock_service.generate_detailed_trade_data(symbol, trade_type, robot.name)
+        trade_data = stock_service.generate_detailed_trade_data(
+            symbol, trade_type, robot.name, quote=quotes[symbol]
+        )
         
         # 거래량과 가격 계산
         quantity = random.randint(10, 500)
@@ -227,12 +283,418 @@ def init_enhanced_sample_data():
     db.session.commit()
     print(f"Added {Trade.query.count()} enhanced trades")
 
-with app.app_context():
+def upgrade_schema():
+    """새 테이블 생성 후 기존 DB에 아직 적용되지 않은 마이그레이션 적용"""
     db.create_all()
+    return run_migrations(db.engine)
+
+def seed_database():
+    """DB 스키마 생성 및 초기 데이터 적재 (네트워크 호출 포함, flask seed 또는 직접 실행 시)"""
+    upgrade_schema()
     init_stock_universe()
+    load_symbol_index()
     init_market_conditions()
     init_enhanced_sample_data()
 
+# 모듈 import 시에는 네트워크/대량 DB 작업을 하지 않고, 첫 요청에서 가벼운 초기화만 한 번 수행
+_init_lock = threading.Lock()
+_initialized = False
+
+def ensure_initialized():
+    """프로세스당 한 번만 실행되는 지연 초기화 (스키마, 종목 인덱스, 시장 상황 스냅샷)"""
+    global _initialized
+    if _initialized:
+        return
+    with _init_lock:
+        if _initialized:
+            return
+        upgrade_schema()
+        load_symbol_index()
+        init_market_conditions()
+        # 날짜가 바뀌면 새 시장 상황을 계산하여 저장
+        stock_service.market_conditions.start(interval=60.0, on_tick=sync_market_condition)
+        # 로봇 런타임은 한 프로세스에서만 켬 (여러 워커가 같은 로봇을 중복 실행하지 않도록)
+        if os.environ.get('ROBOT_RUNTIME') == '1':
+            robot_runtime.workers = int(os.environ.get('ROBOT_RUNTIME_WORKERS', robot_runtime.workers))
+            start_robot_runtime(robot_runtime, tick=float(os.environ.get('ROBOT_RUNTIME_TICK', 1.0)))
+        if Robot.query.first() is None:
+            print("No robots found. Run 'flask --app src.main seed' to load sample data.")
+        _initialized = True
+
+app.before_request(ensure_initialized)
+
+@app.cli.command('init-db')
+def init_db_command():
+    """DB 스키마 생성"""
+    upgrade_schema()
+    print("Database schema created")
+
+@app.cli.command('db-upgrade')
+def db_upgrade_command():
+    """기존 DB에 아직 적용되지 않은 마이그레이션 적용"""
+    applied = upgrade_schema()
+    print(f"Applied migrations: {applied}" if applied else "Database schema is up to date")
+
+@app.cli.command('check-indexes')
+@click.option('--fresh', is_flag=True, help='앱 DB 대신 빈 메모리 DB에 스키마와 마이그레이션을 만들어 검사 (CI용)')
+def check_indexes_command(fresh):
+    """주요 조회 쿼리의 실행 계획을 출력하고 전체 스캔이 있으면 0이 아닌 코드로 종료 (SQLite 전용)"""
+    if fresh:
+        engine = create_engine('sqlite://')
+        db.metadata.create_all(engine)
+        run_migrations(engine)
+    else:
+        if db.engine.dialect.name != 'sqlite':
+            raise click.ClickException("check-indexes supports SQLite only")
+        upgrade_schema()
+        engine = db.engine
+    results = check_query_plans(engine)
+    for result in results:
+        print(f"[{'OK' if result['uses_index'] else 'SCAN'}] {result['query']}")
+        for step in result['plan']:
+            print(f"    {step}")
+    failed = [result['query'] for result in results if not result['uses_index']]
+    if failed:
+        raise click.ClickException(f"Full table scan in: {', '.join(failed)}")
+
+@app.cli.command('seed')
+def seed_command():
+    """DB 스키마 생성 후 종목 목록, 시장 상황, 샘플 로봇/거래 데이터 적재"""
+    seed_database()
+
+@app.cli.command('sync-universe')
+@click.option('--full', is_flag=True, help='last_updated와 관계없이 모든 종목 갱신')
+def sync_universe_command(full):
+    """Polygon 전체 종목 목록 동기화 (기본: 변경된 종목만 갱신)"""
+    sync_stock_universe(incremental=not full)
+    load_symbol_index()
+
+@app.cli.command('sync-bars')
+@click.option('--to-db', is_flag=True, help='바 저장소 → market_data (기본: market_data → 바 저장소)')
+@click.option('--symbols', default=None, help='쉼표로 구분한 종목 (기본: 전체)')
+def sync_bars_command(to_db, symbols):
+    """market_data 테이블과 컬럼형 일봉 저장소(BAR_STORE_PATH) 동기화"""
+    upgrade_schema()
+    symbols = [symbol.strip().upper() for symbol in symbols.split(',') if symbol.strip()] if symbols else None
+    with db.engine.begin() as conn:
+        if to_db:
+            synced = save_to_database(conn, bar_store, symbols)
+        else:
+            synced = load_from_database(conn, bar_store, symbols)
+    if to_db:
+        response_cache.invalidate_tags(['market_data'])
+    direction = 'bar store -> market_data' if to_db else 'market_data -> bar store'
+    print(f"Synced {synced['bars']:,} bars for {synced['symbols']:,} symbols ({direction})")
+
+@app.cli.command('load-history')
+@click.option('--symbols', default=None, help='쉼표로 구분한 종목 (기본: stock_universe의 활성 종목 전체)')
+@click.option('--from', 'start', default=None, help='시작일 YYYY-MM-DD (기본: 2년 전)')
+@click.option('--to', 'end', default=None, help='종료일 YYYY-MM-DD (기본: 오늘)')
+@click.option('--rate', default=float(os.environ.get('POLYGON_RATE_LIMIT', 5)), show_default=True,
+              help='초당 최대 요청 수 (0이면 제한 없음)')
+@click.option('--workers', default=8, show_default=True, help='동시 요청 수')
+@click.option('--refresh', is_flag=True, help='수집 구간 캐시를 무시하고 전체 구간 다시 받기')
+@click.option('--bar-store', 'to_bar_store', is_flag=True, help='받은 봉을 바 저장소에도 기록')
+def load_history_command(symbols, start, end, rate, workers, refresh, to_bar_store):
+    """Polygon 과거 일봉을 빠진 구간만 받아 market_data에 적재 (HISTORY_CACHE_PATH에 수집 구간 기록)"""
+    upgrade_schema()
+    if symbols:
+        symbols = [symbol.strip().upper() for symbol in symbols.split(',') if symbol.strip()]
+    else:
+        symbols = db.session.execute(
+            select(StockUniverse.symbol).where(StockUniverse.is_active.is_(True)).order_by(StockUniverse.symbol)
+        ).scalars().all()
+    start = date.fromisoformat(start) if start else date.today() - timedelta(days=730)
+    end = date.fromisoformat(end) if end else date.today()
+
+    fetcher = HistoryFetcher(stock_service, CoverageCache(default_coverage_path()),
+                             rate_limit=rate or None, max_workers=workers)
+    stats = fetcher.load(db.engine, symbols, start, end,
+                         store=bar_store if to_bar_store else None, refresh=refresh)
+    print(f"Loaded {stats['bars']:,} bars for {stats['fetched_symbols']:,} symbols "
+          f"({stats['gaps']:,} gaps, {stats['requests']:,} requests); "
+          f"{stats['up_to_date']:,} symbols already up to date")
+    for symbol, error in stats['failed'].items():
+        print(f"  failed {symbol}: {error}")
+
+@app.cli.command('generate-trades')
+@click.option('--count', default=1_000_000, show_default=True, help='생성할 거래 수')
+@click.option('--days', default=30, show_default=True, help='거래 시각을 분포시킬 기간 (오늘 기준 과거 N일)')
+@click.option('--seed', default=42, show_default=True, help='난수 seed (같은 값이면 같은 데이터)')
+@click.option('--chunk-size', default=100_000, show_default=True, help='트랜잭션당 적재 건수')
+def generate_trades_command(count, days, seed, chunk_size):
+    """부하 테스트용 가상 거래 대량 생성 (DATABASE_URL로 별도 DB 지정 권장)"""
+    upgrade_schema()
+    robot_ids = [robot_id for (robot_id,) in db.session.query(Robot.id).all()]
+    if not robot_ids:
+        raise click.ClickException("No robots found. Run 'flask --app src.main seed' first.")
+    load_symbol_index()
+    
+    end = datetime.now()
+    generator = SyntheticTradeGenerator(
+        robot_ids, stock_service.symbol_index, end - timedelta(days=days), end, seed=seed
+    )
+    
+    def progress(inserted, elapsed):
+        print(f"  {inserted:,} / {count:,} trades ({inserted / elapsed:,.0f} rows/s)")
+    
+    stats = bulk_insert_trades(db.engine, generator, count, chunk_size=chunk_size, progress=progress)
+    print(f"Inserted {stats['inserted']:,} trades in {stats['seconds']}s ({stats['rows_per_second']:,} rows/s)")
+    
+    # 대량 적재는 ORM flush를 거치지 않으므로 적재 구간의 시간별 롤업을 다시 계산
+    with db.engine.begin() as conn:
+        rollups = rebuild_rollups(conn, since=end - timedelta(days=days))
+    response_cache.invalidate_tags(['trades'])
+    print(f"Rebuilt rollups: {rollups['sector_buckets']:,} sector / {rollups['symbol_buckets']:,} symbol buckets")
+
+@app.cli.command('backfill-rollups')
+@click.option('--days', default=None, type=int, help='최근 N일 구간만 다시 계산 (기본: 전체)')
+def backfill_rollups_command(days):
+    """trades 테이블에서 시간별 섹터/종목 롤업을 다시 계산"""
+    upgrade_schema()
+    since = datetime.now() - timedelta(days=days) if days else None
+    with db.engine.begin() as conn:
+        rollups = rebuild_rollups(conn, since=since)
+    response_cache.invalidate_tags(['trades'])
+    print(f"Rebuilt rollups: {rollups['sector_buckets']:,} sector / {rollups['symbol_buckets']:,} symbol buckets")
+
+def load_backtest_bars(symbols, start, end, source):
+    """백테스트/탐색 CLI 공통: 종목/기간 옵션 → BarMatrix (기본: 활성 종목 전체, 최근 10년)"""
+    if symbols:
+        symbols = [symbol.strip().upper() for symbol in symbols.split(',') if symbol.strip()]
+    else:
+        symbols = db.session.execute(
+            select(StockUniverse.symbol).where(StockUniverse.is_active.is_(True)).order_by(StockUniverse.symbol)
+        ).scalars().all()
+    start = date.fromisoformat(start) if start else date.today() - timedelta(days=3652)
+    end = date.fromisoformat(end) if end else date.today()
+
+    started = time.perf_counter()
+    if source == 'bar-store':
+        bars = bars_from_store(bar_store, symbols, start, end)
+    else:
+        with db.engine.connect() as conn:
+            bars = bars_from_database(conn, symbols, start, end)
+    if len(bars.dates) == 0:
+        raise click.ClickException(f'No bars between {start} and {end}. Run load-history first.')
+    print(f"Loaded {bars.shape[0]:,} symbols x {bars.shape[1]:,} days from {source} "
+          f"({time.perf_counter() - started:.2f}s)")
+    return bars
+
+def find_robot(robot):
+    """로봇 ID 또는 이름 → Robot (없으면 ClickException)"""
+    query = select(Robot).where(Robot.id == int(robot)) if robot.isdigit() else select(Robot).where(Robot.name == robot)
+    found = db.session.execute(query).scalars().first()
+    if found is None:
+        raise click.ClickException(f'Robot not found: {robot}')
+    if found.strategy_type not in STRATEGIES:
+        raise click.ClickException(f'No backtest strategy for strategy_type {found.strategy_type!r}')
+    return found
+
+@app.cli.command('backtest')
+@click.option('--robots', default=None, help='쉼표로 구분한 로봇 ID (기본: 전략이 정의된 활성 로봇 전체)')
+@click.option('--symbols', default=None, help='쉼표로 구분한 종목 (기본: stock_universe의 활성 종목 전체)')
+@click.option('--from', 'start', default=None, help='시작일 YYYY-MM-DD (기본: 10년 전)')
+@click.option('--to', 'end', default=None, help='종료일 YYYY-MM-DD (기본: 오늘)')
+@click.option('--source', type=click.Choice(['db', 'bar-store']), default='db', show_default=True,
+              help='일봉 출처 (market_data 테이블 또는 바 저장소)')
+@click.option('--commission', default=DEFAULT_COMMISSION_RATE, show_default=True, help='체결 금액 대비 수수료율')
+@click.option('--dry-run', is_flag=True, help='결과만 출력하고 trades/robots에 기록하지 않음')
+def backtest_command(robots, symbols, start, end, source, commission, dry_run):
+    """로봇 전략을 과거 일봉으로 백테스트하고 거래와 성과 지표를 trades/robots에 기록"""
+    upgrade_schema()
+    query = select(Robot).where(Robot.strategy_type.in_(list(STRATEGIES))).order_by(Robot.id)
+    if robots:
+        query = query.where(Robot.id.in_([int(robot_id) for robot_id in robots.split(',') if robot_id.strip()]))
+    else:
+        query = query.where(Robot.is_active.is_(True))
+    targets = db.session.execute(query).scalars().all()
+    if not targets:
+        raise click.ClickException('No robots with a known strategy_type found.')
+    bars = load_backtest_bars(symbols, start, end, source)
+    features = Features(bars)
+    for robot in targets:
+        started = time.perf_counter()
+        result = run_backtest(bars, robot.strategy_type, initial_capital=robot.initial_capital or 100000,
+                              commission_rate=commission, features=features)
+        m = result.metrics
+        print(f"  [{robot.id}] {robot.name}: {m['trades']:,} trades, return {m['total_return']}%, "
+              f"win rate {m['win_rate']}%, max drawdown {m['max_drawdown']}%, sharpe {m['sharpe_ratio']} "
+              f"({time.perf_counter() - started:.2f}s)")
+        if not dry_run:
+            saved = save_backtest(db.engine, robot.id, bars, features, result)
+            print(f"      wrote {saved['inserted']:,} trades (replaced {saved['deleted']:,})")
+
+@app.cli.command('sweep')
+@click.option('--robot', required=True, help='로봇 ID 또는 이름 (로봇의 strategy_type 파라미터를 탐색)')
+@click.option('--param', 'specs', multiple=True,
+              help='탐색할 파라미터: name=v1,v2,... (후보 목록) 또는 name=low:high (--samples와 함께 구간 추출)')
+@click.option('--samples', default=0, help='무작위 탐색 설정 수 (0이면 후보 목록의 모든 조합)')
+@click.option('--seed', default=42, show_default=True, help='무작위 탐색 seed')
+@click.option('--workers', default=os.cpu_count() or 1, show_default=True, help='작업 프로세스 수')
+@click.option('--train-days', default=0, help='워크포워드 학습 구간 거래일 수 (0이면 전체 구간 한 번)')
+@click.option('--test-days', default=126, show_default=True, help='워크포워드 검증 구간 거래일 수')
+@click.option('--warmup', default=60, show_default=True, help='지표 준비용으로 건너뛰는 앞쪽 거래일 수')
+@click.option('--objective', type=click.Choice(list(PARAM_SWEEP_OBJECTIVES)), default='sharpe_ratio',
+              show_default=True, help='최적 설정 선택 기준')
+@click.option('--symbols', default=None, help='쉼표로 구분한 종목 (기본: stock_universe의 활성 종목 전체)')
+@click.option('--from', 'start', default=None, help='시작일 YYYY-MM-DD (기본: 10년 전)')
+@click.option('--to', 'end', default=None, help='종료일 YYYY-MM-DD (기본: 오늘)')
+@click.option('--source', type=click.Choice(['db', 'bar-store']), default='db', show_default=True,
+              help='일봉 출처 (market_data 테이블 또는 바 저장소)')
+@click.option('--commission', default=DEFAULT_COMMISSION_RATE, show_default=True, help='체결 금액 대비 수수료율')
+def sweep_command(robot, specs, samples, seed, workers, train_days, test_days, warmup, objective,
+                  symbols, start, end, source, commission):
+    """로봇 전략 파라미터를 프로세스 풀에서 탐색해 sweep_results에 기록 (워크포워드 선택)"""
+    upgrade_schema()
+    robot = find_robot(robot)
+    try:
+        space = parse_space(specs)
+        if samples:
+            configs = random_search(robot.strategy_type, space, samples, seed=seed)
+        elif any(isinstance(values, tuple) for values in space.values()):
+            raise ValueError('name=low:high ranges need --samples')
+        else:
+            configs = grid(robot.strategy_type, space)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    bars = load_backtest_bars(symbols, start, end, source)
+    print(f"Sweeping {len(configs):,} configs of {robot.name} ({robot.strategy_type}) on {workers} workers")
+
+    reported = [0.0]
+    def progress(done, total, elapsed):
+        if elapsed - reported[0] >= 5 or done == total:
+            reported[0] = elapsed
+            print(f"  {done:,} / {total:,} evaluations ({done / elapsed:,.1f}/s)")
+
+    try:
+        summary = run_sweep(db.engine, bars, robot.strategy_type, configs, workers=workers,
+                            walk_forward=(train_days, test_days) if train_days else None, warmup=warmup,
+                            objective=objective, initial_capital=robot.initial_capital or 100000,
+                            commission_rate=commission, progress=progress)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    print(f"Sweep {summary['sweep_id']}: {summary['evaluations']:,} evaluations in {summary['seconds']}s, "
+          f"{summary['rows_written']:,} rows in sweep_results")
+    for fold in summary['best']:
+        metrics = fold.get('test') or fold.get('metrics')
+        label = f"test {fold['test_window'][0]}~{fold['test_window'][1]}" if 'test' in fold else 'full period'
+        print(f"  fold {fold['fold']}: config {fold['config_id']} {json.dumps(fold['params'], sort_keys=True)}")
+        print(f"      {label}: return {metrics['total_return']}%, sharpe {metrics['sharpe_ratio']}, "
+              f"max drawdown {metrics['max_drawdown']}%, {metrics['trades']:,} trades")
+    if 'out_of_sample_return' in summary:
+        print(f"Out-of-sample return across folds: {summary['out_of_sample_return']}%")
+
+def runtime_symbols(symbols=None, limit=200):
+    """로봇 런타임 시세 피드 종목 (기본: 종목 인덱스의 거래 후보 앞쪽 limit개)"""
+    if symbols:
+        return [symbol.strip().upper() for symbol in symbols.split(',') if symbol.strip()]
+    return list(dict.fromkeys(stock_service.symbol_index.candidates))[:limit]
+
+def start_robot_runtime(runtime, symbols=None, limit=200, tick=1.0, seed=None):
+    """로컬 랜덤워크 시세 피드를 tick초마다 갱신하며 로봇 런타임 시작 (피드 반환)
+
+    피드는 종목별 마지막 거래 가격에서 시작하므로 재시작 때 복원한 포지션이 그 가격에서 이어집니다.
+    """
+    symbols = runtime_symbols(symbols, limit)
+    feed = RandomWalkQuoteFeed(symbols, seed=seed, quote_cache=stock_service.quote_cache,
+                               start_prices=last_trade_prices(db.engine, symbols))
+    feed.start(interval=tick)
+    runtime.start(db.engine, feed)
+    return feed
+
+@app.cli.command('run-robots')
+@click.option('--workers', default=4, show_default=True, help='동시에 평가하는 로봇 수')
+@click.option('--tick', default=1.0, show_default=True, help='시세 피드가 새 봉을 만드는 간격 (초)')
+@click.option('--symbols', default=None, help='쉼표로 구분한 피드 종목 (기본: 종목 인덱스 앞쪽 --universe개)')
+@click.option('--universe', default=200, show_default=True, help='--symbols가 없을 때 피드 종목 수')
+@click.option('--seed', default=None, type=int, help='시세 피드 난수 seed')
+@click.option('--interval', default=None, type=float, help='모든 로봇에 같은 실행 주기 (초, 기본: 로봇/전략별)')
+@click.option('--batch-size', default=500, show_default=True, help='한 번에 기록하는 최대 거래 수')
+@click.option('--flush-interval', default=1.0, show_default=True, help='거래 기록 주기 (초)')
+@click.option('--duration', default=0.0, help='실행 시간 (초, 0이면 Ctrl+C까지)')
+@click.option('--report', default=10.0, show_default=True, help='상태 출력 간격 (초)')
+def run_robots_command(workers, tick, symbols, universe, seed, interval, batch_size, flush_interval, duration, report):
+    """활성 로봇을 로컬 시세 피드로 계속 실행하며 거래를 trades에 기록"""
+    upgrade_schema()
+    load_symbol_index()
+    runtime = RobotRuntime(workers=workers, batch_size=batch_size, flush_interval=flush_interval,
+                           interval=interval)
+    feed = start_robot_runtime(runtime, symbols, universe, tick, seed)
+    print(f"Running robots on {len(feed.symbols):,} symbols (new bar every {tick}s, {workers} workers)")
+    started = time.monotonic()
+    try:
+        while not duration or time.monotonic() - started < duration:
+            wait = report if not duration else min(report, duration - (time.monotonic() - started))
+            time.sleep(max(wait, 0.0))
+            stats = runtime.stats()
+            robots, writer = stats['robots'], stats['writer']
+            print(f"  {time.monotonic() - started:6.0f}s bar {stats['feed']['generation']}: "
+                  f"{len(robots)} robots, {sum(r['runs'] for r in robots):,} runs "
+                  f"({sum(r['overruns'] for r in robots):,} overruns, {sum(r['errors'] for r in robots):,} errors), "
+                  f"{writer['written']:,} trades in {writer['batches']:,} batches "
+                  f"(last flush {writer['last_flush_ms']} ms, {writer['pending']:,} pending)")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        feed.stop()
+        runtime.stop()
+    for robot in runtime.stats()['robots']:
+        print(f"  [{robot['robot_id']}] {robot['name']} ({robot['strategy_type']}, every {robot['interval']}s): "
+              f"{robot['runs']:,} runs, avg {robot['avg_ms']} ms, p95 {robot['p95_ms']} ms, max {robot['max_ms']} ms, "
+              f"{robot['trades']:,} trades, {robot['open_positions']} open, equity {robot['equity']:,}")
+        if robot['last_error']:
+            print(f"      last error: {robot['last_error']}")
+
+@app.cli.command('watch-exits')
+@click.option('--robots', default=None, help='쉼표로 구분한 로봇 ID (기본: 전체)')
+@click.option('--tick', default=1.0, show_default=True, help='시세 피드가 새 봉을 만드는 간격 (초)')
+@click.option('--seed', default=None, type=int, help='시세 피드 난수 seed')
+@click.option('--sync-interval', default=1.0, show_default=True, help='새 거래를 읽어 포지션을 갱신하는 간격 (초)')
+@click.option('--batch-size', default=500, show_default=True, help='한 번에 기록하는 최대 청산 거래 수')
+@click.option('--flush-interval', default=1.0, show_default=True, help='청산 거래 기록 주기 (초)')
+@click.option('--duration', default=0.0, help='실행 시간 (초, 0이면 Ctrl+C까지)')
+@click.option('--report', default=10.0, show_default=True, help='상태 출력 간격 (초)')
+def watch_exits_command(robots, tick, seed, sync_interval, batch_size, flush_interval, duration, report):
+    """열린 포지션의 손절가/익절가를 로컬 시세 피드의 새 봉마다 검사하여 청산 거래 기록
+
+    피드는 열린 포지션 종목을 마지막 거래 가격에서 시작합니다. 로봇 런타임도 자기 포지션의
+    손절/익절을 검사하므로 같은 로봇에 대해 run-robots와 함께 돌리지 않습니다 (--robots로 나눔).
+    """
+    upgrade_schema()
+    load_symbol_index()
+    robot_ids = [int(robot_id) for robot_id in robots.split(',') if robot_id.strip()] if robots else None
+    monitor = ExitMonitor(robot_ids, batch_size=batch_size, flush_interval=flush_interval,
+                          sync_interval=sync_interval)
+    started = time.perf_counter()
+    loaded = monitor.sync(db.engine)
+    symbols = monitor.open_symbols()
+    print(f"Read {loaded:,} trades in {time.perf_counter() - started:.2f}s: "
+          f"{len(monitor.index):,} open positions with stop-loss/take-profit on {len(symbols):,} symbols")
+    if not symbols:
+        return
+    feed = RandomWalkQuoteFeed(symbols, seed=seed, quote_cache=stock_service.quote_cache,
+                               start_prices=monitor.last_prices)
+    feed.start(interval=tick)
+    monitor.start(db.engine, feed)
+    started = time.monotonic()
+    try:
+        while not duration or time.monotonic() - started < duration:
+            wait = report if not duration else min(report, duration - (time.monotonic() - started))
+            time.sleep(max(wait, 0.0))
+            stats = monitor.stats()
+            print(f"  {time.monotonic() - started:6.0f}s {stats['ticks']:,} bars: {stats['open_positions']:,} open, "
+                  f"{stats['exits']:,} exits (tick avg {stats['avg_tick_ms']} ms, max {stats['max_tick_ms']} ms), "
+                  f"{stats['writer']['written']:,} written")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        feed.stop()
+        monitor.stop()
+    stats = monitor.stats()
+    print(f"Done: {stats['exits']:,} exits over {stats['ticks']:,} bars, {stats['open_positions']:,} positions still open"
+          + (f", last error: {stats['last_error']}" if stats['last_error'] else ""))
+
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
@@ -250,6 +712,7 @@ def serve(path):
             return "index.html not found", 404
 
 @app.route('/api/health', methods=['GET'])
+@conditional_get(cache_control='no-store')
 def health_check():
     """API 상태 확인"""
     return {
@@ -264,23 +727,27 @@ def health_check():
         }
     }
 
+@app.route('/api/cache/responses', methods=['GET'])
+@conditional_get(cache_control='no-store')
+def get_response_cache_stats():
+    """응답 캐시 적중률/메모리 사용량 조회"""
+    return {
+        'success': True,
+        'data': response_cache.stats()
+    }
+
 @app.route('/api/market/condition', methods=['GET'])
+@conditional_get(tables=('market_conditions',), extra=today_key)
 def get_current_market_condition():
     """현재 시장 상황 조회"""
-    today = date.today()
-    condition = MarketCondition.query.filter_by(date=today).first()
-    
-    if not condition:
-        # 새로운 시장 상황 데이터 생성
-        init_market_conditions()
-        condition = MarketCondition.query.filter_by(date=today).first()
-    
     return {
         'success': True,
-        'data': condition.to_dict() if condition else {}
+        'data': build_market_condition()
     }
 
 @app.route('/api/stocks/universe', methods=['GET'])
+@conditional_get(tables=('stock_universe',))
+@cached_response(tags=('stock_universe',))
 def get_stock_universe():
     """전체 주식 목록 조회"""
     page = request.args.get('page', 1, type=int)
@@ -289,21 +756,54 @@ def get_stock_universe():
     market_cap = request.args.get('market_cap')
     search = request.args.get('search')
     
-    query = StockUniverse.query.filter_by(is_active=True)
+    cursor = request.args.get('cursor')
     
+    conditions = [StockUniverse.is_active.is_(True)]
     if sector:
-        query = query.filter(StockUniverse.sector == sector)
+        conditions.append(StockUniverse.sector == sector)
     if market_cap:
-        query = query.filter(StockUniverse.market_cap == market_cap)
+        conditions.append(StockUniverse.market_cap == market_cap)
     if search:
-        query = query.filter(
+        conditions.append(
             db.or_(
                 StockUniverse.symbol.contains(search.upper()),
                 StockUniverse.name.contains(search)
             )
         )
     
-    stocks = query.paginate(page=page, per_page=per_page, error_out=False)
+    # 커서 모드: ?cursor= (첫 페이지) 또는 이전 응답의 next_cursor, 종목 코드 순
+    if cursor is not None:
+        per_page = max(per_page, 1)
+        try:
+            result = keyset_page(
+                db.session,
+                select(StockUniverse).where(*conditions),
+                (StockUniverse.symbol,),
+                cursor,
+                per_page,
+                descending=False,
+                row_key=lambda row: (row[0].symbol,)
+            )
+        except InvalidCursor as e:
+            return {'success': False, 'error': str(e)}, 400
+        
+        total = None
+        if request.args.get('include_total', 'false').lower() == 'true':
+            total = approximate_counts.get(
+                ('stock_universe', sector, market_cap, search),
+                lambda: db.session.execute(
+                    select(func.count(StockUniverse.id)).where(*conditions)
+                ).scalar()
+            )
+        return {
+            'success': True,
+            'data': {
+                'stocks': [row[0].to_dict() for row in result['rows']],
+                'pagination': cursor_pagination(result, per_page, total)
+            }
+        }
+    
+    stocks = StockUniverse.query.filter(*conditions).paginate(page=page, per_page=per_page, error_out=False)
     
     return {
         'success': True,
@@ -319,5 +819,7 @@ def get_stock_universe():
     }
 
 if __name__ == '__main__':
+    with app.app_context():
+        seed_database()
     app.run(host='0.0.0.0', port=5001, debug=True)
 
@@ -0,0 +1,147 @@
+"""버전 기반 스키마 마이그레이션
+
+db.create_all()은 새 테이블만 만들고 기존 테이블은 변경하지 않으므로, 이미 운영 중인
+app.db에 필요한 변경(인덱스 추가 등)을 순서대로 적용합니다. 적용된 버전은
+schema_migrations 테이블에 기록되어 한 번만 실행됩니다.
+
+새 마이그레이션은 MIGRATIONS 끝에 다음 버전 번호로 추가합니다. 모든 문장은 여러 번
+실행해도 안전해야 합니다 (IF NOT EXISTS). SQL 문 대신 연결을 받는 함수도 쓸 수 있습니다.
+"""
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+
+from src.models.trading import db
+from src.services.trade_rollups import rebuild_rollups
+
+schema_migrations = db.Table(
+    'schema_migrations',
+    db.Column('version', db.Integer, primary_key=True),
+    db.Column('description', db.String(200)),
+    db.Column('applied_at', db.DateTime, default=datetime.utcnow)
+)
+
+
+def add_robot_run_interval(conn):
+    """robots.run_interval 추가 (ADD COLUMN에는 IF NOT EXISTS가 없어 컬럼이 있는지 먼저 확인)"""
+    if 'run_interval' not in {column['name'] for column in inspect(conn).get_columns('robots')}:
+        conn.execute(text('ALTER TABLE robots ADD COLUMN run_interval FLOAT'))
+
+
+def add_trade_exit_of(conn):
+    """trades.exit_of 추가 (청산 거래 → 청산한 매수 거래)"""
+    if 'exit_of' not in {column['name'] for column in inspect(conn).get_columns('trades')}:
+        conn.execute(text('ALTER TABLE trades ADD COLUMN exit_of INTEGER REFERENCES trades (id)'))
+
+
+def add_robot_cash(conn):
+    """robots.cash 추가 (런타임 재시작 때 보유 종목과 별도로 복원하는 현금)"""
+    if 'cash' not in {column['name'] for column in inspect(conn).get_columns('robots')}:
+        conn.execute(text('ALTER TABLE robots ADD COLUMN cash FLOAT'))
+
+
+# (버전, 설명, SQL 문 또는 함수(conn) 목록)
+MIGRATIONS = [
+    (1, 'indexes for hot query columns', [
+        'CREATE INDEX IF NOT EXISTS ix_trades_trade_date ON trades (trade_date, id)',
+        'CREATE INDEX IF NOT EXISTS ix_trades_robot_trade_date ON trades (robot_id, trade_date, id)',
+        'CREATE INDEX IF NOT EXISTS ix_trades_symbol_trade_date ON trades (symbol, trade_date)',
+        'CREATE INDEX IF NOT EXISTS ix_stock_universe_sector_symbol ON stock_universe (sector, symbol)',
+        'CREATE INDEX IF NOT EXISTS ix_stock_universe_market_cap_symbol ON stock_universe (market_cap, symbol)',
+        'CREATE INDEX IF NOT EXISTS ix_user_predictions_user_date '
+        'ON user_predictions (user_name, prediction_date, id)',
+        'ANALYZE',
+    ]),
+    # 기존 DB의 거래로 시간별 롤업 테이블 채우기 (테이블은 create_all에서 생성)
+    (2, 'backfill hourly trade rollups', [rebuild_rollups]),
+    (3, 'robot runtime interval', [add_robot_run_interval]),
+    (4, 'trade exit link', [add_trade_exit_of]),
+    (5, 'robot runtime cash', [add_robot_cash]),
+]
+
+
+def applied_versions(engine) -> set:
+    """이미 적용된 마이그레이션 버전"""
+    schema_migrations.create(engine, checkfirst=True)
+    with engine.connect() as conn:
+        return set(conn.execute(db.select(schema_migrations.c.version)).scalars())
+
+
+def run_migrations(engine) -> List[int]:
+    """적용되지 않은 마이그레이션을 버전 순서대로 적용 (적용한 버전 목록 반환)"""
+    done = applied_versions(engine)
+    applied = []
+    for version, description, statements in sorted(MIGRATIONS, key=lambda m: m[0]):
+        if version in done:
+            continue
+        try:
+            with engine.begin() as conn:
+                for statement in statements:
+                    if callable(statement):
+                        statement(conn)
+                    else:
+                        conn.execute(text(statement))
+                conn.execute(schema_migrations.insert().values(
+                    version=version, description=description, applied_at=datetime.utcnow()
+                ))
+        except IntegrityError:
+            # 다른 워커가 동시에 같은 버전을 적용한 경우
+            continue
+        applied.append(version)
+        print(f"Applied migration {version}: {description}")
+    return applied
+
+
+# 인덱스를 사용해야 하는 주요 조회 쿼리 (check_query_plans로 검증)
+HOT_QUERIES: Dict[str, str] = {
+    'recent trades':
+        'SELECT * FROM trades ORDER BY trade_date DESC LIMIT 20',
+    'robot trades (offset)':
+        'SELECT * FROM trades WHERE robot_id = 1 ORDER BY trade_date DESC LIMIT 20 OFFSET 40',
+    'robot trades (keyset)':
+        "SELECT * FROM trades WHERE robot_id = 1 AND (trade_date, id) < ('2030-01-01 00:00:00', 0) "
+        'ORDER BY trade_date DESC, id DESC LIMIT 21',
+    'robot trade count':
+        'SELECT count(id) FROM trades WHERE robot_id = 1',
+    'trades by sector (24h)':
+        "SELECT * FROM trades WHERE trade_date >= '2030-01-01 00:00:00'",
+    'trending symbols (24h rollup)':
+        'SELECT symbol, sum(trade_count), sum(notional_sum) FROM symbol_hourly_stats '
+        "WHERE bucket >= '2030-01-01 00:00:00' GROUP BY symbol HAVING sum(trade_count) > 0 "
+        'ORDER BY sum(trade_count) DESC, symbol LIMIT 10',
+    'sector activity (24h rollup)':
+        'SELECT sector, sum(trade_count), sum(confidence_sum) FROM sector_hourly_stats '
+        "WHERE bucket >= '2030-01-01 00:00:00' GROUP BY sector HAVING sum(trade_count) > 0",
+    'trades for symbol':
+        "SELECT * FROM trades WHERE symbol = 'AAPL' ORDER BY trade_date DESC LIMIT 20",
+    'prediction history':
+        "SELECT * FROM user_predictions WHERE user_name = 'kim' ORDER BY prediction_date DESC, id DESC LIMIT 20",
+    'universe by sector':
+        "SELECT * FROM stock_universe WHERE is_active = 1 AND sector = 'Technology' "
+        "AND symbol > 'A' ORDER BY symbol LIMIT 51",
+    'universe by market cap':
+        "SELECT * FROM stock_universe WHERE is_active = 1 AND market_cap = 'large' "
+        "AND symbol > 'A' ORDER BY symbol LIMIT 51",
+}
+
+# 인덱스 순서로 읽다가 LIMIT에서 멈추는 쿼리 (SCAN ... USING INDEX 허용)
+ORDERED_SCAN_QUERIES = {'recent trades'}
+
+
+def check_query_plans(engine) -> List[Dict]:
+    """HOT_QUERIES의 EXPLAIN QUERY PLAN 결과와 인덱스 사용 여부 (SQLite 전용)
+
+    SCAN 단계는 인덱스를 쓰더라도 전체를 읽으므로 ORDERED_SCAN_QUERIES가 아니면 실패로 봅니다.
+    """
+    results = []
+    with engine.connect() as conn:
+        for name, sql in HOT_QUERIES.items():
+            plan = [row[-1] for row in conn.execute(text(f'EXPLAIN QUERY PLAN {sql}'))]
+            full_scan = any(
+                step.startswith('SCAN') and ('USING' not in step or name not in ORDERED_SCAN_QUERIES)
+                for step in plan
+            )
+            results.append({'query': name, 'plan': plan, 'uses_index': not full_scan})
+    return results
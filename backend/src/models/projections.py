@@ -0,0 +1,117 @@
+"""거래 조회용 컬럼 프로젝션
+
+ORM 객체를 만들지 않고 필요한 컬럼만 SELECT하며, 로봇 이름은 같은 쿼리에서 JOIN으로
+가져옵니다. 결과 튜플을 Trade.to_dict()와 같은 형태의 dict로 바로 변환합니다.
+trade_date는 datetime 그대로 두고 JSON 제공자(src.services.json_provider)가 ISO 8601로 직렬화합니다.
+"""
+from sqlalchemy import select
+
+from src.models.trading import Robot, Trade
+
+# Trade.to_dict()의 필드 순서와 동일
+TRADE_DETAIL_COLUMNS = (
+    Trade.id, Trade.robot_id, Robot.name.label('robot_name'), Trade.symbol, Trade.company_name,
+    Trade.trade_type, Trade.quantity, Trade.price, Trade.total_amount, Trade.trade_date,
+    Trade.reason, Trade.confidence_score, Trade.market_condition, Trade.sector, Trade.market_cap,
+    Trade.rsi, Trade.macd, Trade.moving_avg_20, Trade.moving_avg_50, Trade.volume_ratio,
+    Trade.market_price_at_trade, Trade.day_high, Trade.day_low, Trade.day_open, Trade.prev_close,
+    Trade.expected_return, Trade.stop_loss, Trade.take_profit, Trade.holding_period,
+    Trade.position_size_pct, Trade.risk_score, Trade.exit_of
+)
+
+# /trades/export 컬럼 (이름 → 컬럼, 상세 조회와 같은 순서의 평탄한 필드)
+TRADE_EXPORT_COLUMNS = {column.key: column for column in TRADE_DETAIL_COLUMNS}
+
+# /trades/recent?details=false 응답 필드
+TRADE_SUMMARY_COLUMNS = (
+    Trade.id, Robot.name.label('robot_name'), Trade.symbol, Trade.company_name, Trade.trade_type,
+    Trade.quantity, Trade.price, Trade.total_amount, Trade.trade_date, Trade.sector,
+    Trade.confidence_score
+)
+
+
+def trade_detail_select():
+    """상세 거래 조회 SELECT (로봇 이름 JOIN 포함)"""
+    return select(*TRADE_DETAIL_COLUMNS).select_from(Trade).outerjoin(Robot, Robot.id == Trade.robot_id)
+
+
+def trade_summary_select():
+    """요약 거래 조회 SELECT (로봇 이름 JOIN 포함)"""
+    return select(*TRADE_SUMMARY_COLUMNS).select_from(Trade).outerjoin(Robot, Robot.id == Trade.robot_id)
+
+
+def serialize_trade_row(row):
+    """trade_detail_select() 결과 행 → Trade.to_dict()와 같은 형태"""
+    (trade_id, robot_id, robot_name, symbol, company_name, trade_type, quantity, price,
+     total_amount, trade_date, reason, confidence_score, market_condition, sector, market_cap,
+     rsi, macd, moving_avg_20, moving_avg_50, volume_ratio,
+     market_price_at_trade, day_high, day_low, day_open, prev_close,
+     expected_return, stop_loss, take_profit, holding_period, position_size_pct, risk_score,
+     exit_of) = row
+    return {
+        'id': trade_id,
+        'robot_id': robot_id,
+        'robot_name': robot_name,
+        'symbol': symbol,
+        'company_name': company_name,
+        'trade_type': trade_type,
+        'quantity': quantity,
+        'price': price,
+        'total_amount': total_amount,
+        'trade_date': trade_date,
+        'reason': reason,
+        'confidence_score': confidence_score,
+        'market_condition': market_condition,
+        'sector': sector,
+        'market_cap': market_cap,
+        'technical_indicators': {
+            'rsi': rsi,
+            'macd': macd,
+            'moving_avg_20': moving_avg_20,
+            'moving_avg_50': moving_avg_50,
+            'volume_ratio': volume_ratio
+        },
+        'market_data': {
+            'market_price_at_trade': market_price_at_trade,
+            'day_high': day_high,
+            'day_low': day_low,
+            'day_open': day_open,
+            'prev_close': prev_close
+        },
+        'trade_strategy': {
+            'expected_return': expected_return,
+            'stop_loss': stop_loss,
+            'take_profit': take_profit,
+            'holding_period': holding_period,
+            'position_size_pct': position_size_pct,
+            'risk_score': risk_score
+        },
+        'exit_of': exit_of
+    }
+
+
+def serialize_trade_summary_row(row):
+    """trade_summary_select() 결과 행 → 요약 dict"""
+    (trade_id, robot_name, symbol, company_name, trade_type, quantity, price, total_amount,
+     trade_date, sector, confidence_score) = row
+    return {
+        'id': trade_id,
+        'robot_name': robot_name,
+        'symbol': symbol,
+        'company_name': company_name,
+        'trade_type': trade_type,
+        'quantity': quantity,
+        'price': price,
+        'total_amount': total_amount,
+        'trade_date': trade_date,
+        'sector': sector,
+        'confidence_score': confidence_score
+    }
+
+
+def serialize_trade_object(trade, robot_name=None):
+    """Trade 객체 → serialize_trade_row와 같은 형태 (관계 로딩 없이 컬럼 값만 사용)"""
+    return serialize_trade_row(tuple(
+        robot_name if column.key == 'robot_name' else getattr(trade, column.key)
+        for column in TRADE_DETAIL_COLUMNS
+    ))
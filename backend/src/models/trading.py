@@ -1,9 +1,30 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 from datetime import datetime
 import json
 
 db = SQLAlchemy()
 
+SQLITE_BUSY_TIMEOUT_MS = 5000
+
+def configure_sqlite(engine):
+    """SQLite 연결마다 WAL 저널 + busy_timeout 설정
+
+    롤백 저널에서는 긴 읽기(내보내기 스트리밍 등)가 끝날 때까지 쓰기가 "database is locked"로
+    실패합니다. WAL에서는 읽기와 쓰기가 서로 막지 않고, 쓰기끼리 겹치면 busy_timeout만큼 기다립니다.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA journal_mode = WAL")
+            cursor.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+        finally:
+            cursor.close()
+
 class Robot(db.Model):
     __tablename__ = 'robots'
     
@@ -14,11 +35,13 @@ class Robot(db.Model):
     risk_level = db.Column(db.String(20))
     initial_capital = db.Column(db.Float, default=100000)
     current_capital = db.Column(db.Float)
+    cash = db.Column(db.Float)  # 로봇 런타임 현금 (current_capital에서 보유 종목 평가액을 뺀 값)
     total_return = db.Column(db.Float)
     win_rate = db.Column(db.Float)
     max_drawdown = db.Column(db.Float)
     sharpe_ratio = db.Column(db.Float)
     is_active = db.Column(db.Boolean, default=True)
+    run_interval = db.Column(db.Float)  # 로봇 런타임 실행 주기 (초, 없으면 전략별 기본값)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -40,6 +63,7 @@ class Robot(db.Model):
             'max_drawdown': self.max_drawdown,
             'sharpe_ratio': self.sharpe_ratio,
             'is_active': self.is_active,
+            'run_interval': self.run_interval,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
@@ -88,6 +112,16 @@ class Trade(db.Model):
     position_size_pct = db.Column(db.Float)  # 포지션 크기 (포트폴리오 대비 %)
     risk_score = db.Column(db.Float)  # 리스크 점수 (1-10)
     
+    # 손절/익절 감시가 낸 청산 거래면 청산한 매수 거래 ID
+    exit_of = db.Column(db.Integer, db.ForeignKey('trades.id'))
+    
+    # 기존 DB에는 migrations.py의 마이그레이션으로 추가됨
+    __table_args__ = (
+        db.Index('ix_trades_trade_date', 'trade_date', 'id'),  # 최근 거래, 24시간 구간 집계
+        db.Index('ix_trades_robot_trade_date', 'robot_id', 'trade_date', 'id'),  # 로봇별 거래 목록
+        db.Index('ix_trades_symbol_trade_date', 'symbol', 'trade_date'),  # 종목별 거래 조회
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -126,7 +160,8 @@ class Trade(db.Model):
                 'holding_period': self.holding_period,
                 'position_size_pct': self.position_size_pct,
                 'risk_score': self.risk_score
-            }
+            },
+            'exit_of': self.exit_of
         }
 
 class Portfolio(db.Model):
@@ -219,6 +254,11 @@ class StockUniverse(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     last_updated = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('ix_stock_universe_sector_symbol', 'sector', 'symbol'),
+        db.Index('ix_stock_universe_market_cap_symbol', 'market_cap', 'symbol'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -280,6 +320,10 @@ class UserPrediction(db.Model):
     is_correct = db.Column(db.Boolean)
     points_earned = db.Column(db.Integer, default=0)
     
+    __table_args__ = (
+        db.Index('ix_user_predictions_user_date', 'user_name', 'prediction_date', 'id'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -293,3 +337,82 @@ class UserPrediction(db.Model):
             'points_earned': self.points_earned
         }
 
+
+class SectorHourlyStats(db.Model):
+    """시간 × 섹터별 거래 집계 (Trade 저장 시 증분 갱신)"""
+    __tablename__ = 'sector_hourly_stats'
+    
+    bucket = db.Column(db.DateTime, primary_key=True)  # 정시 기준 시간 구간 시작
+    sector = db.Column(db.String(100), primary_key=True)  # 섹터가 없으면 'Unknown'
+    trade_count = db.Column(db.Integer, nullable=False, default=0)
+    buy_count = db.Column(db.Integer, nullable=False, default=0)
+    sell_count = db.Column(db.Integer, nullable=False, default=0)
+    notional_sum = db.Column(db.Float, nullable=False, default=0.0)  # total_amount 합계
+    confidence_sum = db.Column(db.Float, nullable=False, default=0.0)
+    confidence_count = db.Column(db.Integer, nullable=False, default=0)  # confidence_score가 있는 거래 수
+
+class SymbolHourlyStats(db.Model):
+    """시간 × 종목별 거래 집계 (Trade 저장 시 증분 갱신)"""
+    __tablename__ = 'symbol_hourly_stats'
+    
+    bucket = db.Column(db.DateTime, primary_key=True)
+    symbol = db.Column(db.String(20), primary_key=True)
+    company_name = db.Column(db.String(200))
+    sector = db.Column(db.String(100))
+    trade_count = db.Column(db.Integer, nullable=False, default=0)
+    buy_count = db.Column(db.Integer, nullable=False, default=0)
+    sell_count = db.Column(db.Integer, nullable=False, default=0)
+    notional_sum = db.Column(db.Float, nullable=False, default=0.0)
+    confidence_sum = db.Column(db.Float, nullable=False, default=0.0)
+    confidence_count = db.Column(db.Integer, nullable=False, default=0)
+
+class DataVersion(db.Model):
+    """테이블별 변경 카운터 (커밋되는 변경마다 증가, ETag 계산에 사용)"""
+    __tablename__ = 'data_versions'
+    
+    table_name = db.Column(db.String(100), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class SweepResult(db.Model):
+    """파라미터 탐색 결과 (설정 x 구간마다 한 행, 완료되는 대로 기록)"""
+    __tablename__ = 'sweep_results'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    sweep_id = db.Column(db.String(32), nullable=False)  # 탐색 실행 단위
+    strategy_type = db.Column(db.String(50), nullable=False)
+    config_id = db.Column(db.Integer, nullable=False)  # 탐색 안에서의 설정 번호
+    params = db.Column(db.Text, nullable=False)  # JSON 형태의 전략 파라미터
+    fold = db.Column(db.Integer, nullable=False, default=0)  # 워크포워드 구간 번호
+    phase = db.Column(db.String(10), nullable=False)  # full, train, test
+    window_start = db.Column(db.Date)
+    window_end = db.Column(db.Date)
+    total_return = db.Column(db.Float)
+    win_rate = db.Column(db.Float)
+    max_drawdown = db.Column(db.Float)
+    sharpe_ratio = db.Column(db.Float)
+    trades = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_sweep_results_sweep_phase_fold', 'sweep_id', 'phase', 'fold'),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'sweep_id': self.sweep_id,
+            'strategy_type': self.strategy_type,
+            'config_id': self.config_id,
+            'params': json.loads(self.params) if self.params else {},
+            'fold': self.fold,
+            'phase': self.phase,
+            'window_start': self.window_start.isoformat() if self.window_start else None,
+            'window_end': self.window_end.isoformat() if self.window_end else None,
+            'total_return': self.total_return,
+            'win_rate': self.win_rate,
+            'max_drawdown': self.max_drawdown,
+            'sharpe_ratio': self.sharpe_ratio,
+            'trades': self.trades,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
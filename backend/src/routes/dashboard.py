@@ -0,0 +1,122 @@
+from flask import Blueprint, current_app, jsonify, request
+from concurrent.futures import ThreadPoolExecutor
+from src.routes.robots import load_active_robots, build_meta_model_performance, build_meta_model_allocation
+from src.routes.trades import (
+    build_recent_trades, build_live_trades, build_market_condition, build_sector_performance,
+    build_trending_stocks, rollup_window_key
+)
+from src.routes.predictions import build_leaderboard
+from src.services.data_versions import compute_etag, etag_matches, not_modified
+import time
+
+dashboard_bp = Blueprint('dashboard', __name__)
+
+# 섹션 이름 → (공유 데이터 키, 생성 함수(shared, options))
+# robots(활성 로봇)와 market_condition(당일 시장 상황)은 요청당 한 번만 조회해 여러 섹션이 공유
+SECTIONS = {
+    'robots': ('robots', lambda shared, options: shared['robots']),
+    'recent_trades': (None, lambda shared, options: build_recent_trades(options['trades_limit'])),
+    'live_trades': ('robots', lambda shared, options: build_live_trades(shared['robots'])),
+    'market_condition': ('market_condition', lambda shared, options: shared['market_condition']),
+    'sectors': ('market_condition', lambda shared, options: build_sector_performance(shared['market_condition'])),
+    'trending': (None, lambda shared, options: build_trending_stocks()),
+    'leaderboard': (None, lambda shared, options: build_leaderboard()),
+    'meta_model': ('robots', lambda shared, options: build_meta_model_performance(shared['robots'])),
+    'allocation': ('robots', lambda shared, options: build_meta_model_allocation(shared['robots']))
+}
+
+# 섹션 이름 → ETag 계산에 쓰는 테이블 (None: 시세/난수를 포함해 ETag를 만들 수 없는 섹션)
+SECTION_TABLES = {
+    'robots': ('robots',),
+    'recent_trades': ('trades', 'robots'),
+    'live_trades': None,
+    'market_condition': ('market_conditions',),
+    'sectors': ('trades', 'market_conditions'),
+    'trending': None,
+    'leaderboard': (),
+    'meta_model': ('robots',),
+    'allocation': ('robots',)
+}
+
+SHARED_LOADERS = {
+    'robots': load_active_robots,
+    'market_condition': build_market_condition
+}
+
+# 대시보드 섹션을 동시에 만드는 스레드 풀 (섹션마다 별도 앱 컨텍스트/DB 세션)
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='dashboard')
+
+def _timed(app, fn, *args):
+    """앱 컨텍스트 안에서 fn 실행 → (결과, 오류, 소요 ms)"""
+    started = time.perf_counter()
+    with app.app_context():
+        try:
+            result, error = fn(*args), None
+        except Exception as e:
+            result, error = None, str(e)
+    return result, error, (time.perf_counter() - started) * 1000
+
+@dashboard_bp.route('/dashboard', methods=['GET'])
+def get_dashboard():
+    """대시보드 전체 데이터를 한 번에 조회 (fields=robots,trending,... 로 섹션 선택)"""
+    started = time.perf_counter()
+    fields = request.args.get('fields')
+    names = [name.strip() for name in fields.split(',') if name.strip()] if fields else list(SECTIONS)
+    unknown = [name for name in names if name not in SECTIONS]
+    if unknown:
+        return jsonify({
+            'success': False,
+            'error': f"Unknown fields: {', '.join(unknown)}"
+        }), 400
+    options = {'trades_limit': request.args.get('trades_limit', 20, type=int)}
+
+    # 모든 섹션이 데이터 버전으로 ETag를 만들 수 있으면 조건부 GET 처리 (섹션 조회 전에 304)
+    etag = None
+    if all(SECTION_TABLES[name] is not None for name in names):
+        cache_control = 'private, no-cache'
+        tables = sorted({table for name in names for table in SECTION_TABLES[name]})
+        etag = compute_etag(tables, extra=rollup_window_key)
+        if etag_matches(etag):
+            return not_modified(etag, cache_control)
+    else:
+        cache_control = 'no-store'
+
+    app = current_app._get_current_object()
+    timings, errors, data, shared = {}, {}, {}, {}
+
+    # 1단계: 선택된 섹션에 필요한 공유 데이터만 동시에 조회
+    needed = {SECTIONS[name][0] for name in names} & set(SHARED_LOADERS)
+    loads = {key: _executor.submit(_timed, app, SHARED_LOADERS[key]) for key in needed}
+    for key, future in loads.items():
+        shared[key], error, timings[f'load_{key}'] = future.result()
+        if error:
+            errors[key] = error
+
+    # 2단계: 섹션 동시 생성 (공유 데이터를 가져오지 못한 섹션은 건너뜀)
+    futures = {}
+    for name in names:
+        dependency, build = SECTIONS[name]
+        if dependency in errors:
+            data[name], errors[name] = None, errors[dependency]
+            continue
+        futures[name] = _executor.submit(_timed, app, build, shared, options)
+    for name, future in futures.items():
+        data[name], error, timings[name] = future.result()
+        if error:
+            errors[name] = error
+
+    timings['total'] = (time.perf_counter() - started) * 1000
+    body = {
+        'success': True,
+        'data': data
+    }
+    if errors:
+        body['errors'] = errors  # 일부 섹션이 실패해도 나머지 섹션은 반환
+    response = jsonify(body)
+    if etag:
+        response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = cache_control
+    response.headers['Server-Timing'] = ', '.join(
+        f'{name};dur={elapsed:.1f}' for name, elapsed in timings.items()
+    )
+    return response
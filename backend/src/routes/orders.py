@@ -0,0 +1,116 @@
+from flask import Blueprint, jsonify, request
+from src.models.trading import db, Robot
+from src.services.data_versions import conditional_get
+from src.services.order_book import LIMIT, MARKET, ORDER_TYPES
+from src.services.simulated_exchange import exchange, place_order
+
+orders_bp = Blueprint('orders', __name__)
+
+def parse_order(data):
+    """요청 본문 → place_order 인자 (잘못된 값은 ValueError)"""
+    side = (data.get('side') or data.get('trade_type') or '').upper()
+    symbol = (data.get('symbol') or '').strip().upper()
+    if not symbol:
+        raise ValueError('symbol is required')
+    limit_price = data.get('limit_price')
+    order_type = (data.get('order_type') or (LIMIT if limit_price is not None else MARKET)).upper()
+    if order_type not in ORDER_TYPES:
+        raise ValueError(f"order_type must be one of {', '.join(ORDER_TYPES)}")
+    quantity = data.get('quantity')
+    if isinstance(quantity, str) and quantity.strip().isdigit():
+        quantity = int(quantity)
+    elif isinstance(quantity, float) and quantity.is_integer():
+        quantity = int(quantity)
+    return {
+        'symbol': symbol,
+        'side': side,
+        'quantity': quantity,
+        'order_type': order_type,
+        'price': float(limit_price) if limit_price is not None else None,
+        'stop_price': float(data['stop_price']) if data.get('stop_price') is not None else None
+    }
+
+@orders_bp.route('/orders', methods=['POST'])
+def submit_order():
+    """모의 거래소에 주문 (order_type=LIMIT|MARKET|STOP|STOP_LIMIT, limit_price, stop_price)"""
+    try:
+        data = request.get_json() or {}
+        robot = db.session.get(Robot, data.get('robot_id')) if data.get('robot_id') is not None else None
+        if robot is None:
+            return jsonify({
+                'success': False,
+                'error': 'Robot not found'
+            }), 404
+        order, trades = place_order(db.session, robot.id, **parse_order(data))
+        return jsonify({
+            'success': True,
+            'data': {
+                'order': order.to_dict(),
+                'trades': [trade.to_dict() for trade in trades]
+            }
+        })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@orders_bp.route('/orders/<int:order_id>', methods=['GET'])
+@conditional_get(cache_control='no-store')
+def get_order(order_id):
+    """대기 중인 주문 조회 (체결 완료/취소된 주문은 404)"""
+    order = exchange.matching.get(order_id)
+    if order is None:
+        return jsonify({
+            'success': False,
+            'error': 'Order not found or no longer open'
+        }), 404
+    return jsonify({
+        'success': True,
+        'data': order.to_dict()
+    })
+
+@orders_bp.route('/orders/<int:order_id>', methods=['DELETE'])
+def cancel_order(order_id):
+    """대기 중인 주문 취소"""
+    order = exchange.cancel(order_id)
+    if order is None:
+        return jsonify({
+            'success': False,
+            'error': 'Order not found or no longer open'
+        }), 404
+    return jsonify({
+        'success': True,
+        'data': order.to_dict()
+    })
+
+@orders_bp.route('/orders/book/<symbol>', methods=['GET'])
+@conditional_get(cache_control='no-store')
+def get_order_book(symbol):
+    """종목 주문장 가격대별 잔량 (levels개 가격대)"""
+    try:
+        levels = max(request.args.get('levels', 10, type=int), 1)
+        return jsonify({
+            'success': True,
+            'data': exchange.matching.depth(symbol.upper(), levels)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@orders_bp.route('/orders/stats', methods=['GET'])
+@conditional_get(cache_control='no-store')
+def get_order_stats():
+    """체결 엔진 통계 (주문장 수, 대기 주문 수, 누적 접수/취소/체결 건수)"""
+    return jsonify({
+        'success': True,
+        'data': exchange.matching.stats()
+    })
@@ -1,5 +1,8 @@
 from flask import Blueprint, jsonify, request
+from sqlalchemy import func, select
 from src.models.trading import db, UserPrediction
+from src.services.pagination import InvalidCursor, approximate_counts, cursor_pagination, keyset_page
+from src.services.data_versions import conditional_get
 from datetime import datetime, date, timedelta
 import random
 
@@ -48,27 +51,30 @@ def submit_prediction():
             'error': str(e)
         }), 500
 
+def build_leaderboard():
+    """예측 순위표 데이터"""
+    # 모의 순위 데이터
+    return [
+        {'rank': 1, 'user_name': '김투자', 'points': 2850, 'accuracy': 78.5, 'predictions': 45},
+        {'rank': 2, 'user_name': '박트레이더', 'points': 2720, 'accuracy': 76.2, 'predictions': 42},
+        {'rank': 3, 'user_name': '이퀀트', 'points': 2680, 'accuracy': 74.8, 'predictions': 38},
+        {'rank': 4, 'user_name': '최애널', 'points': 2590, 'accuracy': 73.1, 'predictions': 41},
+        {'rank': 5, 'user_name': '정로봇', 'points': 2510, 'accuracy': 71.9, 'predictions': 39},
+        {'rank': 6, 'user_name': '한투자', 'points': 2450, 'accuracy': 70.5, 'predictions': 36},
+        {'rank': 7, 'user_name': '윤예측', 'points': 2380, 'accuracy': 69.2, 'predictions': 34},
+        {'rank': 8, 'user_name': '장분석', 'points': 2320, 'accuracy': 68.7, 'predictions': 37},
+        {'rank': 9, 'user_name': '조주식', 'points': 2280, 'accuracy': 67.9, 'predictions': 33},
+        {'rank': 10, 'user_name': '신전략', 'points': 2210, 'accuracy': 66.8, 'predictions': 35}
+    ]
+
 @predictions_bp.route('/predictions/leaderboard', methods=['GET'])
+@conditional_get(cache_control='public, max-age=300')  # 고정된 모의 순위
 def get_leaderboard():
     """예측 순위표"""
     try:
-        # 모의 순위 데이터
-        leaderboard = [
-            {'rank': 1, 'user_name': '김투자', 'points': 2850, 'accuracy': 78.5, 'predictions': 45},
-            {'rank': 2, 'user_name': '박트레이더', 'points': 2720, 'accuracy': 76.2, 'predictions': 42},
-            {'rank': 3, 'user_name': '이퀀트', 'points': 2680, 'accuracy': 74.8, 'predictions': 38},
-            {'rank': 4, 'user_name': '최애널', 'points': 2590, 'accuracy': 73.1, 'predictions': 41},
-            {'rank': 5, 'user_name': '정로봇', 'points': 2510, 'accuracy': 71.9, 'predictions': 39},
-            {'rank': 6, 'user_name': '한투자', 'points': 2450, 'accuracy': 70.5, 'predictions': 36},
-            {'rank': 7, 'user_name': '윤예측', 'points': 2380, 'accuracy': 69.2, 'predictions': 34},
-            {'rank': 8, 'user_name': '장분석', 'points': 2320, 'accuracy': 68.7, 'predictions': 37},
-            {'rank': 9, 'user_name': '조주식', 'points': 2280, 'accuracy': 67.9, 'predictions': 33},
-            {'rank': 10, 'user_name': '신전략', 'points': 2210, 'accuracy': 66.8, 'predictions': 35}
-        ]
-        
         return jsonify({
             'success': True,
-            'data': leaderboard
+            'data': build_leaderboard()
         })
     except Exception as e:
         return jsonify({
@@ -77,6 +83,7 @@ def get_leaderboard():
         }), 500
 
 @predictions_bp.route('/predictions/accuracy', methods=['GET'])
+@conditional_get(cache_control='no-store')  # 모의 순위는 요청마다 다름
 def get_prediction_accuracy():
     """예측 정확도 통계"""
     try:
@@ -131,6 +138,7 @@ def get_prediction_accuracy():
         }), 500
 
 @predictions_bp.route('/predictions/current', methods=['GET'])
+@conditional_get(cache_control='no-store')  # 마감 시각이 현재 시각 기준
 def get_current_predictions():
     """현재 진행 중인 예측 게임"""
     try:
@@ -176,11 +184,37 @@ def get_current_predictions():
         }), 500
 
 @predictions_bp.route('/predictions/history/<user_name>', methods=['GET'])
+@conditional_get(tables=('user_predictions',))
 def get_user_prediction_history(user_name):
     """사용자 예측 기록"""
     try:
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
+        cursor = request.args.get('cursor')
+        
+        # 커서 모드: ?cursor= (첫 페이지) 또는 이전 응답의 next_cursor
+        if cursor is not None:
+            per_page = max(per_page, 1)
+            result = keyset_page(
+                db.session,
+                select(UserPrediction).where(UserPrediction.user_name == user_name),
+                (UserPrediction.prediction_date, UserPrediction.id),
+                cursor,
+                per_page,
+                row_key=lambda row: (row[0].prediction_date, row[0].id)
+            )
+            total = None
+            if request.args.get('include_total', 'false').lower() == 'true':
+                total = approximate_counts.get(('prediction_history', user_name), lambda: db.session.execute(
+                    select(func.count(UserPrediction.id)).where(UserPrediction.user_name == user_name)
+                ).scalar())
+            return jsonify({
+                'success': True,
+                'data': {
+                    'predictions': [row[0].to_dict() for row in result['rows']],
+                    'pagination': cursor_pagination(result, per_page, total)
+                }
+            })
         
         predictions = UserPrediction.query.filter_by(user_name=user_name)\
                                         .order_by(UserPrediction.prediction_date.desc())\
@@ -198,6 +232,11 @@ def get_user_prediction_history(user_name):
                 }
             }
         })
+    except InvalidCursor as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
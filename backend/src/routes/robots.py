@@ -1,18 +1,44 @@
 from flask import Blueprint, jsonify, request
+from sqlalchemy import func, select
 from src.models.trading import db, Robot, Trade, Portfolio
+from src.models.projections import trade_detail_select, serialize_trade_row
+from src.services.pagination import InvalidCursor, approximate_counts, cursor_pagination, keyset_page
+from src.services.data_versions import conditional_get
+from src.services.response_cache import cached_response
+from src.services.robot_runtime import robot_runtime
 from datetime import datetime
+import math
 import random
 
 robots_bp = Blueprint('robots', __name__)
 
+def load_active_robots():
+    """활성 로봇 목록 (dict) - 로봇 목록, 메타 모델, 자산 배분, 실시간 거래가 함께 사용"""
+    return [robot.to_dict() for robot in Robot.query.filter_by(is_active=True).all()]
+
 @robots_bp.route('/robots', methods=['GET'])
+@conditional_get(tables=('robots',))
 def get_robots():
     """모든 투자 로봇 목록 조회"""
     try:
-        robots = Robot.query.filter_by(is_active=True).all()
         return jsonify({
             'success': True,
-            'data': [robot.to_dict() for robot in robots]
+            'data': load_active_robots()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@robots_bp.route('/robots/runtime', methods=['GET'])
+@conditional_get(cache_control='no-store')
+def get_robot_runtime():
+    """로봇 런타임 상태와 로봇별 실행 시간 지표 (ROBOT_RUNTIME=1로 켠 프로세스에서만 running)"""
+    try:
+        return jsonify({
+            'success': True,
+            'data': robot_runtime.stats()
         })
     except Exception as e:
         return jsonify({
@@ -21,6 +47,7 @@ def get_robots():
         }), 500
 
 @robots_bp.route('/robots/<int:robot_id>', methods=['GET'])
+@conditional_get(tables=('robots',))
 def get_robot(robot_id):
     """특정 로봇 상세 정보 조회"""
     try:
@@ -36,6 +63,7 @@ def get_robot(robot_id):
         }), 500
 
 @robots_bp.route('/robots/<int:robot_id>/performance', methods=['GET'])
+@conditional_get(cache_control='no-store')  # 모의 성과 데이터는 요청마다 다름
 def get_robot_performance(robot_id):
     """로봇 성과 데이터 조회"""
     try:
@@ -71,28 +99,64 @@ def get_robot_performance(robot_id):
         }), 500
 
 @robots_bp.route('/robots/<int:robot_id>/trades', methods=['GET'])
+@conditional_get(tables=('trades', 'robots'))
 def get_robot_trades(robot_id):
     """로봇 거래 기록 조회"""
     try:
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
+        cursor = request.args.get('cursor')
+        page = max(page, 1)
+        per_page = max(per_page, 1)
+        
+        # 커서 모드: ?cursor= (첫 페이지) 또는 이전 응답의 next_cursor
+        if cursor is not None:
+            result = keyset_page(
+                db.session,
+                trade_detail_select().where(Trade.robot_id == robot_id),
+                (Trade.trade_date, Trade.id),
+                cursor,
+                per_page
+            )
+            total = None
+            if request.args.get('include_total', 'false').lower() == 'true':
+                total = approximate_counts.get(('robot_trades', robot_id), lambda: db.session.execute(
+                    select(func.count(Trade.id)).where(Trade.robot_id == robot_id)
+                ).scalar())
+            return jsonify({
+                'success': True,
+                'data': {
+                    'trades': [serialize_trade_row(row) for row in result['rows']],
+                    'pagination': cursor_pagination(result, per_page, total)
+                }
+            })
         
-        trades = Trade.query.filter_by(robot_id=robot_id)\
-                          .order_by(Trade.trade_date.desc())\
-                          .paginate(page=page, per_page=per_page, error_out=False)
+        total = db.session.execute(
+            select(func.count(Trade.id)).where(Trade.robot_id == robot_id)
+        ).scalar()
+        query = trade_detail_select()\
+            .where(Trade.robot_id == robot_id)\
+            .order_by(Trade.trade_date.desc())\
+            .limit(per_page)\
+            .offset((page - 1) * per_page)
         
         return jsonify({
             'success': True,
             'data': {
-                'trades': [trade.to_dict() for trade in trades.items],
+                'trades': [serialize_trade_row(row) for row in db.session.execute(query)],
                 'pagination': {
                     'page': page,
                     'per_page': per_page,
-                    'total': trades.total,
-                    'pages': trades.pages
+                    'total': total,
+                    'pages': math.ceil(total / per_page) if total else 0
                 }
             }
         })
+    except InvalidCursor as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -100,6 +164,7 @@ def get_robot_trades(robot_id):
         }), 500
 
 @robots_bp.route('/robots/<int:robot_id>/portfolio', methods=['GET'])
+@conditional_get(tables=('portfolios',))
 def get_robot_portfolio(robot_id):
     """로봇 포트폴리오 조회"""
     try:
@@ -115,36 +180,64 @@ def get_robot_portfolio(robot_id):
             'error': str(e)
         }), 500
 
+def build_meta_model_performance(robots):
+    """메타 모델 성과 (활성 로봇이 없으면 None)"""
+    if not robots:
+        return None
+    
+    # 모든 활성 로봇의 평균 성과 계산
+    total_return = sum(robot['total_return'] or 0 for robot in robots) / len(robots)
+    win_rate = sum(robot['win_rate'] or 0 for robot in robots) / len(robots)
+    current_capital = sum(robot['current_capital'] or 0 for robot in robots) / len(robots)
+    sharpe_ratio = sum(robot['sharpe_ratio'] or 0 for robot in robots) / len(robots)
+    max_drawdown = max(robot['max_drawdown'] or 0 for robot in robots)
+    
+    return {
+        'name': 'Meta Model',
+        'total_return': round(total_return, 2),
+        'win_rate': round(win_rate, 2),
+        'current_capital': round(current_capital, 2),
+        'sharpe_ratio': round(sharpe_ratio, 2),
+        'max_drawdown': round(max_drawdown, 2),
+        'robot_count': len(robots)
+    }
+
+def build_meta_model_allocation(robots):
+    """메타 모델 자산 배분"""
+    allocations = []
+    total_capital = sum(robot['current_capital'] or 0 for robot in robots)
+    
+    for robot in robots:
+        weight = (robot['current_capital'] or 0) / total_capital * 100 if total_capital > 0 else 0
+        allocations.append({
+            'robot_id': robot['id'],
+            'robot_name': robot['name'],
+            'strategy_type': robot['strategy_type'],
+            'weight': round(weight, 2),
+            'capital': robot['current_capital'] or 0,
+            'return': robot['total_return'] or 0
+        })
+    
+    return {
+        'allocations': allocations,
+        'total_capital': total_capital,
+        'last_updated': datetime.now().isoformat()
+    }
+
 @robots_bp.route('/meta-model/performance', methods=['GET'])
+@conditional_get(tables=('robots',))
+@cached_response(tags=('robots',))
 def get_meta_model_performance():
     """메타 모델 성과 조회"""
     try:
-        # 모든 활성 로봇의 평균 성과 계산
-        robots = Robot.query.filter_by(is_active=True).all()
+        meta_performance = build_meta_model_performance(load_active_robots())
         
-        if not robots:
+        if meta_performance is None:
             return jsonify({
                 'success': False,
                 'error': 'No active robots found'
             }), 404
         
-        # 메타 모델 성과 계산
-        total_return = sum(robot.total_return or 0 for robot in robots) / len(robots)
-        win_rate = sum(robot.win_rate or 0 for robot in robots) / len(robots)
-        current_capital = sum(robot.current_capital or 0 for robot in robots) / len(robots)
-        sharpe_ratio = sum(robot.sharpe_ratio or 0 for robot in robots) / len(robots)
-        max_drawdown = max(robot.max_drawdown or 0 for robot in robots)
-        
-        meta_performance = {
-            'name': 'Meta Model',
-            'total_return': round(total_return, 2),
-            'win_rate': round(win_rate, 2),
-            'current_capital': round(current_capital, 2),
-            'sharpe_ratio': round(sharpe_ratio, 2),
-            'max_drawdown': round(max_drawdown, 2),
-            'robot_count': len(robots)
-        }
-        
         return jsonify({
             'success': True,
             'data': meta_performance
@@ -156,32 +249,14 @@ def get_meta_model_performance():
         }), 500
 
 @robots_bp.route('/meta-model/allocation', methods=['GET'])
+@conditional_get(tables=('robots',))
+@cached_response(tags=('robots',))
 def get_meta_model_allocation():
     """메타 모델 자산 배분 현황"""
     try:
-        robots = Robot.query.filter_by(is_active=True).all()
-        
-        allocations = []
-        total_capital = sum(robot.current_capital or 0 for robot in robots)
-        
-        for robot in robots:
-            weight = (robot.current_capital or 0) / total_capital * 100 if total_capital > 0 else 0
-            allocations.append({
-                'robot_id': robot.id,
-                'robot_name': robot.name,
-                'strategy_type': robot.strategy_type,
-                'weight': round(weight, 2),
-                'capital': robot.current_capital or 0,
-                'return': robot.total_return or 0
-            })
-        
         return jsonify({
             'success': True,
-            'data': {
-                'allocations': allocations,
-                'total_capital': total_capital,
-                'last_updated': datetime.now().isoformat()
-            }
+            'data': build_meta_model_allocation(load_active_robots())
         })
     except Exception as e:
         return jsonify({
@@ -0,0 +1,79 @@
+from flask import Blueprint, Response, jsonify, request
+from src.models.trading import db, Trade
+from src.models.projections import trade_detail_select, serialize_trade_row
+from src.services.data_versions import conditional_get
+from src.services.json_provider import dumps
+from src.services.trade_stream import trade_events
+
+stream_bp = Blueprint('stream', __name__)
+
+HEARTBEAT_SECONDS = 15  # 이벤트가 없을 때 연결 유지용 주석 프레임 간격
+RETRY_MILLISECONDS = 3000  # 연결이 끊겼을 때 브라우저의 재접속 대기 시간
+
+def _format_event(event_id, data, event='trade'):
+    return f"id: {event_id}\nevent: {event}\ndata: {data}\n\n"
+
+@stream_bp.route('/stream/trades', methods=['GET'])
+def stream_trades():
+    """체결된 거래 실시간 스트림 (Server-Sent Events)"""
+    # 브라우저 재접속 시 Last-Event-ID 헤더, 첫 접속 시에는 쿼리 파라미터로 이어받기
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid Last-Event-ID'
+        }), 400
+
+    subscription, covered = trade_events.subscribe(last_event_id)
+
+    # 보관 이벤트 범위를 벗어난 경우 놓친 거래를 DB에서 보충 (최대 history 크기만큼)
+    backfill = []
+    if last_event_id is not None and not covered:
+        try:
+            query = trade_detail_select().where(Trade.id > last_event_id) \
+                .order_by(Trade.id).limit(trade_events.history_size)
+            backfill = [serialize_trade_row(row) for row in db.session.execute(query)]
+        except Exception:
+            trade_events.unsubscribe(subscription)
+            raise
+        finally:
+            db.session.remove()
+
+    def generate():
+        sent_id = last_event_id or 0
+        try:
+            yield f"retry: {RETRY_MILLISECONDS}\n\n"
+            for trade in backfill:
+                sent_id = trade['id']
+                yield _format_event(sent_id, dumps(trade))
+            while True:
+                items, dropped = subscription.drain(HEARTBEAT_SECONDS)
+                if dropped:
+                    # 느린 클라이언트: 버려진 건수를 알려 목록을 다시 조회하게 함
+                    yield f"event: dropped\ndata: {dumps({'dropped': dropped})}\n\n"
+                if not items and not dropped:
+                    yield ": heartbeat\n\n"
+                    continue
+                for event_id, data in items:
+                    if event_id <= sent_id:
+                        continue  # DB 보충분과 겹치는 이벤트
+                    sent_id = event_id
+                    yield _format_event(event_id, data)
+        finally:
+            trade_events.unsubscribe(subscription)
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # 프록시(nginx) 버퍼링 비활성화
+    })
+
+@stream_bp.route('/stream/stats', methods=['GET'])
+@conditional_get(cache_control='no-store')  # 구독자 수/발행 건수는 계속 바뀜
+def get_stream_stats():
+    """거래 스트림 구독/발행 통계"""
+    return jsonify({
+        'success': True,
+        'data': trade_events.stats()
+    })
@@ -1,43 +1,46 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 from src.models.trading import db, Trade, Robot, MarketData, StockUniverse, MarketCondition
-from src.services.stock_data_service import StockDataService
+from src.models.projections import (
+    trade_detail_select, trade_summary_select, serialize_trade_row, serialize_trade_summary_row
+)
+from src.services.stock_data_service import stock_service
+from src.services.trade_rollups import UNKNOWN_SECTOR, sector_totals, symbol_totals, window_start
+from src.services.data_versions import conditional_get, today_key
+from src.services.response_cache import cached_response
+from src.services.simulated_exchange import place_order
+from src.routes.orders import parse_order
+from src.services.trade_export import (
+    EXPORT_MIMETYPES, InvalidExportRequest, export_select, iter_csv, iter_ndjson, iter_partitions,
+    parse_bound, parse_columns
+)
 from datetime import datetime, timedelta, date
 import random
 
 trades_bp = Blueprint('trades', __name__)
-stock_service = StockDataService()
+
+def rollup_window_key():
+    """24시간 롤업 구간은 매시 정각에 바뀌므로 구간 시작과 날짜를 ETag에 포함"""
+    return f"{window_start(hours=24).isoformat()}|{today_key()}"
+
+def build_recent_trades(limit=20, include_details=True):
+    """최근 거래 내역 (로봇 이름을 JOIN으로 함께 가져오고 결과 행을 바로 dict로 변환)"""
+    if include_details:
+        query = trade_detail_select().order_by(Trade.trade_date.desc()).limit(limit)
+        return [serialize_trade_row(row) for row in db.session.execute(query)]
+    query = trade_summary_select().order_by(Trade.trade_date.desc()).limit(limit)
+    return [serialize_trade_summary_row(row) for row in db.session.execute(query)]
 
 @trades_bp.route('/trades/recent', methods=['GET'])
+@conditional_get(tables=('trades', 'robots'))
 def get_recent_trades():
     """최근 거래 내역 조회 (상세 정보 포함)"""
     try:
         limit = request.args.get('limit', 20, type=int)
         include_details = request.args.get('details', 'true').lower() == 'true'
         
-        trades = Trade.query.order_by(Trade.trade_date.desc()).limit(limit).all()
-        
-        if include_details:
-            trades_data = [trade.to_dict() for trade in trades]
-        else:
-            trades_data = []
-            for trade in trades:
-                trades_data.append({
-                    'id': trade.id,
-                    'robot_name': trade.robot.name if trade.robot else None,
-                    'symbol': trade.symbol,
-                    'company_name': trade.company_name,
-                    'trade_type': trade.trade_type,
-                    'quantity': trade.quantity,
-                    'price': trade.price,
-                    'total_amount': trade.total_amount,
-                    'trade_date': trade.trade_date.isoformat() if trade.trade_date else None,
-                    'sector': trade.sector,
-                    'confidence_score': trade.confidence_score
-                })
-        
         return jsonify({
             'success': True,
-            'data': trades_data
+            'data': build_recent_trades(limit, include_details)
         })
     except Exception as e:
         return jsonify({
@@ -46,13 +49,19 @@ def get_recent_trades():
         }), 500
 
 @trades_bp.route('/trades/detailed/<int:trade_id>', methods=['GET'])
+@conditional_get(tables=('trades', 'robots'))
 def get_trade_details(trade_id):
     """특정 거래의 상세 정보 조회"""
     try:
-        trade = Trade.query.get_or_404(trade_id)
+        row = db.session.execute(trade_detail_select().where(Trade.id == trade_id)).first()
+        if row is None:
+            return jsonify({
+                'success': False,
+                'error': 'Trade not found'
+            }), 404
         return jsonify({
             'success': True,
-            'data': trade.to_dict()
+            'data': serialize_trade_row(row)
         })
     except Exception as e:
         return jsonify({
@@ -60,51 +69,96 @@ def get_trade_details(trade_id):
             'error': str(e)
         }), 500
 
-@trades_bp.route('/trades/live', methods=['GET'])
-def get_live_trades():
-    """실시간 거래 현황 (향상된 버전)"""
+@trades_bp.route('/trades/export', methods=['GET'])
+def export_trades():
+    """거래 내역 스트리밍 내보내기 (format=csv|ndjson, robot_id, from, to, columns)"""
     try:
-        # 실시간 거래 데이터 시뮬레이션 (더 많은 종목 포함)
-        robots = Robot.query.filter_by(is_active=True).all()
+        export_format = request.args.get('format', 'csv').lower()
+        if export_format not in EXPORT_MIMETYPES:
+            raise InvalidExportRequest(f"Unsupported format: {export_format}")
+        columns = parse_columns(request.args.get('columns'))
+        robot_id = request.args.get('robot_id', type=int)
+        start = parse_bound(request.args.get('from'), 'from')
+        end = parse_bound(request.args.get('to'), 'to', inclusive_day=True)
+
+        if robot_id is not None and db.session.get(Robot, robot_id) is None:
+            return jsonify({
+                'success': False,
+                'error': 'Robot not found'
+            }), 404
+    except InvalidExportRequest as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+    partitions = iter_partitions(db.session, export_select(columns, robot_id, start, end))
+    rows = iter_csv(columns, partitions) if export_format == 'csv' else iter_ndjson(columns, partitions)
+    filename = f"trades_robot{robot_id}.{export_format}" if robot_id is not None else f"trades.{export_format}"
+    return Response(stream_with_context(rows), mimetype=EXPORT_MIMETYPES[export_format], headers={
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'Cache-Control': 'no-store',
+        'X-Accel-Buffering': 'no'
+    })
+
+def build_live_trades(robots):
+    """실시간 거래 현황 (robots: 활성 로봇 dict 목록)"""
+    # 실시간 거래 데이터 시뮬레이션 (더 많은 종목 포함)
+    # 15개의 최근 거래 종목을 먼저 고르고 시세는 한 번에 조회
+    symbols = [stock_service.get_random_stock_for_trading() for _ in range(15)]
+    quotes = stock_service.get_stock_quotes(symbols)
+    
+    live_trades = []
+    for symbol in symbols:
+        robot = random.choice(robots)
+        trade_type = random.choice(['BUY', 'SELL'])
         
-        live_trades = []
-        for i in range(15):  # 15개의 최근 거래
-            robot = random.choice(robots)
-            symbol = stock_service.get_random_stock_for_trading()
-            trade_type = random.choice(['BUY', 'SELL'])
-            
-            # 상세한 거래 데이터 생성
-            trade_data = stock_service.generate_detailed_trade_data(symbol, trade_type, robot.name)
-            
-            # 시간을 몇 분 전으로 설정
-            minutes_ago = random.randint(1, 120)
-            trade_time = datetime.now() - timedelta(minutes=minutes_ago)
-            
-            quantity = random.randint(10, 500)
-            
-            live_trades.append({
-                'symbol': symbol,
-                'company_name': trade_data['company_name'],
-                'trade_type': trade_type,
-                'price': trade_data['price'],
-                'quantity': quantity,
-                'total_amount': round(trade_data['price'] * quantity, 2),
-                'robot_name': robot.name,
-                'robot_id': robot.id,
-                'time_ago': f"{minutes_ago}분 전" if minutes_ago < 60 else f"{minutes_ago//60}시간 전",
-                'trade_time': trade_time.isoformat(),
-                'sector': trade_data['sector'],
-                'confidence_score': trade_data['confidence_score'],
-                'market_condition': trade_data['market_condition'],
-                'reason': trade_data['reason'][:50] + "..." if len(trade_data['reason']) > 50 else trade_data['reason']
-            })
+        # 상세한 거래 데이터 생성
+        trade_data = stock_service.generate_detailed_trade_data(
+            symbol, trade_type, robot['name'], quote=quotes[symbol]
+        )
+        
+        # 시간을 몇 분 전으로 설정
+        minutes_ago = random.randint(1, 120)
+        trade_time = datetime.now() - timedelta(minutes=minutes_ago)
         
-        # 시간순으로 정렬
-        live_trades.sort(key=lambda x: x['trade_time'], reverse=True)
+        quantity = random.randint(10, 500)
         
+        live_trades.append({
+            'symbol': symbol,
+            'company_name': trade_data['company_name'],
+            'trade_type': trade_type,
+            'price': trade_data['price'],
+            'quantity': quantity,
+            'total_amount': round(trade_data['price'] * quantity, 2),
+            'robot_name': robot['name'],
+            'robot_id': robot['id'],
+            'time_ago': f"{minutes_ago}분 전" if minutes_ago < 60 else f"{minutes_ago//60}시간 전",
+            'trade_time': trade_time.isoformat(),
+            'sector': trade_data['sector'],
+            'confidence_score': trade_data['confidence_score'],
+            'market_condition': trade_data['market_condition'],
+            'reason': trade_data['reason'][:50] + "..." if len(trade_data['reason']) > 50 else trade_data['reason']
+        })
+    
+    # 시간순으로 정렬
+    live_trades.sort(key=lambda x: x['trade_time'], reverse=True)
+    return live_trades
+
+@trades_bp.route('/trades/live', methods=['GET'])
+@conditional_get(cache_control='no-store')  # 요청마다 새로 만드는 모의 거래
+def get_live_trades():
+    """실시간 거래 현황 (향상된 버전)"""
+    try:
+        robots = [robot.to_dict() for robot in Robot.query.filter_by(is_active=True).all()]
         return jsonify({
             'success': True,
-            'data': live_trades
+            'data': build_live_trades(robots)
         })
     except Exception as e:
         return jsonify({
@@ -113,57 +167,31 @@ def get_live_trades():
         }), 500
 
 @trades_bp.route('/trades/by-sector', methods=['GET'])
+@conditional_get(tables=('trades',), extra=rollup_window_key)
+@cached_response(tags=('trades',), vary=rollup_window_key)
 def get_trades_by_sector():
     """섹터별 거래 현황"""
     try:
-        # 최근 24시간 거래 데이터
-        yesterday = datetime.now() - timedelta(days=1)
-        trades = Trade.query.filter(Trade.trade_date >= yesterday).all()
+        # 최근 24시간 시간별 롤업 합계 (거래 건수와 관계없이 24개 구간만 읽음)
+        since = window_start(hours=24)
         
         sector_stats = {}
-        for trade in trades:
-            sector = trade.sector or 'Unknown'
-            if sector not in sector_stats:
-                sector_stats[sector] = {
-                    'sector': sector,
-                    'total_trades': 0,
-                    'buy_trades': 0,
-                    'sell_trades': 0,
-                    'total_volume': 0,
-                    'avg_confidence': 0,
-                    'top_stocks': {}
-                }
-            
-            sector_stats[sector]['total_trades'] += 1
-            if trade.trade_type == 'BUY':
-                sector_stats[sector]['buy_trades'] += 1
-            else:
-                sector_stats[sector]['sell_trades'] += 1
-            
-            sector_stats[sector]['total_volume'] += trade.total_amount
-            
-            if trade.confidence_score:
-                sector_stats[sector]['avg_confidence'] += trade.confidence_score
-            
-            # 인기 종목 추적
-            symbol = trade.symbol
-            if symbol not in sector_stats[sector]['top_stocks']:
-                sector_stats[sector]['top_stocks'][symbol] = 0
-            sector_stats[sector]['top_stocks'][symbol] += 1
+        for row in sector_totals(db.session, since):
+            sector_stats[row.sector] = {
+                'sector': row.sector,
+                'total_trades': row.trade_count,
+                'buy_trades': row.buy_count,
+                'sell_trades': row.sell_count,
+                'total_volume': row.notional_sum,
+                'avg_confidence': round(row.confidence_sum / row.trade_count, 1),
+                'top_stocks': []
+            }
         
-        # 평균 신뢰도 계산 및 상위 종목 정리
-        for sector in sector_stats:
-            if sector_stats[sector]['total_trades'] > 0:
-                sector_stats[sector]['avg_confidence'] /= sector_stats[sector]['total_trades']
-                sector_stats[sector]['avg_confidence'] = round(sector_stats[sector]['avg_confidence'], 1)
-            
-            # 상위 3개 종목만 유지
-            top_stocks = sorted(
-                sector_stats[sector]['top_stocks'].items(),
-                key=lambda x: x[1],
-                reverse=True
-            )[:3]
-            sector_stats[sector]['top_stocks'] = [{'symbol': k, 'trades': v} for k, v in top_stocks]
+        # 섹터별 상위 3개 종목 (종목 합계는 거래 건수 내림차순)
+        for row in symbol_totals(db.session, since):
+            stats = sector_stats.get(row.sector or UNKNOWN_SECTOR)
+            if stats is not None and len(stats['top_stocks']) < 3:
+                stats['top_stocks'].append({'symbol': row.symbol, 'trades': row.trade_count})
         
         return jsonify({
             'success': True,
@@ -177,9 +205,9 @@ def get_trades_by_sector():
 
 @trades_bp.route('/trades/simulate', methods=['POST'])
 def simulate_trade():
-    """거래 시뮬레이션 (향상된 버전)"""
+    """거래 시뮬레이션 (모의 거래소에 주문: 기본 시장가, order_type/limit_price/stop_price 지정 가능)"""
     try:
-        data = request.get_json()
+        data = request.get_json() or {}
         
         robot_id = data.get('robot_id')
         symbol = data.get('symbol')
@@ -192,58 +220,29 @@ def simulate_trade():
                 'error': 'Missing required fields'
             }), 400
         
-        robot = Robot.query.get(robot_id)
+        robot = db.session.get(Robot, robot_id)
         if not robot:
             return jsonify({
                 'success': False,
                 'error': 'Robot not found'
             }), 404
         
-        # 상세한 거래 데이터 생성
-        trade_data = stock_service.generate_detailed_trade_data(symbol, trade_type, robot.name)
-        price = trade_data['price']
-        total_amount = price * quantity
-        
-        # 거래 기록 생성
-        trade = Trade(
-            robot_id=robot_id,
-            symbol=symbol,
-            company_name=trade_data['company_name'],
-            trade_type=trade_type,
-            quantity=quantity,
-            price=price,
-            total_amount=total_amount,
-            reason=trade_data['reason'],
-            confidence_score=trade_data['confidence_score'],
-            market_condition=trade_data['market_condition'],
-            sector=trade_data['sector'],
-            market_cap=trade_data['market_cap'],
-            rsi=trade_data['technical_indicators']['rsi'],
-            macd=trade_data['technical_indicators']['macd'],
-            moving_avg_20=trade_data['technical_indicators']['moving_avg_20'],
-            moving_avg_50=trade_data['technical_indicators']['moving_avg_50'],
-            volume_ratio=trade_data['technical_indicators']['volume_ratio'],
-            market_price_at_trade=trade_data['market_data']['market_price_at_trade'],
-            day_high=trade_data['market_data']['day_high'],
-            day_low=trade_data['market_data']['day_low'],
-            day_open=trade_data['market_data']['day_open'],
-            prev_close=trade_data['market_data']['prev_close'],
-            expected_return=trade_data['trade_strategy']['expected_return'],
-            stop_loss=trade_data['trade_strategy']['stop_loss'],
-            take_profit=trade_data['trade_strategy']['take_profit'],
-            holding_period=trade_data['trade_strategy']['holding_period'],
-            position_size_pct=trade_data['trade_strategy']['position_size_pct'],
-            risk_score=trade_data['trade_strategy']['risk_score']
-        )
-        
-        db.session.add(trade)
-        db.session.commit()
+        # 주문장에서 체결된 만큼만 거래로 기록 (지정가/스톱 주문은 대기할 수 있음)
+        order, trades = place_order(db.session, robot.id, **parse_order(data))
         
+        # data는 기존과 같은 거래 한 건 (첫 체결, 대기 중이면 None), 주문과 전체 체결은 따로 제공
         return jsonify({
             'success': True,
-            'data': trade.to_dict(),
+            'data': trades[0].to_dict() if trades else None,
+            'order': order.to_dict(),
+            'trades': [trade.to_dict() for trade in trades],
             'message': f'Successfully simulated {trade_type} order for {quantity} shares of {symbol}'
         })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -252,6 +251,7 @@ def simulate_trade():
         }), 500
 
 @trades_bp.route('/market/quote/<symbol>', methods=['GET'])
+@conditional_get(cache_control='public, max-age=15')  # 시세 캐시 TTL 이내
 def get_market_quote(symbol):
     """실시간 주식 시세 (실제 API 연동)"""
     try:
@@ -260,12 +260,13 @@ def get_market_quote(symbol):
         # 추가 정보 포함
         stock_info = StockUniverse.query.filter_by(symbol=symbol).first()
         if stock_info:
-            quote_data.update({
+            quote_data = {
+                **quote_data,
                 'company_name': stock_info.name,
                 'sector': stock_info.sector,
                 'exchange': stock_info.exchange,
                 'market_cap_category': stock_info.market_cap
-            })
+            }
         
         return jsonify({
             'success': True,
@@ -277,49 +278,49 @@ def get_market_quote(symbol):
             'error': str(e)
         }), 500
 
+@trades_bp.route('/market/quotes/cache', methods=['GET'])
+@conditional_get(cache_control='no-store')
+def get_quote_cache_stats():
+    """시세 캐시 통계 조회"""
+    return jsonify({
+        'success': True,
+        'data': stock_service.get_quote_cache_stats()
+    })
+
+def build_trending_stocks():
+    """인기 종목 (실제 거래 데이터 기반)"""
+    # 최근 24시간 거래량 기준 인기 종목 (시간별 롤업 합계)
+    popular_stocks = symbol_totals(db.session, window_start(hours=24), limit=10)
+    
+    # 현재 시세 일괄 조회
+    quotes = stock_service.get_stock_quotes(stock.symbol for stock in popular_stocks)
+    
+    trending_data = []
+    for stock in popular_stocks:
+        quote = quotes[stock.symbol]
+        
+        trending_data.append({
+            'symbol': stock.symbol,
+            'company_name': stock.company_name or f"{stock.symbol} Inc.",
+            'sector': stock.sector,
+            'current_price': quote['close'],
+            'change_percent': round(random.uniform(-5, 5), 2),  # 실제로는 전일 대비 계산
+            'trade_count': stock.trade_count,
+            'total_volume': round(stock.notional_sum, 2),
+            'avg_confidence': round(stock.confidence_sum / stock.confidence_count, 1)
+            if stock.confidence_count else 0,
+            'volume': quote['volume']
+        })
+    return trending_data
+
 @trades_bp.route('/market/trending', methods=['GET'])
+@conditional_get(cache_control='private, max-age=15')  # 시세 포함
 def get_trending_stocks():
     """인기 종목 조회 (실제 거래 데이터 기반)"""
     try:
-        # 최근 24시간 거래량 기준 인기 종목
-        yesterday = datetime.now() - timedelta(days=1)
-        
-        # 거래량이 많은 종목들 조회
-        popular_stocks = db.session.query(
-            Trade.symbol,
-            Trade.company_name,
-            Trade.sector,
-            db.func.count(Trade.id).label('trade_count'),
-            db.func.sum(Trade.total_amount).label('total_volume'),
-            db.func.avg(Trade.confidence_score).label('avg_confidence')
-        ).filter(
-            Trade.trade_date >= yesterday
-        ).group_by(
-            Trade.symbol
-        ).order_by(
-            db.func.count(Trade.id).desc()
-        ).limit(10).all()
-        
-        trending_data = []
-        for stock in popular_stocks:
-            # 현재 시세 가져오기
-            quote = stock_service.get_stock_quote(stock.symbol)
-            
-            trending_data.append({
-                'symbol': stock.symbol,
-                'company_name': stock.company_name or f"{stock.symbol} Inc.",
-                'sector': stock.sector,
-                'current_price': quote['close'],
-                'change_percent': round(random.uniform(-5, 5), 2),  # 실제로는 전일 대비 계산
-                'trade_count': stock.trade_count,
-                'total_volume': round(stock.total_volume, 2),
-                'avg_confidence': round(stock.avg_confidence or 0, 1),
-                'volume': quote['volume']
-            })
-        
         return jsonify({
             'success': True,
-            'data': trending_data
+            'data': build_trending_stocks()
         })
     except Exception as e:
         return jsonify({
@@ -327,58 +328,54 @@ def get_trending_stocks():
             'error': str(e)
         }), 500
 
+def build_market_condition():
+    """당일 시장 상황 (저장되지 않았으면 메모리 스냅샷, 저장은 스케줄러가 담당)"""
+    today = date.today()
+    condition = MarketCondition.query.filter_by(date=today).first()
+    return condition.to_dict() if condition else stock_service.market_conditions.get(today)
+
+def build_sector_performance(market_condition=None):
+    """섹터별 성과와 최근 24시간 거래 활동 (market_condition: build_market_condition 결과)"""
+    if market_condition is None:
+        market_condition = build_market_condition()
+    # 저장된 시장 상황에 섹터 성과가 없으면 당일 스냅샷의 섹터 성과 사용
+    sector_data = market_condition.get('sector_rotation') \
+        or stock_service.market_conditions.get(date.today())['sector_rotation']
+    
+    # 섹터별 거래 활동 추가 (최근 24시간 시간별 롤업 합계)
+    sector_activity = {row.sector: {
+        'trade_count': row.trade_count,
+        'avg_confidence': round(row.confidence_sum / row.confidence_count, 1) if row.confidence_count else 0
+    } for row in sector_totals(db.session, window_start(hours=24))}
+    
+    # 결합된 섹터 데이터
+    combined_data = []
+    for sector, performance in sector_data.items():
+        activity = sector_activity.get(sector, {'trade_count': 0, 'avg_confidence': 0})
+        combined_data.append({
+            'sector': sector,
+            'performance': performance,
+            'trade_count': activity['trade_count'],
+            'avg_confidence': activity['avg_confidence'],
+            'trend': 'up' if performance > 0 else 'down' if performance < 0 else 'neutral'
+        })
+    
+    # 성과순으로 정렬
+    combined_data.sort(key=lambda x: x['performance'], reverse=True)
+    return combined_data
+
 @trades_bp.route('/market/sectors', methods=['GET'])
+@conditional_get(tables=('trades', 'market_conditions'), extra=rollup_window_key)
+@cached_response(tags=('trades', 'market_conditions'), vary=rollup_window_key)
 def get_sector_performance():
     """섹터별 성과 분석"""
     try:
-        # 현재 시장 상황 가져오기
-        today = date.today()
-        market_condition = MarketCondition.query.filter_by(date=today).first()
-        
-        if market_condition and market_condition.sector_rotation:
-            sector_data = market_condition.to_dict()['sector_rotation']
-        else:
-            # 기본 섹터 성과 데이터
-            sector_data = stock_service._generate_sector_performance()
-        
-        # 섹터별 거래 활동 추가
-        yesterday = datetime.now() - timedelta(days=1)
-        sector_trades = db.session.query(
-            Trade.sector,
-            db.func.count(Trade.id).label('trade_count'),
-            db.func.avg(Trade.confidence_score).label('avg_confidence')
-        ).filter(
-            Trade.trade_date >= yesterday,
-            Trade.sector.isnot(None)
-        ).group_by(Trade.sector).all()
-        
-        sector_activity = {trade.sector: {
-            'trade_count': trade.trade_count,
-            'avg_confidence': round(trade.avg_confidence or 0, 1)
-        } for trade in sector_trades}
-        
-        # 결합된 섹터 데이터
-        combined_data = []
-        for sector, performance in sector_data.items():
-            activity = sector_activity.get(sector, {'trade_count': 0, 'avg_confidence': 0})
-            combined_data.append({
-                'sector': sector,
-                'performance': performance,
-                'trade_count': activity['trade_count'],
-                'avg_confidence': activity['avg_confidence'],
-                'trend': 'up' if performance > 0 else 'down' if performance < 0 else 'neutral'
-            })
-        
-        # 성과순으로 정렬
-        combined_data.sort(key=lambda x: x['performance'], reverse=True)
-        
         return jsonify({
             'success': True,
-            'data': combined_data
+            'data': build_sector_performance()
         })
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
-
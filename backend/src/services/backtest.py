@@ -0,0 +1,639 @@
+"""벡터화 백테스트 (종목 x 거래일 행렬)
+
+로봇 전략(strategy_type)별 진입/청산 조건을 지표 행렬로 한 번에 계산하고, 봉 단위 파이썬
+루프 없이 배열 연산으로 거래를 만듭니다.
+
+1. 신호: 전 종목 x 전 기간의 진입/청산 조건을 불리언 행렬로 계산 (진입은 조건이 새로 성립한 봉)
+2. 청산: 진입 후보마다 최대 보유 기간만큼의 저가/고가/청산 신호를 한 번에 모아 손절, 익절,
+   청산 신호, 기간 만료 중 처음 일어난 봉을 argmax로 찾음 (후보가 많으면 블록 단위)
+3. 선택: 보유 중에는 같은 종목에 다시 진입하지 않도록 청산일 다음의 첫 후보를 searchsorted로
+   이어 두고, 전 종목의 사슬을 동시에 따라감 (반복 횟수 = 종목당 최대 거래 수).
+   동시 보유 수 제한이 있으면 종목 간에 순서가 생기므로 진입 후보(봉이 아니라 사건)를
+   진입일 순으로 한 번 훑으며 청산일 힙으로 보유 수와 실현 자본을 셈
+4. 평가: 보유 수량 행렬(차분 배열의 누적합) x 종가 + 현금 흐름 → 일별 평가액과 성과 지표
+
+체결 규칙
+- 신호는 종가 기준, 진입은 다음 봉 시가
+- 손절/익절은 장중 저가/고가로 판정하고 시가가 이미 넘어섰으면 시가에 체결
+  (같은 봉에서 둘 다 닿으면 손절 우선). 청산 신호와 기간 만료는 그 봉 종가
+- 포지션 크기는 진입일 전까지의 실현 자본 x position_size_pct%, 동시 보유는 기본적으로
+  100 / position_size_pct 종목까지 (같은 날 후보는 종목 순서대로). max_positions=0이면
+  보유 수 제한 없이 초기 자본 x position_size_pct%로 고정 (신호 자체의 성과 확인용, max_exposure)
+- 수수료는 체결 금액 x commission_rate (매수/매도 각각)
+"""
+import heapq
+import math
+import warnings
+from datetime import date, datetime, time, timedelta
+from itertools import groupby
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import String, cast, delete, select, update
+
+from src.models.trading import MarketData, Robot, StockUniverse, Trade
+from src.services.data_versions import bump_versions
+from src.services.indicators import RSI_PERIOD, SMA_LONG, SMA_SHORT, TRADE_INDICATORS, compute_batch, rsi, sma
+from src.services.response_cache import response_cache
+from src.services.trade_rollups import rebuild_rollups
+
+TRADING_DAYS = 252
+DEFAULT_COMMISSION_RATE = 0.001
+BLOCK_SIZE = 20000  # 청산 탐색 시 한 번에 모으는 진입 후보 수
+ENTRY_TIME, EXIT_TIME = time(9, 30), time(16, 0)
+
+# 청산 사유 코드
+EXIT_STOP, EXIT_TARGET, EXIT_SIGNAL, EXIT_EXPIRY, EXIT_END = range(5)
+EXIT_REASONS = {
+    EXIT_STOP: "손절가 도달로 청산",
+    EXIT_TARGET: "익절가 도달로 청산",
+    EXIT_SIGNAL: "매도 신호 발생으로 청산",
+    EXIT_EXPIRY: "최대 보유 기간 경과로 청산",
+    EXIT_END: "백테스트 기간 종료로 청산"
+}
+
+OHLCV = ("open", "high", "low", "close", "volume")
+
+
+class BarMatrix:
+    """종목 x 거래일 OHLCV 행렬 (거래일은 전 종목 날짜의 합집합, 빈 자리는 NaN)"""
+
+    __slots__ = ("symbols", "dates", "open", "high", "low", "close", "volume")
+
+    def __init__(self, symbols: Sequence[str], dates, open, high, low, close, volume):
+        self.symbols = list(symbols)
+        self.dates = np.asarray(dates, dtype="datetime64[D]")
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.close.shape
+
+    @classmethod
+    def allocate(cls, symbols: Sequence[str], dates) -> "BarMatrix":
+        shape = (len(symbols), len(dates))
+        return cls(symbols, dates, *(np.full(shape, np.nan) for _ in OHLCV))
+
+
+def _assemble(series: List[Tuple[str, np.ndarray, List[np.ndarray]]]) -> BarMatrix:
+    """종목별 (종목, 날짜, OHLCV 컬럼) → 날짜 합집합 기준 BarMatrix"""
+    dates = (np.unique(np.concatenate([days for _, days, _ in series])) if series
+             else np.empty(0, "datetime64[D]"))
+    matrix = BarMatrix.allocate([symbol for symbol, _, _ in series], dates)
+    for row, (_, days, columns) in enumerate(series):
+        index = np.searchsorted(dates, days)
+        for name, values in zip(OHLCV, columns):
+            getattr(matrix, name)[row, index] = values
+    return matrix
+
+
+def bars_from_store(store, symbols: Sequence[str], start: Optional[date] = None,
+                    end: Optional[date] = None) -> BarMatrix:
+    """바 저장소 → BarMatrix"""
+    series = []
+    for symbol in symbols:
+        bars = store.read(symbol, start, end)
+        series.append((bars.symbol, bars.date, [getattr(bars, name) for name in OHLCV]))
+    return _assemble(series)
+
+
+def bars_from_database(conn, symbols: Optional[Sequence[str]] = None, start: Optional[date] = None,
+                       end: Optional[date] = None, batch_size: int = 50000) -> BarMatrix:
+    """market_data 테이블 → BarMatrix (종목, 날짜 순으로 스트리밍, symbols가 없으면 전체 종목)
+
+    요청한 종목은 데이터가 없어도 빈 행(NaN)으로 순서대로 들어갑니다.
+    """
+    table = MarketData.__table__
+    # 날짜는 문자열로 받아 NumPy가 한 번에 변환 (행마다 date 객체를 만들지 않음)
+    query = select(table.c.symbol, cast(table.c.date, String), table.c.open_price, table.c.high_price,
+                   table.c.low_price, table.c.close_price, table.c.volume).order_by(table.c.symbol, table.c.date)
+    if symbols is not None:
+        symbols = [symbol.upper() for symbol in symbols]
+        query = query.where(table.c.symbol.in_(symbols))
+    if start is not None:
+        query = query.where(table.c.date >= start)
+    if end is not None:
+        query = query.where(table.c.date <= end)
+
+    result = conn.execute(query.execution_options(yield_per=batch_size))
+    rows = (row for partition in result.partitions() for row in partition)
+    loaded = {}
+    for symbol, group in groupby(rows, key=lambda row: row[0]):
+        _, days, *columns = zip(*group)
+        loaded[symbol] = (symbol, np.array(days, dtype="datetime64[D]"),
+                          [np.array(column, dtype=np.float64) for column in columns])
+    if symbols is None:
+        return _assemble(list(loaded.values()))
+    empty = np.empty(0, "datetime64[D]")
+    return _assemble([loaded.get(symbol) or (symbol, empty, [np.empty(0)] * len(OHLCV)) for symbol in symbols])
+
+
+def _ffill(values: np.ndarray) -> np.ndarray:
+    """행마다 NaN을 앞의 값으로 채움 (첫 유효 값 이전은 NaN 유지)"""
+    index = np.where(np.isnan(values), 0, np.arange(values.shape[1]))
+    np.maximum.accumulate(index, axis=1, out=index)
+    return values[np.arange(values.shape[0])[:, None], index]
+
+
+def _crossed(condition: np.ndarray) -> np.ndarray:
+    """조건이 새로 성립한 봉 (전 봉에는 거짓, 이번 봉에 참)"""
+    out = condition.copy()
+    out[:, 1:] &= ~condition[:, :-1]
+    return out
+
+
+def _zscore(values: np.ndarray) -> np.ndarray:
+    """같은 날 전 종목 기준 표준화 (종목 방향)"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean = np.nanmean(values, axis=0)
+        std = np.nanstd(values, axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(std > 0, (values - mean) / std, 0.0)
+
+
+def _percentile_rank(values: np.ndarray) -> np.ndarray:
+    """같은 날 전 종목 중 순위 (0 = 최저, 1 = 최고, NaN은 NaN)"""
+    missing = np.isnan(values)
+    ranks = np.argsort(np.argsort(np.where(missing, -np.inf, values), axis=0, kind="stable"), axis=0)
+    valid = (~missing).sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = (ranks - (values.shape[0] - valid)) / np.maximum(valid - 1, 1)
+    return np.where(missing, np.nan, out)
+
+
+class Features:
+    """전략 신호에 쓰는 지표 행렬 (기간별로 한 번만 계산해 캐시, 여러 전략/파라미터가 공유)"""
+
+    def __init__(self, bars: BarMatrix, parent: Optional["Features"] = None):
+        self.bars = bars
+        self._parent = parent
+        self._cache: Dict[tuple, np.ndarray] = {}
+
+    def window(self, end: int) -> "Features":
+        """앞쪽 end개 거래일만 보는 Features
+
+        지표는 과거 봉만 사용하므로 전체 기간 계산 결과를 잘라 쓰면 잘린 행렬로 다시 계산한
+        값과 같습니다 (워크포워드 구간마다 지표를 다시 계산하지 않음).
+        """
+        bars = BarMatrix(self.bars.symbols, self.bars.dates[:end],
+                         *(getattr(self.bars, name)[:, :end] for name in OHLCV))
+        return Features(bars, parent=self)
+
+    def _get(self, key: tuple, compute: Callable[[BarMatrix], np.ndarray]):
+        if key not in self._cache:
+            if self._parent is None:
+                self._cache[key] = compute(self.bars)
+            else:
+                value, end = self._parent._get(key, compute), self.bars.shape[1]
+                self._cache[key] = ({name: values[:, :end] for name, values in value.items()}
+                                    if isinstance(value, dict) else value[:, :end])
+        return self._cache[key]
+
+    @property
+    def base(self) -> Dict[str, np.ndarray]:
+        """기본 기간 지표 (indicators.compute_batch, Trade 컬럼 값에도 사용)"""
+        return self._get(("base",), lambda bars: compute_batch(bars.close, bars.volume))
+
+    @property
+    def filled_close(self) -> np.ndarray:
+        """빈 거래일을 직전 종가로 채운 종가 (청산가/평가액 계산용)"""
+        return self._get(("filled_close",), lambda bars: _ffill(bars.close))
+
+    def sma(self, period: int) -> np.ndarray:
+        if period == SMA_SHORT:
+            return self.base["moving_avg_20"]
+        if period == SMA_LONG:
+            return self.base["moving_avg_50"]
+        return self._get(("sma", period), lambda bars: sma(bars.close, period))
+
+    def rsi(self, period: int) -> np.ndarray:
+        if period == RSI_PERIOD:
+            return self.base["rsi"]
+        return self._get(("rsi", period), lambda bars: rsi(bars.close, period))
+
+    def macd(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        base = self.base
+        return base["macd"], base["macd_signal"], base["macd_hist"]
+
+    def momentum(self, period: int) -> np.ndarray:
+        """period봉 전 대비 수익률"""
+        def compute(bars):
+            out = np.full(bars.shape, np.nan)
+            out[:, period:] = bars.close[:, period:] / bars.close[:, :-period] - 1
+            return out
+        return self._get(("momentum", period), compute)
+
+    def volatility(self, period: int) -> np.ndarray:
+        """최근 period봉 일간 로그 수익률의 표준편차"""
+        def compute(bars):
+            returns = np.full(bars.shape, np.nan)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                returns[:, 1:] = np.log(bars.close[:, 1:] / bars.close[:, :-1])
+            mean = sma(returns, period)
+            return np.sqrt(np.maximum(sma(returns ** 2, period) - mean ** 2, 0.0))
+        return self._get(("volatility", period), compute)
+
+
+# ---- 전략별 신호 (features, params) → (진입 조건, 청산 조건) ----
+
+def momentum_signals(f: Features, p: Dict) -> Tuple[np.ndarray, np.ndarray]:
+    """MACD 골든크로스 + RSI 상승 구간 + 단기 이동평균 위 → 진입, MACD 데드크로스 또는 RSI 과열 → 청산"""
+    line, signal, _ = f.macd()
+    strength = f.rsi(p["rsi_period"])
+    entry = (_crossed(line > signal) & (strength >= p["rsi_entry"]) & (strength <= p["rsi_exit"])
+             & (f.bars.close > f.sma(p["ma_short"])))
+    return entry, _crossed(line < signal) | (strength > p["rsi_exit"])
+
+
+def value_signals(f: Features, p: Dict) -> Tuple[np.ndarray, np.ndarray]:
+    """장기 이동평균 아래(저평가 근사)에서 RSI가 과매도 구간을 벗어나면 진입, RSI 회복 시 청산"""
+    strength = f.rsi(p["rsi_period"])
+    entry = _crossed(strength > p["rsi_entry"]) & (f.bars.close < f.sma(p["ma_long"]))
+    return entry, strength > p["rsi_exit"]
+
+
+def growth_signals(f: Features, p: Dict) -> Tuple[np.ndarray, np.ndarray]:
+    """단기/장기 이동평균 골든크로스 + 장기 수익률 양수 → 진입, 데드크로스 → 청산"""
+    short, long = f.sma(p["ma_short"]), f.sma(p["ma_long"])
+    entry = _crossed(short > long) & (f.momentum(p["ma_long"]) > 0)
+    return entry, _crossed(short < long)
+
+
+def dividend_signals(f: Features, p: Dict) -> Tuple[np.ndarray, np.ndarray]:
+    """변동성이 같은 날 전 종목 중 하위 절반인 종목이 장기 이동평균을 상향 돌파하면 진입, 하향 이탈 시 청산"""
+    volatility = f.volatility(p["ma_short"])
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        calm = volatility <= np.nanmedian(volatility, axis=0)
+    long = f.sma(p["ma_long"])
+    return _crossed(f.bars.close > long) & calm, _crossed(f.bars.close < long)
+
+
+def quant_signals(f: Features, p: Dict) -> Tuple[np.ndarray, np.ndarray]:
+    """단기 모멘텀 + MACD 히스토그램 - RSI 과열의 종목 간 종합 점수가 상위 구간에 들면 진입, 중간 아래로 내려가면 청산"""
+    _, _, hist = f.macd()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = _zscore(f.momentum(p["ma_short"])) + _zscore(hist / f.bars.close) - _zscore(f.rsi(p["rsi_period"]))
+    score = np.where(np.isnan(f.bars.close) | np.isnan(hist), np.nan, score)
+    rank = _percentile_rank(score)
+    return _crossed(rank >= p["entry_quantile"]), rank < p["exit_quantile"]
+
+
+# strategy_type → (신호 함수, 진입 이유, 기본 파라미터)
+STRATEGIES: Dict[str, Dict] = {
+    "모멘텀 투자": {
+        "signals": momentum_signals,
+        "reason": "MACD 골든크로스와 RSI 상승 모멘텀 확인",
+        "params": {"rsi_period": 14, "rsi_entry": 50.0, "rsi_exit": 75.0, "ma_short": 20,
+                   "stop_loss_pct": 5.0, "take_profit_pct": 15.0, "max_holding_days": 30, "position_size_pct": 5.0}
+    },
+    "가치 투자": {
+        "signals": value_signals,
+        "reason": "장기 이동평균 하회 구간에서 RSI 과매도 탈출",
+        "params": {"rsi_period": 14, "rsi_entry": 30.0, "rsi_exit": 65.0, "ma_long": 50,
+                   "stop_loss_pct": 8.0, "take_profit_pct": 20.0, "max_holding_days": 120, "position_size_pct": 4.0}
+    },
+    "성장주 투자": {
+        "signals": growth_signals,
+        "reason": "이동평균 골든크로스와 장기 상승 추세 확인",
+        "params": {"ma_short": 20, "ma_long": 50,
+                   "stop_loss_pct": 10.0, "take_profit_pct": 30.0, "max_holding_days": 90, "position_size_pct": 6.0}
+    },
+    "배당 투자": {
+        "signals": dividend_signals,
+        "reason": "저변동성 종목의 장기 이동평균 상향 돌파",
+        "params": {"ma_short": 20, "ma_long": 100,
+                   "stop_loss_pct": 5.0, "take_profit_pct": 10.0, "max_holding_days": 120, "position_size_pct": 3.0}
+    },
+    "AI 퀀트": {
+        "signals": quant_signals,
+        "reason": "모멘텀/MACD/RSI 종합 점수 상위 구간 진입",
+        "params": {"rsi_period": 14, "ma_short": 20, "entry_quantile": 0.9, "exit_quantile": 0.5,
+                   "stop_loss_pct": 4.0, "take_profit_pct": 12.0, "max_holding_days": 20, "position_size_pct": 5.0}
+    }
+}
+
+
+def strategy_params(strategy_type: str, overrides: Optional[Dict] = None) -> Dict:
+    """전략 기본 파라미터에 overrides를 덮어쓴 값 (알 수 없는 전략/파라미터는 ValueError)"""
+    if strategy_type not in STRATEGIES:
+        raise ValueError(f"Unknown strategy_type: {strategy_type}")
+    params = dict(STRATEGIES[strategy_type]["params"])
+    for name, value in (overrides or {}).items():
+        if name not in params:
+            raise ValueError(f"Unknown parameter for {strategy_type}: {name}")
+        params[name] = type(params[name])(value)
+    return params
+
+
+class BacktestResult:
+    """백테스트 결과 (거래는 컬럼 배열, 행/거래일 인덱스는 BarMatrix 기준, equity는 start 거래일부터)"""
+
+    __slots__ = ("strategy_type", "params", "initial_capital", "commission_rate", "trades", "equity", "metrics")
+
+    def __init__(self, strategy_type: str, params: Dict, initial_capital: float, commission_rate: float,
+                 trades: Dict[str, np.ndarray], equity: np.ndarray, metrics: Dict):
+        self.strategy_type = strategy_type
+        self.params = params
+        self.initial_capital = initial_capital
+        self.commission_rate = commission_rate
+        self.trades = trades
+        self.equity = equity
+        self.metrics = metrics
+
+
+def _find_exits(bars: BarMatrix, close: np.ndarray, rows: np.ndarray, entry_day: np.ndarray,
+                stop: np.ndarray, target: np.ndarray, exit_signal: np.ndarray, horizon: np.ndarray,
+                max_holding: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """진입 후보별 (청산 거래일, 청산가, 청산 사유) (보유 기간 창을 모아 첫 사건을 argmax로)"""
+    last_day = bars.shape[1] - 1
+    offsets = np.arange(max_holding)
+    exit_day = np.empty(len(rows), dtype=np.int64)
+    exit_price = np.empty(len(rows))
+    reason = np.empty(len(rows), dtype=np.int64)
+    for lo in range(0, len(rows), BLOCK_SIZE):
+        part = slice(lo, lo + BLOCK_SIZE)
+        row, days = rows[part, None], np.minimum(entry_day[part, None] + offsets, last_day)
+        window = offsets < horizon[part, None]
+        hit_stop = (bars.low[row, days] <= stop[part, None]) & window
+        hit_target = (bars.high[row, days] >= target[part, None]) & window
+        hit_signal = exit_signal[row, days] & window
+        last = offsets == (horizon[part, None] - 1)
+        first = np.argmax(hit_stop | hit_target | hit_signal | last, axis=1)
+
+        index = np.arange(len(first))
+        day = days[index, first]
+        opening = bars.open[rows[part], day]
+        stopped, targeted = hit_stop[index, first], hit_target[index, first]
+        signaled = hit_signal[index, first]
+        exit_day[part] = day
+        exit_price[part] = np.where(
+            stopped, np.where(opening <= stop[part], opening, stop[part]),
+            np.where(targeted, np.where(opening >= target[part], opening, target[part]), close[rows[part], day])
+        )
+        reason[part] = np.select(
+            [stopped, targeted, signaled, horizon[part] == max_holding],
+            [EXIT_STOP, EXIT_TARGET, EXIT_SIGNAL, EXIT_EXPIRY], EXIT_END
+        )
+    return exit_day, exit_price, reason
+
+
+def _select_trades(rows: np.ndarray, entry_day: np.ndarray, exit_day: np.ndarray, days: int) -> np.ndarray:
+    """종목별로 겹치지 않는 거래 선택 (첫 후보부터 청산일 다음의 첫 후보를 잇는 사슬)"""
+    if len(rows) == 0:
+        return np.empty(0, dtype=np.int64)
+    keys = rows * days + entry_day  # (종목, 진입일) 순으로 정렬된 상태
+    following = np.searchsorted(keys, rows * days + exit_day, side="right")
+    following[following >= len(rows)] = -1
+    following[(following >= 0) & (rows[np.maximum(following, 0)] != rows)] = -1
+
+    current = np.unique(rows, return_index=True)[1]
+    chosen = []
+    while current.size:
+        chosen.append(current)
+        current = following[current]
+        current = current[current >= 0]
+    return np.sort(np.concatenate(chosen))
+
+
+def _select_trades_limited(rows: np.ndarray, entry_day: np.ndarray, exit_day: np.ndarray,
+                           entry_price: np.ndarray, exit_price: np.ndarray, max_positions: int,
+                           initial_capital: float, size_pct: float,
+                           commission_rate: float) -> Tuple[np.ndarray, np.ndarray]:
+    """동시 보유 max_positions개 이하로 거래 선택 → (후보 인덱스, 수량)
+
+    진입일 순으로 훑으며 청산일 힙으로 보유 수와 실현 손익을 셈. 수량은 진입일 전까지
+    실현된 자본 x size_pct% (청산일 종가 이후에 자리와 자본이 돌아옴)
+    """
+    order = np.lexsort((rows, entry_day))
+    row_list, entry_list, exit_list = rows.tolist(), entry_day.tolist(), exit_day.tolist()
+    buy_list, sell_list = entry_price.tolist(), exit_price.tolist()
+    busy_until: Dict[int, int] = {}
+    open_exits: List[Tuple[int, float]] = []
+    realized = initial_capital
+    chosen, quantities = [], []
+    for i in order.tolist():
+        day = entry_list[i]
+        while open_exits and open_exits[0][0] < day:
+            realized += heapq.heappop(open_exits)[1]
+        if busy_until.get(row_list[i], -1) >= day or len(open_exits) >= max_positions:
+            continue
+        quantity = math.floor(max(realized, 0.0) * size_pct / 100 / buy_list[i])
+        if quantity <= 0:
+            continue
+        pnl = quantity * (sell_list[i] * (1 - commission_rate) - buy_list[i] * (1 + commission_rate))
+        heapq.heappush(open_exits, (exit_list[i], pnl))
+        busy_until[row_list[i]] = exit_list[i]
+        chosen.append(i)
+        quantities.append(quantity)
+    order = np.argsort(chosen)
+    return np.array(chosen, dtype=np.int64)[order], np.array(quantities, dtype=np.float64)[order]
+
+
+def compute_metrics(equity: np.ndarray, pnl: np.ndarray, initial_capital: float,
+                    market_value: Optional[np.ndarray] = None) -> Dict:
+    """일별 평가액과 거래별 손익 → Robot 성과 지표 (수익률/낙폭/승률은 %)"""
+    if len(equity) == 0:
+        equity = np.array([initial_capital])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.diff(equity) / equity[:-1]
+    returns = returns[np.isfinite(returns)]
+    std = returns.std() if len(returns) > 1 else 0.0
+    peak = np.maximum.accumulate(np.maximum(equity, initial_capital))
+    metrics = {
+        "final_capital": round(float(equity[-1]), 2),
+        "total_return": round(float((equity[-1] / initial_capital - 1) * 100), 2),
+        "win_rate": round(float((pnl > 0).mean() * 100), 2) if len(pnl) else 0.0,
+        "max_drawdown": round(float(np.max(1 - equity / peak) * 100), 2),
+        "sharpe_ratio": round(float(returns.mean() / std * np.sqrt(TRADING_DAYS)), 2) if std > 0 else 0.0,
+        "trades": int(len(pnl))
+    }
+    if market_value is not None:
+        metrics["max_exposure"] = round(float(market_value.max(initial=0.0) / initial_capital * 100), 2)
+    return metrics
+
+
+def run_backtest(bars: BarMatrix, strategy_type: str, params: Optional[Dict] = None,
+                 initial_capital: float = 100000.0, commission_rate: float = DEFAULT_COMMISSION_RATE,
+                 max_positions: Optional[int] = None, features: Optional[Features] = None,
+                 start: int = 0) -> BacktestResult:
+    """strategy_type 전략으로 bars 전 종목을 백테스트 (features를 넘기면 지표 캐시 공유)
+
+    max_positions: 동시 보유 종목 수 한도 (None이면 100 / position_size_pct, 0이면 제한 없음)
+    start: 이 거래일부터 진입하고 평가액/지표도 여기부터 계산 (앞쪽은 지표 준비 구간)
+    """
+    params = strategy_params(strategy_type, params)
+    if bars.shape[1] == 0:
+        raise ValueError("No bars to backtest")
+    features = features or Features(bars)
+    entry, exit_signal = STRATEGIES[strategy_type]["signals"](features, params)
+    count, days = bars.shape
+    close = features.filled_close
+
+    # 진입 후보: 신호 봉 다음 봉 시가 (np.nonzero는 (종목, 거래일) 순)
+    valid = ~np.isnan(bars.close)
+    last_valid = np.where(valid.any(axis=1), days - 1 - np.argmax(valid[:, ::-1], axis=1), -1)
+    rows, signal_day = np.nonzero(entry[:, :-1])
+    entry_day = signal_day + 1
+    entry_price = bars.open[rows, entry_day]
+    with np.errstate(invalid="ignore"):
+        quantity = np.floor(initial_capital * params["position_size_pct"] / 100 / entry_price)
+    ok = (entry_price > 0) & (entry_day >= start) & (entry_day <= last_valid[rows]) & (quantity > 0)
+    rows, entry_day, entry_price, quantity = rows[ok], entry_day[ok], entry_price[ok], quantity[ok]
+
+    stop = entry_price * (1 - params["stop_loss_pct"] / 100)
+    target = entry_price * (1 + params["take_profit_pct"] / 100)
+    max_holding = max(int(params["max_holding_days"]), 1)
+    horizon = np.minimum(max_holding, last_valid[rows] - entry_day + 1)
+    exit_day, exit_price, reason = _find_exits(bars, close, rows, entry_day, stop, target,
+                                               exit_signal, horizon, max_holding)
+
+    if max_positions is None:
+        max_positions = max(int(100 // params["position_size_pct"]), 1)
+    if max_positions:
+        chosen, quantity = _select_trades_limited(rows, entry_day, exit_day, entry_price, exit_price,
+                                                  max_positions, initial_capital, params["position_size_pct"],
+                                                  commission_rate)
+    else:
+        chosen = _select_trades(rows, entry_day, exit_day, days)
+        quantity = quantity[chosen]
+    rows, entry_day, entry_price = rows[chosen], entry_day[chosen], entry_price[chosen]
+    exit_day, exit_price, reason = exit_day[chosen], exit_price[chosen], reason[chosen]
+
+    cost = quantity * entry_price
+    proceeds = quantity * exit_price
+    fees = (cost + proceeds) * commission_rate
+    pnl = proceeds - cost - fees
+
+    # 일별 평가액 = 초기 자본 + 누적 현금 흐름 + 보유 수량 x 종가 (청산일 종가에는 보유하지 않음)
+    flows = np.zeros(days)
+    np.add.at(flows, entry_day, -cost * (1 + commission_rate))
+    np.add.at(flows, exit_day, proceeds * (1 - commission_rate))
+    held = np.zeros((count, days + 1))
+    np.add.at(held, (rows, entry_day), quantity)
+    np.add.at(held, (rows, exit_day), -quantity)
+    np.cumsum(held, axis=1, out=held)
+    market_value = (held[:, start:days] * np.nan_to_num(close[:, start:])).sum(axis=0)
+    equity = initial_capital + np.cumsum(flows[start:]) + market_value
+
+    trades = {
+        "row": rows, "entry_day": entry_day, "exit_day": exit_day, "quantity": quantity.astype(np.int64),
+        "entry_price": entry_price, "exit_price": exit_price, "stop_loss": stop[chosen],
+        "take_profit": target[chosen], "reason": reason, "pnl": pnl, "return_pct": pnl / cost * 100
+    }
+    return BacktestResult(strategy_type, params, initial_capital, commission_rate, trades, equity,
+                          compute_metrics(equity, pnl, initial_capital, market_value))
+
+
+# ---- Robot / Trade 기록 ----
+
+def _nullable(values: np.ndarray, digits: int) -> List:
+    return [None if value != value else value for value in np.round(values, digits).tolist()]
+
+
+def trade_rows(bars: BarMatrix, features: Features, result: BacktestResult, robot_id: int,
+               universe: Optional[Dict[str, Tuple]] = None) -> List[Dict]:
+    """백테스트 거래 → trades 행 목록 (거래마다 진입 BUY와 청산 SELL 두 행, 시각순)
+
+    universe: 종목 → (회사명, 섹터, 시가총액 구분)
+    """
+    trades, params = result.trades, result.params
+    universe = universe or {}
+    rows = trades["row"]
+    symbols = np.array(bars.symbols, dtype=object)[rows]
+    info = [universe.get(symbol, (None, None, None)) for symbol in symbols.tolist()]
+    company, sector, market_cap = (list(column) for column in zip(*info)) if info else ([], [], [])
+    indicators = features.base
+    held_days = (bars.dates[trades["exit_day"]] - bars.dates[trades["entry_day"]]).astype(np.int64).tolist()
+    exit_reasons = [EXIT_REASONS[code] for code in trades["reason"].tolist()]
+    entry_reason = STRATEGIES[result.strategy_type]["reason"]
+
+    def side(trade_type, day, price, when, reasons, expected):
+        prev_day = np.maximum(day - 1, 0)
+        # 진입은 전 봉 종가의 신호로 결정하므로 그 봉의 지표를 기록
+        signal_day = prev_day if trade_type == "BUY" else day
+        dates = (bars.dates[day].astype("datetime64[us]") + np.timedelta64(
+            when.hour * 3600 + when.minute * 60, "s")).tolist()
+        columns = {
+            "robot_id": [robot_id] * len(rows),
+            "symbol": symbols.tolist(),
+            "company_name": company,
+            "trade_type": [trade_type] * len(rows),
+            "quantity": trades["quantity"].tolist(),
+            "price": _nullable(price, 2),
+            "total_amount": _nullable(price * trades["quantity"], 2),
+            "trade_date": dates,
+            "reason": reasons,
+            "sector": sector,
+            "market_cap": market_cap,
+            **{name: _nullable(indicators[name][rows, signal_day], digits)
+               for name, digits in TRADE_INDICATORS.items()},
+            "market_price_at_trade": _nullable(price, 2),
+            "day_high": _nullable(bars.high[rows, day], 2),
+            "day_low": _nullable(bars.low[rows, day], 2),
+            "day_open": _nullable(bars.open[rows, day], 2),
+            "prev_close": _nullable(np.where(day > 0, bars.close[rows, prev_day], np.nan), 2),
+            "expected_return": expected,
+            "stop_loss": _nullable(trades["stop_loss"], 2),
+            "take_profit": _nullable(trades["take_profit"], 2),
+            "holding_period": held_days,
+            "position_size_pct": [params["position_size_pct"]] * len(rows)
+        }
+        return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+    buys = side("BUY", trades["entry_day"], trades["entry_price"], ENTRY_TIME,
+                [entry_reason] * len(rows), [params["take_profit_pct"]] * len(rows))
+    sells = side("SELL", trades["exit_day"], trades["exit_price"], EXIT_TIME,
+                 exit_reasons, _nullable(trades["return_pct"], 2))
+    return sorted(buys + sells, key=lambda row: row["trade_date"])
+
+
+def universe_info(conn, symbols: Iterable[str]) -> Dict[str, Tuple]:
+    """종목 → (회사명, 섹터, 시가총액 구분) (stock_universe 기준)"""
+    symbols = list(symbols)
+    info = {}
+    for lo in range(0, len(symbols), 500):
+        info.update((symbol, (name, sector, market_cap)) for symbol, name, sector, market_cap in conn.execute(
+            select(StockUniverse.symbol, StockUniverse.name, StockUniverse.sector, StockUniverse.market_cap)
+            .where(StockUniverse.symbol.in_(symbols[lo:lo + 500]))
+        ))
+    return info
+
+
+def save_backtest(engine, robot_id: int, bars: BarMatrix, features: Features, result: BacktestResult,
+                  replace: bool = True, chunk_size: int = 5000) -> Dict:
+    """백테스트 거래를 trades에, 성과 지표를 robots에 한 트랜잭션으로 기록
+
+    replace=True면 백테스트 기간에 있던 이 로봇의 기존 거래를 지우고 다시 씁니다.
+    ORM을 거치지 않으므로 롤업/데이터 버전/응답 캐시는 직접 갱신합니다.
+    """
+    trades = Trade.__table__
+    first_day = bars.dates[0].tolist() if len(bars.dates) else None
+    with engine.begin() as conn:
+        rows = trade_rows(bars, features, result, robot_id, universe_info(conn, bars.symbols))
+        deleted = 0
+        if replace and first_day is not None:
+            since = datetime.combine(first_day, time.min)
+            until = datetime.combine(bars.dates[-1].tolist() + timedelta(days=1), time.min)
+            deleted = conn.execute(delete(trades).where(
+                trades.c.robot_id == robot_id, trades.c.trade_date >= since, trades.c.trade_date < until
+            )).rowcount
+        for lo in range(0, len(rows), chunk_size):
+            conn.execute(trades.insert(), rows[lo:lo + chunk_size])
+        metrics = result.metrics
+        conn.execute(update(Robot.__table__).where(Robot.__table__.c.id == robot_id).values(
+            # 백테스트는 끝에 모두 청산하므로 현금 = 최종 자본
+            current_capital=metrics["final_capital"], cash=metrics["final_capital"],
+            total_return=metrics["total_return"], win_rate=metrics["win_rate"], max_drawdown=metrics["max_drawdown"],
+            sharpe_ratio=metrics["sharpe_ratio"], updated_at=datetime.utcnow()
+        ))
+        if first_day is not None and (rows or deleted):
+            rebuild_rollups(conn, since=datetime.combine(first_day, time.min))
+        bump_versions(conn, ["trades", "robots"])
+    response_cache.invalidate_tags(["trades", "robots"])
+    return {"inserted": len(rows), "deleted": deleted}
@@ -0,0 +1,327 @@
+"""컬럼형 일봉(OHLCV) 저장소 (메모리 맵 파일)
+
+종목마다 파일 하나에 64바이트 헤더와 컬럼 블록 6개(date, open, high, low, close, volume)를
+capacity 행 크기로 연속 배치합니다. 새 날짜는 각 블록의 빈 자리에 이어 쓰고 헤더의 count를
+마지막에 올리므로, 읽는 쪽은 항상 완전히 기록된 행까지만 봅니다. 블록이 가득 차거나 기존
+구간 중간에 날짜가 끼어들면 새 파일에 다시 써서 교체합니다 (열려 있던 뷰는 이전 파일을 계속 가리킴).
+헤더의 writes는 기록할 때마다 1씩 올라가므로 signature()로 그 사이 기록이 있었는지 O(1)로 확인합니다.
+
+read()는 파일을 복사하지 않는 읽기 전용 NumPy 뷰를 반환하고, 날짜 구간은 정렬된 date
+컬럼의 이진 탐색(searchsorted)으로 찾습니다. market_data 테이블과는 load_from_database /
+save_to_database로 양방향 동기화합니다.
+"""
+import os
+import re
+import threading
+from datetime import date
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.models.trading import MarketData
+from src.services.data_versions import bump_versions
+
+MAGIC = b"OHLCV001"
+HEADER_SIZE = 64
+HEADER_DTYPE = np.dtype([("magic", "S8"), ("capacity", "<i8"), ("count", "<i8"), ("writes", "<i8")])
+COLUMNS = ("date", "open", "high", "low", "close", "volume")
+COLUMN_DTYPES = {
+    "date": np.dtype("<i8"),  # 1970-01-01 기준 일수 (datetime64[D]로 복사 없이 변환)
+    "open": np.dtype("<f8"),
+    "high": np.dtype("<f8"),
+    "low": np.dtype("<f8"),
+    "close": np.dtype("<f8"),
+    "volume": np.dtype("<i8")
+}
+ITEM_SIZE = 8
+MIN_CAPACITY = 1024  # 약 4년치 일봉
+
+_SYMBOL_PATTERN = re.compile(r"^[A-Z0-9.\-]{1,20}$")
+
+
+class Bars:
+    """한 종목의 일봉 컬럼 (저장소 파일에 대한 읽기 전용 뷰)"""
+
+    __slots__ = ("symbol", "date", "open", "high", "low", "close", "volume")
+
+    def __init__(self, symbol: str, date, open, high, low, close, volume):
+        self.symbol = symbol
+        self.date = date
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    def __len__(self) -> int:
+        return len(self.date)
+
+    @classmethod
+    def empty(cls, symbol: str) -> "Bars":
+        return cls(symbol, np.empty(0, dtype="datetime64[D]"),
+                   *(np.empty(0, dtype=COLUMN_DTYPES[name]) for name in COLUMNS[1:]))
+
+
+class _MappedFile:
+    """종목 파일 하나의 메모리 맵과 컬럼 뷰"""
+
+    def __init__(self, path: str, mode: str = "r"):
+        stat = os.stat(path)
+        self.inode = (stat.st_ino, stat.st_size)
+        self.buffer = np.memmap(path, dtype=np.uint8, mode=mode)
+        self.header = self.buffer[:HEADER_DTYPE.itemsize].view(HEADER_DTYPE)
+        if self.header["magic"][0] != MAGIC:
+            raise ValueError(f"Not a bar file: {path}")
+        self.capacity = int(self.header["capacity"][0])
+        self.columns = {
+            name: self.buffer[self._offset(index):self._offset(index + 1)].view(COLUMN_DTYPES[name])
+            for index, name in enumerate(COLUMNS)
+        }
+
+    def _offset(self, index: int) -> int:
+        return HEADER_SIZE + index * self.capacity * ITEM_SIZE
+
+    @property
+    def count(self) -> int:
+        return int(self.header["count"][0])
+
+    @property
+    def writes(self) -> int:
+        return int(self.header["writes"][0])
+
+
+def _to_days(dates) -> np.ndarray:
+    return np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+
+
+def _write_file(path: str, columns: Dict[str, np.ndarray], capacity: int, writes: int = 0):
+    """columns로 새 파일을 만들어 path를 원자적으로 교체"""
+    count = len(columns["date"])
+    header = np.zeros(1, dtype=HEADER_DTYPE)
+    header["magic"], header["capacity"], header["count"], header["writes"] = MAGIC, capacity, count, writes
+    temp_path = f"{path}.tmp{os.getpid()}"
+    with open(temp_path, "wb") as f:
+        f.write(header.tobytes().ljust(HEADER_SIZE, b"\0"))
+        for name in COLUMNS:
+            block = np.zeros(capacity, dtype=COLUMN_DTYPES[name])
+            block[:count] = columns[name]
+            f.write(block.tobytes())
+    os.replace(temp_path, path)
+
+
+def _grow(capacity: int, needed: int) -> int:
+    while capacity < needed:
+        capacity *= 2
+    return capacity
+
+
+class BarStore:
+    """종목별 메모리 맵 일봉 저장소 (쓰기는 프로세스 하나에서만)"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._mapped: Dict[str, _MappedFile] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, symbol: str) -> str:
+        symbol = symbol.upper()
+        if not _SYMBOL_PATTERN.match(symbol):
+            raise ValueError(f"Invalid symbol: {symbol}")
+        return os.path.join(self.root, f"{symbol}.bars")
+
+    def _open(self, symbol: str) -> Optional[_MappedFile]:
+        """종목 파일의 읽기 전용 맵 (파일이 교체되었으면 다시 염)"""
+        path = self._path(symbol)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            mapped = self._mapped.get(symbol)
+            if mapped is None or mapped.inode != (stat.st_ino, stat.st_size):
+                mapped = self._mapped[symbol] = _MappedFile(path)
+            return mapped
+
+    def symbols(self) -> List[str]:
+        """저장된 종목 목록"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name[:-5] for name in os.listdir(self.root) if name.endswith(".bars"))
+
+    def coverage(self, symbol: str) -> Optional[Tuple[date, date, int]]:
+        """(첫 날짜, 마지막 날짜, 봉 수) (없으면 None)"""
+        mapped = self._open(symbol.upper())
+        if mapped is None or mapped.count == 0:
+            return None
+        dates = mapped.columns["date"]
+        first, last = np.array([dates[0], dates[mapped.count - 1]]).astype("datetime64[D]").tolist()
+        return first, last, mapped.count
+
+    def signature(self, symbol: str) -> Optional[Tuple[Tuple[int, int], int, int]]:
+        """(파일 식별자, 봉 수, 기록 횟수) (없으면 None), 값이 같으면 그 사이 기록이 없었음"""
+        mapped = self._open(symbol.upper())
+        if mapped is None:
+            return None
+        return mapped.inode, mapped.count, mapped.writes
+
+    def read(self, symbol: str, start: Optional[date] = None, end: Optional[date] = None) -> Bars:
+        """start <= date <= end 구간 일봉 (복사 없는 읽기 전용 뷰, 없으면 빈 배열)"""
+        symbol = symbol.upper()
+        mapped = self._open(symbol)
+        if mapped is None:
+            return Bars.empty(symbol)
+        count = mapped.count
+        dates = mapped.columns["date"][:count]
+        lo = int(np.searchsorted(dates, _to_days([start])[0], "left")) if start is not None else 0
+        hi = int(np.searchsorted(dates, _to_days([end])[0], "right")) if end is not None else count
+        return Bars(symbol, dates[lo:hi].view("datetime64[D]"),
+                    *(mapped.columns[name][lo:hi] for name in COLUMNS[1:]))
+
+    def write(self, symbol: str, dates, open, high, low, close, volume) -> int:
+        """일봉 기록 (같은 날짜는 덮어씀) → 기록한 행 수
+
+        마지막 날짜 이후의 봉은 빈 자리에 이어 쓰고, 기존 날짜는 제자리에서 갱신합니다.
+        기존 구간 중간에 없던 날짜가 들어오거나 자리가 부족하면 파일 전체를 다시 씁니다.
+        """
+        symbol = symbol.upper()
+        days = _to_days(dates)
+        if len(days) == 0:
+            return 0
+        values = {
+            "open": np.asarray(open, dtype=np.float64),
+            "high": np.asarray(high, dtype=np.float64),
+            "low": np.asarray(low, dtype=np.float64),
+            "close": np.asarray(close, dtype=np.float64),
+            "volume": np.asarray(volume, dtype=np.int64)
+        }
+        # 날짜순 정렬, 같은 날짜가 여러 번 있으면 마지막 값 사용
+        order = np.argsort(days, kind="stable")
+        days = days[order]
+        keep = np.append(days[1:] != days[:-1], True)
+        new = {"date": days[keep], **{name: column[order][keep] for name, column in values.items()}}
+
+        path = self._path(symbol)
+        os.makedirs(self.root, exist_ok=True)
+        if not os.path.exists(path):
+            _write_file(path, new, _grow(MIN_CAPACITY, len(new["date"])))
+            return len(new["date"])
+
+        mapped = _MappedFile(path, mode="r+")
+        count = mapped.count
+        writes = mapped.writes + 1
+        existing = mapped.columns["date"][:count]
+        positions = np.searchsorted(existing, new["date"])
+        exists = (positions < count) & (existing[np.minimum(positions, count - 1)] == new["date"]) \
+            if count else np.zeros(len(new["date"]), dtype=bool)
+        tail = ~exists & (positions == count)
+
+        if not np.all(exists | tail):
+            # 기존 구간 중간에 새 날짜 → 합쳐서 다시 쓰기
+            merged = {name: mapped.columns[name][:count].copy() for name in COLUMNS}
+            for name in COLUMNS:
+                merged[name][positions[exists]] = new[name][exists]
+            combined = {name: np.concatenate([merged[name], new[name][~exists]]) for name in COLUMNS}
+            order = np.argsort(combined["date"], kind="stable")
+            combined = {name: column[order] for name, column in combined.items()}
+            del mapped
+            _write_file(path, combined, _grow(MIN_CAPACITY, len(combined["date"])), writes)
+            return len(new["date"])
+
+        appended = int(tail.sum())
+        if count + appended > mapped.capacity:
+            merged = {name: np.concatenate([mapped.columns[name][:count], new[name][tail]]) for name in COLUMNS}
+            for name in COLUMNS:
+                merged[name][positions[exists]] = new[name][exists]
+            capacity = _grow(mapped.capacity, count + appended)
+            del mapped
+            _write_file(path, merged, capacity, writes)
+            return len(new["date"])
+
+        for name in COLUMNS:
+            column = mapped.columns[name]
+            column[positions[exists]] = new[name][exists]
+            column[count:count + appended] = new[name][tail]
+        mapped.buffer.flush()
+        mapped.header["count"] = count + appended  # 컬럼을 다 쓴 뒤에 count를 올림
+        mapped.header["writes"] = writes
+        mapped.buffer.flush()
+        return len(new["date"])
+
+
+def _default_root() -> str:
+    return os.environ.get("BAR_STORE_PATH") or os.path.join(os.path.dirname(__file__), "..", "database", "bars")
+
+
+bar_store = BarStore(_default_root())
+
+
+def load_from_database(conn, store: BarStore, symbols: Optional[Iterable[str]] = None,
+                       batch_size: int = 50000) -> Dict[str, int]:
+    """market_data → 바 저장소 (종목, 날짜 순으로 스트리밍해 종목 단위로 기록)"""
+    table = MarketData.__table__
+    query = select(table.c.symbol, table.c.date, table.c.open_price, table.c.high_price,
+                   table.c.low_price, table.c.close_price, table.c.volume).order_by(table.c.symbol, table.c.date)
+    if symbols is not None:
+        query = query.where(table.c.symbol.in_([symbol.upper() for symbol in symbols]))
+
+    result = conn.execute(query.execution_options(yield_per=batch_size))
+    loaded = {"symbols": 0, "bars": 0}
+    rows = (row for partition in result.partitions() for row in partition)
+    for symbol, group in groupby(rows, key=lambda row: row[0]):
+        _, dates, opens, highs, lows, closes, volumes = zip(*group)
+        store.write(symbol, dates,
+                    *(np.array(column, dtype=np.float64) for column in (opens, highs, lows, closes)),
+                    np.array([volume or 0 for volume in volumes], dtype=np.int64))
+        loaded["symbols"] += 1
+        loaded["bars"] += len(dates)
+    return loaded
+
+
+MARKET_DATA_UPDATE_COLUMNS = ("open_price", "high_price", "low_price", "close_price", "volume", "data_source")
+
+
+def upsert_market_data(conn, rows: List[Dict], chunk_size: int = 5000) -> int:
+    """market_data 대량 기록 ((symbol, date)가 같으면 OHLCV만 갱신)"""
+    table = MarketData.__table__
+    insert = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}.get(conn.dialect.name)
+    for offset in range(0, len(rows), chunk_size):
+        chunk = rows[offset:offset + chunk_size]
+        if insert is not None:
+            stmt = insert(table)
+            conn.execute(stmt.on_conflict_do_update(
+                index_elements=[table.c.symbol, table.c.date],
+                set_={name: stmt.excluded[name] for name in MARKET_DATA_UPDATE_COLUMNS}
+            ), chunk)
+        else:
+            for symbol, rows_for_symbol in groupby(chunk, key=lambda row: row["symbol"]):
+                conn.execute(delete(table).where(
+                    table.c.symbol == symbol, table.c.date.in_([row["date"] for row in rows_for_symbol])
+                ))
+            conn.execute(table.insert(), chunk)
+    return len(rows)
+
+
+def save_to_database(conn, store: BarStore, symbols: Optional[Iterable[str]] = None,
+                     start: Optional[date] = None, end: Optional[date] = None,
+                     chunk_size: int = 5000, data_source: str = "bar_store") -> Dict[str, int]:
+    """바 저장소 → market_data ((symbol, date)가 같으면 OHLCV만 갱신)"""
+    saved = {"symbols": 0, "bars": 0}
+    for symbol in (symbols if symbols is not None else store.symbols()):
+        bars = store.read(symbol, start, end)
+        if not len(bars):
+            continue
+        prices = [np.where(np.isnan(column), None, column).tolist()
+                  for column in (bars.open, bars.high, bars.low, bars.close)]
+        rows = [
+            {"symbol": bars.symbol, "date": day, "open_price": o, "high_price": h, "low_price": l,
+             "close_price": c, "volume": v, "data_source": data_source}
+            for day, o, h, l, c, v in zip(bars.date.tolist(), *prices, bars.volume.tolist())
+        ]
+        saved["bars"] += upsert_market_data(conn, rows, chunk_size)
+        saved["symbols"] += 1
+    # ORM을 거치지 않는 대량 적재이므로 데이터 버전을 직접 올림
+    bump_versions(conn, ["market_data"])
+    return saved
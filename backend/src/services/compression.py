@@ -0,0 +1,88 @@
+"""응답 압축 (Accept-Encoding 협상: brotli > gzip)
+
+min_size 바이트 이상인 텍스트/JSON 응답만 압축합니다. 스트리밍 응답(SSE, 내보내기),
+이미 인코딩된 응답, 304 등 본문이 없는 응답은 그대로 둡니다. brotli는 Brotli 패키지가
+설치된 경우에만 사용합니다.
+"""
+import gzip
+from typing import Optional
+
+from flask import Flask, Response, request
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json", "application/javascript", "application/xml", "image/svg+xml"
+}
+
+
+def _accepted_encodings(header: str) -> dict:
+    """Accept-Encoding 헤더 → {인코딩: q값}"""
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    return accepted
+
+
+def choose_encoding(header: Optional[str]) -> Optional[str]:
+    """클라이언트가 받는 인코딩 중 서버가 지원하는 가장 좋은 것 (없으면 None)"""
+    if not header:
+        return None
+    accepted = _accepted_encodings(header)
+    supported = (["br"] if brotli is not None else []) + ["gzip"]
+    candidates = [name for name in supported if accepted.get(name, accepted.get("*", 0)) > 0]
+    if not candidates:
+        return None
+    # q값이 같으면 압축률이 좋은 br 우선
+    return max(candidates, key=lambda name: (accepted.get(name, accepted.get("*", 0)), name == "br"))
+
+
+def compress(data: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=brotli_quality)
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+
+def _is_compressible(response: Response) -> bool:
+    mimetype = response.mimetype or ""
+    return mimetype.startswith("text/") or mimetype in COMPRESSIBLE_MIMETYPES
+
+
+def init_compression(app: Flask, min_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+    """앱에 응답 압축 after_request 훅 등록
+
+    brotli 품질은 응답마다 압축하므로 속도 위주(4)로, gzip은 기본 수준(6)을 사용합니다.
+    """
+    @app.after_request
+    def compress_response(response: Response) -> Response:
+        if (response.direct_passthrough or response.is_streamed
+                or response.status_code < 200 or response.status_code in (204, 206, 304)
+                or 'Content-Encoding' in response.headers or not _is_compressible(response)):
+            return response
+        response.vary.add('Accept-Encoding')
+
+        encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+        if encoding is None:
+            return response
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+
+        response.set_data(compress(data, encoding, gzip_level, brotli_quality))
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    return app
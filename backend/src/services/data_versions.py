@@ -0,0 +1,122 @@
+"""테이블별 데이터 버전과 조건부 GET (ETag / 304)
+
+ORM으로 변경된 테이블은 flush 시 같은 트랜잭션에서 data_versions의 카운터가 증가하고,
+ORM을 거치지 않는 대량 적재는 bump_versions를 직접 호출합니다. ETag는 응답 본문이 아니라
+엔드포인트가 읽는 테이블들의 버전으로 계산하므로, If-None-Match가 맞으면 엔드포인트의
+쿼리를 실행하지 않고 304를 반환합니다. 여러 워커가 같은 DB를 쓰면 버전도 공유됩니다.
+"""
+import hashlib
+from datetime import date, datetime
+from functools import wraps
+from typing import Callable, Dict, Iterable, Optional, Sequence
+
+from flask import Response, make_response, request
+from sqlalchemy import event, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from src.models.trading import DataVersion, db
+
+
+def today_key() -> str:
+    """시장 상황 스냅샷은 DB 변경 없이 날짜가 바뀌면 달라지므로 날짜를 ETag에 포함"""
+    return date.today().isoformat()
+
+
+def bump_versions(conn, tables: Iterable[str]):
+    """tables의 버전 증가 (없는 테이블은 1로 추가)"""
+    tables = sorted(set(tables))
+    if not tables:
+        return
+    table = DataVersion.__table__
+    now = datetime.utcnow()
+    insert = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}.get(conn.dialect.name)
+    if insert is not None:
+        stmt = insert(table)
+        conn.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.table_name],
+            set_={"version": table.c.version + 1, "updated_at": stmt.excluded.updated_at}
+        ), [{"table_name": name, "version": 1, "updated_at": now} for name in tables])
+        return
+    for name in tables:
+        result = conn.execute(
+            update(table).where(table.c.table_name == name)
+            .values(version=table.c.version + 1, updated_at=now)
+        )
+        if result.rowcount == 0:
+            conn.execute(table.insert().values(table_name=name, version=1, updated_at=now))
+
+
+def get_versions(tables: Sequence[str]) -> Dict[str, int]:
+    """tables의 현재 버전 (변경된 적이 없으면 0)"""
+    rows = db.session.execute(
+        select(DataVersion.table_name, DataVersion.version).where(DataVersion.table_name.in_(tables))
+    ).all()
+    versions = dict.fromkeys(tables, 0)
+    versions.update(rows)
+    return versions
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_flushed_tables(session, flush_context):
+    """flush된 ORM 변경이 있는 테이블의 버전을 같은 트랜잭션에서 증가"""
+    changed = {obj.__table__.name for obj in session.new}
+    changed.update(obj.__table__.name for obj in session.deleted)
+    changed.update(obj.__table__.name for obj in session.dirty if session.is_modified(obj))
+    changed.discard(DataVersion.__tablename__)
+    if changed:
+        bump_versions(session.connection(), changed)
+
+
+def compute_etag(tables: Sequence[str], extra: Optional[Callable[[], str]] = None) -> str:
+    """URL(쿼리 포함) + 테이블 버전 (+ 추가 값) → 약한 ETag"""
+    versions = get_versions(tables) if tables else {}
+    key = "|".join([request.full_path] + [f"{name}:{versions[name]}" for name in sorted(versions)])
+    if extra is not None:
+        key += "|" + extra()
+    # 압축 등으로 바이트가 달라도 같은 데이터면 같은 ETag이므로 약한 검증자(W/) 사용
+    return 'W/"' + hashlib.blake2b(key.encode(), digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(etag: str) -> bool:
+    """If-None-Match에 etag가 있는지 (약한 비교)"""
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    candidates = {value.strip().removeprefix('W/') for value in header.split(',')}
+    return etag.removeprefix('W/') in candidates
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    response = Response(status=304)
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+
+def conditional_get(tables: Sequence[str] = (), cache_control: str = 'private, no-cache',
+                    extra: Optional[Callable[[], str]] = None):
+    """조건부 GET 데코레이터
+
+    tables: 응답이 의존하는 테이블 (tables와 extra가 모두 없으면 ETag 없이 Cache-Control만 설정)
+    cache_control: 응답과 304에 설정할 Cache-Control
+    extra: 테이블 외에 응답을 바꾸는 값 (예: 오늘 날짜)
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = compute_etag(tables, extra) if tables or extra else None
+            if etag and etag_matches(etag):
+                return not_modified(etag, cache_control)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                if etag:
+                    response.headers['ETag'] = etag
+                response.headers['Cache-Control'] = cache_control
+            return response
+        return wrapper
+    return decorator
+
@@ -0,0 +1,420 @@
+"""손절/익절 트리거 인덱스와 열린 포지션 감시
+
+trades의 매수 거래마다 기록된 stop_loss/take_profit을 종목별 정렬 목록으로 유지하다가 새 가격이
+오면 닿은 트리거만 이분 탐색으로 찾아 청산 거래를 만듭니다 (포지션 수 n, 발동 k건에 O(log n + k)).
+
+- 손절 목록은 손절가 오름차순이며 가격 <= 손절가인 항목은 항상 뒤쪽 구간입니다. 익절 목록은
+  -익절가 오름차순으로 두어 가격 >= 익절가인 항목도 뒤쪽 구간이 되므로, 발동한 항목은 목록
+  끝에서 잘라 냅니다.
+- 한쪽이 발동하거나 포지션이 매도로 닫히면 다른 쪽 항목은 표시만 하고 (stale) 잘라 낼 때
+  버립니다. 버려진 항목이 절반을 넘으면 목록을 다시 만듭니다 (주문장과 같은 방식).
+- 열린 포지션은 (로봇, 종목)별 매수 묶음(lot)입니다. exit_of가 있는 매도는 그 매수를 닫고,
+  없는 매도(로봇 런타임 청산, 모의 거래소 체결 등)는 먼저 산 묶음부터 수량을 차감합니다 (FIFO).
+  이 저장소의 로봇/백테스트는 매수 진입만 하므로 매도로 시작하는 공매도 포지션은 두지 않습니다.
+- ExitMonitor는 trades를 ID 순으로 이어 읽어 (sync) 다른 프로세스나 Core 일괄 삽입으로 들어온
+  거래도 반영하고, 시세 피드의 새 봉마다 트리거를 검사해 청산 거래를 TradeBatchWriter로 기록합니다.
+  청산은 그 봉의 종가로 하며 (갭이면 손절가보다 불리할 수 있음) exit_of에 매수 거래 ID를 남깁니다.
+"""
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import deque
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+
+from src.models.trading import Trade
+from src.services.backtest import EXIT_REASONS, EXIT_STOP, EXIT_TARGET
+from src.services.robot_runtime import TradeBatchWriter
+from src.services.stock_data_service import stock_service
+
+COMPACT_MIN_STALE = 1024
+SYNC_BATCH = 10000
+
+POSITION_COLUMNS = ("id", "robot_id", "symbol", "trade_type", "quantity", "price", "stop_loss", "take_profit",
+                    "trade_date", "exit_of")
+
+
+class OpenPosition:
+    """열린 매수 묶음 (open이 False면 닫힌 것으로 봄)"""
+
+    __slots__ = ("trade_id", "robot_id", "symbol", "quantity", "entry_price", "stop_loss", "take_profit",
+                 "opened_at", "open")
+
+    def __init__(self, trade_id: int, robot_id: int, symbol: str, quantity: int, entry_price: float,
+                 stop_loss: Optional[float], take_profit: Optional[float], opened_at: Optional[datetime] = None):
+        self.trade_id = trade_id
+        self.robot_id = robot_id
+        self.symbol = symbol
+        self.quantity = quantity
+        self.entry_price = entry_price
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.opened_at = opened_at
+        self.open = True
+
+    @property
+    def legs(self) -> int:
+        """인덱스에 들어가는 트리거 수"""
+        return (self.stop_loss is not None) + (self.take_profit is not None)
+
+
+class SymbolTriggers:
+    """한 종목의 손절/익절 정렬 목록 (키 목록과 같은 순서의 포지션 목록)"""
+
+    __slots__ = ("stop_keys", "stops", "target_keys", "targets", "stale")
+
+    def __init__(self):
+        self.stop_keys: List[float] = []  # 손절가 오름차순
+        self.stops: List[OpenPosition] = []
+        self.target_keys: List[float] = []  # -익절가 오름차순
+        self.targets: List[OpenPosition] = []
+        self.stale = 0  # 닫혔지만 목록에 남은 항목 수
+
+    def __len__(self) -> int:
+        return len(self.stops) + len(self.targets)
+
+    def add(self, position: OpenPosition):
+        # 같은 가격이면 먼저 들어온 포지션이 앞에 오도록 bisect_right
+        if position.stop_loss is not None:
+            i = bisect_right(self.stop_keys, position.stop_loss)
+            self.stop_keys.insert(i, position.stop_loss)
+            self.stops.insert(i, position)
+        if position.take_profit is not None:
+            key = -position.take_profit
+            i = bisect_right(self.target_keys, key)
+            self.target_keys.insert(i, key)
+            self.targets.insert(i, position)
+
+    def crossed(self, price: float) -> Tuple[Sequence[OpenPosition], Sequence[OpenPosition]]:
+        """가격이 닿은 (손절 항목, 익절 항목)을 목록에서 잘라 반환 (닫힌 포지션 포함)"""
+        stops = targets = ()
+        # 대부분의 틱은 아무것도 닿지 않으므로 맨 뒤 항목만 먼저 비교
+        keys = self.stop_keys
+        if keys and keys[-1] >= price:
+            i = bisect_left(keys, price)  # 손절가 >= 가격
+            stops = self.stops[i:]
+            del keys[i:], self.stops[i:]
+        keys = self.target_keys
+        if keys and keys[-1] >= -price:
+            j = bisect_left(keys, -price)  # 익절가 <= 가격
+            targets = self.targets[j:]
+            del keys[j:], self.targets[j:]
+        return stops, targets
+
+    def compact(self):
+        """닫힌 항목이 많으면 목록을 다시 만듦"""
+        if self.stale < COMPACT_MIN_STALE or self.stale * 2 < len(self):
+            return
+        for keys, positions in ((self.stop_keys, self.stops), (self.target_keys, self.targets)):
+            kept = [(key, position) for key, position in zip(keys, positions) if position.open]
+            keys[:] = [key for key, _ in kept]
+            positions[:] = [position for _, position in kept]
+        self.stale = 0
+
+
+class TriggerIndex:
+    """종목별 손절/익절 트리거 모음 (잠금은 호출하는 쪽에서)"""
+
+    def __init__(self):
+        self.books: Dict[str, SymbolTriggers] = {}
+        self.positions: Dict[int, OpenPosition] = {}  # 매수 거래 ID → 트리거가 걸린 열린 포지션
+        self.fired = 0
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def add(self, position: OpenPosition):
+        if not position.legs:
+            return
+        book = self.books.get(position.symbol)
+        if book is None:
+            book = self.books[position.symbol] = SymbolTriggers()
+        book.add(position)
+        self.positions[position.trade_id] = position
+
+    def remove(self, position: OpenPosition):
+        """포지션을 닫음 (목록의 항목은 잘라 낼 때나 compact에서 버림)"""
+        position.open = False
+        if self.positions.pop(position.trade_id, None) is not None:
+            book = self.books[position.symbol]
+            book.stale += position.legs
+            book.compact()
+
+    def check(self, symbol: str, price: float) -> List[Tuple[OpenPosition, int]]:
+        """price에 닿은 포지션을 닫고 (포지션, EXIT_STOP|EXIT_TARGET) 목록 반환 (매수 거래 순서)"""
+        book = self.books.get(symbol)
+        if book is None:
+            return []
+        stops, targets = book.crossed(price)
+        if not stops and not targets:
+            return []
+        hits = []
+        for reason, positions in ((EXIT_STOP, stops), (EXIT_TARGET, targets)):
+            for position in positions:
+                if not position.open:
+                    book.stale -= 1
+                    continue
+                position.open = False
+                del self.positions[position.trade_id]
+                # 반대쪽 트리거는 목록에 남아 있음
+                book.stale += position.legs - 1
+                hits.append((position, reason))
+        self.fired += len(hits)
+        book.compact()
+        hits.sort(key=lambda hit: hit[0].trade_id)
+        return hits
+
+    def stats(self) -> Dict:
+        return {
+            'open_positions': len(self.positions),
+            'symbols': sum(1 for book in self.books.values() if len(book)),
+            'triggers': sum(len(book) for book in self.books.values()),
+            'stale': sum(book.stale for book in self.books.values()),
+            'fired': self.fired
+        }
+
+
+def exit_row(position: OpenPosition, price: float, reason: int, at: datetime,
+             market_condition: Optional[str] = None) -> Dict:
+    """발동한 포지션 → 청산 매도 trades 행"""
+    info = stock_service.symbol_index.get(position.symbol)
+    return_pct = (price / position.entry_price - 1) * 100 if position.entry_price else None
+    level = position.stop_loss if reason == EXIT_STOP else position.take_profit
+    return {
+        "robot_id": position.robot_id,
+        "symbol": position.symbol,
+        "company_name": (info.name if info is not None else None) or f"{position.symbol} Inc.",
+        "trade_type": "SELL",
+        "quantity": position.quantity,
+        "price": round(price, 2),
+        "total_amount": round(price * position.quantity, 2),
+        "trade_date": at,
+        "reason": (f"{EXIT_REASONS[reason]} ({'손절가' if reason == EXIT_STOP else '익절가'} {level:,.2f}, "
+                   f"매수 #{position.trade_id} {position.entry_price:,.2f} → {price:,.2f})"),
+        "market_condition": market_condition,
+        "sector": info.sector if info is not None else None,
+        "market_cap": info.market_cap if info is not None else None,
+        "market_price_at_trade": round(price, 2),
+        "expected_return": round(return_pct, 2) if return_pct is not None else None,
+        "stop_loss": position.stop_loss,
+        "take_profit": position.take_profit,
+        "holding_period": (at - position.opened_at).days if position.opened_at is not None else None,
+        "exit_of": position.trade_id
+    }
+
+
+class ExitMonitor:
+    """열린 포지션의 손절/익절을 시세 피드의 새 봉마다 검사하는 백그라운드 감시"""
+
+    def __init__(self, robot_ids: Optional[Sequence[int]] = None, batch_size: int = 500,
+                 flush_interval: float = 1.0, sync_interval: float = 1.0, poll: float = 0.05):
+        self.robot_ids = set(robot_ids) if robot_ids else None  # 지정하면 이 로봇들의 포지션만
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sync_interval = sync_interval
+        self.poll = poll
+        self.index = TriggerIndex()
+        self.engine = None
+        self.feed = None
+        self.writer: Optional[TradeBatchWriter] = None
+        self.last_id = 0  # 읽은 마지막 거래 ID
+        self.last_prices: Dict[str, float] = {}  # 종목 → 마지막 거래 가격
+        self._lots: Dict[Tuple[int, str], deque] = {}  # (로봇, 종목) → 열린 매수 묶음 (먼저 산 순서)
+        self._by_id: Dict[int, OpenPosition] = {}  # 매수 거래 ID → 열린 묶음 (트리거 없는 묶음 포함)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.ticks = 0
+        self.exits = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self.last_tick_ms = 0.0
+        self.max_tick_ms = 0.0
+        self._tick_total = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # -- 포지션 장부 --
+
+    def apply(self, trades: Iterable[tuple]):
+        """POSITION_COLUMNS 순서의 거래 행을 ID 순으로 반영 (이미 읽은 ID는 건너뜀)"""
+        with self._lock:
+            for trade_id, robot_id, symbol, trade_type, quantity, price, stop_loss, take_profit, \
+                    trade_date, exit_of in trades:
+                if trade_id <= self.last_id:
+                    continue
+                self.last_id = trade_id
+                if self.robot_ids is not None and robot_id not in self.robot_ids:
+                    continue
+                self.last_prices[symbol] = price
+                if trade_type == "BUY":
+                    position = OpenPosition(trade_id, robot_id, symbol, quantity, price, stop_loss, take_profit,
+                                            trade_date)
+                    self._lots.setdefault((robot_id, symbol), deque()).append(position)
+                    self._by_id[trade_id] = position
+                    self.index.add(position)
+                elif exit_of is not None:
+                    position = self._by_id.get(exit_of)
+                    if position is not None:
+                        self._reduce(position, quantity)
+                else:
+                    self._sell_fifo(robot_id, symbol, quantity)
+
+    def _reduce(self, position: OpenPosition, quantity: int) -> int:
+        """묶음에서 quantity만큼 차감 (다 팔리면 닫음) → 차감한 수량"""
+        taken = min(quantity, position.quantity)
+        position.quantity -= taken
+        if not position.quantity:
+            self._close(position)
+        return taken
+
+    def _close(self, position: OpenPosition):
+        self.index.remove(position)
+        self._closed(position)
+
+    def _closed(self, position: OpenPosition):
+        """닫힌 묶음을 장부에서 정리 (묶음 목록은 앞쪽의 닫힌 묶음만 버림)"""
+        self._by_id.pop(position.trade_id, None)
+        key = (position.robot_id, position.symbol)
+        lots = self._lots.get(key)
+        while lots and not lots[0].open:
+            lots.popleft()
+        if lots is not None and not lots:
+            del self._lots[key]
+
+    def _sell_fifo(self, robot_id: int, symbol: str, quantity: int):
+        lots = self._lots.get((robot_id, symbol))
+        while quantity and lots:
+            position = lots[0]
+            if position.open:
+                quantity -= self._reduce(position, quantity)
+            else:
+                lots.popleft()
+
+    def sync(self, engine=None) -> int:
+        """last_id 이후의 거래를 읽어 포지션 반영 → 읽은 거래 수"""
+        engine = engine or self.engine
+        table = Trade.__table__
+        columns = [table.c[name] for name in POSITION_COLUMNS]
+        count = 0
+        query = select(*columns)
+        if self.robot_ids is not None:
+            query = query.where(table.c.robot_id.in_(self.robot_ids))
+        with engine.connect() as conn:
+            while True:
+                rows = conn.execute(query.where(table.c.id > self.last_id)
+                                    .order_by(table.c.id).limit(SYNC_BATCH)).all()
+                self.apply(rows)
+                count += len(rows)
+                if len(rows) < SYNC_BATCH:
+                    return count
+
+    def open_lots(self) -> Dict[Tuple[int, str], List[OpenPosition]]:
+        """(로봇, 종목) → 열린 매수 묶음 (먼저 산 순서)"""
+        with self._lock:
+            lots = {key: [position for position in positions if position.open]
+                    for key, positions in self._lots.items()}
+        return {key: positions for key, positions in lots.items() if positions}
+
+    def open_symbols(self) -> List[str]:
+        """트리거가 걸린 열린 포지션이 있는 종목"""
+        with self._lock:
+            return sorted({position.symbol for position in self.index.positions.values()})
+
+    # -- 가격 검사 --
+
+    def check_prices(self, prices: Iterable[Tuple[str, float]], at: Optional[datetime] = None) -> List[Dict]:
+        """(종목, 가격)마다 닿은 트리거를 발동시켜 청산 거래 행 목록 반환"""
+        at = at or datetime.utcnow()
+        rows, market_condition = [], None
+        with self._lock:
+            for symbol, price in prices:
+                hits = self.index.check(symbol, price)
+                if not hits:
+                    continue
+                if market_condition is None:
+                    market_condition = stock_service.market_conditions.get()["overall_sentiment"]
+                for position, reason in hits:
+                    self._closed(position)
+                    rows.append(exit_row(position, price, reason, at, market_condition))
+        self.exits += len(rows)
+        return rows
+
+    def on_snapshot(self, snapshot) -> List[Dict]:
+        """피드 봉의 종가로 트리거 검사 (트리거가 있는 종목만)"""
+        start = time.perf_counter()
+        close = snapshot.bars.close[:, -1].tolist()
+        rows_of = snapshot.rows
+        prices = [(symbol, close[rows_of[symbol]]) for symbol in list(self.index.books) if symbol in rows_of]
+        rows = self.check_prices(prices, snapshot.at)
+        elapsed = (time.perf_counter() - start) * 1000
+        self.ticks += 1
+        self._tick_total += elapsed
+        self.last_tick_ms = elapsed
+        self.max_tick_ms = max(self.max_tick_ms, elapsed)
+        return rows
+
+    # -- 실행 --
+
+    def start(self, engine, feed):
+        """기록 스레드와 감시 스레드 시작 (feed의 tick은 호출하는 쪽에서 관리)"""
+        if self.running:
+            return
+        self.engine = engine
+        self.feed = feed
+        self.writer = TradeBatchWriter(engine, self.batch_size, self.flush_interval)
+        self.writer.start()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="exit-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self.writer is not None:
+            self.writer.stop(timeout)
+
+    def _run(self):
+        generation = self.feed.snapshot().generation
+        sync_at = time.monotonic() + self.sync_interval
+        while not self._stop.wait(self.poll):
+            try:
+                if time.monotonic() >= sync_at:
+                    self.sync()
+                    sync_at = time.monotonic() + self.sync_interval
+                snapshot = self.feed.snapshot()
+                if snapshot.generation == generation:
+                    continue
+                generation = snapshot.generation
+                rows = self.on_snapshot(snapshot)
+                if rows:
+                    self.writer.add(rows)
+            except Exception as e:
+                self.errors += 1
+                self.last_error = str(e)
+                print(f"Error checking exit triggers: {e}")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            index = self.index.stats()
+            lots = len(self._by_id)
+        return {
+            'running': self.running,
+            'last_trade_id': self.last_id,
+            'open_lots': lots,
+            **index,
+            'ticks': self.ticks,
+            'exits': self.exits,
+            'avg_tick_ms': round(self._tick_total / self.ticks, 3) if self.ticks else None,
+            'last_tick_ms': round(self.last_tick_ms, 3),
+            'max_tick_ms': round(self.max_tick_ms, 3),
+            'errors': self.errors,
+            'last_error': self.last_error,
+            'writer': self.writer.stats() if self.writer is not None else None
+        }
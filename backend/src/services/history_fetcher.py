@@ -0,0 +1,252 @@
+"""과거 일봉 수집기 (Polygon range aggregates + 수집 구간 캐시)
+
+종목별로 이미 받아 온 날짜 구간을 디스크(SQLite 파일)에 기록해 두고, 요청 구간 중 빠진
+부분(gap)만 /v2/aggs/ticker/{symbol}/range/1/day/{from}/{to}로 받아 옵니다. 여러 종목을
+스레드 풀에서 동시에 받되 전체 요청 속도는 토큰 버킷으로 제한하고, 받은 봉은 호출한
+스레드 하나에서 market_data에 (symbol, date) 기준으로 upsert한 뒤 구간을 캐시에 기록합니다.
+따라서 전체 종목 이력 적재를 다시 실행하면 새로 생긴 날짜의 봉만 받아 옵니다.
+
+당일처럼 아직 확정되지 않은 날짜는 구간 캐시에 기록하지 않아 다음 실행 때 다시 받습니다.
+"""
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.services.bar_store import BarStore, upsert_market_data
+from src.services.data_versions import bump_versions
+from src.services.response_cache import response_cache
+
+DateRange = Tuple[date, date]
+
+
+class CoverageCache:
+    """종목별 수집 완료 날짜 구간 (양끝 포함, 겹치거나 붙은 구간은 합침)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS coverage ("
+            "symbol TEXT NOT NULL, start TEXT NOT NULL, end TEXT NOT NULL, PRIMARY KEY (symbol, start))"
+        )
+
+    def ranges(self, symbol: str) -> List[DateRange]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT start, end FROM coverage WHERE symbol = ? ORDER BY start", (symbol,)
+            ).fetchall()
+        return [(date.fromisoformat(start), date.fromisoformat(end)) for start, end in rows]
+
+    def missing(self, symbol: str, start: date, end: date) -> List[DateRange]:
+        """start~end 중 아직 수집하지 않은 구간 목록"""
+        gaps, cursor = [], start
+        for covered_start, covered_end in self.ranges(symbol):
+            if covered_end < cursor:
+                continue
+            if covered_start > end:
+                break
+            if covered_start > cursor:
+                gaps.append((cursor, covered_start - timedelta(days=1)))
+            cursor = max(cursor, covered_end + timedelta(days=1))
+            if cursor > end:
+                break
+        if cursor <= end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def add(self, symbol: str, start: date, end: date):
+        """수집 완료 구간 기록 (기존 구간과 합침)"""
+        if end < start:
+            return
+        merged_start, merged_end = start, end
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT start, end FROM coverage WHERE symbol = ? AND start <= ? AND end >= ?",
+                    (symbol, (end + timedelta(days=1)).isoformat(), (start - timedelta(days=1)).isoformat())
+                ).fetchall()
+                for covered_start, covered_end in rows:
+                    merged_start = min(merged_start, date.fromisoformat(covered_start))
+                    merged_end = max(merged_end, date.fromisoformat(covered_end))
+                self._conn.executemany(
+                    "DELETE FROM coverage WHERE symbol = ? AND start = ?",
+                    [(symbol, covered_start) for covered_start, _ in rows]
+                )
+                self._conn.execute(
+                    "INSERT INTO coverage (symbol, start, end) VALUES (?, ?, ?)",
+                    (symbol, merged_start.isoformat(), merged_end.isoformat())
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def clear(self, symbols: Optional[Iterable[str]] = None):
+        with self._lock:
+            if symbols is None:
+                self._conn.execute("DELETE FROM coverage")
+            else:
+                self._conn.executemany("DELETE FROM coverage WHERE symbol = ?", [(s,) for s in symbols])
+
+
+class RateLimiter:
+    """초당 rate회, 최대 burst회까지 몰아서 허용하는 토큰 버킷 (rate가 None이면 제한 없음)"""
+
+    def __init__(self, rate: Optional[float], burst: int = 1):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def _bar_date(timestamp_ms: int) -> date:
+    """Polygon 봉 시작 시각(UTC 밀리초) → 거래일"""
+    return datetime.fromtimestamp(timestamp_ms / 1000, timezone.utc).date()
+
+
+class HistoryFetcher:
+    """종목별 과거 일봉 수집기 (HTTP 세션과 API 키는 StockDataService의 것을 사용)"""
+
+    def __init__(self, service, coverage: CoverageCache, rate_limit: Optional[float] = 5.0,
+                 max_workers: int = 8, page_limit: int = 50000, write_batch_size: int = 5000):
+        self.service = service
+        self.coverage = coverage
+        self.limiter = RateLimiter(rate_limit, burst=max_workers)
+        self.max_workers = max_workers
+        self.page_limit = page_limit
+        self.write_batch_size = write_batch_size
+        self._requests = 0
+        self._requests_lock = threading.Lock()
+
+    def _get(self, url: str, params: Dict) -> Dict:
+        self.limiter.acquire()
+        with self._requests_lock:
+            self._requests += 1
+        response = self.service.session.get(url, params=params, timeout=self.service.timeout)
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}")
+        return response.json()
+
+    def fetch_range(self, symbol: str, start: date, end: date) -> List[Dict]:
+        """start~end 일봉 (market_data 행 형태, 날짜순, next_url 페이지를 따라감)"""
+        url = f"{self.service.base_url}/v2/aggs/ticker/{symbol}/range/1/day/{start.isoformat()}/{end.isoformat()}"
+        params = {"adjusted": "true", "sort": "asc", "limit": self.page_limit,
+                  "apikey": self.service.polygon_api_key}
+        rows = []
+        while url:
+            data = self._get(url, params)
+            for bar in data.get("results") or []:
+                rows.append({
+                    "symbol": symbol,
+                    "date": _bar_date(bar["t"]),
+                    "open_price": bar.get("o"),
+                    "high_price": bar.get("h"),
+                    "low_price": bar.get("l"),
+                    "close_price": bar.get("c"),
+                    "volume": int(bar["v"]) if bar.get("v") is not None else None,
+                    "data_source": "polygon"
+                })
+            url = data.get("next_url")
+            params = {"apikey": self.service.polygon_api_key}
+        return rows
+
+    def _fetch_gaps(self, symbol: str, gaps: List[DateRange]) -> List[Dict]:
+        rows = []
+        for gap_start, gap_end in gaps:
+            rows.extend(self.fetch_range(symbol, gap_start, gap_end))
+        return rows
+
+    def load(self, engine, symbols: Iterable[str], start: date, end: Optional[date] = None,
+             store: Optional[BarStore] = None, refresh: bool = False) -> Dict:
+        """symbols의 start~end 일봉 중 빠진 구간만 받아 market_data에 기록
+
+        store가 있으면 받은 봉을 바 저장소에도 기록합니다.
+        refresh=True면 구간 캐시를 무시하고 전체 구간을 다시 받습니다.
+        """
+        end = end or date.today()
+        # 당일(또는 미래) 봉은 아직 바뀔 수 있으므로 구간 캐시에는 어제까지만 기록
+        final_day = min(end, date.today() - timedelta(days=1))
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+        requests_before = self._requests
+        stats = {"symbols": len(symbols), "up_to_date": 0, "fetched_symbols": 0, "gaps": 0,
+                 "bars": 0, "failed": {}}
+
+        work = {}
+        for symbol in symbols:
+            gaps = [(start, end)] if refresh else self.coverage.missing(symbol, start, end)
+            if gaps:
+                work[symbol] = gaps
+            else:
+                stats["up_to_date"] += 1
+
+        pending_rows, pending_symbols = [], []
+
+        def flush():
+            """모아 둔 봉을 한 트랜잭션으로 기록하고, 커밋된 뒤에 구간 캐시 갱신"""
+            if pending_rows:
+                with engine.begin() as conn:
+                    upsert_market_data(conn, pending_rows, self.write_batch_size)
+                    bump_versions(conn, ["market_data"])
+            for symbol in pending_symbols:
+                for gap_start, gap_end in work[symbol]:
+                    self.coverage.add(symbol, gap_start, min(gap_end, final_day))
+            pending_rows.clear()
+            pending_symbols.clear()
+
+        # 기록은 호출한 스레드에서만 (SQLite 쓰기 경합 방지), 여러 종목을 모아 write_batch_size 행 단위로
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="history-fetch") as executor:
+            futures = {executor.submit(self._fetch_gaps, symbol, gaps): symbol for symbol, gaps in work.items()}
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    rows = future.result()
+                except Exception as e:
+                    stats["failed"][symbol] = str(e)
+                    continue
+                if rows and store is not None:
+                    store.write(symbol, [row["date"] for row in rows],
+                                *([row[name] if row[name] is not None else float("nan") for row in rows]
+                                  for name in ("open_price", "high_price", "low_price", "close_price")),
+                                [row["volume"] or 0 for row in rows])
+                pending_rows.extend(rows)
+                pending_symbols.append(symbol)
+                stats["fetched_symbols"] += 1
+                stats["gaps"] += len(work[symbol])
+                stats["bars"] += len(rows)
+                if len(pending_rows) >= self.write_batch_size:
+                    flush()
+            flush()
+
+        if stats["bars"]:
+            response_cache.invalidate_tags(["market_data"])
+        stats["requests"] = self._requests - requests_before
+        return stats
+
+
+def default_coverage_path() -> str:
+    return os.environ.get("HISTORY_CACHE_PATH") or os.path.join(
+        os.path.dirname(__file__), "..", "database", "history_coverage.db"
+    )
@@ -0,0 +1,391 @@
+"""기술적 지표 계산 (RSI, MACD, SMA/EMA, 거래량 비율)
+
+- 배치: 종목 x 봉 2차원 배열을 한 번에 계산 (행마다 앞쪽이 NaN인 길이가 다른 이력 허용).
+  SMA는 누적합으로, EMA/Wilder 평활은 시간축으로 한 번 순회하며 전 종목을 벡터 연산
+- 스트리밍: 종목별 상태(IndicatorState)를 두고 새 봉마다 O(1)로 갱신. 저장소에 기록이 없었으면
+  (BarStore.signature) 조회도 O(1)이고, 기록이 있었을 때만 반영한 봉 전체의 체크섬(O(n))으로 이미 반영한
+  봉이 바뀌었는지 확인해 다시 계산합니다 (마지막 봉 제자리 갱신은 그 직전 상태에서, 중간 봉이 바뀌거나
+  끼어들면 처음부터)
+
+두 방식은 같은 정의를 사용합니다.
+- EMA(n): 처음 n개 값의 단순 평균으로 시작해 alpha = 2 / (n + 1)로 갱신
+- RSI(n): Wilder 평활 (처음 n개 변화량의 평균으로 시작, alpha = 1 / n).
+  평균 하락폭이 0이면 100 (상승폭도 0이면 50)
+- MACD(12, 26, 9): EMA12 - EMA26, 시그널은 MACD 값의 EMA9
+- 거래량 비율: 당일 거래량 / 직전 20일 평균 거래량
+"""
+import copy
+import threading
+import zlib
+from collections import deque
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.services.bar_store import bar_store
+
+RSI_PERIOD = 14
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+SMA_SHORT, SMA_LONG = 20, 50
+VOLUME_PERIOD = 20
+
+# Trade 컬럼에 저장하는 지표와 반올림 자릿수
+TRADE_INDICATORS = {
+    "rsi": 2,
+    "macd": 3,
+    "moving_avg_20": 2,
+    "moving_avg_50": 2,
+    "volume_ratio": 2
+}
+
+
+# ---- 배치 (NumPy) ----
+
+def _as_rows(values) -> np.ndarray:
+    return np.atleast_2d(np.asarray(values, dtype=np.float64))
+
+
+def sma(values, period: int) -> np.ndarray:
+    """단순 이동평균 (마지막 축 기준, 유효 값이 period개 미만인 자리는 NaN)"""
+    rows = _as_rows(values)
+    valid = ~np.isnan(rows)
+    sums = np.concatenate([np.zeros((rows.shape[0], 1)), np.cumsum(np.where(valid, rows, 0.0), axis=1)], axis=1)
+    out = np.full(rows.shape, np.nan)
+    out[:, period - 1:] = (sums[:, period:] - sums[:, :-period]) / period
+    out[np.cumsum(valid, axis=1) < period] = np.nan
+    return out
+
+
+def _smooth(values, period, alpha) -> np.ndarray:
+    """처음 period개 평균으로 시작하는 지수 평활 (시간축 순회, 종목 방향은 벡터 연산)
+
+    period/alpha는 스칼라 또는 행마다 다른 값의 배열 (여러 지표를 한 번의 순회로 계산)
+    """
+    rows = _as_rows(values)
+    count = rows.shape[0]
+    period = np.broadcast_to(np.asarray(period, dtype=np.int64), (count,))
+    alpha = np.broadcast_to(np.asarray(alpha, dtype=np.float64), (count,))
+    series = rows.T.copy()  # 시간축 순회 시 한 시점의 전 종목 값이 연속되도록
+    out = np.empty_like(series)
+    seen = np.zeros(count, dtype=np.int64)
+    seed = np.zeros(count)
+    current = np.full(count, np.nan)
+    for t in range(series.shape[0]):
+        x = series[t]
+        valid = ~np.isnan(x)
+        seen += valid
+        seed += np.where(valid & (seen <= period), x, 0.0)
+        current = np.where(valid & (seen == period), seed / period,
+                           np.where(valid & (seen > period), current + alpha * (x - current), current))
+        out[t] = np.where(seen >= period, current, np.nan)
+    return out.T
+
+
+def ema(values, period: int) -> np.ndarray:
+    """지수 이동평균 (alpha = 2 / (period + 1))"""
+    return _smooth(values, period, 2.0 / (period + 1))
+
+
+def _gains_losses(close: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """전일 대비 상승폭/하락폭 (첫 봉은 NaN)"""
+    change = np.full(close.shape, np.nan)
+    change[:, 1:] = close[:, 1:] - close[:, :-1]
+    missing = np.isnan(change)
+    return np.where(missing, np.nan, np.maximum(change, 0.0)), np.where(missing, np.nan, np.maximum(-change, 0.0))
+
+
+def _rsi_from_averages(avg_gain: np.ndarray, avg_loss: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    out = np.where(avg_loss == 0, np.where(avg_gain == 0, 50.0, 100.0), out)
+    return np.where(np.isnan(avg_gain), np.nan, out)
+
+
+def rsi(close, period: int = RSI_PERIOD) -> np.ndarray:
+    """Wilder RSI"""
+    gains, losses = _gains_losses(_as_rows(close))
+    averages = _smooth(np.concatenate([gains, losses]), period, 1.0 / period)
+    avg_gain, avg_loss = np.split(averages, 2)
+    return _rsi_from_averages(avg_gain, avg_loss)
+
+
+def macd(close, fast: int = MACD_FAST, slow: int = MACD_SLOW,
+         signal: int = MACD_SIGNAL) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(MACD, 시그널, 히스토그램)"""
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return line, signal_line, line - signal_line
+
+
+def volume_ratio(volume, period: int = VOLUME_PERIOD) -> np.ndarray:
+    """당일 거래량 / 직전 period일 평균 거래량"""
+    rows = _as_rows(volume)
+    previous = np.full(rows.shape, np.nan)
+    previous[:, 1:] = sma(rows, period)[:, :-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(previous > 0, rows / previous, np.nan)
+
+
+def compute_batch(close, volume) -> Dict[str, np.ndarray]:
+    """종목 x 봉 배열 → 지표 배열 dict (모양은 입력과 같음)
+
+    EMA12/EMA26/RSI 평활은 행을 쌓아 한 번의 시간축 순회로, MACD 시그널은 두 번째 순회로 계산
+    """
+    close, volume = _as_rows(close), _as_rows(volume)
+    count = close.shape[0]
+    gains, losses = _gains_losses(close)
+    smoothed = _smooth(
+        np.concatenate([close, close, gains, losses]),
+        np.repeat([MACD_FAST, MACD_SLOW, RSI_PERIOD, RSI_PERIOD], count),
+        np.repeat([2.0 / (MACD_FAST + 1), 2.0 / (MACD_SLOW + 1), 1.0 / RSI_PERIOD, 1.0 / RSI_PERIOD], count)
+    )
+    ema_fast, ema_slow, avg_gain, avg_loss = np.split(smoothed, 4)
+    macd_line = ema_fast - ema_slow
+    macd_signal = ema(macd_line, MACD_SIGNAL)
+    return {
+        "rsi": _rsi_from_averages(avg_gain, avg_loss),
+        "macd": macd_line,
+        "macd_signal": macd_signal,
+        "macd_hist": macd_line - macd_signal,
+        "ema_12": ema_fast,
+        "ema_26": ema_slow,
+        "moving_avg_20": sma(close, SMA_SHORT),
+        "moving_avg_50": sma(close, SMA_LONG),
+        "volume_ratio": volume_ratio(volume)
+    }
+
+
+def load_matrix(store, symbols: Sequence[str], bars: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """바 저장소의 종목별 최근 bars개 봉 → 오른쪽 정렬한 (종가, 거래량) 2차원 배열 (빈 앞자리는 NaN)"""
+    series = [store.read(symbol) for symbol in symbols]
+    width = max((len(s) for s in series), default=0)
+    if bars is not None:
+        width = min(width, bars)
+    close = np.full((len(series), width), np.nan)
+    volume = np.full((len(series), width), np.nan)
+    for row, s in enumerate(series):
+        length = min(len(s), width)
+        if length:
+            close[row, width - length:] = s.close[len(s) - length:]
+            volume[row, width - length:] = s.volume[len(s) - length:]
+    return close, volume
+
+
+def compute_universe(store, symbols: Sequence[str], bars: Optional[int] = None) -> Dict[str, Dict]:
+    """종목별 최신 지표 (배치 계산 결과의 마지막 봉)"""
+    symbols = list(symbols)
+    close, volume = load_matrix(store, symbols, bars)
+    if close.shape[1] == 0:
+        return {}
+    results = compute_batch(close, volume)
+    return {
+        symbol: {name: _optional(values[row, -1]) for name, values in results.items()}
+        for row, symbol in enumerate(symbols)
+    }
+
+
+def _optional(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+# ---- 스트리밍 (종목별 O(1) 갱신) ----
+
+class _Smoother:
+    """처음 period개 평균으로 시작하는 지수 평활"""
+
+    __slots__ = ("period", "alpha", "seen", "seed", "value")
+
+    def __init__(self, period: int, alpha: float):
+        self.period = period
+        self.alpha = alpha
+        self.seen = 0
+        self.seed = 0.0
+        self.value = None
+
+    def update(self, x: float) -> Optional[float]:
+        self.seen += 1
+        if self.seen < self.period:
+            self.seed += x
+        elif self.seen == self.period:
+            self.value = (self.seed + x) / self.period
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.value
+
+
+class _Window:
+    """최근 period개 값의 합 (링 버퍼)"""
+
+    __slots__ = ("period", "values", "total")
+
+    def __init__(self, period: int):
+        self.period = period
+        self.values = deque(maxlen=period)
+        self.total = 0.0
+
+    def update(self, x: float) -> Optional[float]:
+        if len(self.values) == self.period:
+            self.total -= self.values[0]
+        self.values.append(x)
+        self.total += x
+        return self.total / self.period if len(self.values) == self.period else None
+
+
+class IndicatorState:
+    """한 종목의 지표 상태 (update는 봉 하나당 O(1))"""
+
+    def __init__(self):
+        self.last_date: Optional[date] = None
+        self.bars = 0
+        self._prev_close: Optional[float] = None
+        self._ema_fast = _Smoother(MACD_FAST, 2.0 / (MACD_FAST + 1))
+        self._ema_slow = _Smoother(MACD_SLOW, 2.0 / (MACD_SLOW + 1))
+        self._signal = _Smoother(MACD_SIGNAL, 2.0 / (MACD_SIGNAL + 1))
+        self._gain = _Smoother(RSI_PERIOD, 1.0 / RSI_PERIOD)
+        self._loss = _Smoother(RSI_PERIOD, 1.0 / RSI_PERIOD)
+        self._sma_short = _Window(SMA_SHORT)
+        self._sma_long = _Window(SMA_LONG)
+        self._volume = _Window(VOLUME_PERIOD)
+        self.values: Dict[str, Optional[float]] = {}
+
+    def update(self, close: float, volume: float, day: Optional[date] = None) -> Dict[str, Optional[float]]:
+        previous_volume_avg = self._volume.total / VOLUME_PERIOD \
+            if len(self._volume.values) == VOLUME_PERIOD else None
+
+        avg_gain = avg_loss = None
+        if self._prev_close is not None:
+            change = close - self._prev_close
+            avg_gain = self._gain.update(max(change, 0.0))
+            avg_loss = self._loss.update(max(-change, 0.0))
+        self._prev_close = close
+
+        ema_fast = self._ema_fast.update(close)
+        ema_slow = self._ema_slow.update(close)
+        macd_line = ema_fast - ema_slow if ema_fast is not None and ema_slow is not None else None
+        macd_signal = self._signal.update(macd_line) if macd_line is not None else None
+
+        if avg_gain is None:
+            rsi_value = None
+        elif avg_loss == 0:
+            rsi_value = 50.0 if avg_gain == 0 else 100.0
+        else:
+            rsi_value = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+        self._volume.update(volume)
+        self.bars += 1
+        self.last_date = day if day is not None else self.last_date
+        self.values = {
+            "rsi": rsi_value,
+            "macd": macd_line,
+            "macd_signal": macd_signal,
+            "macd_hist": macd_line - macd_signal if macd_signal is not None else None,
+            "ema_12": ema_fast,
+            "ema_26": ema_slow,
+            "moving_avg_20": self._sma_short.update(close),
+            "moving_avg_50": self._sma_long.update(close),
+            "volume_ratio": volume / previous_volume_avg if previous_volume_avg else None
+        }
+        return self.values
+
+
+def _bar(bars, index: int) -> Tuple[date, float, int]:
+    return bars.date[index].item(), float(bars.close[index]), int(bars.volume[index])
+
+
+def _digest(bars, count: int) -> int:
+    """앞쪽 count개 봉의 (날짜, 종가, 거래량) CRC32"""
+    digest = 0
+    for column in (bars.date.view(np.int64), bars.close, bars.volume):
+        digest = zlib.crc32(np.ascontiguousarray(column[:count]), digest)
+    return digest
+
+
+class _Applied:
+    """저장소에서 상태에 반영한 이력 요약 (저장소 이력이 바뀌었는지 확인용)"""
+
+    __slots__ = ("previous", "last", "prefix", "signature")
+
+    def __init__(self, previous: IndicatorState, last: Tuple[date, float, int], prefix: int, signature):
+        self.previous = previous  # 마지막 봉 반영 직전 상태
+        self.last = last  # 마지막으로 반영한 봉
+        self.prefix = prefix  # 마지막 봉 앞쪽 봉들의 체크섬
+        self.signature = signature  # 반영할 때의 저장소 서명 (같으면 확인 없이 그대로 사용)
+
+
+class IndicatorEngine:
+    """종목별 스트리밍 지표 (바 저장소에 새 봉이 생기면 그 봉만 반영)"""
+
+    def __init__(self, store):
+        self.store = store
+        self._states: Dict[str, IndicatorState] = {}
+        self._applied: Dict[str, _Applied] = {}
+        self._lock = threading.Lock()
+
+    def update(self, symbol: str, day: date, close: float, volume: float) -> Dict[str, Optional[float]]:
+        """새 봉 하나 반영 (이미 반영한 날짜 이전의 봉은 무시)
+
+        저장소를 거치지 않은 봉이므로 다음 latest()는 저장소 이력으로 상태를 다시 만듭니다.
+        """
+        with self._lock:
+            symbol = symbol.upper()
+            state = self._states.setdefault(symbol, IndicatorState())
+            if state.last_date is not None and day <= state.last_date:
+                return state.values
+            self._applied.pop(symbol, None)
+            return state.update(close, volume, day)
+
+    def _catch_up(self, symbol: str) -> Optional[IndicatorState]:
+        # 읽기 전에 서명을 잡아 두면 그 사이 기록이 있어도 다음 조회에서 다시 확인함
+        signature = self.store.signature(symbol)
+        if signature is None:
+            return None
+        with self._lock:
+            state = self._states.get(symbol)
+            applied = self._applied.get(symbol)
+            if state is not None and applied is not None and applied.signature == signature:
+                return state
+        bars = self.store.read(symbol)
+        if not len(bars):
+            return None
+        with self._lock:
+            state = self._states.get(symbol)
+            applied = self._applied.get(symbol)
+            if state is None or applied is None or state.bars > len(bars) \
+                    or _digest(bars, state.bars - 1) != applied.prefix:
+                # 처음 계산하거나, 반영한 구간 중간의 봉이 바뀌었거나 끼어듦 → 처음부터
+                state = IndicatorState()
+            elif _bar(bars, state.bars - 1) != applied.last:
+                # 마지막 봉만 제자리에서 바뀜 (장중 갱신 등) → 그 직전 상태에서 다시 반영
+                state = copy.deepcopy(applied.previous)
+            start = state.bars
+            if start == len(bars):
+                applied.signature = signature
+            else:
+                dates, closes, volumes = bars.date[start:].tolist(), bars.close[start:].tolist(), \
+                    bars.volume[start:].tolist()
+                for day, close, volume in zip(dates[:-1], closes[:-1], volumes[:-1]):
+                    state.update(close, volume, day)
+                previous = copy.deepcopy(state)
+                state.update(closes[-1], volumes[-1], dates[-1])
+                self._states[symbol] = state
+                self._applied[symbol] = _Applied(previous, _bar(bars, len(bars) - 1), _digest(bars, len(bars) - 1),
+                                                 signature)
+            return state
+
+    def latest(self, symbol: str) -> Optional[Dict[str, float]]:
+        """Trade에 저장하는 지표 (반올림), 봉이 부족하면 None"""
+        state = self._catch_up(symbol.upper())
+        if state is None:
+            return None
+        values = {name: state.values.get(name) for name in TRADE_INDICATORS}
+        if any(value is None for value in values.values()):
+            return None
+        return {name: round(value, TRADE_INDICATORS[name]) for name, value in values.items()}
+
+    def symbols(self) -> List[str]:
+        with self._lock:
+            return list(self._states)
+
+
+indicator_engine = IndicatorEngine(bar_store)
@@ -0,0 +1,78 @@
+"""빠른 JSON 직렬화 (orjson이 있으면 사용, 없으면 표준 json)
+
+datetime/date는 직렬화기가 ISO 8601 문자열로 직접 변환하므로, 목록 응답을 만드는 쪽에서
+필드마다 isoformat()을 호출하지 않고 값을 그대로 넘겨도 됩니다. 표준 json 경로도 같은
+형식을 쓰므로 어느 쪽이든 응답 본문은 같습니다 (Flask 기본 제공자는 HTTP 날짜 형식).
+"""
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date, datetime, time
+from typing import Any
+
+from flask import Response
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성
+    orjson = None
+
+
+def _default(value: Any):
+    """직렬화기가 직접 처리하지 못하는 값 변환"""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if hasattr(value, "__html__"):
+        return str(value.__html__())
+    if hasattr(value, "tolist"):  # numpy 배열/스칼라
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps_bytes(obj: Any) -> bytes:
+        """obj → UTF-8 JSON 바이트 (공백 없음, 키 순서 유지)"""
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+
+    loads = orjson.loads
+    BACKEND = "orjson"
+else:
+    def dumps_bytes(obj: Any) -> bytes:
+        """obj → UTF-8 JSON 바이트 (공백 없음, 키 순서 유지)"""
+        return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+    loads = json.loads
+    BACKEND = "json"
+
+
+def dumps(obj: Any) -> str:
+    """obj → JSON 문자열 (SSE 이벤트 등 문자열이 필요한 곳)"""
+    return dumps_bytes(obj).decode()
+
+
+class FastJSONProvider(JSONProvider):
+    """jsonify/request.get_json에 쓰이는 Flask JSON 제공자
+
+    응답은 dict의 필드 순서를 그대로 유지합니다 (Flask 기본값은 키 정렬).
+    """
+
+    mimetype = "application/json"
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dumps(obj)
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        return loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        # 문자열로 디코딩했다가 다시 인코딩하지 않고 바이트를 바로 응답 본문으로 사용
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj), mimetype=self.mimetype)
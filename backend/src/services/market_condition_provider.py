@@ -0,0 +1,86 @@
+import threading
+from datetime import date
+from typing import Callable, Dict, Optional
+
+
+class MarketConditionProvider:
+    """거래일별 시장 상황 스냅샷 제공
+
+    하루에 한 번만 시장 상황을 계산하여 메모리에 보관하고, 같은 날의 모든 호출자
+    (거래 생성, API 응답)에게 같은 스냅샷을 반환합니다. 반환값은 공유 객체이므로
+    수정하지 말아야 합니다.
+    """
+
+    def __init__(self, builder: Callable[[date], Dict], today: Callable[[], date] = date.today,
+                 keep_days: int = 7):
+        self._builder = builder
+        self._today = today
+        self._keep_days = keep_days
+        self._snapshots: Dict[date, Dict] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def get(self, day: date = None) -> Dict:
+        """해당 거래일 (기본: 오늘)의 시장 상황 스냅샷"""
+        day = day or self._today()
+        snapshot = self._snapshots.get(day)
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshots.get(day)
+            if snapshot is None:
+                snapshot = self._store(day, self._builder(day))
+            return snapshot
+
+    def prime(self, day: date, snapshot: Dict) -> Dict:
+        """외부 (DB 등)에서 읽은 스냅샷으로 교체"""
+        with self._lock:
+            return self._store(day, snapshot)
+
+    def refresh(self, day: date = None) -> Dict:
+        """스냅샷을 새로 계산"""
+        day = day or self._today()
+        with self._lock:
+            return self._store(day, self._builder(day))
+
+    def _store(self, day: date, snapshot: Dict) -> Dict:
+        # dict 교체는 원자적이므로 읽기 경로는 잠금 없이 조회
+        snapshots = dict(self._snapshots)
+        snapshots[day] = snapshot
+        for old_day in sorted(snapshots)[:-self._keep_days]:
+            del snapshots[old_day]
+        self._snapshots = snapshots
+        return snapshot
+
+    def start(self, interval: float = 60.0,
+              on_tick: Callable[[date, Dict], Optional[Dict]] = None):
+        """주기적으로 당일 스냅샷을 확인하는 백그라운드 스레드 시작
+
+        날짜가 바뀌면 다음 조회 시점이 아닌 이 주기에서 새 스냅샷을 계산합니다.
+        on_tick(day, snapshot)이 dict를 반환하면 그 값으로 스냅샷을 교체합니다
+        (예: 다른 워커가 먼저 DB에 저장한 값과 맞추기).
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        def run():
+            while True:
+                try:
+                    day = self._today()
+                    snapshot = self.get(day)
+                    if on_tick is not None:
+                        replacement = on_tick(day, snapshot)
+                        if replacement is not None and replacement is not snapshot:
+                            self.prime(day, replacement)
+                except Exception as e:
+                    print(f"Error refreshing market condition: {e}")
+                if self._stop.wait(interval):
+                    break
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, name="market-condition", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
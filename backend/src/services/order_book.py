@@ -0,0 +1,337 @@
+"""종목별 지정가 주문장과 가격-시간 우선 체결 엔진 (메모리)
+
+- 매수/매도 호가는 힙 (매수는 가격 내림차순, 매도는 오름차순, 같은 가격은 접수 순서)
+- 지정가: 상대 호가와 체결 가능한 만큼 체결하고 남은 수량은 주문장에 대기
+- 시장가: 상대 호가를 순서대로 소진하고 남은 수량은 취소 (IOC)
+- 스톱 / 스톱 지정가: 최근 체결가(또는 mark로 알려 준 기준가)가 스톱 가격에 닿으면 시장가 /
+  지정가 주문으로 전환. 발동 대기 주문도 매수는 스톱 가격 오름차순, 매도는 내림차순 힙.
+  발동된 스톱 지정가 주문의 시간 우선순위는 접수 시점이 아니라 발동 시점
+- 체결가는 주문장에 먼저 있던 주문(maker)의 가격이며, 부분 체결을 지원합니다.
+- 취소는 잔량을 0으로 표시만 하고 힙에서는 맨 앞에 올 때 버립니다 (버려진 항목이 절반을 넘으면
+  힙을 다시 만듦). 주문 조회/취소는 주문 ID → 주문 dict로 O(1)
+"""
+import heapq
+import itertools
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+BUY, SELL = "BUY", "SELL"
+LIMIT, MARKET, STOP, STOP_LIMIT = "LIMIT", "MARKET", "STOP", "STOP_LIMIT"
+ORDER_TYPES = (LIMIT, MARKET, STOP, STOP_LIMIT)
+
+# 주문 상태
+PENDING = "PENDING"  # 스톱 발동 대기
+OPEN = "OPEN"
+PARTIALLY_FILLED = "PARTIALLY_FILLED"
+FILLED = "FILLED"
+CANCELED = "CANCELED"
+
+COMPACT_MIN_STALE = 1024
+
+
+class Order:
+    """주문 (remaining이 0이면 주문장에서 빠진 것으로 봄)"""
+
+    __slots__ = ("id", "symbol", "side", "type", "quantity", "remaining", "filled", "filled_value", "price",
+                 "stop_price", "robot_id", "status")
+
+    def __init__(self, order_id: int, symbol: str, side: str, order_type: str, quantity: int,
+                 price: Optional[float], stop_price: Optional[float], robot_id: Optional[int]):
+        self.id = order_id
+        self.symbol = symbol
+        self.side = side
+        self.type = order_type
+        self.quantity = quantity
+        self.remaining = quantity
+        self.filled = 0
+        self.filled_value = 0.0
+        self.price = price  # 지정가 (시장가/스톱은 None)
+        self.stop_price = stop_price
+        self.robot_id = robot_id
+        self.status = OPEN
+
+    @property
+    def average_price(self) -> Optional[float]:
+        return self.filled_value / self.filled if self.filled else None
+
+    def to_dict(self) -> Dict:
+        return {
+            'id': self.id,
+            'symbol': self.symbol,
+            'side': self.side,
+            'order_type': self.type,
+            'quantity': self.quantity,
+            'filled': self.filled,
+            'remaining': self.quantity - self.filled if self.status not in (FILLED, CANCELED) else 0,
+            'limit_price': self.price,
+            'stop_price': self.stop_price,
+            'average_price': round(self.average_price, 4) if self.filled else None,
+            'robot_id': self.robot_id,
+            'status': self.status
+        }
+
+
+class Fill(NamedTuple):
+    """체결 한 건 (가격은 maker 주문 가격)"""
+    price: float
+    quantity: int
+    buy: Order
+    sell: Order
+    aggressor: str  # 주문장에 있던 주문을 가져간 쪽 (BUY/SELL)
+
+
+class OrderBook:
+    """한 종목의 주문장"""
+
+    __slots__ = ("symbol", "bids", "asks", "buy_stops", "sell_stops", "last_price", "stale")
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.bids: List[tuple] = []  # (-가격, 순번, 주문)
+        self.asks: List[tuple] = []  # (가격, 순번, 주문)
+        self.buy_stops: List[tuple] = []  # (스톱 가격, 순번, 주문): 가격이 올라 닿으면 발동
+        self.sell_stops: List[tuple] = []  # (-스톱 가격, 순번, 주문): 가격이 내려 닿으면 발동
+        self.last_price: Optional[float] = None
+        self.stale = 0  # 취소되었지만 힙에 남은 항목 수
+
+    def match(self, order: Order, fills: List[Fill]):
+        """order를 상대 호가와 체결 (지정가를 넘는 호가에서 멈춤)"""
+        limit, remaining = order.price, order.remaining
+        if order.side == BUY:
+            book, sign = self.asks, 1.0
+        else:
+            book, sign = self.bids, -1.0
+        value, last = 0.0, None
+        while remaining and book:
+            key, _, maker = book[0]
+            if not maker.remaining:
+                heapq.heappop(book)
+                self.stale -= 1
+                continue
+            price = key * sign
+            if limit is not None and (price > limit if sign > 0 else price < limit):
+                break
+            quantity = remaining if remaining < maker.remaining else maker.remaining
+            remaining -= quantity
+            value += price * quantity
+            last = price
+            maker.remaining -= quantity
+            maker.filled += quantity
+            maker.filled_value += price * quantity
+            if maker.remaining:
+                maker.status = PARTIALLY_FILLED
+            else:
+                maker.status = FILLED
+                heapq.heappop(book)
+            fills.append(Fill(price, quantity, order, maker, BUY) if sign > 0
+                         else Fill(price, quantity, maker, order, SELL))
+        if last is not None:
+            order.filled += order.remaining - remaining
+            order.filled_value += value
+            order.remaining = remaining
+            self.last_price = last
+
+    def rest(self, order: Order, seq: int):
+        """남은 지정가 주문을 주문장에 대기"""
+        if order.side == BUY:
+            heapq.heappush(self.bids, (-order.price, seq, order))
+        else:
+            heapq.heappush(self.asks, (order.price, seq, order))
+
+    def add_stop(self, order: Order, seq: int):
+        if order.side == BUY:
+            heapq.heappush(self.buy_stops, (order.stop_price, seq, order))
+        else:
+            heapq.heappush(self.sell_stops, (-order.stop_price, seq, order))
+
+    def stop_reached(self, order: Order) -> bool:
+        price = self.last_price
+        if price is None:
+            return False
+        return price >= order.stop_price if order.side == BUY else price <= order.stop_price
+
+    def triggered_stops(self) -> List[Tuple[int, Order]]:
+        """기준가가 닿은 스톱 주문 (접수 순서)"""
+        price = self.last_price
+        if price is None:
+            return []
+        triggered = []
+        for heap, sign in ((self.buy_stops, 1.0), (self.sell_stops, -1.0)):
+            while heap and heap[0][0] <= price * sign:
+                _, seq, order = heapq.heappop(heap)
+                if order.remaining:
+                    triggered.append((seq, order))
+                else:
+                    self.stale -= 1
+        triggered.sort(key=lambda item: item[0])
+        return triggered
+
+    def compact(self):
+        """취소된 항목이 많으면 힙을 다시 만듦"""
+        heaps = (self.bids, self.asks, self.buy_stops, self.sell_stops)
+        if self.stale < COMPACT_MIN_STALE or self.stale * 2 < sum(len(heap) for heap in heaps):
+            return
+        for heap in heaps:
+            heap[:] = [entry for entry in heap if entry[2].remaining]
+            heapq.heapify(heap)
+        self.stale = 0
+
+    @staticmethod
+    def _levels(heap: List[tuple], sign: float, levels: int) -> List[List]:
+        out = []
+        for key, _, order in sorted(heap):
+            if not order.remaining:
+                continue
+            price = key * sign
+            if out and out[-1][0] == price:
+                out[-1][1] += order.remaining
+                out[-1][2] += 1
+            elif len(out) == levels:
+                break
+            else:
+                out.append([price, order.remaining, 1])
+        return out
+
+    def depth(self, levels: int = 10) -> Dict:
+        """가격대별 잔량 [가격, 수량, 주문 수] (매수는 높은 가격부터, 매도는 낮은 가격부터)"""
+        return {
+            'symbol': self.symbol,
+            'bids': self._levels(self.bids, -1.0, levels),
+            'asks': self._levels(self.asks, 1.0, levels),
+            'last_price': self.last_price,
+            'pending_stops': sum(1 for heap in (self.buy_stops, self.sell_stops)
+                                 for entry in heap if entry[2].remaining)
+        }
+
+
+def validate_order(side: str, quantity: int, order_type: str, price: Optional[float] = None,
+                   stop_price: Optional[float] = None) -> Tuple[Optional[float], Optional[float]]:
+    """주문 검증 (잘못되면 ValueError) → 주문 유형에 맞게 정리한 (지정가, 스톱 가격)"""
+    if side not in (BUY, SELL):
+        raise ValueError(f"Unknown side: {side}")
+    if order_type not in ORDER_TYPES:
+        raise ValueError(f"Unknown order type: {order_type}")
+    if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity <= 0:
+        raise ValueError("quantity must be a positive integer")
+    if order_type in (LIMIT, STOP_LIMIT):
+        if price is None or not price > 0:
+            raise ValueError(f"{order_type} order needs a positive limit price")
+    else:
+        price = None
+    if order_type in (STOP, STOP_LIMIT):
+        if stop_price is None or not stop_price > 0:
+            raise ValueError(f"{order_type} order needs a positive stop price")
+    else:
+        stop_price = None
+    return price, stop_price
+
+
+class MatchingEngine:
+    """종목별 주문장 모음 (모든 연산은 잠금 하나로 직렬화)"""
+
+    def __init__(self):
+        self.books: Dict[str, OrderBook] = {}
+        self.orders: Dict[int, Order] = {}  # 주문장/스톱 대기 중인 주문
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.canceled = 0
+        self.fills = 0
+
+    def book(self, symbol: str) -> OrderBook:
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = OrderBook(symbol)
+        return book
+
+    def submit(self, symbol: str, side: str, quantity: int, order_type: str = LIMIT, price: Optional[float] = None,
+               stop_price: Optional[float] = None, robot_id: Optional[int] = None) -> Tuple[Order, List[Fill]]:
+        """주문 접수 → (주문, 이 주문으로 생긴 체결 목록 (발동된 스톱 주문의 체결 포함))"""
+        price, stop_price = validate_order(side, quantity, order_type, price, stop_price)
+        fills: List[Fill] = []
+        with self._lock:
+            seq = next(self._ids)
+            order = Order(seq, symbol, side, order_type, quantity, price, stop_price, robot_id)
+            book = self.book(symbol)
+            self.submitted += 1
+            if stop_price is not None and not book.stop_reached(order):
+                order.status = PENDING
+                book.add_stop(order, seq)
+                self.orders[seq] = order
+                return order, fills
+            self._execute(book, order, seq, fills)
+            self._run_stops(book, fills)
+            self.fills += len(fills)
+        return order, fills
+
+    def _execute(self, book: OrderBook, order: Order, seq: int, fills: List[Fill]):
+        start = len(fills)
+        book.match(order, fills)
+        for fill in fills[start:]:
+            # 체결된 maker 주문은 조회 목록에서 제거
+            maker = fill.sell if fill.buy is order else fill.buy
+            if not maker.remaining:
+                self.orders.pop(maker.id, None)
+        if not order.remaining:
+            order.status = FILLED
+            self.orders.pop(order.id, None)
+        elif order.price is None:
+            # 시장가 (발동된 스톱 포함) 잔량은 취소
+            order.status = CANCELED
+            order.remaining = 0
+            self.orders.pop(order.id, None)
+        else:
+            order.status = PARTIALLY_FILLED if order.filled else OPEN
+            book.rest(order, seq)
+            self.orders[order.id] = order
+
+    def _run_stops(self, book: OrderBook, fills: List[Fill]):
+        """체결가가 바뀌어 닿은 스톱 주문을 차례로 실행 (연쇄 발동 포함)"""
+        while True:
+            triggered = book.triggered_stops()
+            if not triggered:
+                return
+            for _, order in triggered:
+                # 발동 시점에 새 순번으로 대기 (주문 ID는 그대로, 발동 전부터 있던 같은 가격 주문보다 뒤)
+                self._execute(book, order, next(self._ids), fills)
+
+    def mark(self, symbol: str, price: float) -> List[Fill]:
+        """외부 기준가 (시세) 반영: 닿은 스톱 주문 실행"""
+        fills: List[Fill] = []
+        with self._lock:
+            book = self.book(symbol)
+            book.last_price = price
+            self._run_stops(book, fills)
+            self.fills += len(fills)
+        return fills
+
+    def cancel(self, order_id: int) -> Optional[Order]:
+        """대기 중인 주문 취소 (없거나 이미 끝난 주문이면 None)"""
+        with self._lock:
+            order = self.orders.pop(order_id, None)
+            if order is None:
+                return None
+            order.remaining = 0
+            order.status = CANCELED
+            book = self.books[order.symbol]
+            book.stale += 1
+            book.compact()
+            self.canceled += 1
+            return order
+
+    def get(self, order_id: int) -> Optional[Order]:
+        return self.orders.get(order_id)
+
+    def depth(self, symbol: str, levels: int = 10) -> Dict:
+        with self._lock:
+            return self.book(symbol).depth(levels)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'symbols': len(self.books),
+                'open_orders': len(self.orders),
+                'submitted': self.submitted,
+                'canceled': self.canceled,
+                'fills': self.fills
+            }
@@ -0,0 +1,115 @@
+"""키셋(커서) 페이지네이션
+
+OFFSET 대신 마지막으로 본 정렬 키 이후의 행만 조회하므로, 깊은 페이지도 첫 페이지와
+같은 비용으로 조회됩니다. 커서는 정렬 키 값을 담은 불투명한 문자열입니다.
+"""
+import base64
+import json
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence
+
+from sqlalchemy import literal, tuple_
+
+
+class InvalidCursor(ValueError):
+    """잘못된 커서"""
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """정렬 키 값 → 커서 문자열"""
+    encoded = [
+        {"dt": value.isoformat()} if isinstance(value, datetime) else
+        {"d": value.isoformat()} if isinstance(value, date) else value
+        for value in values
+    ]
+    raw = json.dumps(encoded, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """커서 문자열 → 정렬 키 값 (size개)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError("unexpected cursor shape")
+        return [
+            datetime.fromisoformat(value["dt"]) if isinstance(value, dict) and "dt" in value else
+            date.fromisoformat(value["d"]) if isinstance(value, dict) and "d" in value else value
+            for value in values
+        ]
+    except (ValueError, TypeError, KeyError) as e:
+        raise InvalidCursor(f"Invalid cursor: {e}") from e
+
+
+def keyset_page(session, query, key_columns: Sequence, cursor: Optional[str], limit: int,
+                descending: bool = True, row_key: Callable = None) -> Dict:
+    """키셋 방식으로 한 페이지 조회
+
+    query: 필터가 적용된 select (정렬/LIMIT 제외)
+    key_columns: 정렬 키 컬럼 (마지막 컬럼은 유일해야 함, 예: (trade_date, id))
+    row_key: 결과 행 → 정렬 키 값 (기본: 행의 같은 이름 속성)
+    """
+    if cursor:
+        values = decode_cursor(cursor, len(key_columns))
+        if len(key_columns) == 1:
+            column, value = key_columns[0], values[0]
+            query = query.where(column < value if descending else column > value)
+        else:
+            keys = tuple_(*key_columns)
+            bound = tuple_(*[literal(value, column.type) for column, value in zip(key_columns, values)])
+            query = query.where(keys < bound if descending else keys > bound)
+
+    order = [column.desc() if descending else column.asc() for column in key_columns]
+    rows = session.execute(query.order_by(*order).limit(limit + 1)).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        values = row_key(last) if row_key else [getattr(last, column.key) for column in key_columns]
+        next_cursor = encode_cursor(values)
+
+    return {"rows": rows, "next_cursor": next_cursor, "has_more": has_more}
+
+
+def cursor_pagination(page: Dict, per_page: int, total: Optional[int] = None) -> Dict:
+    """커서 모드 응답의 pagination 블록"""
+    pagination = {
+        'mode': 'cursor',
+        'per_page': per_page,
+        'next_cursor': page['next_cursor'],
+        'has_more': page['has_more']
+    }
+    if total is not None:
+        pagination['total'] = total
+        pagination['total_is_approximate'] = True
+    return pagination
+
+
+class ApproximateCounter:
+    """COUNT(*) 결과를 ttl초 동안 재사용하는 근사 전체 건수 캐시"""
+
+    def __init__(self, ttl: float = 60.0, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._values: Dict[Hashable, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, compute: Callable[[], int]) -> int:
+        now = time.monotonic()
+        entry = self._values.get(key)
+        if entry is not None and now - entry[1] < self.ttl:
+            return entry[0]
+        value = compute()
+        with self._lock:
+            if len(self._values) >= self.maxsize:
+                self._values.clear()
+            self._values[key] = (value, now)
+        return value
+
+
+approximate_counts = ApproximateCounter()
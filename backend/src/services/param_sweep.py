@@ -0,0 +1,282 @@
+"""전략 파라미터 탐색 (프로세스 풀 + 공유 메모리 + 워크포워드)
+
+- 일봉 행렬(BarMatrix)은 공유 메모리 블록 하나에 한 번만 올리고, 작업 프로세스는 이름으로
+  붙어 복사 없는 뷰로 사용합니다. 작업마다 넘기는 것은 설정 묶음과 구간 인덱스뿐입니다.
+- 작업 프로세스마다 지표(Features)를 한 번 계산해 두고 모든 설정과 구간이 공유합니다
+  (구간은 Features.window로 잘라 씀).
+- 설정을 묶음 단위 작업으로 제출하고, 끝나는 대로 sweep_results에 모아서 기록합니다.
+- 워크포워드: 학습 구간에서 목표 지표가 가장 좋은 설정을 고르고, 바로 다음 검증 구간에서
+  그 설정만 평가합니다. 구간 하나의 학습이 모두 끝나면 즉시 검증 작업을 제출합니다.
+"""
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.models.trading import SweepResult
+from src.services.backtest import (DEFAULT_COMMISSION_RATE, OHLCV, BarMatrix, Features, run_backtest,
+                                   strategy_params)
+
+# 목표 지표 → 방향 (1이면 클수록, -1이면 작을수록 좋음)
+OBJECTIVES = {"sharpe_ratio": 1, "total_return": 1, "win_rate": 1, "max_drawdown": -1}
+METRICS = ("total_return", "win_rate", "max_drawdown", "sharpe_ratio", "trades")
+
+Config = Tuple[int, Dict]  # (설정 번호, 파라미터)
+
+
+# ---- 탐색 공간 ----
+
+def grid(strategy_type: str, values: Dict[str, Sequence]) -> List[Dict]:
+    """파라미터별 후보 값의 모든 조합 (나머지는 전략 기본값)"""
+    names = list(values)
+    return [strategy_params(strategy_type, dict(zip(names, combo)))
+            for combo in itertools.product(*(values[name] for name in names))]
+
+
+def random_search(strategy_type: str, space: Dict[str, object], samples: int,
+                  seed: Optional[int] = None) -> List[Dict]:
+    """무작위 탐색 (목록이면 그중 하나, (하한, 상한)이면 구간에서 균등 추출, 정수 파라미터는 정수로)"""
+    rng = np.random.default_rng(seed)
+    defaults = strategy_params(strategy_type)
+    configs = []
+    for _ in range(samples):
+        overrides = {}
+        for name, spec in space.items():
+            if isinstance(spec, tuple):
+                low, high = spec
+                if isinstance(defaults.get(name), int):
+                    overrides[name] = int(rng.integers(int(low), int(high) + 1))
+                else:
+                    overrides[name] = round(float(rng.uniform(low, high)), 4)
+            else:
+                overrides[name] = spec[int(rng.integers(len(spec)))]
+        configs.append(strategy_params(strategy_type, overrides))
+    return configs
+
+
+def parse_space(specs: Sequence[str]) -> Dict[str, object]:
+    """['rsi_entry=45,50,55', 'stop_loss_pct=3:8'] → {'rsi_entry': [45.0, 50.0, 55.0], 'stop_loss_pct': (3.0, 8.0)}"""
+    space = {}
+    for spec in specs:
+        name, sep, values = spec.partition("=")
+        if not sep or not name.strip() or not values.strip():
+            raise ValueError(f"Invalid parameter spec: {spec} (expected name=v1,v2 or name=low:high)")
+        try:
+            if ":" in values:
+                low, high = (float(value) for value in values.split(":", 1))
+                space[name.strip()] = (low, high)
+            else:
+                space[name.strip()] = [float(value) for value in values.split(",") if value.strip()]
+        except ValueError:
+            raise ValueError(f"Invalid parameter spec: {spec} (values must be numbers)")
+    return space
+
+
+def walk_forward_windows(days: int, train_days: int, test_days: int, warmup: int = 0,
+                         step: Optional[int] = None) -> List[Tuple[int, int, int, int]]:
+    """[(학습 시작, 학습 끝, 검증 시작, 검증 끝)] 거래일 인덱스 (끝은 미포함, 앞 warmup일은 지표 준비용)"""
+    step = step or test_days
+    windows, start = [], warmup
+    while start + train_days + test_days <= days:
+        windows.append((start, start + train_days, start + train_days, start + train_days + test_days))
+        start += step
+    return windows
+
+
+# ---- 공유 메모리 ----
+
+def share_bars(bars: BarMatrix) -> Tuple[SharedMemory, Dict]:
+    """OHLCV 행렬을 공유 메모리 블록 하나로 복사 → (블록, 작업 프로세스에 넘길 명세)"""
+    shape = bars.shape
+    size = max(len(OHLCV) * shape[0] * shape[1] * 8, 1)
+    shm = SharedMemory(create=True, size=size)
+    block = np.ndarray((len(OHLCV),) + shape, dtype=np.float64, buffer=shm.buf)
+    for index, name in enumerate(OHLCV):
+        block[index] = getattr(bars, name)
+    spec = {"name": shm.name, "shape": shape, "symbols": bars.symbols,
+            "dates": bars.dates.astype(np.int64)}
+    return shm, spec
+
+
+def attach_bars(spec: Dict) -> Tuple[SharedMemory, BarMatrix]:
+    """share_bars의 명세로 공유 메모리에 붙어 복사 없는 BarMatrix 생성"""
+    shm = SharedMemory(name=spec["name"])
+    block = np.ndarray((len(OHLCV),) + tuple(spec["shape"]), dtype=np.float64, buffer=shm.buf)
+    return shm, BarMatrix(spec["symbols"], spec["dates"].astype("datetime64[D]"), *block)
+
+
+# ---- 작업 프로세스 ----
+
+_worker: Dict = {}
+
+
+def _init_worker(spec: Dict, initial_capital: float, commission_rate: float, max_positions: Optional[int]):
+    shm, bars = attach_bars(spec)
+    _worker.update(shm=shm, features=Features(bars), windows={}, initial_capital=initial_capital,
+                   commission_rate=commission_rate, max_positions=max_positions)
+
+
+def _window(end: int) -> Features:
+    features = _worker["features"]
+    if end >= features.bars.shape[1]:
+        return features
+    if end not in _worker["windows"]:
+        _worker["windows"][end] = features.window(end)
+    return _worker["windows"][end]
+
+
+def _evaluate(strategy_type: str, configs: List[Config], start: int, end: int) -> List[Tuple[int, Dict]]:
+    """설정 묶음을 [start, end) 구간에서 백테스트 → [(설정 번호, 지표)]"""
+    features = _window(end)
+    return [
+        (config_id, run_backtest(features.bars, strategy_type, params, _worker["initial_capital"],
+                                 _worker["commission_rate"], _worker["max_positions"], features, start).metrics)
+        for config_id, params in configs
+    ]
+
+
+# ---- 결과 기록 ----
+
+class ResultWriter:
+    """탐색 결과를 모아 두었다가 flush_rows행 또는 flush_seconds초마다 한 트랜잭션으로 기록"""
+
+    def __init__(self, engine, sweep_id: str, strategy_type: str, dates: np.ndarray,
+                 flush_rows: int = 500, flush_seconds: float = 1.0):
+        self.engine = engine
+        self.sweep_id = sweep_id
+        self.strategy_type = strategy_type
+        self.dates = dates
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.written = 0
+        self._rows: List[Dict] = []
+        self._flushed_at = time.monotonic()
+
+    def add(self, config_id: int, params: Dict, fold: int, phase: str, start: int, end: int, metrics: Dict):
+        self._rows.append({
+            "sweep_id": self.sweep_id, "strategy_type": self.strategy_type, "config_id": config_id,
+            "params": json.dumps(params, sort_keys=True), "fold": fold, "phase": phase,
+            "window_start": self.dates[start].tolist(), "window_end": self.dates[end - 1].tolist(),
+            **{name: metrics[name] for name in METRICS}
+        })
+        if len(self._rows) >= self.flush_rows or time.monotonic() - self._flushed_at >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        if self._rows:
+            with self.engine.begin() as conn:
+                conn.execute(SweepResult.__table__.insert(), self._rows)
+            self.written += len(self._rows)
+            self._rows = []
+        self._flushed_at = time.monotonic()
+
+
+def _score(metrics: Dict, objective: str) -> float:
+    value = metrics[objective]
+    return OBJECTIVES[objective] * (value if value == value else -math.inf)
+
+
+def run_sweep(engine, bars: BarMatrix, strategy_type: str, configs: Sequence[Dict],
+              workers: Optional[int] = None, walk_forward: Optional[Tuple[int, int]] = None,
+              warmup: int = 0, objective: str = "sharpe_ratio", initial_capital: float = 100000.0,
+              commission_rate: float = DEFAULT_COMMISSION_RATE, max_positions: Optional[int] = None,
+              chunk_size: Optional[int] = None,
+              progress: Optional[Callable[[int, int, float], None]] = None) -> Dict:
+    """configs를 프로세스 풀에서 평가해 sweep_results에 기록하고 요약 반환
+
+    walk_forward=(학습 거래일 수, 검증 거래일 수)면 구간마다 학습 → 최적 설정 검증,
+    없으면 warmup 이후 전체 구간에서 한 번씩 평가합니다 (phase='full').
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective: {objective}")
+    configs = list(enumerate(configs))
+    if not configs:
+        raise ValueError("No configurations to evaluate")
+    days = bars.shape[1]
+    if walk_forward:
+        windows = walk_forward_windows(days, walk_forward[0], walk_forward[1], warmup)
+        if not windows:
+            raise ValueError(f"{days} trading days are too few for walk-forward windows {walk_forward}")
+    else:
+        windows = [(warmup, days, None, None)]
+    workers = workers or os.cpu_count() or 1
+    # 작업 프로세스마다 구간당 묶음이 여러 개 돌아가도록 (마지막 묶음 대기 시간 감소)
+    chunk_size = chunk_size or max(1, min(50, math.ceil(len(configs) / (workers * 4))))
+    chunks = [configs[lo:lo + chunk_size] for lo in range(0, len(configs), chunk_size)]
+    params_by_id = dict(configs)
+
+    sweep_id = uuid.uuid4().hex
+    writer = ResultWriter(engine, sweep_id, strategy_type, bars.dates)
+    best: Dict[int, Tuple[float, int, Dict]] = {}
+    tested: Dict[int, Dict] = {}
+    remaining = {fold: len(chunks) for fold in range(len(windows))}
+    total = len(configs) * len(windows) + (len(windows) if walk_forward else 0)
+    evaluated = 0
+    started = time.perf_counter()
+
+    shm, spec = share_bars(bars)
+    try:
+        context = multiprocessing.get_context("spawn")  # 부모의 스레드/DB 연결을 물려받지 않도록
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                                 initargs=(spec, initial_capital, commission_rate, max_positions)) as pool:
+            pending = {}
+            phase = "train" if walk_forward else "full"
+            for fold, (start, end, _, _) in enumerate(windows):
+                for chunk in chunks:
+                    pending[pool.submit(_evaluate, strategy_type, chunk, start, end)] = (fold, phase, start, end)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    fold, phase, start, end = pending.pop(future)
+                    for config_id, metrics in future.result():
+                        writer.add(config_id, params_by_id[config_id], fold, phase, start, end, metrics)
+                        evaluated += 1
+                        if phase == "test":
+                            tested[fold] = metrics
+                            continue
+                        candidate = (_score(metrics, objective), -config_id, metrics)
+                        if fold not in best or candidate[:2] > best[fold][:2]:
+                            best[fold] = candidate
+                    if phase == "train":
+                        remaining[fold] -= 1
+                        if remaining[fold] == 0:
+                            _, _, test_start, test_end = windows[fold]
+                            config_id = -best[fold][1]
+                            task = [(config_id, params_by_id[config_id])]
+                            pending[pool.submit(_evaluate, strategy_type, task, test_start, test_end)] = (
+                                fold, "test", test_start, test_end)
+                if progress is not None:
+                    progress(evaluated, total, time.perf_counter() - started)
+    finally:
+        writer.flush()
+        shm.close()
+        shm.unlink()
+
+    elapsed = time.perf_counter() - started
+    folds = []
+    for fold, (start, end, test_start, test_end) in enumerate(windows):
+        _, negative_id, metrics = best[fold]
+        entry = {"fold": fold, "config_id": -negative_id, "params": params_by_id[-negative_id],
+                 "window": [str(bars.dates[start]), str(bars.dates[end - 1])],
+                 "train" if walk_forward else "metrics": metrics}
+        if walk_forward:
+            entry["test_window"] = [str(bars.dates[test_start]), str(bars.dates[test_end - 1])]
+            entry["test"] = tested.get(fold)
+        folds.append(entry)
+    summary = {"sweep_id": sweep_id, "strategy_type": strategy_type, "configs": len(configs),
+               "evaluations": evaluated, "rows_written": writer.written, "workers": workers,
+               "seconds": round(elapsed, 3), "evaluations_per_second": round(evaluated / elapsed, 1),
+               "best": folds}
+    if walk_forward:
+        # 검증 구간 수익률을 이어 붙인 표본 외 성과
+        growth = np.prod([1 + fold["test"]["total_return"] / 100 for fold in folds if fold["test"]])
+        summary["out_of_sample_return"] = round(float((growth - 1) * 100), 2)
+    return summary
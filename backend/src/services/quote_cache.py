@@ -0,0 +1,170 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _InFlight:
+    """진행 중인 조회 (같은 키의 동시 요청이 결과를 공유)"""
+
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class QuoteCache:
+    """TTL + LRU 시세 캐시
+
+    - 항목별 TTL이 지나기 전에는 캐시된 값을 그대로 반환합니다.
+    - TTL이 지났지만 stale_ttl 이내인 항목은 즉시 반환하고 백그라운드에서 갱신합니다
+      (stale-while-revalidate).
+    - 같은 키에 대한 동시 캐시 미스는 한 번의 조회로 합쳐집니다 (single-flight).
+    - maxsize를 넘으면 가장 오래 사용되지 않은 항목부터 제거합니다.
+    - get의 ttl_for로 값마다 TTL을 정할 수 있습니다 (예: 조회 실패 대체값은 짧게, stale 구간 없이).
+    """
+
+    def __init__(self, maxsize: int = 2048, ttl: float = 30.0, stale_ttl: float = 120.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (value, stored_at, ttl, stale_ttl)
+        self._inflight: Dict[Hashable, _InFlight] = {}
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    def get(self, key: Hashable, loader: Callable[[], Any],
+            ttl_for: Optional[Callable[[Any], Optional[float]]] = None) -> Any:
+        """캐시에서 값을 가져오고, 없으면 loader로 조회하여 저장
+
+        ttl_for(value)가 숫자를 돌려주면 그 값을 이 항목의 TTL로 쓰고 stale 구간은 두지 않습니다
+        (None이면 기본 ttl/stale_ttl).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at, ttl, stale_ttl = entry
+                age = self._clock() - stored_at
+                if age < ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                if age < ttl + stale_ttl:
+                    self._entries.move_to_end(key)
+                    self.stale_hits += 1
+                    if key not in self._inflight:
+                        flight = self._inflight[key] = _InFlight()
+                        threading.Thread(
+                            target=self._revalidate, args=(key, loader, flight, ttl_for), daemon=True
+                        ).start()
+                    return value
+
+            self.misses += 1
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _InFlight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+            self._store(key, flight.value, ttl_for)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+        return flight.value
+
+    def _revalidate(self, key: Hashable, loader: Callable[[], Any], flight: _InFlight,
+                    ttl_for: Optional[Callable[[Any], Optional[float]]] = None):
+        """만료된 항목을 백그라운드에서 갱신"""
+        try:
+            flight.value = loader()
+            self._store(key, flight.value, ttl_for)
+            with self._lock:
+                self.refreshes += 1
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self.refresh_errors += 1
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """만료되지 않은 값만 조회 (통계와 LRU 순서에 영향 없음)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() - entry[1] < entry[2]:
+                return entry[0]
+        return None
+
+    def _store(self, key: Hashable, value: Any, ttl_for: Optional[Callable[[Any], Optional[float]]]):
+        ttl = ttl_for(value) if ttl_for is not None else None
+        if ttl is None:
+            self.set(key, value)
+        else:
+            self.set(key, value, ttl=ttl, stale_ttl=0.0)
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, stale_ttl: Optional[float] = None):
+        """값 저장 (TTL을 주지 않으면 기본값, 용량 초과 시 LRU 항목 제거)"""
+        with self._lock:
+            self._entries[key] = (value, self._clock(), self.ttl if ttl is None else ttl,
+                                  self.stale_ttl if stale_ttl is None else stale_ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable = None):
+        """특정 키 또는 전체 캐시 무효화"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        """캐시 통계"""
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "stale_ttl": self.stale_ttl,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "refreshes": self.refreshes,
+                "refresh_errors": self.refresh_errors,
+                "inflight": len(self._inflight)
+            }
@@ -0,0 +1,315 @@
+"""태그로 무효화되는 집계 응답 캐시
+
+엔드포인트 + 정규화된 쿼리 인자를 키로 직렬화된 응답 본문을 저장합니다. 각 항목은 저장 시점의
+태그(테이블) 세대 번호를 함께 기록하고, 커밋된 변경이 태그 세대를 올리면 해당 태그의 항목은
+다음 조회에서 무효로 처리됩니다 (항목을 찾아 지울 필요 없음). 세대는 ETag와 같은 DB의
+data_versions 버전과 저장소의 태그 세대를 합친 값입니다.
+
+- MemoryBackend: 프로세스 내 LRU (항목 수/바이트 상한)
+- DiskBackend: SQLite 파일 (같은 서버의 여러 gunicorn 워커가 결과와 무효화를 공유)
+
+ORM 커밋은 after_commit 훅으로 자동 무효화되고, ORM을 거치지 않는 대량 적재는
+invalidate_tags를 직접 호출합니다. 다른 프로세스(CLI, 로봇 런타임, 다른 워커)의 변경도
+data_versions를 올리므로 저장소와 관계없이 다음 조회에서 반영되어, 캐시된 본문이 ETag보다
+오래된 데이터가 되지 않습니다.
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+from flask import Response, make_response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.services.data_versions import get_versions
+
+
+class MemoryBackend:
+    """프로세스 내 LRU 저장소"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (body, mimetype, gens, expires)
+        self._generations: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def tag_generations(self, tags: Sequence[str]) -> Tuple[int, ...]:
+        with self._lock:
+            return tuple(self._generations.get(tag, 0) for tag in tags)
+
+    def bump_tags(self, tags: Iterable[str]):
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+
+    def get(self, key: str) -> Optional[tuple]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, body: bytes, mimetype: str, generations: Tuple[int, ...], expires: float):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[0])
+            self._entries[key] = (body, mimetype, generations, expires)
+            self._bytes += len(body)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted[0])
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "backend": self.name,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions
+            }
+
+
+class DiskBackend:
+    """SQLite 파일 저장소 (여러 프로세스가 공유, 마지막 접근 시각 기준 LRU)"""
+
+    name = "disk"
+
+    def __init__(self, path: str, max_entries: int = 10000, max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._writes = 0
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY, body BLOB NOT NULL, mimetype TEXT NOT NULL,
+                    generations TEXT NOT NULL, expires REAL NOT NULL, accessed REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS ix_entries_accessed ON entries (accessed);
+                CREATE TABLE IF NOT EXISTS tags (tag TEXT PRIMARY KEY, generation INTEGER NOT NULL);
+                CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def tag_generations(self, tags: Sequence[str]) -> Tuple[int, ...]:
+        if not tags:
+            return ()
+        rows = dict(self._connect().execute(
+            f"SELECT tag, generation FROM tags WHERE tag IN ({','.join('?' for _ in tags)})", list(tags)
+        ).fetchall())
+        return tuple(rows.get(tag, 0) for tag in tags)
+
+    def bump_tags(self, tags: Iterable[str]):
+        self._connect().executemany(
+            "INSERT INTO tags (tag, generation) VALUES (?, 1) "
+            "ON CONFLICT(tag) DO UPDATE SET generation = generation + 1",
+            [(tag,) for tag in tags]
+        )
+
+    def get(self, key: str) -> Optional[tuple]:
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT body, mimetype, generations, expires FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+        body, mimetype, generations, expires = row
+        return body, mimetype, tuple(int(value) for value in generations.split(",") if value), expires
+
+    def set(self, key: str, body: bytes, mimetype: str, generations: Tuple[int, ...], expires: float):
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO entries (key, body, mimetype, generations, expires, accessed) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, body, mimetype, ",".join(map(str, generations)), expires, time.time())
+        )
+        self._writes += 1
+        if self._writes % 32 == 0:
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        """상한을 넘으면 가장 오래 접근하지 않은 항목부터 삭제 (쓰기 32회마다 확인)"""
+        count, size = conn.execute("SELECT count(*), coalesce(sum(length(body)), 0) FROM entries").fetchone()
+        excess = max(count - self.max_entries, 0)
+        if size > self.max_bytes and count:
+            excess = max(excess, int(count * (1 - self.max_bytes / size)) + 1)
+        if excess:
+            conn.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed LIMIT ?)",
+                (excess,)
+            )
+            conn.execute(
+                "INSERT INTO counters (name, value) VALUES ('evictions', ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value", (excess,)
+            )
+
+    def clear(self):
+        self._connect().execute("DELETE FROM entries")
+
+    def stats(self) -> Dict:
+        conn = self._connect()
+        count, size = conn.execute("SELECT count(*), coalesce(sum(length(body)), 0) FROM entries").fetchone()
+        evictions = conn.execute("SELECT value FROM counters WHERE name = 'evictions'").fetchone()
+        return {
+            "backend": self.name,
+            "path": self.path,
+            "entries": count,
+            "bytes": size,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "evictions": evictions[0] if evictions else 0
+        }
+
+
+class ResponseCache:
+    """응답 캐시 (저장소는 backend로 교체 가능)"""
+
+    def __init__(self, backend=None, ttl: float = 300.0,
+                 versions: Optional[Callable[[Sequence[str]], Dict[str, int]]] = None):
+        self.backend = backend or MemoryBackend()
+        self.ttl = ttl
+        self.versions = versions or get_versions  # 태그(테이블) → DB의 data_versions 버전
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0  # 태그 무효화로 버려진 항목 수 (조회 시점 기준)
+
+    def _count(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def get_or_build(self, key: str, tags: Sequence[str], build: Callable[[], Response],
+                     ttl: Optional[float] = None) -> Tuple[Response, bool]:
+        """캐시된 응답 또는 build() 결과 (200 응답만 저장) → (응답, 캐시 적중 여부)"""
+        # 빌드 전에 세대를 읽어 두어야 빌드 중 커밋된 변경이 있으면 저장된 항목이 바로 무효가 됨
+        generations = self.generations(tags)
+        entry = self.backend.get(key)
+        if entry is not None:
+            body, mimetype, stored_generations, expires = entry
+            if stored_generations == generations and expires > time.time():
+                self._count("hits")
+                return Response(body, mimetype=mimetype), True
+            if stored_generations != generations:
+                self._count("invalidated")
+        self._count("misses")
+
+        response = build()
+        if response.status_code == 200 and not response.is_streamed:
+            self.backend.set(key, response.get_data(), response.mimetype, generations,
+                             time.time() + (ttl or self.ttl))
+        return response, False
+
+    def generations(self, tags: Sequence[str]) -> Tuple[int, ...]:
+        """DB 버전 (다른 프로세스의 쓰기 포함) + 저장소 태그 세대 (이 프로세스/저장소 공유 범위의 무효화)"""
+        if not tags:
+            return ()
+        versions = self.versions(tags)
+        return tuple(versions[tag] for tag in tags) + self.backend.tag_generations(tags)
+
+    def invalidate_tags(self, tags: Iterable[str]):
+        tags = sorted(set(tags))
+        if tags:
+            self.backend.bump_tags(tags)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits, misses, invalidated = self.hits, self.misses, self.invalidated
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "invalidated": invalidated,
+            "hit_ratio": round(hits / total, 4) if total else None,
+            **self.backend.stats()
+        }
+
+
+def make_backend(kind: str = None, path: str = None):
+    """RESPONSE_CACHE_BACKEND (memory/disk) 설정 → 저장소"""
+    if (kind or "memory") == "disk":
+        return DiskBackend(path or os.path.join(os.path.dirname(__file__), "..", "database", "response_cache.db"))
+    return MemoryBackend()
+
+
+response_cache = ResponseCache()
+
+
+def cache_key(vary: Optional[Callable[[], str]] = None) -> str:
+    """엔드포인트 + 정렬된 쿼리 인자 (+ vary 값)"""
+    args = "&".join(f"{name}={value}" for name, value in sorted(request.args.items(multi=True)))
+    key = f"{request.path}?{args}"
+    return f"{key}|{vary()}" if vary is not None else key
+
+
+def cached_response(tags: Sequence[str], ttl: Optional[float] = None, vary: Optional[Callable[[], str]] = None):
+    """응답 캐시 데코레이터
+
+    tags: 응답이 의존하는 테이블 (해당 테이블 커밋 시 무효화)
+    vary: 쿼리 인자 외에 응답을 바꾸는 값 (예: 롤업 구간)
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            response, hit = response_cache.get_or_build(
+                cache_key(vary), tags, lambda: make_response(view(*args, **kwargs)), ttl
+            )
+            response.headers['X-Cache'] = 'HIT' if hit else 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+
+_CHANGED_KEY = 'response_cache_changed_tables'
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changed_tables(session, flush_context):
+    changed = session.info.setdefault(_CHANGED_KEY, set())
+    changed.update(obj.__table__.name for obj in session.new)
+    changed.update(obj.__table__.name for obj in session.deleted)
+    changed.update(obj.__table__.name for obj in session.dirty if session.is_modified(obj))
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed_tables(session):
+    """커밋된 변경이 있는 테이블 태그 무효화"""
+    changed = session.info.pop(_CHANGED_KEY, None)
+    if changed:
+        response_cache.invalidate_tags(changed)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_changed_tables(session, previous_transaction):
+    session.info.pop(_CHANGED_KEY, None)
@@ -0,0 +1,664 @@
+"""로봇 런타임 (모의 매매 스케줄러)
+
+활성 로봇마다 자기 주기(Robot.run_interval, 없으면 전략별 기본값)로 깨어나 시세 피드의
+최신 봉 행렬에서 전략 신호를 평가하고, 나온 거래를 모아서 trades에 기록합니다.
+
+- 스케줄러 스레드 하나가 다음 실행 시각 힙으로 로봇을 깨우고, 평가는 크기가 정해진 스레드
+  풀에서 합니다. 이전 실행이 끝나지 않은 로봇은 그 회차를 건너뛰므로 (overrun) 느린 로봇은
+  작업자를 하나만 차지하고 다른 로봇의 주기를 밀어내지 않습니다.
+- 지표(Features)는 피드 봉이 바뀔 때 한 번, 전략 신호는 (전략, 파라미터)마다 한 번 계산해
+  같은 봉을 보는 로봇들이 공유합니다. 신호 함수는 백테스트(backtest.STRATEGIES)와 같습니다.
+- 체결은 최신 종가로 하며, 손절/익절/청산 신호/최대 보유 봉 수 규칙과 포지션 크기는 백테스트의
+  보유 수 제한 모드와 같습니다.
+- robots에는 평가액(current_capital)과 현금(cash)을 함께 기록합니다. 런타임을 시작하면 trades의
+  닫히지 않은 매수 묶음(ExitMonitor 장부와 같은 규칙)으로 피드에 있는 종목의 보유 포지션을 복원하고
+  현금은 cash에서 이어 갑니다 (cash가 없으면 current_capital에서 복원한 포지션의 매수 금액을 뺌).
+- 거래는 기록 스레드가 batch_size건 또는 flush_interval초마다 ORM 세션 한 번의 커밋으로
+  저장합니다 (롤업, 데이터 버전, 응답 캐시, SSE 거래 스트림은 세션 이벤트로 함께 갱신).
+- RandomWalkQuoteFeed는 Polygon 대신 쓰는 로컬 시세 피드로, interval초마다 전 종목에
+  기하 랜덤워크 봉을 하나씩 추가합니다.
+"""
+import heapq
+import math
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from src.models.trading import Robot, Trade
+from src.services.backtest import (DEFAULT_COMMISSION_RATE, EXIT_EXPIRY, EXIT_REASONS, EXIT_SIGNAL, EXIT_STOP,
+                                   EXIT_TARGET, OHLCV, STRATEGIES, BarMatrix, Features, strategy_params)
+from src.services.indicators import TRADE_INDICATORS
+from src.services.stock_data_service import stock_service
+
+# strategy_type → 기본 실행 주기 (초, Robot.run_interval이 없을 때)
+DEFAULT_INTERVALS = {
+    "AI 퀀트": 5.0,
+    "모멘텀 투자": 10.0,
+    "성장주 투자": 15.0,
+    "가치 투자": 30.0,
+    "배당 투자": 30.0
+}
+FALLBACK_INTERVAL = 30.0
+
+
+def robot_interval(strategy_type: str, run_interval: Optional[float] = None) -> float:
+    """로봇 실행 주기 (초)"""
+    if run_interval is not None and run_interval > 0:
+        return float(run_interval)
+    return DEFAULT_INTERVALS.get(strategy_type, FALLBACK_INTERVAL)
+
+
+# ---- 로컬 시세 피드 ----
+
+class FeedSnapshot:
+    """피드의 한 시점 (봉 행렬은 교체만 되고 수정되지 않으므로 잠금 없이 읽음)"""
+
+    __slots__ = ("generation", "bars", "rows", "at")
+
+    def __init__(self, generation: int, bars: BarMatrix, rows: Dict[str, int]):
+        self.generation = generation  # 봉이 추가될 때마다 1 증가
+        self.bars = bars
+        self.rows = rows  # 종목 → 행
+        self.at = datetime.utcnow()
+
+    def quote(self, symbol: str) -> Optional[Dict]:
+        """StockDataService 시세 형식의 최신 봉"""
+        row = self.rows.get(symbol)
+        if row is None:
+            return None
+        bars = self.bars
+        return {
+            "symbol": symbol,
+            "open": round(float(bars.open[row, -1]), 2),
+            "high": round(float(bars.high[row, -1]), 2),
+            "low": round(float(bars.low[row, -1]), 2),
+            "close": round(float(bars.close[row, -1]), 2),
+            "volume": int(bars.volume[row, -1]),
+            "timestamp": int(self.at.timestamp() * 1000)
+        }
+
+
+class RandomWalkQuoteFeed:
+    """Polygon 대역 로컬 시세 피드 (종목별 기하 랜덤워크 봉)
+
+    처음에 window개 봉을 미리 만들어 지표가 바로 준비되게 하고, tick()마다 전 종목에 봉을
+    하나 추가하고 가장 오래된 봉을 버립니다. quote_cache를 넘기면 새 봉을 시세 캐시에도
+    넣어 /api/market/quote 등이 같은 가격을 보게 합니다. start_prices의 종목은 마지막 종가가
+    그 가격에서 시작합니다 (없으면 20~500 사이 무작위).
+    """
+
+    def __init__(self, symbols: Sequence[str], window: int = 260, seed: Optional[int] = None,
+                 drift: float = 0.0002, volatility: float = 0.015, quote_cache=None,
+                 start_prices: Optional[Dict[str, float]] = None):
+        self.symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+        if not self.symbols:
+            raise ValueError("No symbols for the quote feed")
+        self.drift = drift
+        self.volatility = volatility
+        self.quote_cache = quote_cache
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        start_price = self._rng.uniform(20, 500, len(self.symbols))
+        columns = self._random_bars(start_price, window)
+        if start_prices:
+            # 주어진 종목은 마지막 종가가 그 가격이 되도록 봉 전체를 비례 조정
+            scale = np.array([start_prices.get(symbol, close) / close
+                              for symbol, close in zip(self.symbols, columns[3][:, -1].tolist())])
+            columns[:4] = [column * scale[:, None] for column in columns[:4]]
+        dates = np.busday_offset(np.datetime64(date.today(), "D"), np.arange(-window, 0), roll="backward")
+        self._snapshot = FeedSnapshot(0, BarMatrix(self.symbols, dates, *columns),
+                                      {symbol: row for row, symbol in enumerate(self.symbols)})
+
+    def _random_bars(self, prev_close: np.ndarray, steps: int) -> List[np.ndarray]:
+        """직전 종가에서 이어지는 steps개 봉 (open, high, low, close, volume)"""
+        shape = (len(prev_close), steps)
+        rng, volatility = self._rng, self.volatility
+        close = prev_close[:, None] * np.exp(np.cumsum(rng.normal(self.drift, volatility, shape), axis=1))
+        previous = np.concatenate([prev_close[:, None], close[:, :-1]], axis=1)
+        open_ = previous * np.exp(rng.normal(0, volatility / 4, shape))
+        high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0, volatility / 2, shape)))
+        low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0, volatility / 2, shape)))
+        volume = rng.integers(100_000, 5_000_000, shape).astype(np.float64)
+        return [open_, high, low, close, volume]
+
+    def snapshot(self) -> FeedSnapshot:
+        return self._snapshot
+
+    def tick(self) -> FeedSnapshot:
+        """전 종목에 새 봉 하나 추가"""
+        with self._lock:
+            current = self._snapshot
+            bars = current.bars
+            columns = self._random_bars(bars.close[:, -1], 1)
+            shifted = [np.concatenate([getattr(bars, name)[:, 1:], column], axis=1)
+                       for name, column in zip(OHLCV, columns)]
+            dates = np.append(bars.dates[1:], np.busday_offset(bars.dates[-1], 1, roll="forward"))
+            self._snapshot = snapshot = FeedSnapshot(current.generation + 1,
+                                                     BarMatrix(bars.symbols, dates, *shifted), current.rows)
+        if self.quote_cache is not None:
+            for symbol in self.symbols:
+                self.quote_cache.set(symbol, snapshot.quote(symbol))
+        return snapshot
+
+    def start(self, interval: float = 1.0):
+        """interval초마다 tick()하는 백그라운드 스레드 시작"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.tick()
+                except Exception as e:
+                    print(f"Error advancing quote feed: {e}")
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, name="quote-feed", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def last_trade_prices(engine, symbols: Sequence[str]) -> Dict[str, float]:
+    """종목별 마지막 거래 가격 (피드 시작 가격으로 쓰면 복원한 포지션이 그 가격에서 이어짐)"""
+    table = Trade.__table__
+    latest = select(func.max(table.c.id)).where(table.c.symbol.in_(list(symbols))).group_by(table.c.symbol)
+    with engine.connect() as conn:
+        rows = conn.execute(select(table.c.symbol, table.c.price).where(table.c.id.in_(latest))).all()
+    return {symbol: price for symbol, price in rows if price}
+
+
+# ---- 로봇 상태 ----
+
+class Position(NamedTuple):
+    quantity: int
+    price: float
+    generation: int  # 진입한 피드 봉
+    stop_loss: float
+    take_profit: float
+
+
+class RobotState:
+    """런타임이 관리하는 로봇 한 개 (같은 로봇의 실행은 겹치지 않으므로 실행 중에는 잠금 없이 갱신)"""
+
+    def __init__(self, robot_id: int, name: str, strategy_type: str, interval: float, capital: float,
+                 initial_capital: float, cash: Optional[float] = None):
+        self.robot_id = robot_id
+        self.name = name
+        self.strategy_type = strategy_type
+        self.params = strategy_params(strategy_type)
+        self.interval = interval
+        self.initial_capital = initial_capital
+        self.capital = capital  # 실현 손익 반영 자본 (포지션 크기 기준)
+        self.cash = capital if cash is None else cash
+        self.equity = capital
+        self.positions: Dict[str, Position] = {}
+        self.generation = -1  # 마지막으로 평가한 피드 봉
+        self.busy = False
+
+        self.runs = 0
+        self.overruns = 0
+        self.errors = 0
+        self.trades = 0
+        self.last_error: Optional[str] = None
+        self.last_run_at: Optional[datetime] = None
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.last_seconds = 0.0
+        self._recent = deque(maxlen=256)
+
+    def record(self, seconds: float):
+        self.runs += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.last_seconds = seconds
+        self.last_run_at = datetime.utcnow()
+        self._recent.append(seconds)
+
+    def stats(self) -> Dict:
+        recent = sorted(self._recent)
+        return {
+            'robot_id': self.robot_id,
+            'name': self.name,
+            'strategy_type': self.strategy_type,
+            'interval': self.interval,
+            'runs': self.runs,
+            'overruns': self.overruns,
+            'errors': self.errors,
+            'last_error': self.last_error,
+            'trades': self.trades,
+            'open_positions': len(self.positions),
+            'cash': round(self.cash, 2),
+            'equity': round(self.equity, 2),
+            'last_run_at': self.last_run_at.isoformat() if self.last_run_at else None,
+            'last_ms': round(self.last_seconds * 1000, 2),
+            'avg_ms': round(self.total_seconds / self.runs * 1000, 2) if self.runs else None,
+            'p95_ms': round(recent[int(0.95 * (len(recent) - 1))] * 1000, 2) if recent else None,
+            'max_ms': round(self.max_seconds * 1000, 2)
+        }
+
+
+# ---- 거래 기록 ----
+
+class TradeBatchWriter:
+    """로봇들이 낸 거래를 모아 batch_size건 또는 flush_interval초마다 한 트랜잭션으로 기록"""
+
+    def __init__(self, engine, batch_size: int = 500, flush_interval: float = 1.0):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._rows: List[Dict] = []
+        self._capital: Dict[int, Tuple[float, float, float]] = {}  # 로봇 → (평가액, 현금, 초기 자본)
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.written = 0
+        self.batches = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self.last_batch = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+
+    def add(self, rows: List[Dict], state: Optional[RobotState] = None):
+        """거래 행 추가 (state를 넘기면 그 로봇의 평가액/현금도 같은 트랜잭션으로 robots에 반영)"""
+        with self._lock:
+            self._rows.extend(rows)
+            if state is not None:
+                self._capital[state.robot_id] = (state.equity, state.cash, state.initial_capital)
+            full = len(self._rows) >= self.batch_size
+        if full:
+            self._ready.set()
+
+    def flush(self) -> int:
+        with self._lock:
+            rows, self._rows = self._rows, []
+            capital, self._capital = self._capital, {}
+        if not rows and not capital:
+            return 0
+        start = time.perf_counter()
+        try:
+            with Session(self.engine) as session:
+                session.add_all([Trade(**row) for row in rows])
+                for robot in session.scalars(select(Robot).where(Robot.id.in_(capital))):
+                    equity, cash, initial = capital[robot.id]
+                    robot.current_capital = round(equity, 2)
+                    robot.cash = round(cash, 2)
+                    robot.total_return = round((equity / initial - 1) * 100, 2) if initial else None
+                session.commit()
+        except Exception as e:
+            # 다음 주기에 다시 시도 (그 사이 들어온 거래 앞에 둠)
+            self.errors += 1
+            self.last_error = str(e)
+            print(f"Error writing robot trades: {e}")
+            with self._lock:
+                self._rows[:0] = rows
+                for robot_id, value in capital.items():
+                    self._capital.setdefault(robot_id, value)
+            return 0
+        elapsed = (time.perf_counter() - start) * 1000
+        self.written += len(rows)
+        self.batches += 1
+        self.last_batch = len(rows)
+        self.last_flush_ms = elapsed
+        self.max_flush_ms = max(self.max_flush_ms, elapsed)
+        return len(rows)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        def run():
+            while not self._stop.is_set():
+                self._ready.wait(self.flush_interval)
+                self._ready.clear()
+                self.flush()
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, name="robot-trade-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        self._ready.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            pending = len(self._rows)
+        return {
+            'written': self.written,
+            'batches': self.batches,
+            'pending': pending,
+            'errors': self.errors,
+            'last_error': self.last_error,
+            'last_batch': self.last_batch,
+            'avg_batch': round(self.written / self.batches, 1) if self.batches else None,
+            'last_flush_ms': round(self.last_flush_ms, 2),
+            'max_flush_ms': round(self.max_flush_ms, 2)
+        }
+
+
+# ---- 런타임 ----
+
+def _rounded(value: float, digits: int) -> Optional[float]:
+    return None if value != value else round(float(value), digits)
+
+
+class RobotRuntime:
+    """활성 로봇을 각자의 주기로 실행하는 백그라운드 런타임"""
+
+    def __init__(self, workers: int = 4, batch_size: int = 500, flush_interval: float = 1.0,
+                 reload_interval: float = 30.0, commission_rate: float = DEFAULT_COMMISSION_RATE,
+                 interval: Optional[float] = None):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.reload_interval = reload_interval
+        self.commission_rate = commission_rate
+        self.interval = interval  # 지정하면 모든 로봇에 같은 주기 사용
+        self.engine = None
+        self.feed = None
+        self.writer: Optional[TradeBatchWriter] = None
+        self.started_at: Optional[datetime] = None
+        self._robots: Dict[int, RobotState] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._reload = threading.Event()
+        self._cache_lock = threading.Lock()
+        self._cache_generation = -1
+        self._features: Optional[list] = None  # [잠금, Features]
+        self._signals: Dict[tuple, list] = {}  # (전략, 파라미터) → [잠금, (진입, 청산)]
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, engine, feed):
+        """스케줄러/평가 풀/기록 스레드 시작 (feed의 tick은 호출하는 쪽에서 관리)"""
+        if self.running:
+            return
+        self.engine = engine
+        self.feed = feed
+        self.writer = TradeBatchWriter(engine, self.batch_size, self.flush_interval)
+        self.writer.start()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="robot-runtime")
+        self._stop.clear()
+        self.started_at = datetime.utcnow()
+        self._thread = threading.Thread(target=self._schedule, name="robot-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """새 실행을 멈추고 진행 중인 실행이 끝나면 남은 거래를 기록"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        if self.writer is not None:
+            # 거래가 없던 마지막 실행들의 평가액도 robots에 남김
+            for state in self._robots.values():
+                if state.runs:
+                    self.writer.add([], state)
+            self.writer.stop(timeout)
+
+    def reload(self):
+        """다음 스케줄러 주기에 활성 로봇 목록 다시 읽기"""
+        self._reload.set()
+
+    # -- 스케줄링 --
+
+    def load_robots(self) -> List[int]:
+        """활성 로봇 목록 동기화 (전략이 정의된 로봇만), 새로 추가된 로봇 ID 반환"""
+        table = Robot.__table__
+        with self.engine.connect() as conn:
+            rows = conn.execute(select(
+                table.c.id, table.c.name, table.c.strategy_type, table.c.initial_capital,
+                table.c.current_capital, table.c.cash, table.c.run_interval
+            ).where(table.c.is_active.is_(True), table.c.strategy_type.in_(list(STRATEGIES)))).all()
+        robots, added = {}, {}
+        for robot_id, name, strategy_type, initial, current, cash, run_interval in rows:
+            interval = self.interval or robot_interval(strategy_type, run_interval)
+            state = self._robots.get(robot_id)
+            if state is None:
+                initial = initial or 100000.0
+                state = RobotState(robot_id, name, strategy_type, interval, current or initial, initial, cash)
+                added[robot_id] = (state, cash is None)
+            elif state.strategy_type != strategy_type:
+                state.strategy_type, state.params = strategy_type, strategy_params(strategy_type)
+            state.name, state.interval = name, interval
+            robots[robot_id] = state
+        if added:
+            self.restore_positions(added)
+        self._robots = robots
+        return list(added)
+
+    def restore_positions(self, states: Dict[int, Tuple[RobotState, bool]]):
+        """trades의 닫히지 않은 매수 묶음으로 보유 포지션 복원 (로봇 → (상태, 현금 미기록 여부))
+
+        같은 종목의 묶음은 수량 가중 평균 단가의 포지션 하나로 합치고, 손절/익절가는 가장 먼저 산
+        묶음의 값을 씁니다 (없으면 전략 비율). 보유 기간은 복원한 봉부터 셉니다. 피드에 없는 종목은
+        런타임이 값을 매기거나 팔 수 없으므로 건너뜁니다 (ExitMonitor가 감시).
+        """
+        # exit_triggers가 이 모듈의 TradeBatchWriter를 가져오므로 순환 import를 피해 여기서 가져옴
+        from src.services.exit_triggers import ExitMonitor
+
+        ledger = ExitMonitor(robot_ids=list(states))
+        ledger.sync(self.engine)
+        snapshot = self.feed.snapshot()
+        close = snapshot.bars.close[:, -1]
+        for (robot_id, symbol), lots in ledger.open_lots().items():
+            row = snapshot.rows.get(symbol)
+            if row is None:
+                continue
+            state, derive_cash = states[robot_id]
+            params = state.params
+            quantity = sum(lot.quantity for lot in lots)
+            price = sum(lot.quantity * lot.entry_price for lot in lots) / quantity
+            first = lots[0]
+            state.positions[symbol] = Position(
+                quantity, price, snapshot.generation,
+                first.stop_loss if first.stop_loss is not None else price * (1 - params["stop_loss_pct"] / 100),
+                first.take_profit if first.take_profit is not None else price * (1 + params["take_profit_pct"] / 100)
+            )
+            if derive_cash:
+                state.cash -= quantity * price
+        for state, _ in states.values():
+            state.equity = state.cash + sum(position.quantity * close[snapshot.rows[symbol]]
+                                            for symbol, position in state.positions.items())
+
+    def _schedule(self):
+        due: List[Tuple[float, int]] = []
+        reload_at = 0.0
+        while not self._stop.is_set():
+            now = time.monotonic()
+            if now >= reload_at or self._reload.is_set():
+                self._reload.clear()
+                try:
+                    # 새 로봇은 주기 안에서 시작 시점을 흩어 한꺼번에 깨어나지 않게 함
+                    for robot_id in self.load_robots():
+                        heapq.heappush(due, (now + random.uniform(0, self._robots[robot_id].interval), robot_id))
+                except Exception as e:
+                    print(f"Error loading robots: {e}")
+                reload_at = now + self.reload_interval
+            while due and due[0][0] <= now:
+                when, robot_id = heapq.heappop(due)
+                state = self._robots.get(robot_id)
+                if state is None:  # 비활성화된 로봇
+                    continue
+                if state.busy:
+                    state.overruns += 1
+                else:
+                    state.busy = True
+                    self._executor.submit(self._run, state)
+                # 고정 주기, 밀린 회차는 몰아서 실행하지 않음
+                when += state.interval
+                heapq.heappush(due, (when if when > now else now + state.interval, robot_id))
+            wait = min(due[0][0] if due else reload_at, reload_at) - time.monotonic()
+            self._stop.wait(max(wait, 0.0))
+
+    def _run(self, state: RobotState):
+        start = time.perf_counter()
+        try:
+            rows = self.evaluate(state, self.feed.snapshot())
+            if rows:
+                state.trades += len(rows)
+                self.writer.add(rows, state)
+        except Exception as e:
+            state.errors += 1
+            state.last_error = str(e)
+        finally:
+            state.record(time.perf_counter() - start)
+            state.busy = False
+
+    # -- 평가 --
+
+    def _shared(self, snapshot: FeedSnapshot, strategy_type: str, params: Dict) -> Tuple[Features, tuple]:
+        """피드 봉 기준 공유 지표와 (전략, 파라미터)별 신호의 마지막 봉 (처음 요청한 로봇이 계산)"""
+        key = (strategy_type, tuple(sorted(params.items())))
+        with self._cache_lock:
+            if self._cache_generation != snapshot.generation:
+                self._cache_generation = snapshot.generation
+                self._features = [threading.Lock(), None]
+                self._signals = {}
+            features_entry = self._features
+            entry = self._signals.setdefault(key, [threading.Lock(), None])
+        with features_entry[0]:
+            if features_entry[1] is None:
+                features = Features(snapshot.bars)
+                features.base
+                features_entry[1] = features
+        features = features_entry[1]
+        with entry[0]:
+            if entry[1] is None:
+                entry_signal, exit_signal = STRATEGIES[strategy_type]["signals"](features, params)
+                entry[1] = (entry_signal[:, -1], exit_signal[:, -1])
+        return features, entry[1]
+
+    def evaluate(self, state: RobotState, snapshot: FeedSnapshot) -> List[Dict]:
+        """새 봉이 있으면 청산 → 진입 순으로 처리하고 trades 행 목록 반환"""
+        if snapshot.generation == state.generation:
+            return []
+        state.generation = snapshot.generation
+        features, (entry_signal, exit_signal) = self._shared(snapshot, state.strategy_type, state.params)
+        bars, params, rate = snapshot.bars, state.params, self.commission_rate
+        close = bars.close[:, -1]
+        rows = []
+
+        for symbol, position in list(state.positions.items()):
+            row = snapshot.rows[symbol]
+            price = close[row]
+            if not price > 0:
+                continue
+            if price <= position.stop_loss:
+                reason = EXIT_STOP
+            elif price >= position.take_profit:
+                reason = EXIT_TARGET
+            elif exit_signal[row]:
+                reason = EXIT_SIGNAL
+            elif snapshot.generation - position.generation >= params["max_holding_days"]:
+                reason = EXIT_EXPIRY
+            else:
+                continue
+            del state.positions[symbol]
+            state.cash += position.quantity * price * (1 - rate)
+            state.capital += position.quantity * (price * (1 - rate) - position.price * (1 + rate))
+            return_pct = (price * (1 - rate) / (position.price * (1 + rate)) - 1) * 100
+            rows.append(self._trade_row(state, snapshot, features, row, "SELL", position.quantity, price,
+                                        EXIT_REASONS[reason], position, return_pct,
+                                        snapshot.generation - position.generation))
+
+        # 진입: 신호가 난 종목을 종목 순서대로, 보유 수 제한(100 / position_size_pct)과 현금 안에서
+        limit = max(int(100 // params["position_size_pct"]), 1)
+        for row in np.flatnonzero(entry_signal & (close > 0)).tolist():
+            if len(state.positions) >= limit:
+                break
+            symbol = bars.symbols[row]
+            if symbol in state.positions:
+                continue
+            price = float(close[row])
+            quantity = math.floor(max(state.capital, 0.0) * params["position_size_pct"] / 100 / price)
+            cost = quantity * price * (1 + rate)
+            if quantity <= 0 or cost > state.cash:
+                continue
+            state.cash -= cost
+            position = Position(quantity, price, snapshot.generation,
+                                price * (1 - params["stop_loss_pct"] / 100),
+                                price * (1 + params["take_profit_pct"] / 100))
+            state.positions[symbol] = position
+            rows.append(self._trade_row(state, snapshot, features, row, "BUY", quantity, price,
+                                        STRATEGIES[state.strategy_type]["reason"], position,
+                                        params["take_profit_pct"], params["max_holding_days"]))
+
+        state.equity = state.cash + sum(position.quantity * close[snapshot.rows[symbol]]
+                                        for symbol, position in state.positions.items())
+        return rows
+
+    def _trade_row(self, state: RobotState, snapshot: FeedSnapshot, features: Features, row: int,
+                   trade_type: str, quantity: int, price: float, reason: str, position: Position,
+                   expected_return: float, holding_period: int) -> Dict:
+        bars, symbol = snapshot.bars, snapshot.bars.symbols[row]
+        info = stock_service.symbol_index.get(symbol)
+        indicators = features.base
+        return {
+            "robot_id": state.robot_id,
+            "symbol": symbol,
+            "company_name": (info.name if info is not None else None) or f"{symbol} Inc.",
+            "trade_type": trade_type,
+            "quantity": quantity,
+            "price": round(price, 2),
+            "total_amount": round(price * quantity, 2),
+            "trade_date": snapshot.at,
+            "reason": reason,
+            "market_condition": stock_service.market_conditions.get()["overall_sentiment"],
+            "sector": info.sector if info is not None else None,
+            "market_cap": info.market_cap if info is not None else None,
+            **{name: _rounded(indicators[name][row, -1], digits) for name, digits in TRADE_INDICATORS.items()},
+            "market_price_at_trade": round(price, 2),
+            "day_high": _rounded(bars.high[row, -1], 2),
+            "day_low": _rounded(bars.low[row, -1], 2),
+            "day_open": _rounded(bars.open[row, -1], 2),
+            "prev_close": _rounded(bars.close[row, -2], 2) if bars.shape[1] > 1 else None,
+            "expected_return": round(expected_return, 2),
+            "stop_loss": round(position.stop_loss, 2),
+            "take_profit": round(position.take_profit, 2),
+            "holding_period": holding_period,
+            "position_size_pct": state.params["position_size_pct"]
+        }
+
+    def stats(self) -> Dict:
+        robots = sorted(self._robots.values(), key=lambda state: state.robot_id)
+        snapshot = self.feed.snapshot() if self.feed is not None else None
+        return {
+            'running': self.running,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'workers': self.workers,
+            'feed': {
+                'symbols': len(snapshot.bars.symbols),
+                'generation': snapshot.generation,
+                'updated_at': snapshot.at.isoformat()
+            } if snapshot is not None else None,
+            'writer': self.writer.stats() if self.writer is not None else None,
+            'robots': [state.stats() for state in robots]
+        }
+
+
+# 앱 전체에서 공유하는 런타임 (flask run-robots 또는 ROBOT_RUNTIME=1일 때 시작)
+robot_runtime = RobotRuntime()
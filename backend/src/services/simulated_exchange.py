@@ -0,0 +1,152 @@
+"""모의 거래소 (체결 엔진 + 시세 주변 가상 유동성 + 체결의 Trade 기록)
+
+종목에 주문이 들어오면 현재 시세(종가)를 기준으로 위아래 levels단계의 지정가 호가 사다리를
+가상 유동성 공급자 주문(robot_id 없음)으로 채워 둡니다. 시세가 바뀌면 사다리를 새 가격으로
+다시 걸고 (그때 로봇의 대기 주문과 교차하면 로봇 주문 가격으로 체결), 기준가를 옮겨 닿은
+스톱 주문을 발동합니다. 로봇 주문이 참여한 체결은 로봇 쪽마다 Trade 한 행으로 기록합니다.
+"""
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.models.trading import Trade
+from src.services.order_book import (BUY, LIMIT, MARKET, SELL, STOP, STOP_LIMIT, Fill, MatchingEngine, Order,
+                                     validate_order)
+from src.services.stock_data_service import stock_service
+
+ORDER_TYPE_LABELS = {LIMIT: "지정가", MARKET: "시장가", STOP: "스톱", STOP_LIMIT: "스톱 지정가"}
+
+
+def trade_row(robot_id: int, trade_type: str, quantity: int, price: float, reason: str, data: Dict) -> Dict:
+    """generate_detailed_trade_data 결과 + 체결 수량/가격 → trades 행"""
+    indicators, market, strategy = data['technical_indicators'], data['market_data'], data['trade_strategy']
+    return {
+        'robot_id': robot_id,
+        'symbol': data['symbol'],
+        'company_name': data['company_name'],
+        'trade_type': trade_type,
+        'quantity': quantity,
+        'price': price,
+        'total_amount': round(price * quantity, 2),
+        'reason': reason,
+        'confidence_score': data['confidence_score'],
+        'market_condition': data['market_condition'],
+        'sector': data['sector'],
+        'market_cap': data['market_cap'],
+        'rsi': indicators['rsi'],
+        'macd': indicators['macd'],
+        'moving_avg_20': indicators['moving_avg_20'],
+        'moving_avg_50': indicators['moving_avg_50'],
+        'volume_ratio': indicators['volume_ratio'],
+        'market_price_at_trade': market['market_price_at_trade'],
+        'day_high': market['day_high'],
+        'day_low': market['day_low'],
+        'day_open': market['day_open'],
+        'prev_close': market['prev_close'],
+        'expected_return': strategy['expected_return'],
+        'stop_loss': strategy['stop_loss'],
+        'take_profit': strategy['take_profit'],
+        'holding_period': strategy['holding_period'],
+        'position_size_pct': strategy['position_size_pct'],
+        'risk_score': strategy['risk_score']
+    }
+
+
+class SimulatedExchange:
+    """시세 주변 가상 유동성을 공급하는 모의 거래소"""
+
+    def __init__(self, matching: Optional[MatchingEngine] = None,
+                 quote_source: Optional[Callable[[str], Dict]] = None,
+                 levels: int = 5, level_size: int = 500, spread_bps: float = 5.0):
+        self.matching = matching or MatchingEngine()
+        self.quote_source = quote_source or stock_service.get_stock_quote
+        self.levels = levels
+        self.level_size = level_size  # 1단계 수량 (단계마다 1배씩 늘어남)
+        self.spread_bps = spread_bps  # 단계 간격 (기준가 대비 bp, 최소 0.01)
+        self._liquidity: Dict[str, Tuple[float, List[Order]]] = {}  # 종목 → (기준가, 공급자 주문)
+        self._lock = threading.Lock()
+
+    def refresh(self, symbol: str) -> Tuple[Dict, List[Fill]]:
+        """시세가 바뀌었으면 호가 사다리를 다시 걸고 기준가 반영 → (시세, 그 사이 생긴 체결)"""
+        quote = self.quote_source(symbol)
+        price = quote['close']
+        fills: List[Fill] = []
+        with self._lock:
+            current = self._liquidity.get(symbol)
+            if current is not None and current[0] == price:
+                return quote, fills
+            for order in current[1] if current is not None else ():
+                self.matching.cancel(order.id)
+            step = max(round(price * self.spread_bps / 10000, 2), 0.01)
+            orders = []
+            for level in range(1, self.levels + 1):
+                for side, level_price in ((SELL, round(price + step * level, 2)), (BUY, round(price - step * level, 2))):
+                    if level_price <= 0:
+                        continue
+                    order, level_fills = self.matching.submit(symbol, side, self.level_size * level, LIMIT, level_price)
+                    fills.extend(level_fills)
+                    if order.remaining:
+                        orders.append(order)
+            self._liquidity[symbol] = (price, orders)
+            fills.extend(self.matching.mark(symbol, price))
+        return quote, fills
+
+    def submit(self, symbol: str, side: str, quantity: int, order_type: str = MARKET,
+               price: Optional[float] = None, stop_price: Optional[float] = None,
+               robot_id: Optional[int] = None) -> Tuple[Order, List[Fill], Dict]:
+        """주문 접수 → (주문, 체결 목록 (호가 갱신으로 체결된 다른 대기 주문 포함), 시세)"""
+        symbol = symbol.upper()
+        # 호가 갱신으로 생긴 체결을 잃지 않도록 갱신 전에 검증
+        validate_order(side, quantity, order_type, price, stop_price)
+        quote, fills = self.refresh(symbol)
+        order, order_fills = self.matching.submit(symbol, side, quantity, order_type, price, stop_price, robot_id)
+        return order, fills + order_fills, quote
+
+    def cancel(self, order_id: int) -> Optional[Order]:
+        return self.matching.cancel(order_id)
+
+    def trade_rows(self, fills: List[Fill], quote: Dict) -> List[Tuple[Order, Dict]]:
+        """로봇 주문이 참여한 체결 → (주문, trades 행) (체결마다 로봇 쪽 한 행씩)"""
+        rows = []
+        for fill in fills:
+            for order, trade_type in ((fill.buy, BUY), (fill.sell, SELL)):
+                if order.robot_id is None:
+                    continue
+                data = stock_service.generate_detailed_trade_data(order.symbol, trade_type, None, quote=quote)
+                reason = (f"{ORDER_TYPE_LABELS[order.type]} 주문 #{order.id} 체결 "
+                          f"{fill.quantity}/{order.quantity}주: {data['reason']}")
+                rows.append((order, trade_row(order.robot_id, trade_type, fill.quantity, fill.price, reason, data)))
+        return rows
+
+
+def place_order(session, robot_id: int, symbol: str, side: str, quantity: int, order_type: str = MARKET,
+                price: Optional[float] = None, stop_price: Optional[float] = None) -> Tuple[Order, List[Trade]]:
+    """주문을 모의 거래소에 넣고 생긴 로봇 체결을 trades에 커밋 → (주문, 이 주문의 Trade 목록)
+
+    잘못된 주문은 ValueError. 호가 갱신으로 함께 체결된 다른 로봇의 대기 주문도 같은 트랜잭션에
+    기록하지만 반환 목록에는 이 주문의 체결만 담습니다. 주문장은 커밋 전에 이미 바뀌므로, 기록에
+    실패하면 trades에 남지 않은 로봇 체결을 로그로 남기고 롤백한 뒤 예외를 다시 던집니다.
+    """
+    order, fills, quote = exchange.submit(symbol, side, quantity, order_type, price, stop_price, robot_id)
+    try:
+        rows = exchange.trade_rows(fills, quote)
+        trades = [Trade(**row) for _, row in rows]
+        session.add_all(trades)
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        log_lost_fills(fills, e)
+        raise
+    return order, [trade for (owner, _), trade in zip(rows, trades) if owner is order]
+
+
+def log_lost_fills(fills: List[Fill], error: Exception):
+    """주문장에서는 체결되었지만 trades에 기록하지 못한 로봇 체결 출력"""
+    for fill in fills:
+        for order, trade_type in ((fill.buy, BUY), (fill.sell, SELL)):
+            if order.robot_id is not None:
+                print(f"Lost fill (not recorded in trades): robot {order.robot_id} {trade_type} "
+                      f"{fill.quantity} {order.symbol} @ {fill.price} (order #{order.id}): {error}")
+
+
+# 앱 전체에서 공유하는 모의 거래소 (주문장은 프로세스 메모리에만 있음)
+exchange = SimulatedExchange()
@@ -1,15 +1,45 @@
 import requests
 import random
+import copy
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date, timedelta
-from typing import List, Dict, Optional
+from itertools import islice
+from typing import Iterable, Iterator, List, Dict, Optional
 import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from src.services.market_condition_provider import MarketConditionProvider
+from src.services.quote_cache import QuoteCache
+from src.services.symbol_index import SymbolIndex
+
+MOCK_QUOTE_TTL = 5.0  # 조회 실패 대체 시세의 캐시 시간 (초)
+
+
+class MockQuote(dict):
+    """API 조회 실패 시 대신 쓰는 모의 시세 (캐시에서 실제 시세와 구분하기 위한 표시)"""
+
 
 class StockDataService:
     """실제 주식 데이터를 가져오는 서비스"""
     
-    def __init__(self, polygon_api_key: str = None):
+    def __init__(self, polygon_api_key: str = None, quote_cache: QuoteCache = None,
+                 base_url: str = None, max_workers: int = 8, timeout: tuple = (3.05, 10)):
         self.polygon_api_key = polygon_api_key or "demo"  # 데모 키 사용
-        self.base_url = "https://api.polygon.io"
+        self.base_url = base_url or "https://api.polygon.io"
+        
+        # HTTP 연결 재사용 (keep-alive, 연결 수 제한, 타임아웃, 재시도)
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.session = self._build_session(pool_size=max_workers)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        
+        # 시세 캐시 (대시보드 폴링마다 종목별 API 호출을 반복하지 않도록)
+        self.quote_cache = quote_cache or QuoteCache(maxsize=2048, ttl=30.0, stale_ttl=120.0)
+        
+        # 종목 → 실제 일봉으로 계산한 기술적 지표 (없거나 봉이 부족하면 None, 그때는 모의 값 사용)
+        self.indicator_source = None
         
         # 주요 섹터별 대표 종목들
         self.sector_stocks = {
@@ -26,6 +56,19 @@ class StockDataService:
             "Communication": ["VZ", "T", "CMCSA", "DIS", "CHTR", "TMUS", "NFLX", "GOOGL", "META", "TWTR"]
         }
         
+        # 섹터 목록 외 추가 거래 종목들
+        self.additional_stocks = [
+            "ROKU", "ZOOM", "SHOP", "SQ", "PYPL", "UBER", "LYFT", "SNAP", "TWTR", "PINS",
+            "DOCU", "ZM", "CRWD", "OKTA", "SNOW", "PLTR", "RBLX", "COIN", "HOOD", "RIVN",
+            "AMD", "INTC", "QCOM", "AVGO", "TXN", "MU", "LRCX", "KLAC", "MCHP", "XLNX"
+        ]
+        
+        # 종목 메타데이터 인덱스 (StockUniverse가 채워지면 load_symbol_index로 교체)
+        self.symbol_index = SymbolIndex.from_sector_map(self.sector_stocks, self.additional_stocks)
+        
+        # 거래일별 시장 상황 스냅샷 (하루 한 번 계산)
+        self.market_conditions = MarketConditionProvider(self._build_market_condition)
+        
         # 시가총액별 분류
         self.market_cap_ranges = {
             "large": 10000000000,  # 100억 이상
@@ -34,27 +77,76 @@ class StockDataService:
             "micro": 0             # 3억 미만
         }
     
+    def _build_session(self, pool_size: int) -> requests.Session:
+        """커넥션 풀과 재시도 정책이 설정된 HTTP 세션 생성"""
+        retry = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+            respect_retry_after_header=True
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """병렬 시세 조회용 스레드 풀 (처음 사용할 때 생성)"""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="quote-fetch"
+                    )
+        return self._executor
+    
+    def load_symbol_index(self, rows) -> SymbolIndex:
+        """StockUniverse 행 (symbol, sector, market_cap, exchange, name)으로 종목 인덱스 교체"""
+        index = SymbolIndex.from_rows(rows)
+        if len(index) > 0:
+            self.symbol_index = index
+        return self.symbol_index
+    
     def get_all_tickers(self, limit: int = 1000) -> List[Dict]:
-        """모든 활성 주식 티커 목록 가져오기"""
-        try:
-            url = f"{self.base_url}/v3/reference/tickers"
-            params = {
-                "market": "stocks",
-                "active": "true",
-                "limit": limit,
-                "apikey": self.polygon_api_key
-            }
-            
-            response = requests.get(url, params=params)
-            if response.status_code == 200:
+        """모든 활성 주식 티커 목록 가져오기 (최대 limit개)"""
+        return list(islice(self.iter_tickers(page_size=min(limit, 1000)), limit))
+    
+    def iter_tickers(self, page_size: int = 1000, max_pages: int = None) -> Iterator[Dict]:
+        """모든 활성 주식 티커를 페이지 단위로 가져오기 (Polygon next_url 커서를 따라감)
+        
+        한 페이지씩만 메모리에 유지합니다. 첫 페이지부터 실패하면 샘플 데이터를 반환하고,
+        중간 페이지에서 실패하면 그때까지 가져온 티커까지만 반환합니다.
+        """
+        url = f"{self.base_url}/v3/reference/tickers"
+        params = {
+            "market": "stocks",
+            "active": "true",
+            "limit": page_size,
+            "apikey": self.polygon_api_key
+        }
+        pages = 0
+        
+        while url and (max_pages is None or pages < max_pages):
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+                if response.status_code != 200:
+                    raise RuntimeError(f"HTTP {response.status_code}")
                 data = response.json()
-                return data.get("results", [])
-            else:
-                # API 호출 실패 시 샘플 데이터 반환
-                return self._get_sample_tickers()
-        except Exception as e:
-            print(f"Error fetching tickers: {e}")
-            return self._get_sample_tickers()
+            except Exception as e:
+                print(f"Error fetching tickers (page {pages + 1}): {e}")
+                if pages == 0:
+                    # API 호출 실패 시 샘플 데이터 반환
+                    yield from self._get_sample_tickers()
+                return
+            
+            pages += 1
+            yield from data.get("results", [])
+            
+            # next_url에는 커서가 포함되어 있고 API 키는 다시 붙여야 함
+            url = data.get("next_url")
+            params = {"apikey": self.polygon_api_key}
     
     def _get_sample_tickers(self) -> List[Dict]:
         """샘플 티커 데이터 생성"""
@@ -91,12 +183,37 @@ class StockDataService:
         return sample_tickers
     
     def get_stock_quote(self, symbol: str) -> Dict:
-        """실시간 주식 시세 가져오기"""
+        """실시간 주식 시세 가져오기 (캐시 사용)
+
+        캐시된 dict는 여러 스레드가 함께 읽으므로 호출하는 쪽이 수정해도 되는 복사본을 반환합니다.
+        """
+        return dict(self.quote_cache.get(symbol, lambda: self._fetch_stock_quote(symbol), ttl_for=self._quote_ttl))
+
+    @staticmethod
+    def _quote_ttl(quote: Dict) -> Optional[float]:
+        """조회 실패로 만든 모의 시세는 짧게만 캐시 (곧 다시 조회)"""
+        return MOCK_QUOTE_TTL if isinstance(quote, MockQuote) else None
+    
+    def get_stock_quotes(self, symbols: Iterable[str]) -> Dict[str, Dict]:
+        """여러 종목 시세를 동시에 가져오기 (symbol -> quote)"""
+        unique_symbols = list(dict.fromkeys(symbols))
+        if len(unique_symbols) <= 1:
+            return {symbol: self.get_stock_quote(symbol) for symbol in unique_symbols}
+        
+        quotes = self._get_executor().map(self.get_stock_quote, unique_symbols)
+        return dict(zip(unique_symbols, quotes))
+    
+    def get_quote_cache_stats(self) -> Dict:
+        """시세 캐시 적중/미스 통계"""
+        return self.quote_cache.stats()
+    
+    def _fetch_stock_quote(self, symbol: str) -> Dict:
+        """Polygon API에서 시세 조회 (캐시 미사용)"""
         try:
             url = f"{self.base_url}/v2/aggs/ticker/{symbol}/prev"
             params = {"apikey": self.polygon_api_key}
             
-            response = requests.get(url, params=params)
+            response = self.session.get(url, params=params, timeout=self.timeout)
             if response.status_code == 200:
                 data = response.json()
                 if data.get("results"):
@@ -114,7 +231,7 @@ class StockDataService:
             print(f"Error fetching quote for {symbol}: {e}")
         
         # API 호출 실패 시 모의 데이터 반환
-        return self._generate_mock_quote(symbol)
+        return MockQuote(self._generate_mock_quote(symbol))
     
     def _generate_mock_quote(self, symbol: str) -> Dict:
         """모의 주식 시세 생성"""
@@ -138,13 +255,17 @@ class StockDataService:
         }
     
     def get_market_condition(self) -> Dict:
-        """현재 시장 상황 분석"""
+        """현재 시장 상황 분석 (당일 스냅샷의 복사본)"""
+        return copy.deepcopy(self.market_conditions.get())
+    
+    def _build_market_condition(self, day: date) -> Dict:
+        """시장 상황 계산"""
         # 실제로는 여러 지표를 종합하여 분석
         market_conditions = ["bullish", "bearish", "neutral"]
         sentiment = random.choice(market_conditions)
         
         return {
-            "date": date.today().isoformat(),
+            "date": day.isoformat(),
             "overall_sentiment": sentiment,
             "vix_level": round(random.uniform(15, 35), 2),
             "market_changes": {
@@ -164,30 +285,30 @@ class StockDataService:
             sector_performance[sector] = round(random.uniform(-3, 3), 2)
         return sector_performance
     
-    def generate_detailed_trade_data(self, symbol: str, trade_type: str, robot_name: str) -> Dict:
-        """상세한 거래 데이터 생성"""
-        quote = self.get_stock_quote(symbol)
-        market_condition = self.get_market_condition()
-        
-        # 섹터 결정
-        sector = "Technology"  # 기본값
-        for sec, stocks in self.sector_stocks.items():
-            if symbol in stocks:
-                sector = sec
-                break
+    def generate_detailed_trade_data(self, symbol: str, trade_type: str, robot_name: str,
+                                     quote: Dict = None) -> Dict:
+        """상세한 거래 데이터 생성 (quote를 넘기면 시세 조회 생략)"""
+        if quote is None:
+            quote = self.get_stock_quote(symbol)
+        market_condition = self.market_conditions.get()
         
-        # 시가총액 결정
-        market_cap = random.choice(["large", "mid", "small"])
+        # 섹터/시가총액 결정 (인덱스에 없으면 기본값/랜덤)
+        info = self.symbol_index.get(symbol)
+        sector = info.sector if info is not None and info.sector else "Technology"
+        market_cap = (info.market_cap if info is not None else None) or random.choice(["large", "mid", "small"])
+        company_name = (info.name if info is not None else None) or f"{symbol} Inc."
         
-        # 기술적 지표 생성
+        # 기술적 지표 (일봉 이력이 있으면 실제 계산 값, 없으면 모의 값)
         price = quote["close"]
-        technical_indicators = {
-            "rsi": round(random.uniform(20, 80), 2),
-            "macd": round(random.uniform(-2, 2), 3),
-            "moving_avg_20": round(price * random.uniform(0.95, 1.05), 2),
-            "moving_avg_50": round(price * random.uniform(0.90, 1.10), 2),
-            "volume_ratio": round(random.uniform(0.5, 2.0), 2)
-        }
+        technical_indicators = self.indicator_source(symbol) if self.indicator_source is not None else None
+        if technical_indicators is None:
+            technical_indicators = {
+                "rsi": round(random.uniform(20, 80), 2),
+                "macd": round(random.uniform(-2, 2), 3),
+                "moving_avg_20": round(price * random.uniform(0.95, 1.05), 2),
+                "moving_avg_50": round(price * random.uniform(0.90, 1.10), 2),
+                "volume_ratio": round(random.uniform(0.5, 2.0), 2)
+            }
         
         # 거래 이유 생성
         reasons = {
@@ -209,7 +330,7 @@ class StockDataService:
         
         return {
             "symbol": symbol,
-            "company_name": f"{symbol} Inc.",
+            "company_name": company_name,
             "trade_type": trade_type,
             "price": price,
             "reason": random.choice(reasons[trade_type]),
@@ -237,17 +358,8 @@ class StockDataService:
     
     def get_random_stock_for_trading(self) -> str:
         """거래할 랜덤 주식 선택"""
-        all_stocks = []
-        for stocks in self.sector_stocks.values():
-            all_stocks.extend(stocks)
-        
-        # 추가 종목들도 포함
-        additional_stocks = [
-            "ROKU", "ZOOM", "SHOP", "SQ", "PYPL", "UBER", "LYFT", "SNAP", "TWTR", "PINS",
-            "DOCU", "ZM", "CRWD", "OKTA", "SNOW", "PLTR", "RBLX", "COIN", "HOOD", "RIVN",
-            "AMD", "INTC", "QCOM", "AVGO", "TXN", "MU", "LRCX", "KLAC", "MCHP", "XLNX"
-        ]
-        all_stocks.extend(additional_stocks)
-        
-        return random.choice(all_stocks)
+        return self.symbol_index.random_symbol()
+
 
+# 앱 전체에서 공유하는 서비스 인스턴스 (시세 캐시를 공유하기 위함)
+stock_service = StockDataService()
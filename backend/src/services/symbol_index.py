@@ -0,0 +1,66 @@
+import random
+from types import MappingProxyType
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+
+class SymbolInfo(NamedTuple):
+    """종목 메타데이터"""
+    symbol: str
+    sector: Optional[str] = None
+    market_cap: Optional[str] = None
+    exchange: Optional[str] = None
+    name: Optional[str] = None
+
+
+class SymbolIndex:
+    """종목 → 섹터/시가총액/거래소 조회용 불변 인덱스
+
+    한 번 만들어진 뒤에는 변경되지 않으며, 갱신이 필요하면 새 인덱스를 만들어
+    참조를 교체합니다. 조회는 dict 기반 O(1), 랜덤 선택은 후보 튜플에서 O(1)입니다.
+    """
+
+    __slots__ = ("_by_symbol", "_candidates")
+
+    def __init__(self, infos: Iterable[SymbolInfo], candidates: Sequence[str] = None):
+        by_symbol: Dict[str, SymbolInfo] = {}
+        for info in infos:
+            # 여러 섹터에 중복된 종목은 처음 등장한 섹터를 사용
+            by_symbol.setdefault(info.symbol, info)
+        self._by_symbol = MappingProxyType(by_symbol)
+        self._candidates = tuple(candidates) if candidates is not None else tuple(by_symbol)
+
+    @classmethod
+    def from_sector_map(cls, sector_stocks: Dict[str, List[str]],
+                        additional_stocks: Sequence[str] = ()) -> "SymbolIndex":
+        """섹터별 대표 종목 목록으로 인덱스 생성"""
+        infos = [SymbolInfo(symbol, sector) for sector, stocks in sector_stocks.items() for symbol in stocks]
+        infos.extend(SymbolInfo(symbol) for symbol in additional_stocks)
+        # 랜덤 후보는 기존과 같이 중복 포함 (여러 섹터에 속한 종목의 선택 비중 유지)
+        return cls(infos, candidates=[info.symbol for info in infos])
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence]) -> "SymbolIndex":
+        """(symbol, sector, market_cap, exchange, name) 행들로 인덱스 생성 (StockUniverse 조회 결과)"""
+        return cls(SymbolInfo(*row) for row in rows)
+
+    @property
+    def candidates(self) -> tuple:
+        """랜덤 거래 대상 후보 종목"""
+        return self._candidates
+
+    def get(self, symbol: str) -> Optional[SymbolInfo]:
+        return self._by_symbol.get(symbol)
+
+    def sector_for(self, symbol: str, default: str = "Technology") -> str:
+        """종목의 섹터 (모르면 기본값)"""
+        info = self._by_symbol.get(symbol)
+        return info.sector if info is not None and info.sector else default
+
+    def random_symbol(self, rng: random.Random = random) -> str:
+        return rng.choice(self._candidates)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._by_symbol
+
+    def __len__(self) -> int:
+        return len(self._by_symbol)
@@ -0,0 +1,254 @@
+"""부하 테스트용 대량 가상 거래 생성기
+
+generate_detailed_trade_data와 같은 분포의 거래를 NumPy 배열(컬럼 단위)로 한 번에 만들고,
+청크 단위 executemany로 trades 테이블에 적재합니다. 같은 seed면 같은 데이터가 생성됩니다.
+"""
+import gc
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from src.services.data_versions import bump_versions
+from src.services.response_cache import response_cache
+from src.services.symbol_index import SymbolIndex
+
+# trades 테이블 INSERT 컬럼 순서
+TRADE_COLUMNS = (
+    "robot_id", "symbol", "company_name", "trade_type", "quantity", "price", "total_amount",
+    "trade_date", "reason", "confidence_score", "market_condition", "sector", "market_cap",
+    "rsi", "macd", "moving_avg_20", "moving_avg_50", "volume_ratio",
+    "market_price_at_trade", "day_high", "day_low", "day_open", "prev_close",
+    "expected_return", "stop_loss", "take_profit", "holding_period",
+    "position_size_pct", "risk_score"
+)
+
+TRADE_TYPES = np.array(["BUY", "SELL"], dtype=object)
+MARKET_CONDITIONS = np.array(["bullish", "bearish", "neutral"], dtype=object)
+MARKET_CAPS = np.array(["large", "mid", "small"], dtype=object)
+
+# 수치가 들어가지 않는 거래 이유 (섹터 이유는 섹터별로 미리 만들어 둠)
+REASON_TEMPLATES = {
+    "BUY": [
+        "20일 이동평균선 돌파로 상승 모멘텀 확인",
+        "MACD 골든크로스 발생으로 상승 전환 신호",
+        "RSI 지표 과매도 구간 진입",
+        "{sector} 섹터 강세로 인한 매수 신호"
+    ],
+    "SELL": [
+        "20일 이동평균선 하향 이탈로 하락 모멘텀 확인",
+        "MACD 데드크로스 발생으로 하락 전환 신호",
+        "거래량 감소로 상승 동력 약화",
+        "{sector} 섹터 약세로 인한 매도 신호"
+    ]
+}
+
+
+class SyntheticTradeGenerator:
+    """컬럼 단위 가상 거래 생성기"""
+
+    def __init__(self, robot_ids: Sequence[int], symbol_index: SymbolIndex,
+                 start: datetime, end: datetime, seed: Optional[int] = None):
+        if not robot_ids:
+            raise ValueError("robot_ids must not be empty")
+        if end <= start:
+            raise ValueError("end must be after start")
+
+        self.rng = np.random.default_rng(seed)
+        self.robot_ids = np.asarray(robot_ids, dtype=np.int64)
+        self.start = np.datetime64(start, "us")
+        self.span_us = int((end - start).total_seconds() * 1e6)
+
+        # 종목별 속성은 한 번만 배열로 만들어 두고 인덱스로 조회
+        symbols = list(dict.fromkeys(symbol_index.candidates))
+        infos = [symbol_index.get(symbol) for symbol in symbols]
+        self.symbols = np.array(symbols, dtype=object)
+        self.company_names = np.array(
+            [(info.name if info and info.name else f"{symbol} Inc.") for symbol, info in zip(symbols, infos)],
+            dtype=object
+        )
+        sectors = [symbol_index.sector_for(symbol) for symbol in symbols]
+        sector_names = sorted(set(sectors))
+        sector_codes = {sector: i for i, sector in enumerate(sector_names)}
+        self.sectors = np.array(sector_names, dtype=object)
+        self.symbol_sector = np.array([sector_codes[sector] for sector in sectors], dtype=np.int64)
+        self.symbol_market_cap = np.array(
+            [(info.market_cap if info else None) for info in infos], dtype=object
+        )
+        self.base_prices = np.round(self.rng.uniform(20, 500, len(symbols)), 2)
+
+        # reasons[trade_type, sector, template]
+        self.reasons = np.array([
+            [[template.format(sector=sector) for template in REASON_TEMPLATES[trade_type]]
+             for sector in sector_names]
+            for trade_type in ("BUY", "SELL")
+        ], dtype=object)
+
+        # 거래일별 시장 상황 (같은 날의 거래는 같은 시장 상황을 공유)
+        days = self.span_us // 86_400_000_000 + 1
+        self.daily_condition = self.rng.integers(0, len(MARKET_CONDITIONS), days)
+
+    def generate(self, n: int, window: tuple = (0.0, 1.0)) -> Dict[str, np.ndarray]:
+        """n건의 거래를 컬럼 배열로 생성 (window: 전체 기간 중 이 청크가 차지하는 비율 구간)"""
+        rng = self.rng
+        uniform = rng.uniform
+
+        sym = rng.integers(0, len(self.symbols), n)
+        is_sell = rng.random(n) < 0.5
+        trade_type = is_sell.astype(np.int64)
+        sector = self.symbol_sector[sym]
+
+        price = np.round(self.base_prices[sym] * (1 + rng.normal(0, 0.02, n)), 2)
+        quantity = rng.integers(10, 501, n)
+
+        # 청크 구간 안에서 정렬된 거래 시각 (전체적으로 시간순 적재)
+        lo, hi = int(window[0] * self.span_us), int(window[1] * self.span_us)
+        offsets = np.sort(rng.integers(lo, max(hi, lo + 1), n))
+        trade_date = np.strings.replace(
+            np.datetime_as_string(self.start + offsets.astype("timedelta64[us]"), unit="us"), "T", " "
+        )
+
+        market_cap = self.symbol_market_cap[sym]
+        unknown_cap = market_cap == None  # noqa: E711 (object 배열 비교)
+        market_cap[unknown_cap] = MARKET_CAPS[rng.integers(0, len(MARKET_CAPS), int(unknown_cap.sum()))]
+
+        reason = self.reasons[trade_type, sector, rng.integers(0, self.reasons.shape[2], n)]
+
+        return {
+            "robot_id": self.robot_ids[rng.integers(0, len(self.robot_ids), n)],
+            "symbol": self.symbols[sym],
+            "company_name": self.company_names[sym],
+            "trade_type": TRADE_TYPES[trade_type],
+            "quantity": quantity,
+            "price": price,
+            "total_amount": np.round(price * quantity, 2),
+            "trade_date": trade_date,
+            "reason": reason,
+            "confidence_score": np.round(uniform(70, 95, n), 1),
+            "market_condition": MARKET_CONDITIONS[self.daily_condition[offsets // 86_400_000_000]],
+            "sector": self.sectors[sector],
+            "market_cap": market_cap,
+            "rsi": np.round(uniform(20, 80, n), 2),
+            "macd": np.round(uniform(-2, 2, n), 3),
+            "moving_avg_20": np.round(price * uniform(0.95, 1.05, n), 2),
+            "moving_avg_50": np.round(price * uniform(0.90, 1.10, n), 2),
+            "volume_ratio": np.round(uniform(0.5, 2.0, n), 2),
+            "market_price_at_trade": price,
+            "day_high": np.round(price * uniform(1.01, 1.05, n), 2),
+            "day_low": np.round(price * uniform(0.95, 0.99, n), 2),
+            "day_open": np.round(price * uniform(0.98, 1.02, n), 2),
+            "prev_close": np.round(price * uniform(0.98, 1.02, n), 2),
+            "expected_return": np.round(uniform(5, 20, n), 1),
+            "stop_loss": np.round(price * np.where(is_sell, 1.05, 0.95), 2),
+            "take_profit": np.round(price * np.where(is_sell, 0.85, 1.15), 2),
+            "holding_period": rng.integers(1, 31, n),
+            "position_size_pct": np.round(uniform(2, 8, n), 1),
+            "risk_score": np.round(uniform(3, 8, n), 1)
+        }
+
+    def iter_chunks(self, total: int, chunk_size: int) -> Iterator[Dict[str, np.ndarray]]:
+        """total건을 chunk_size씩 나누어 생성 (청크마다 기간을 순서대로 배분)"""
+        produced = 0
+        while produced < total:
+            n = min(chunk_size, total - produced)
+            yield self.generate(n, window=(produced / total, (produced + n) / total))
+            produced += n
+
+
+def columns_to_rows(columns: Dict[str, np.ndarray]) -> List[tuple]:
+    """컬럼 배열 → executemany용 튜플 목록 (tolist로 파이썬 기본 타입 변환)"""
+    return list(zip(*(columns[name].tolist() for name in TRADE_COLUMNS)))
+
+
+def bulk_insert_trades(engine, generator: SyntheticTradeGenerator, total: int,
+                       chunk_size: int = 100_000,
+                       progress: Callable[[int, float], None] = None) -> Dict:
+    """가상 거래 total건을 청크 단위로 trades 테이블에 적재
+
+    생성/변환은 별도 스레드에서 다음 청크를 미리 준비하고, 이 스레드는 INSERT만 수행합니다.
+    대량의 튜플을 만드는 동안에는 순환 GC를 잠시 멈춥니다 (GC 검사 비용이 변환 시간의 대부분).
+    """
+    sql = (
+        f"INSERT INTO trades ({', '.join(TRADE_COLUMNS)}) "
+        f"VALUES ({', '.join('?' for _ in TRADE_COLUMNS)})"
+    )
+    if engine.dialect.name != "sqlite":
+        sql = sql.replace("?", "%s")
+
+    chunks: "queue.Queue" = queue.Queue(maxsize=2)
+    stop = threading.Event()
+    _done = object()
+
+    def put(item) -> bool:
+        """큐에 넣기 (적재가 실패해 소비 쪽이 멈추면 기다리지 않고 False)"""
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for columns in generator.iter_chunks(total, chunk_size):
+                if not put(columns_to_rows(columns)):
+                    return
+            put(_done)
+        except BaseException as e:
+            put(e)
+
+    started = time.perf_counter()
+    inserted = 0
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    raw = engine.raw_connection()
+    pragmas = {}
+    try:
+        cursor = raw.cursor()
+        if engine.dialect.name == "sqlite":
+            # 적재 중에는 fsync 생략, 페이지 캐시 확대. 연결은 풀로 돌아가므로 끝나면 원래 값으로 되돌림
+            for name in ("synchronous", "cache_size"):
+                pragmas[name] = cursor.execute(f"PRAGMA {name}").fetchone()[0]
+            cursor.execute("PRAGMA synchronous = OFF")
+            cursor.execute("PRAGMA cache_size = -262144")
+        threading.Thread(target=produce, name="trade-generator", daemon=True).start()
+        while True:
+            rows = chunks.get()
+            if rows is _done:
+                break
+            if isinstance(rows, BaseException):
+                raise rows
+            cursor.executemany(sql, rows)
+            raw.commit()
+            inserted += len(rows)
+            if progress is not None:
+                progress(inserted, time.perf_counter() - started)
+        cursor.close()
+    finally:
+        stop.set()
+        if pragmas:
+            raw.rollback()
+            cursor = raw.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {int(value)}")
+            cursor.close()
+        raw.close()
+        if gc_was_enabled:
+            gc.enable()
+        # ORM flush/커밋 훅을 거치지 않으므로 trades 데이터 버전과 응답 캐시를 직접 갱신
+        # (중간에 실패해도 이미 커밋된 청크가 있으면 갱신)
+        if inserted:
+            with engine.begin() as conn:
+                bump_versions(conn, ["trades"])
+            response_cache.invalidate_tags(["trades"])
+
+    elapsed = time.perf_counter() - started
+    return {
+        "inserted": inserted,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(inserted / elapsed) if elapsed > 0 else None
+    }
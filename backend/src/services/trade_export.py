@@ -0,0 +1,113 @@
+"""거래 내역 스트리밍 내보내기 (CSV / NDJSON)
+
+서버 측 커서에서 yield_per 단위로 행을 읽어 바로 응답으로 흘려보내므로, 내보내는 행 수와
+상관없이 메모리 사용량은 배치 크기만큼으로 일정합니다. 정렬은 (trade_date, id) 오름차순으로
+고정되어 같은 조건의 내보내기는 항상 같은 순서이며, 인덱스(robot_id, trade_date, id)를 그대로
+따라 읽습니다. 스트리밍 동안 읽기 트랜잭션이 열려 있으므로 앱 엔진은 WAL 저널을 사용해
+(models.trading.configure_sqlite) 내보내기 중에도 쓰기가 막히지 않습니다.
+"""
+import csv
+import io
+from datetime import date, datetime, timedelta
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+from sqlalchemy import DateTime, select
+
+from src.models.projections import TRADE_EXPORT_COLUMNS
+from src.models.trading import Robot, Trade
+from src.services.json_provider import dumps_bytes
+
+EXPORT_MIMETYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson'
+}
+
+DEFAULT_BATCH_SIZE = 2000
+
+
+class InvalidExportRequest(ValueError):
+    """잘못된 내보내기 파라미터"""
+
+
+def parse_columns(value: Optional[str]) -> List[str]:
+    """columns=id,symbol,... → 컬럼 이름 목록 (없으면 전체)"""
+    if not value:
+        return list(TRADE_EXPORT_COLUMNS)
+    columns = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in columns if name not in TRADE_EXPORT_COLUMNS]
+    if unknown:
+        raise InvalidExportRequest(f"Unknown columns: {', '.join(unknown)}")
+    if not columns:
+        raise InvalidExportRequest('No columns selected')
+    return columns
+
+
+def parse_bound(value: Optional[str], name: str, inclusive_day: bool = False) -> Optional[datetime]:
+    """from/to 값 (YYYY-MM-DD 또는 ISO 8601 시각) → datetime
+
+    inclusive_day: 날짜만 주어진 to는 그날 전체를 포함하도록 다음 날 0시로 변환
+    """
+    if not value:
+        return None
+    try:
+        if len(value) == 10:
+            day = date.fromisoformat(value)
+            bound = datetime.combine(day, datetime.min.time())
+            return bound + timedelta(days=1) if inclusive_day else bound
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise InvalidExportRequest(f"Invalid {name}: {value}")
+
+
+def export_select(columns: Sequence[str], robot_id: Optional[int] = None,
+                  start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """내보내기 SELECT (start <= trade_date < end, (trade_date, id) 순)"""
+    query = select(*(TRADE_EXPORT_COLUMNS[name] for name in columns)).select_from(Trade)
+    if 'robot_name' in columns:
+        query = query.outerjoin(Robot, Robot.id == Trade.robot_id)
+    if robot_id is not None:
+        query = query.where(Trade.robot_id == robot_id)
+    if start is not None:
+        query = query.where(Trade.trade_date >= start)
+    if end is not None:
+        query = query.where(Trade.trade_date < end)
+    return query.order_by(Trade.trade_date, Trade.id)
+
+
+def iter_partitions(session, query, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[list]:
+    """서버 측 커서에서 batch_size 행씩 읽기"""
+    result = session.execute(query.execution_options(yield_per=batch_size))
+    try:
+        yield from result.partitions()
+    finally:
+        result.close()
+
+
+def iter_csv(columns: Sequence[str], partitions: Iterable[list]) -> Iterator[str]:
+    """헤더 + 배치마다 CSV 텍스트 한 덩어리 (시각은 ISO 8601)"""
+    datetime_indexes = [
+        index for index, name in enumerate(columns)
+        if isinstance(TRADE_EXPORT_COLUMNS[name].type, DateTime)
+    ]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(columns)
+    yield buffer.getvalue()
+    for rows in partitions:
+        buffer.seek(0)
+        buffer.truncate()
+        if datetime_indexes:
+            rows = [list(row) for row in rows]
+            for row in rows:
+                for index in datetime_indexes:
+                    if row[index] is not None:
+                        row[index] = row[index].isoformat()
+        writer.writerows(rows)
+        yield buffer.getvalue()
+
+
+def iter_ndjson(columns: Sequence[str], partitions: Iterable[list]) -> Iterator[bytes]:
+    """배치마다 한 줄에 거래 하나씩인 JSON 덩어리"""
+    columns = tuple(columns)
+    for rows in partitions:
+        yield b''.join(dumps_bytes(dict(zip(columns, row))) + b'\n' for row in rows)
@@ -0,0 +1,227 @@
+"""시간 단위 거래 집계 (롤업)
+
+Trade가 저장/수정/삭제될 때마다 같은 트랜잭션 안에서 (시간, 섹터)와 (시간, 종목)별 건수와 합계를
+증분 갱신합니다. 최근 24시간 통계는 거래 건수와 관계없이 24개 구간의 합으로 계산됩니다.
+ORM을 거치지 않는 대량 적재(bulk_insert_trades) 후에는 rebuild_rollups로 다시 계산합니다.
+"""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, delete, event, func, inspect, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from src.models.trading import SectorHourlyStats, SymbolHourlyStats, Trade
+from src.services.data_versions import bump_versions
+
+UNKNOWN_SECTOR = 'Unknown'
+METRICS = ('trade_count', 'buy_count', 'sell_count', 'notional_sum', 'confidence_sum', 'confidence_count')
+# 롤업 구간/지표를 정하는 Trade 컬럼 (수정되면 이전 값을 빼고 새 값을 더함)
+ROLLUP_COLUMNS = ('trade_date', 'sector', 'symbol', 'company_name', 'trade_type', 'total_amount', 'confidence_score')
+
+
+def hour_bucket(value: datetime) -> datetime:
+    """시각 → 해당 시간 구간의 시작 (정시)"""
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def window_start(hours: int = 24, now: Optional[datetime] = None) -> datetime:
+    """현재 구간을 포함한 최근 hours개 구간의 첫 구간"""
+    return hour_bucket(now or datetime.now()) - timedelta(hours=hours - 1)
+
+
+def _trade_metrics(trade: Trade, sign: int) -> List:
+    confidence = trade.confidence_score
+    return [
+        sign,
+        sign if trade.trade_type == 'BUY' else 0,
+        sign if trade.trade_type == 'SELL' else 0,
+        sign * (trade.total_amount or 0.0),
+        sign * (confidence or 0.0),
+        sign if confidence is not None else 0
+    ]
+
+
+def collect_deltas(trades: Iterable[Tuple[Trade, int]]) -> Tuple[Dict, Dict]:
+    """(거래, +1/-1) 목록 → (시간, 섹터) / (시간, 종목)별 증감"""
+    sector_deltas: Dict[Tuple, List] = {}
+    symbol_deltas: Dict[Tuple, Dict] = {}
+    for trade, sign in trades:
+        bucket = hour_bucket(trade.trade_date or datetime.utcnow())
+        metrics = _trade_metrics(trade, sign)
+
+        totals = sector_deltas.setdefault((bucket, trade.sector or UNKNOWN_SECTOR), [0] * len(METRICS))
+        for i, value in enumerate(metrics):
+            totals[i] += value
+
+        entry = symbol_deltas.setdefault((bucket, trade.symbol), {
+            'company_name': trade.company_name, 'sector': trade.sector, 'metrics': [0] * len(METRICS)
+        })
+        for i, value in enumerate(metrics):
+            entry['metrics'][i] += value
+    return sector_deltas, symbol_deltas
+
+
+def _increment(conn, model, key_columns: Tuple[str, ...], rows: List[Dict]):
+    """rows의 지표를 기존 집계에 더함 (없는 구간은 새로 추가)"""
+    if not rows:
+        return
+    table = model.__table__
+    insert = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}.get(conn.dialect.name)
+    if insert is not None:
+        stmt = insert(table)
+        set_ = {name: table.c[name] + stmt.excluded[name] for name in METRICS}
+        for name in ('company_name', 'sector'):
+            if name in table.c and name not in key_columns:
+                set_[name] = func.coalesce(stmt.excluded[name], table.c[name])
+        conn.execute(stmt.on_conflict_do_update(index_elements=list(key_columns), set_=set_), rows)
+        return
+
+    # ON CONFLICT를 지원하지 않는 DB: 행마다 UPDATE 후 없으면 INSERT
+    for row in rows:
+        where = [table.c[name] == row[name] for name in key_columns]
+        result = conn.execute(
+            update(table).where(*where).values({name: table.c[name] + row[name] for name in METRICS})
+        )
+        if result.rowcount == 0:
+            conn.execute(table.insert().values(row))
+
+
+def _decrement(conn, model, key_columns: Tuple[str, ...], rows: List[Dict]):
+    """기존 집계에 증감 반영 (삭제/수정된 거래, 집계가 없는 구간은 무시)"""
+    table = model.__table__
+    for row in rows:
+        conn.execute(
+            update(table)
+            .where(*[table.c[name] == row[name] for name in key_columns])
+            .values({name: table.c[name] + row[name] for name in METRICS})
+        )
+
+
+def apply_deltas(conn, sector_deltas: Dict, symbol_deltas: Dict):
+    """collect_deltas 결과를 롤업 테이블에 반영"""
+    sector_rows = [
+        dict(bucket=bucket, sector=sector, **dict(zip(METRICS, metrics)))
+        for (bucket, sector), metrics in sector_deltas.items()
+    ]
+    symbol_rows = [
+        dict(bucket=bucket, symbol=symbol, company_name=entry['company_name'], sector=entry['sector'],
+             **dict(zip(METRICS, entry['metrics'])))
+        for (bucket, symbol), entry in symbol_deltas.items()
+    ]
+    for model, key_columns, rows in ((SectorHourlyStats, ('bucket', 'sector'), sector_rows),
+                                     (SymbolHourlyStats, ('bucket', 'symbol'), symbol_rows)):
+        _increment(conn, model, key_columns, [row for row in rows if row['trade_count'] > 0])
+        # 건수가 그대로인 구간 (같은 구간 안에서 금액 등만 수정)도 기존 집계에 더함
+        _decrement(conn, model, key_columns, [row for row in rows if row['trade_count'] < 0 or (
+            row['trade_count'] == 0 and any(row[name] for name in METRICS))])
+
+
+def _previous_values(trade: Trade) -> Optional[SimpleNamespace]:
+    """수정된 Trade의 롤업 컬럼 이전 값 (롤업 컬럼이 바뀌지 않았으면 None)
+
+    after_flush 시점에는 속성 이력이 아직 남아 있으므로 바뀐 컬럼은 이전 값, 나머지는 현재 값을 씁니다.
+    """
+    state = inspect(trade)
+    values, changed = {}, False
+    for name in ROLLUP_COLUMNS:
+        history = state.attrs[name].history
+        if history.deleted:
+            values[name], changed = history.deleted[0], True
+        else:
+            values[name] = getattr(trade, name)
+    return SimpleNamespace(**values) if changed else None
+
+
+@event.listens_for(Session, 'after_flush')
+def _update_rollups_after_flush(session, flush_context):
+    """flush된 Trade 추가/수정/삭제를 같은 트랜잭션에서 롤업에 반영 (수정은 이전 값 -1, 새 값 +1)"""
+    changes = [(obj, 1) for obj in session.new if isinstance(obj, Trade)]
+    changes += [(obj, -1) for obj in session.deleted if isinstance(obj, Trade)]
+    for obj in session.dirty:
+        if isinstance(obj, Trade) and obj not in session.deleted:
+            previous = _previous_values(obj)
+            if previous is not None:
+                changes += [(previous, -1), (obj, 1)]
+    if changes:
+        apply_deltas(session.connection(), *collect_deltas(changes))
+
+
+def _bucket_expression(dialect_name: str):
+    if dialect_name == 'postgresql':
+        return func.date_trunc('hour', Trade.trade_date)
+    return func.strftime('%Y-%m-%d %H:00:00', Trade.trade_date)
+
+
+def rebuild_rollups(conn, since: Optional[datetime] = None) -> Dict:
+    """trades 테이블에서 롤업을 다시 계산 (since 이후 구간만, 없으면 전체)"""
+    since = hour_bucket(since) if since else None
+    for model in (SectorHourlyStats, SymbolHourlyStats):
+        stmt = delete(model)
+        conn.execute(stmt.where(model.bucket >= since) if since else stmt)
+
+    bucket = _bucket_expression(conn.dialect.name).label('bucket')
+    aggregates = [
+        func.count(Trade.id),
+        func.sum(case((Trade.trade_type == 'BUY', 1), else_=0)),
+        func.sum(case((Trade.trade_type == 'SELL', 1), else_=0)),
+        func.coalesce(func.sum(Trade.total_amount), 0.0),
+        func.coalesce(func.sum(Trade.confidence_score), 0.0),
+        func.count(Trade.confidence_score)
+    ]
+    where = [Trade.trade_date >= since] if since else []
+
+    def to_datetime(value):
+        return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+    sector = func.coalesce(Trade.sector, UNKNOWN_SECTOR)
+    sector_rows = [
+        dict(bucket=to_datetime(row[0]), sector=row[1], **dict(zip(METRICS, row[2:])))
+        for row in conn.execute(select(bucket, sector, *aggregates).where(*where).group_by(bucket, sector))
+    ]
+    symbol_rows = [
+        dict(bucket=to_datetime(row[0]), symbol=row[1], company_name=row[2], sector=row[3],
+             **dict(zip(METRICS, row[4:])))
+        for row in conn.execute(
+            select(bucket, Trade.symbol, func.max(Trade.company_name), func.max(Trade.sector), *aggregates)
+            .where(*where).group_by(bucket, Trade.symbol)
+        )
+    ]
+    if sector_rows:
+        conn.execute(SectorHourlyStats.__table__.insert(), sector_rows)
+    if symbol_rows:
+        conn.execute(SymbolHourlyStats.__table__.insert(), symbol_rows)
+    # 롤업으로 만드는 응답은 trades 버전으로 ETag를 계산하므로 함께 증가
+    bump_versions(conn, ['trades'])
+    return {'sector_buckets': len(sector_rows), 'symbol_buckets': len(symbol_rows)}
+
+
+def sector_totals(session, since: datetime) -> List:
+    """since 이후 섹터별 합계 (sector, trade_count, buy_count, sell_count, notional_sum,
+    confidence_sum, confidence_count)"""
+    return session.execute(
+        select(SectorHourlyStats.sector, *[func.sum(getattr(SectorHourlyStats, name)).label(name)
+                                           for name in METRICS])
+        .where(SectorHourlyStats.bucket >= since)
+        .group_by(SectorHourlyStats.sector)
+        .having(func.sum(SectorHourlyStats.trade_count) > 0)
+    ).all()
+
+
+def symbol_totals(session, since: datetime, limit: Optional[int] = None) -> List:
+    """since 이후 종목별 합계 (거래 건수 내림차순)"""
+    trade_count = func.sum(SymbolHourlyStats.trade_count)
+    query = (
+        select(SymbolHourlyStats.symbol,
+               func.max(SymbolHourlyStats.company_name).label('company_name'),
+               func.max(SymbolHourlyStats.sector).label('sector'),
+               *[func.sum(getattr(SymbolHourlyStats, name)).label(name) for name in METRICS])
+        .where(SymbolHourlyStats.bucket >= since)
+        .group_by(SymbolHourlyStats.symbol)
+        .having(trade_count > 0)
+        .order_by(trade_count.desc(), SymbolHourlyStats.symbol)
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    return session.execute(query).all()
@@ -0,0 +1,130 @@
+"""체결된 거래의 프로세스 내 발행/구독 (SSE 스트림용)
+
+커밋된 Trade를 구독자마다 크기가 제한된 큐로 전달합니다. 느린 구독자의 큐가 가득 차면
+가장 오래된 이벤트부터 버리고 버린 건수를 알려 줍니다. 이벤트 ID는 거래 ID이며, 최근
+이벤트는 재접속(Last-Event-ID) 시 다시 보내기 위해 history_size개까지 보관합니다.
+"""
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from src.models.projections import serialize_trade_object
+from src.models.trading import Robot, Trade
+from src.services.json_provider import dumps
+
+
+class Subscription:
+    """구독자 한 명의 이벤트 큐"""
+
+    def __init__(self, maxsize: int):
+        self.events: deque = deque(maxlen=maxsize)
+        self.dropped = 0
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+
+    def push(self, item: Tuple[int, str]):
+        with self._lock:
+            if len(self.events) == self.events.maxlen:
+                self.dropped += 1
+            self.events.append(item)
+        self._wakeup.set()
+
+    def drain(self, timeout: float) -> Tuple[List[Tuple[int, str]], int]:
+        """대기 중인 이벤트와 그동안 버려진 건수 (timeout초 동안 없으면 빈 목록)"""
+        self._wakeup.wait(timeout)
+        with self._lock:
+            self._wakeup.clear()
+            items = list(self.events)
+            self.events.clear()
+            dropped, self.dropped = self.dropped, 0
+        return items, dropped
+
+
+class TradeEventBus:
+    """커밋된 거래 이벤트 발행/구독"""
+
+    def __init__(self, history_size: int = 500, queue_size: int = 256):
+        self.history_size = history_size
+        self.queue_size = queue_size
+        self._history: deque = deque(maxlen=history_size)
+        self._subscribers: List[Subscription] = []
+        self._lock = threading.Lock()
+        self.published = 0
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> Tuple[Subscription, bool]:
+        """구독 시작. last_event_id 이후의 보관 이벤트를 큐에 미리 넣음
+
+        두 번째 값은 보관 이벤트만으로 빠짐없이 재전송할 수 있는지 여부
+        (False면 호출하는 쪽에서 DB로 보충)
+        """
+        subscription = Subscription(self.queue_size)
+        with self._lock:
+            self._subscribers.append(subscription)
+            if last_event_id is None:
+                return subscription, True
+            covered = bool(self._history) and self._history[0][0] <= last_event_id
+            replay = [item for item in self._history if item[0] > last_event_id]
+        for item in replay:
+            subscription.push(item)
+        return subscription, covered
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    def publish(self, trades: List[Dict]):
+        """직렬화된 거래 목록 발행"""
+        items = [(trade['id'], dumps(trade)) for trade in trades]
+        with self._lock:
+            self._history.extend(items)
+            subscribers = list(self._subscribers)
+            self.published += len(items)
+        for subscription in subscribers:
+            for item in items:
+                subscription.push(item)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'subscribers': len(self._subscribers),
+                'published': self.published,
+                'history': len(self._history),
+                'history_size': self.history_size,
+                'queue_size': self.queue_size
+            }
+
+
+trade_events = TradeEventBus()
+
+_PENDING_KEY = 'pending_trade_events'
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_trade_events(session, flush_context):
+    """flush된 새 Trade를 직렬화해 두었다가 커밋 후 발행 (ID와 기본값이 채워진 시점)"""
+    trades = [obj for obj in session.new if isinstance(obj, Trade)]
+    if not trades:
+        return
+    robot_ids = {trade.robot_id for trade in trades if trade.robot_id is not None}
+    robot_names = dict(session.connection().execute(
+        select(Robot.id, Robot.name).where(Robot.id.in_(robot_ids))
+    ).all()) if robot_ids else {}
+    session.info.setdefault(_PENDING_KEY, []).extend(
+        serialize_trade_object(trade, robot_names.get(trade.robot_id)) for trade in trades
+    )
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_trade_events(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        trade_events.publish(sorted(pending, key=lambda trade: trade['id']))
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_trade_events(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
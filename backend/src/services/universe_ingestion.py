@@ -0,0 +1,119 @@
+import random
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.models.trading import StockUniverse
+from src.services.data_versions import bump_versions
+from src.services.response_cache import response_cache
+from src.services.symbol_index import SymbolIndex
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    """iterable을 size 크기의 리스트로 나누어 순회"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Polygon의 last_updated_utc (ISO 8601, UTC) → naive UTC datetime"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def ticker_to_row(ticker: Dict, symbol_index: SymbolIndex, now: datetime) -> Optional[Dict]:
+    """Polygon 티커 응답 → stock_universe 행"""
+    symbol = ticker.get("ticker")
+    if not symbol:
+        return None
+    sector = symbol_index.sector_for(symbol)
+    return {
+        "symbol": symbol,
+        "name": ticker.get("name") or f"{symbol} Inc.",
+        "exchange": ticker.get("primary_exchange", "NASDAQ"),
+        "sector": sector,
+        "industry": f"{sector} Industry",
+        "market_cap": random.choice(["large", "mid", "small", "micro"]),  # 시가총액 결정 (랜덤)
+        "is_active": ticker.get("active", True),
+        "last_updated": _parse_timestamp(ticker.get("last_updated_utc")) or now
+    }
+
+
+def _upsert_statement(dialect_name: str, incremental: bool):
+    """symbol 충돌 시 갱신하는 INSERT ... ON CONFLICT 문 (지원하지 않는 DB면 None)"""
+    insert = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}.get(dialect_name)
+    if insert is None:
+        return None
+
+    table = StockUniverse.__table__
+    stmt = insert(table)
+    # 섹터/산업/시가총액은 처음 등록할 때만 정하고 이후에는 유지
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.symbol],
+        set_={
+            "name": stmt.excluded.name,
+            "exchange": stmt.excluded.exchange,
+            "is_active": stmt.excluded.is_active,
+            "last_updated": stmt.excluded.last_updated
+        },
+        # 증분 갱신: Polygon 쪽 last_updated가 더 최신인 행만 갱신
+        where=(table.c.last_updated < stmt.excluded.last_updated) if incremental else None
+    )
+
+
+def _insert_missing(conn, rows: List[Dict]):
+    """ON CONFLICT를 지원하지 않는 DB: 없는 종목만 추가"""
+    table = StockUniverse.__table__
+    existing = set(conn.execute(
+        select(table.c.symbol).where(table.c.symbol.in_([row["symbol"] for row in rows]))
+    ).scalars())
+    missing = [row for row in rows if row["symbol"] not in existing]
+    if missing:
+        conn.execute(table.insert(), missing)
+
+
+def ingest_stock_universe(engine, tickers: Iterable[Dict], symbol_index: SymbolIndex,
+                          chunk_size: int = 1000, incremental: bool = True) -> Dict:
+    """티커 스트림을 chunk_size 단위로 stock_universe에 upsert
+
+    청크마다 트랜잭션을 커밋하므로 전체 목록 크기와 관계없이 메모리 사용량이 일정합니다.
+    """
+    stmt = _upsert_statement(engine.dialect.name, incremental)
+    now = datetime.utcnow()
+    stats = {"received": 0, "chunks": 0}
+
+    for chunk in chunked(tickers, chunk_size):
+        stats["received"] += len(chunk)
+        # 같은 청크 안의 중복 종목은 마지막 값 사용
+        rows = {}
+        for ticker in chunk:
+            row = ticker_to_row(ticker, symbol_index, now)
+            if row is not None:
+                rows[row["symbol"]] = row
+        if not rows:
+            continue
+
+        with engine.begin() as conn:
+            if stmt is not None:
+                conn.execute(stmt, list(rows.values()))
+            else:
+                _insert_missing(conn, list(rows.values()))
+            bump_versions(conn, ["stock_universe"])
+        response_cache.invalidate_tags(["stock_universe"])
+        stats["chunks"] += 1
+
+    return stats
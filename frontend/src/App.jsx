@@ -25,93 +25,40 @@ import './App.css'
 // API 기본 URL (향상된 백엔드)
 const API_BASE_URL = 'https://g8h3ilc7vokm.manus.space/api'
 
-// API 호출 함수들
-const fetchRobots = async () => {
+// API 호출 함수 - 대시보드 섹션을 한 번의 요청으로 조회 (fields: 필요한 섹션 목록)
+const fetchDashboard = async (fields, params = '') => {
   try {
-    const response = await fetch(`${API_BASE_URL}/robots`)
-    const data = await response.json()
-    return data.success ? data.data : []
-  } catch (error) {
-    console.error('Error fetching robots:', error)
-    return []
-  }
-}
-
-const fetchDetailedTrades = async (limit = 20) => {
-  try {
-    const response = await fetch(`${API_BASE_URL}/trades/recent?details=true&limit=${limit}`)
-    const data = await response.json()
-    return data.success ? data.data : []
-  } catch (error) {
-    console.error('Error fetching detailed trades:', error)
-    return []
-  }
-}
-
-const fetchLiveTrades = async () => {
-  try {
-    const response = await fetch(`${API_BASE_URL}/trades/live`)
-    const data = await response.json()
-    return data.success ? data.data : []
-  } catch (error) {
-    console.error('Error fetching live trades:', error)
-    return []
-  }
-}
-
-const fetchMarketCondition = async () => {
-  try {
-    const response = await fetch(`${API_BASE_URL}/market/condition`)
+    const response = await fetch(`${API_BASE_URL}/dashboard?fields=${fields.join(',')}${params}`)
     const data = await response.json()
+    if (data.errors) console.error('Dashboard section errors:', data.errors)
     return data.success ? data.data : {}
   } catch (error) {
-    console.error('Error fetching market condition:', error)
+    console.error('Error fetching dashboard:', error)
     return {}
   }
 }
 
-const fetchSectorPerformance = async () => {
-  try {
-    const response = await fetch(`${API_BASE_URL}/trades/sectors`)
-    const data = await response.json()
-    return data.success ? data.data : []
-  } catch (error) {
-    console.error('Error fetching sector performance:', error)
-    return []
-  }
-}
+const LIVE_TRADES_LIMIT = 15
 
-const fetchTrendingStocks = async () => {
-  try {
-    const response = await fetch(`${API_BASE_URL}/market/trending`)
-    const data = await response.json()
-    return data.success ? data.data : []
-  } catch (error) {
-    console.error('Error fetching trending stocks:', error)
-    return []
-  }
-}
+// 서버 시각 문자열 → Date (trade_date 등은 오프셋 없는 UTC이므로 로컬 시각으로 해석되지 않도록 Z를 붙임)
+const parseServerDate = (value) =>
+  new Date(/(Z|[+-]\d{2}:\d{2})$/.test(value) ? value : `${value}Z`)
 
-const fetchPredictions = async () => {
-  try {
-    const response = await fetch(`${API_BASE_URL}/predictions/leaderboard`)
-    const data = await response.json()
-    return data.success ? data.data : []
-  } catch (error) {
-    console.error('Error fetching predictions:', error)
-    return []
-  }
+// 거래 시각 → "N분 전" 형태
+const formatTimeAgo = (tradeDate) => {
+  if (!tradeDate) return ''
+  const minutesAgo = Math.max(0, Math.floor((Date.now() - parseServerDate(tradeDate).getTime()) / 60000))
+  if (minutesAgo < 1) return '방금 전'
+  return minutesAgo < 60 ? `${minutesAgo}분 전` : `${Math.floor(minutesAgo / 60)}시간 전`
 }
 
-const fetchMetaModel = async () => {
-  try {
-    const response = await fetch(`${API_BASE_URL}/meta-model/performance`)
-    const data = await response.json()
-    return data.success ? data.data : {}
-  } catch (error) {
-    console.error('Error fetching meta model:', error)
-    return {}
-  }
+// 체결된 거래 실시간 스트림 구독 (SSE, 끊기면 브라우저가 Last-Event-ID로 자동 재접속)
+const subscribeTrades = (onTrade, onDropped) => {
+  const source = new EventSource(`${API_BASE_URL}/stream/trades`)
+  source.addEventListener('trade', (event) => onTrade(JSON.parse(event.data)))
+  source.addEventListener('dropped', onDropped)
+  source.onerror = (error) => console.error('Trade stream error:', error)
+  return () => source.close()
 }
 
 // 거래 상세 정보 모달 컴포넌트
@@ -305,47 +252,43 @@ function App() {
   const [selectedTrade, setSelectedTrade] = useState(null)
   const [lastUpdate, setLastUpdate] = useState(new Date())
 
-  // 데이터 로딩 함수
+  // 데이터 로딩 함수 (거래 목록은 스트림으로 갱신되므로 처음 한 번과 스트림 누락 시에만 조회)
+  const loadTrades = async () => {
+    const data = await fetchDashboard(['recent_trades'], '&trades_limit=20')
+    const detailedTradesData = data.recent_trades || []
+    setDetailedTrades(detailedTradesData)
+    setLiveTrades(detailedTradesData.slice(0, LIVE_TRADES_LIMIT))
+  }
+
   const loadData = async () => {
-    try {
-      const [
-        robotsData,
-        detailedTradesData,
-        liveTradesData,
-        marketData,
-        sectorData,
-        trendingData,
-        predictionsData,
-        metaModelData
-      ] = await Promise.all([
-        fetchRobots(),
-        fetchDetailedTrades(20),
-        fetchLiveTrades(),
-        fetchMarketCondition(),
-        fetchSectorPerformance(),
-        fetchTrendingStocks(),
-        fetchPredictions(),
-        fetchMetaModel()
-      ])
-
-      setRobots(robotsData)
-      setDetailedTrades(detailedTradesData)
-      setLiveTrades(liveTradesData)
-      setMarketCondition(marketData)
-      setSectorPerformance(sectorData)
-      setTrendingStocks(trendingData)
-      setPredictions(predictionsData)
-      setMetaModel(metaModelData)
-      setLastUpdate(new Date())
-    } catch (error) {
-      console.error('Error loading data:', error)
-    }
+    const data = await fetchDashboard(['robots', 'market_condition', 'sectors', 'trending', 'leaderboard', 'meta_model'])
+    setRobots(data.robots || [])
+    setMarketCondition(data.market_condition || {})
+    setSectorPerformance(data.sectors || [])
+    setTrendingStocks(data.trending || [])
+    setPredictions(data.leaderboard || [])
+    setMetaModel(data.meta_model || {})
+    setLastUpdate(new Date())
   }
 
   useEffect(() => {
+    loadTrades()
     loadData()
-    const interval = setInterval(loadData, 30000) // 30초마다 업데이트
-    return () => clearInterval(interval)
+    const interval = setInterval(loadData, 30000) // 거래 외 집계 데이터는 30초마다 업데이트
+
+    const unsubscribe = subscribeTrades(
+      (trade) => {
+        setLiveTrades((trades) => [trade, ...trades].slice(0, LIVE_TRADES_LIMIT))
+        setDetailedTrades((trades) => [trade, ...trades].slice(0, 20))
+        setLastUpdate(new Date())
+      },
+      loadTrades // 느린 연결로 이벤트가 누락되면 목록을 다시 조회
+    )
+
+    return () => {
+      clearInterval(interval)
+      unsubscribe()
+    }
   }, [])
 
   return (
@@ -568,8 +511,8 @@ function App() {
                 </CardHeader>
                 <CardContent>
                   <div className="space-y-3 max-h-96 overflow-y-auto">
-                    {liveTrades.map((trade, index) => (
-                      <div key={index} className="flex items-center justify-between p-3 bg-gray-50 rounded-lg">
+                    {liveTrades.map((trade) => (
+                      <div key={trade.id} className="flex items-center justify-between p-3 bg-gray-50 rounded-lg">
                         <div className="flex items-center space-x-3">
                           <div className={`p-2 rounded-full ${trade.trade_type === 'BUY' ? 'bg-green-100' : 'bg-red-100'}`}>
                             {trade.trade_type === 'BUY' ? 
@@ -584,7 +527,7 @@ function App() {
                         </div>
                         <div className="text-right">
                           <p className="font-semibold">${trade.price}</p>
-                          <p className="text-sm text-gray-600">{trade.time_ago}</p>
+                          <p className="text-sm text-gray-600">{formatTimeAgo(trade.trade_date)}</p>
                         </div>
                       </div>
                     ))}
@@ -626,7 +569,7 @@ function App() {
                         <div className="flex justify-between items-center mt-2">
                           <span className="text-sm font-semibold">${trade.price} × {trade.quantity}</span>
                           <span className="text-xs text-gray-500">
-                            {new Date(trade.trade_date).toLocaleTimeString('ko-KR')}
+                            {parseServerDate(trade.trade_date).toLocaleTimeString('ko-KR')}
                           </span>
                         </div>
                       </div>